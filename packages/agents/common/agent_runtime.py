@@ -0,0 +1,208 @@
+"""
+Agent Runtime - Shared MCP websocket loop for enrichment agents
+
+Connects to the MCP server, registers the agent's tools and dispatches each
+`tools/invoke` request as its own task. Replies are sent as soon as each tool
+finishes (out of order, correlated by JSON-RPC id). At most `max_concurrency`
+invocations run at once; further requests stay unread on the socket until a
+slot frees up. On SIGTERM/SIGINT the runtime stops reading, lets in-flight
+invocations finish for up to `drain_timeout` seconds and then closes.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import signal
+import uuid
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+import websockets
+
+logger = logging.getLogger(__name__)
+
+ToolHandler = Callable[[str, Dict[str, Any]], Awaitable[Dict[str, Any]]]
+
+
+def make_request(method: str, params: Dict[str, Any], request_id: str) -> str:
+    """Create JSON-RPC 2.0 request"""
+    return json.dumps({
+        "jsonrpc": "2.0",
+        "method": method,
+        "params": params,
+        "id": request_id
+    })
+
+
+def make_response(result: Dict[str, Any], request_id: str) -> str:
+    """Create JSON-RPC 2.0 response"""
+    return json.dumps({
+        "jsonrpc": "2.0",
+        "result": result,
+        "id": request_id
+    })
+
+
+def make_error(code: int, message: str, request_id: str) -> str:
+    """Create JSON-RPC 2.0 error response"""
+    return json.dumps({
+        "jsonrpc": "2.0",
+        "error": {
+            "code": code,
+            "message": message
+        },
+        "id": request_id
+    })
+
+
+class AgentRuntime:
+    """Runs an agent's tools over a single MCP websocket connection"""
+
+    def __init__(self, agent_id: str, server_url: str, token: Optional[str],
+                 tool_definitions: List[Dict[str, Any]], handler: ToolHandler,
+                 max_concurrency: Optional[int] = None, drain_timeout: Optional[float] = None):
+        """
+        Args:
+            agent_id: Agent identifier used in logs
+            server_url: MCP server websocket URL
+            token: Bearer token for the MCP server (optional)
+            tool_definitions: Tool definitions sent in `tools/register`
+            handler: Coroutine called as handler(method, params) for each invocation
+            max_concurrency: Maximum invocations in flight (AGENT_MAX_CONCURRENCY)
+            drain_timeout: Seconds to wait for in-flight invocations on shutdown
+                (AGENT_DRAIN_TIMEOUT)
+        """
+        self.agent_id = agent_id
+        self.server_url = server_url
+        self.token = token
+        self.tool_definitions = tool_definitions
+        self.handler = handler
+        self.max_concurrency = max_concurrency or int(os.getenv('AGENT_MAX_CONCURRENCY', '8'))
+        self.drain_timeout = drain_timeout if drain_timeout is not None else float(
+            os.getenv('AGENT_DRAIN_TIMEOUT', '30')
+        )
+
+        self.semaphore = asyncio.Semaphore(self.max_concurrency)
+        self.in_flight: Dict[Any, asyncio.Task] = {}
+        self.stopping = asyncio.Event()
+        self.stats = {
+            'invocations_total': 0,
+            'invocations_failed': 0,
+            'peak_in_flight': 0
+        }
+
+    def stop(self):
+        """Stop accepting invocations and drain the ones in flight"""
+        if not self.stopping.is_set():
+            logger.info(f"{self.agent_id} stopping, draining {len(self.in_flight)} in-flight invocations")
+            self.stopping.set()
+
+    async def run(self):
+        """Connect, register tools and serve invocations until stopped or disconnected"""
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGTERM, signal.SIGINT):
+            try:
+                loop.add_signal_handler(sig, self.stop)
+            except (NotImplementedError, RuntimeError):
+                pass
+
+        headers = {}
+        if self.token:
+            headers['Authorization'] = f'Bearer {self.token}'
+
+        logger.info(f"Connecting to MCP server at {self.server_url}")
+
+        async with websockets.connect(self.server_url, additional_headers=headers) as ws:
+            logger.info("Connected to MCP server")
+            await self.register(ws)
+
+            logger.info(f"Entering message processing loop (max {self.max_concurrency} concurrent invocations)")
+            reader = asyncio.create_task(self._read_loop(ws))
+            stopper = asyncio.create_task(self.stopping.wait())
+            try:
+                await asyncio.wait({reader, stopper}, return_when=asyncio.FIRST_COMPLETED)
+            finally:
+                reader.cancel()
+                stopper.cancel()
+                await asyncio.gather(reader, stopper, return_exceptions=True)
+                await self.drain(ws)
+
+            if not reader.cancelled() and reader.exception():
+                raise reader.exception()
+
+    async def register(self, ws):
+        """Send tool registration and wait for confirmation"""
+        registration_id = str(uuid.uuid4())
+        await ws.send(make_request(
+            "tools/register",
+            {"tools": self.tool_definitions},
+            registration_id
+        ))
+        logger.info("Sent tool registration request")
+
+        response = await ws.recv()
+        reg_response = json.loads(response)
+        logger.info(f"Registration response: {reg_response}")
+
+    async def drain(self, ws):
+        """Wait for in-flight invocations, cancelling any still running after drain_timeout"""
+        if not self.in_flight:
+            return
+
+        tasks = list(self.in_flight.values())
+        _, pending = await asyncio.wait(tasks, timeout=self.drain_timeout)
+        if pending:
+            logger.warning(f"Cancelling {len(pending)} invocations still running after {self.drain_timeout}s")
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+
+    async def _read_loop(self, ws):
+        """Read messages, starting a task per invocation once a slot is free"""
+        async for raw_message in ws:
+            try:
+                message = json.loads(raw_message)
+            except json.JSONDecodeError as e:
+                logger.error(f"Failed to parse message: {e}")
+                continue
+
+            if message.get('method') != 'tools/invoke':
+                continue
+
+            # Backpressure: stop reading while every slot is busy
+            await self.semaphore.acquire()
+            request_id = message.get('id')
+            task = asyncio.create_task(self._invoke(ws, request_id, message['method'], message.get('params', {})))
+            self.in_flight[request_id] = task
+            self.stats['invocations_total'] += 1
+            self.stats['peak_in_flight'] = max(self.stats['peak_in_flight'], len(self.in_flight))
+            task.add_done_callback(lambda _, request_id=request_id: self._release(request_id))
+
+    def _release(self, request_id):
+        self.in_flight.pop(request_id, None)
+        self.semaphore.release()
+
+    async def _invoke(self, ws, request_id, method: str, params: Dict[str, Any]):
+        """Run one invocation and send its response"""
+        logger.debug(f"Received tool invocation: {request_id}")
+
+        try:
+            result = await self.handler(method, params)
+            reply = make_response(result, request_id)
+        except asyncio.CancelledError:
+            self.stats['invocations_failed'] += 1
+            await self._send(ws, make_error(-32603, "Agent shutting down", request_id), request_id)
+            raise
+        except Exception as e:
+            self.stats['invocations_failed'] += 1
+            logger.error(f"Tool invocation error: {e}")
+            reply = make_error(-32603, str(e), request_id)
+
+        await self._send(ws, reply, request_id)
+
+    async def _send(self, ws, reply: str, request_id):
+        try:
+            await ws.send(reply)
+            logger.debug(f"Sent tool response: {request_id}")
+        except websockets.ConnectionClosed:
+            logger.warning(f"Connection closed before response {request_id} could be sent")
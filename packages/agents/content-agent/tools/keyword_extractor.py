@@ -5,8 +5,8 @@ Keyword Extractor - Extracts keywords using Ollama
 import json
 import logging
 import re
-import requests
-from typing import Dict, Any, List
+import httpx
+from typing import Dict, Any, List, Optional
 
 logger = logging.getLogger(__name__)
 
@@ -14,9 +14,11 @@ logger = logging.getLogger(__name__)
 class KeywordExtractor:
     """Extracts keywords from text using Ollama"""
 
-    def __init__(self, ollama_host: str = 'http://ollama:11434', model: str = 'llama3.2'):
+    def __init__(self, ollama_host: str = 'http://ollama:11434', model: str = 'llama3.2',
+                 http_client: Optional[httpx.AsyncClient] = None):
         self.ollama_host = ollama_host
         self.model = model
+        self.http_client = http_client or httpx.AsyncClient()
         logger.info(f"KeywordExtractor initialized with model {model}")
 
     async def extract(self, text: str) -> Dict[str, Any]:
@@ -27,7 +29,7 @@ class KeywordExtractor:
         prompt = self._build_prompt(text[:2000])
 
         try:
-            response = requests.post(
+            response = await self.http_client.post(
                 f'{self.ollama_host}/api/generate',
                 json={
                     'model': self.model,
@@ -4,8 +4,8 @@ Subject Classifier - Classifies letter by subject taxonomy
 
 import json
 import logging
-import requests
-from typing import Dict, Any, List
+import httpx
+from typing import Dict, Any, List, Optional
 
 logger = logging.getLogger(__name__)
 
@@ -27,9 +27,11 @@ class SubjectClassifier:
         'historical_documentation'
     ]
 
-    def __init__(self, ollama_host: str = 'http://ollama:11434', model: str = 'llama3.2'):
+    def __init__(self, ollama_host: str = 'http://ollama:11434', model: str = 'llama3.2',
+                 http_client: Optional[httpx.AsyncClient] = None):
         self.ollama_host = ollama_host
         self.model = model
+        self.http_client = http_client or httpx.AsyncClient()
         logger.info("SubjectClassifier initialized")
 
     async def classify(self, text: str, entities: Dict[str, Any] = None) -> Dict[str, Any]:
@@ -40,7 +42,7 @@ class SubjectClassifier:
         prompt = self._build_prompt(text[:2000])
 
         try:
-            response = requests.post(
+            response = await self.http_client.post(
                 f'{self.ollama_host}/api/generate',
                 json={
                     'model': self.model,
@@ -17,8 +17,8 @@ class Summarizer:
 
         if self.enabled:
             try:
-                from anthropic import Anthropic
-                self.client = Anthropic(api_key=api_key)
+                from anthropic import AsyncAnthropic
+                self.client = AsyncAnthropic(api_key=api_key)
                 logger.info("Summarizer initialized with Claude API")
             except Exception as e:
                 logger.warning(f"Could not initialize Claude client: {e}")
@@ -26,6 +26,11 @@ class Summarizer:
         else:
             logger.info("Summarizer running in fallback mode (no API key)")
 
+    async def close(self):
+        """Close the Claude client's connection pool"""
+        if self.enabled:
+            await self.client.close()
+
     async def summarize(self, text: str, entities: Dict[str, Any] = None) -> Dict[str, Any]:
         """
         Generate summary of letter content using Claude Sonnet
@@ -43,7 +48,7 @@ class Summarizer:
             prompt = self._build_summary_prompt(text, entities)
 
             # Call Claude Sonnet (better quality than Haiku for summaries)
-            response = self.client.messages.create(
+            response = await self.client.messages.create(
                 model="claude-sonnet-4-20250514",
                 max_tokens=500,
                 messages=[{
@@ -11,14 +11,15 @@ Model: Claude Opus 4.5 (highest quality for critical analysis)
 """
 
 import asyncio
-import json
 import logging
 import os
 import sys
-import websockets
-import uuid
 from typing import Dict, Any, Optional
 
+# Shared MCP runtime lives in packages/agents/common; the Docker image copies it next to main.py
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'common'))
+from agent_runtime import AgentRuntime
+
 # Setup logging
 logging.basicConfig(
     level=logging.INFO,
@@ -27,37 +28,6 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
-def make_request(method: str, params: Dict[str, Any], request_id: str) -> str:
-    """Create JSON-RPC 2.0 request"""
-    return json.dumps({
-        "jsonrpc": "2.0",
-        "method": method,
-        "params": params,
-        "id": request_id
-    })
-
-
-def make_response(result: Dict[str, Any], request_id: str) -> str:
-    """Create JSON-RPC 2.0 response"""
-    return json.dumps({
-        "jsonrpc": "2.0",
-        "result": result,
-        "id": request_id
-    })
-
-
-def make_error(code: int, message: str, request_id: str) -> str:
-    """Create JSON-RPC 2.0 error response"""
-    return json.dumps({
-        "jsonrpc": "2.0",
-        "error": {
-            "code": code,
-            "message": message
-        },
-        "id": request_id
-    })
-
-
 class ContextAgent:
     """Agent for historical context and significance analysis"""
 
@@ -204,62 +174,29 @@ class ContextAgent:
         logger.info(f"Invoking tool: {tool_name}")
         return await self.tools[tool_name](arguments)
 
+    async def close(self):
+        """Close HTTP connection pools held by the agent and its tools"""
+        await self.historian.close()
+        await self.significance_assessor.close()
+        await self.biographer.close()
+
     async def run(self):
         """Main agent loop"""
-        try:
-            headers = {}
-            if self.token:
-                headers['Authorization'] = f'Bearer {self.token}'
-
-            logger.info(f"Connecting to MCP server at {self.server_url}")
-
-            async with websockets.connect(self.server_url, additional_headers=headers) as ws:
-                logger.info("Connected to MCP server")
-
-                registration_id = str(uuid.uuid4())
-                registration_msg = make_request(
-                    "tools/register",
-                    {"tools": self.get_tool_definitions()},
-                    registration_id
-                )
-
-                await ws.send(registration_msg)
-                logger.info("Sent tool registration request")
-
-                response = await ws.recv()
-                reg_response = json.loads(response)
-                logger.info(f"Registration response: {reg_response}")
-
-                logger.info("Entering message processing loop")
-                async for raw_message in ws:
-                    try:
-                        message = json.loads(raw_message)
-
-                        if message.get('method') == 'tools/invoke':
-                            request_id = message.get('id')
-                            params = message.get('params', {})
-
-                            logger.debug(f"Received tool invocation: {request_id}")
-
-                            try:
-                                result = await self.handle_tool_invocation(message['method'], params)
-                                response_msg = make_response(result, request_id)
-                                await ws.send(response_msg)
-                                logger.debug(f"Sent tool response: {request_id}")
-
-                            except Exception as e:
-                                error_msg = make_error(-32603, str(e), request_id)
-                                await ws.send(error_msg)
-                                logger.error(f"Tool invocation error: {e}")
-
-                    except json.JSONDecodeError as e:
-                        logger.error(f"Failed to parse message: {e}")
-                    except Exception as e:
-                        logger.error(f"Error processing message: {e}")
+        runtime = AgentRuntime(
+            self.agent_id,
+            self.server_url,
+            self.token,
+            self.get_tool_definitions(),
+            self.handle_tool_invocation
+        )
 
+        try:
+            await runtime.run()
         except Exception as e:
             logger.error(f"Agent error: {e}", exc_info=True)
             sys.exit(1)
+        finally:
+            await self.close()
 
 
 if __name__ == '__main__':
@@ -17,8 +17,8 @@ class BiographyGenerator:
 
         if self.enabled:
             try:
-                from anthropic import Anthropic
-                self.client = Anthropic(api_key=api_key)
+                from anthropic import AsyncAnthropic
+                self.client = AsyncAnthropic(api_key=api_key)
                 logger.info("BiographyGenerator initialized with Claude Opus")
             except Exception as e:
                 logger.warning(f"Could not initialize Claude client: {e}")
@@ -26,6 +26,11 @@ class BiographyGenerator:
         else:
             logger.info("BiographyGenerator running in fallback mode")
 
+    async def close(self):
+        """Close the Claude client's connection pool"""
+        if self.enabled:
+            await self.client.close()
+
     async def generate(self, people: List[Dict[str, Any]], context: str = "") -> Dict[str, Dict[str, str]]:
         """
         Generate enhanced biographies for key people
@@ -48,7 +53,7 @@ class BiographyGenerator:
 
                 prompt = self._build_biography_prompt(name, person, context)
 
-                response = self.client.messages.create(
+                response = await self.client.messages.create(
                     model="claude-opus-4-20250805",
                     max_tokens=400,
                     messages=[{
@@ -17,8 +17,8 @@ class HistoricalResearcher:
 
         if self.enabled:
             try:
-                from anthropic import Anthropic
-                self.client = Anthropic(api_key=api_key)
+                from anthropic import AsyncAnthropic
+                self.client = AsyncAnthropic(api_key=api_key)
                 logger.info("HistoricalResearcher initialized with Claude Opus")
             except Exception as e:
                 logger.warning(f"Could not initialize Claude client: {e}")
@@ -26,6 +26,11 @@ class HistoricalResearcher:
         else:
             logger.info("HistoricalResearcher running in fallback mode")
 
+    async def close(self):
+        """Close the Claude client's connection pool"""
+        if self.enabled:
+            await self.client.close()
+
     async def research(
         self,
         text: str,
@@ -49,7 +54,7 @@ class HistoricalResearcher:
             prompt = self._build_research_prompt(text, people, locations, events, date)
 
             # Use Claude Opus for highest quality
-            response = self.client.messages.create(
+            response = await self.client.messages.create(
                 model="claude-opus-4-20250805",
                 max_tokens=1500,
                 messages=[{
@@ -17,8 +17,8 @@ class SignificanceAssessor:
 
         if self.enabled:
             try:
-                from anthropic import Anthropic
-                self.client = Anthropic(api_key=api_key)
+                from anthropic import AsyncAnthropic
+                self.client = AsyncAnthropic(api_key=api_key)
                 logger.info("SignificanceAssessor initialized with Claude Opus")
             except Exception as e:
                 logger.warning(f"Could not initialize Claude client: {e}")
@@ -26,6 +26,11 @@ class SignificanceAssessor:
         else:
             logger.info("SignificanceAssessor running in fallback mode")
 
+    async def close(self):
+        """Close the Claude client's connection pool"""
+        if self.enabled:
+            await self.client.close()
+
     async def assess(self, text: str, context: str = "") -> Dict[str, Any]:
         """
         Assess the historical significance of a document
@@ -45,7 +50,7 @@ class SignificanceAssessor:
         try:
             prompt = self._build_assessment_prompt(text, context)
 
-            response = self.client.messages.create(
+            response = await self.client.messages.create(
                 model="claude-opus-4-20250805",
                 max_tokens=800,
                 messages=[{
@@ -18,8 +18,8 @@ class EntityDisambiguator:
 
         if self.enabled:
             try:
-                from anthropic import Anthropic
-                self.client = Anthropic(api_key=api_key)
+                from anthropic import AsyncAnthropic
+                self.client = AsyncAnthropic(api_key=api_key)
                 logger.info("EntityDisambiguator initialized with Claude API")
             except Exception as e:
                 logger.warning(f"Could not initialize Claude client: {e}")
@@ -27,6 +27,11 @@ class EntityDisambiguator:
         else:
             logger.info("EntityDisambiguator running in fallback mode (no API key)")
 
+    async def close(self):
+        """Close the Claude client's connection pool"""
+        if self.enabled:
+            await self.client.close()
+
     async def disambiguate_people(self, people: List[Dict[str, Any]], context: str) -> List[Dict[str, Any]]:
         """
         Disambiguate and enrich person entities using Claude
@@ -41,7 +46,7 @@ class EntityDisambiguator:
             prompt = self._build_disambiguation_prompt(people, context)
 
             # Call Claude Haiku (fast, cheap)
-            response = self.client.messages.create(
+            response = await self.client.messages.create(
                 model="claude-haiku-4-5-20241001",
                 max_tokens=1000,
                 messages=[{
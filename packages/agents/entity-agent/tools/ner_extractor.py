@@ -6,8 +6,8 @@ Handles: people, organizations, locations, events
 import json
 import logging
 import re
-import requests
-from typing import Dict, Any, List
+import httpx
+from typing import Dict, Any, List, Optional
 
 logger = logging.getLogger(__name__)
 
@@ -15,9 +15,11 @@ logger = logging.getLogger(__name__)
 class NERExtractor:
     """Performs Named Entity Recognition using Ollama"""
 
-    def __init__(self, ollama_host: str = 'http://ollama:11434', model: str = 'llama3.2'):
+    def __init__(self, ollama_host: str = 'http://ollama:11434', model: str = 'llama3.2',
+                 http_client: Optional[httpx.AsyncClient] = None):
         self.ollama_host = ollama_host
         self.model = model
+        self.http_client = http_client or httpx.AsyncClient()
         logger.info(f"NERExtractor initialized with model {model}")
 
     async def extract_people(self, text: str) -> Dict[str, List[Dict[str, Any]]]:
@@ -28,7 +30,7 @@ class NERExtractor:
         prompt = self._build_people_prompt(text[:2000])
 
         try:
-            response = requests.post(
+            response = await self.http_client.post(
                 f'{self.ollama_host}/api/generate',
                 json={
                     'model': self.model,
@@ -63,7 +65,7 @@ class NERExtractor:
         prompt = self._build_organizations_prompt(text[:2000])
 
         try:
-            response = requests.post(
+            response = await self.http_client.post(
                 f'{self.ollama_host}/api/generate',
                 json={
                     'model': self.model,
@@ -97,7 +99,7 @@ class NERExtractor:
         prompt = self._build_locations_prompt(text[:2000])
 
         try:
-            response = requests.post(
+            response = await self.http_client.post(
                 f'{self.ollama_host}/api/generate',
                 json={
                     'model': self.model,
@@ -131,7 +133,7 @@ class NERExtractor:
         prompt = self._build_events_prompt(text[:2000])
 
         try:
-            response = requests.post(
+            response = await self.http_client.post(
                 f'{self.ollama_host}/api/generate',
                 json={
                     'model': self.model,
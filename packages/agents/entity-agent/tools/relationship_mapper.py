@@ -5,7 +5,6 @@ Relationship Mapper - Maps relationships and connections between entities
 import json
 import logging
 import re
-import requests
 from typing import Dict, Any, List
 
 logger = logging.getLogger(__name__)
@@ -12,14 +12,16 @@ Model: Ollama (llama3.2)
 """
 
 import asyncio
-import json
 import logging
 import os
 import sys
-import websockets
-import uuid
+import httpx
 from typing import Dict, Any, Optional
 
+# Shared MCP runtime lives in packages/agents/common; the Docker image copies it next to main.py
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'common'))
+from agent_runtime import AgentRuntime
+
 # Setup logging
 logging.basicConfig(
     level=logging.INFO,
@@ -28,37 +30,6 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
-def make_request(method: str, params: Dict[str, Any], request_id: str) -> str:
-    """Create JSON-RPC 2.0 request"""
-    return json.dumps({
-        "jsonrpc": "2.0",
-        "method": method,
-        "params": params,
-        "id": request_id
-    })
-
-
-def make_response(result: Dict[str, Any], request_id: str) -> str:
-    """Create JSON-RPC 2.0 response"""
-    return json.dumps({
-        "jsonrpc": "2.0",
-        "result": result,
-        "id": request_id
-    })
-
-
-def make_error(code: int, message: str, request_id: str) -> str:
-    """Create JSON-RPC 2.0 error response"""
-    return json.dumps({
-        "jsonrpc": "2.0",
-        "error": {
-            "code": code,
-            "message": message
-        },
-        "id": request_id
-    })
-
-
 class MetadataAgent:
     """Agent for extracting metadata from historical documents"""
 
@@ -69,6 +40,14 @@ class MetadataAgent:
         self.ollama_host = os.getenv('OLLAMA_HOST', 'http://ollama:11434')
         self.ollama_model = os.getenv('OLLAMA_MODEL', 'llama3.2')
 
+        # Pooled async HTTP client shared by the Ollama-backed tools
+        self.http_client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=int(os.getenv('HTTP_MAX_CONNECTIONS', '20')),
+                max_keepalive_connections=int(os.getenv('HTTP_MAX_KEEPALIVE_CONNECTIONS', '10'))
+            )
+        )
+
         logger.info(f"Initialized {self.agent_id}")
         logger.info(f"Server: {self.server_url}")
         logger.info(f"Ollama: {self.ollama_host} ({self.ollama_model})")
@@ -78,7 +57,7 @@ class MetadataAgent:
         from tools.storage_extractor import StorageExtractor
         from tools.access_determiner import AccessDeterminer
 
-        self.classifier = DocumentClassifier(self.ollama_host, self.ollama_model)
+        self.classifier = DocumentClassifier(self.ollama_host, self.ollama_model, http_client=self.http_client)
         self.storage_extractor = StorageExtractor(self.ollama_host, self.ollama_model)
         self.access_determiner = AccessDeterminer(self.ollama_host, self.ollama_model)
 
@@ -333,70 +312,27 @@ class MetadataAgent:
         logger.info(f"Invoking tool: {tool_name}")
         return await self.tools[tool_name](arguments)
 
+    async def close(self):
+        """Close HTTP connection pools held by the agent and its tools"""
+        await self.http_client.aclose()
+
     async def run(self):
         """Main agent loop"""
-        try:
-            # Prepare connection headers
-            headers = {}
-            if self.token:
-                headers['Authorization'] = f'Bearer {self.token}'
-
-            logger.info(f"Connecting to MCP server at {self.server_url}")
-
-            async with websockets.connect(self.server_url, additional_headers=headers) as ws:
-                logger.info("Connected to MCP server")
-
-                # Register tools
-                registration_id = str(uuid.uuid4())
-                registration_msg = make_request(
-                    "tools/register",
-                    {"tools": self.get_tool_definitions()},
-                    registration_id
-                )
-
-                await ws.send(registration_msg)
-                logger.info("Sent tool registration request")
-
-                # Wait for registration confirmation
-                response = await ws.recv()
-                reg_response = json.loads(response)
-                logger.info(f"Registration response: {reg_response}")
-
-                # Main message loop
-                logger.info("Entering message processing loop")
-                async for raw_message in ws:
-                    try:
-                        message = json.loads(raw_message)
-
-                        # Handle tool invocation
-                        if message.get('method') == 'tools/invoke':
-                            request_id = message.get('id')
-                            params = message.get('params', {})
-
-                            logger.debug(f"Received tool invocation: {request_id}")
-
-                            try:
-                                result = await self.handle_tool_invocation(message['method'], params)
-
-                                # Send response
-                                response_msg = make_response(result, request_id)
-                                await ws.send(response_msg)
-                                logger.debug(f"Sent tool response: {request_id}")
-
-                            except Exception as e:
-                                # Send error response
-                                error_msg = make_error(-32603, str(e), request_id)
-                                await ws.send(error_msg)
-                                logger.error(f"Tool invocation error: {e}")
-
-                    except json.JSONDecodeError as e:
-                        logger.error(f"Failed to parse message: {e}")
-                    except Exception as e:
-                        logger.error(f"Error processing message: {e}")
+        runtime = AgentRuntime(
+            self.agent_id,
+            self.server_url,
+            self.token,
+            self.get_tool_definitions(),
+            self.handle_tool_invocation
+        )
 
+        try:
+            await runtime.run()
         except Exception as e:
             logger.error(f"Agent error: {e}", exc_info=True)
             sys.exit(1)
+        finally:
+            await self.close()
 
 
 if __name__ == '__main__':
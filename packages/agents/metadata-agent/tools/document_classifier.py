@@ -5,7 +5,7 @@ Uses Ollama LLM for efficient, local classification
 
 import json
 import logging
-import requests
+import httpx
 from typing import Dict, Any, Optional
 
 logger = logging.getLogger(__name__)
@@ -16,16 +16,19 @@ class DocumentClassifier:
 
     VALID_TYPES = ['letter', 'memo', 'telegram', 'fax', 'email', 'invitation']
 
-    def __init__(self, ollama_host: str = 'http://ollama:11434', model: str = 'llama3.2'):
+    def __init__(self, ollama_host: str = 'http://ollama:11434', model: str = 'llama3.2',
+                 http_client: Optional[httpx.AsyncClient] = None):
         """
         Initialize classifier
 
         Args:
             ollama_host: Ollama API host URL
             model: Model name (e.g., 'llama3.2', 'mistral')
+            http_client: Pooled async HTTP client shared by the agent's tools
         """
         self.ollama_host = ollama_host
         self.model = model
+        self.http_client = http_client or httpx.AsyncClient()
         logger.info(f"DocumentClassifier initialized with model {model}")
 
     async def classify(self, text: str, ocr_confidence: float = 1.0) -> Dict[str, Any]:
@@ -55,7 +58,7 @@ class DocumentClassifier:
 
         try:
             # Call Ollama API
-            response = requests.post(
+            response = await self.http_client.post(
                 f'{self.ollama_host}/api/generate',
                 json={
                     'model': self.model,
@@ -80,7 +83,7 @@ class DocumentClassifier:
         except json.JSONDecodeError as e:
             logger.error(f"Failed to parse Ollama response: {e}")
             return self._fallback_classify(text_excerpt, ocr_confidence)
-        except requests.RequestException as e:
+        except httpx.HTTPError as e:
             logger.error(f"Ollama connection error: {e}")
             return self._fallback_classify(text_excerpt, ocr_confidence)
         except Exception as e:
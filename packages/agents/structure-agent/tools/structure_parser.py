@@ -5,7 +5,6 @@ Structure Parser - Parses letter structure (salutation, body, closing, signature
 import json
 import logging
 import re
-import requests
 from typing import Dict, Any, List
 
 logger = logging.getLogger(__name__)
@@ -75,8 +75,33 @@ def _initialize_job_recovery(app):
         pass
 
 
+def _validate_priority_lanes(config_class):
+    """
+    Check that the default NSQ priority is one of the configured lanes
+
+    Jobs without a priority are published to the default lane; if it is not
+    in NSQ_PRIORITY_LANES, no worker reader subscribes to its topic and the
+    tasks are never consumed.
+
+    Raises:
+        ValueError: If NSQ_DEFAULT_PRIORITY is not a configured lane
+    """
+    lanes = config_class.NSQ_PRIORITY_LANES
+    if not lanes:
+        raise ValueError("NSQ_PRIORITY_LANES must define at least one lane (e.g. 'high=8,normal=3,low=1')")
+    if config_class.NSQ_DEFAULT_PRIORITY not in lanes:
+        raise ValueError(
+            f"NSQ_DEFAULT_PRIORITY '{config_class.NSQ_DEFAULT_PRIORITY}' is not one of "
+            f"NSQ_PRIORITY_LANES: {', '.join(lanes)}"
+        )
+
+
 def create_app(config_class=Config):
     """Create and configure Flask application"""
+    # Lanes only route NSQ file tasks; threaded bulk jobs never use them
+    if config_class.USE_NSQ:
+        _validate_priority_lanes(config_class)
+
     app = Flask(__name__)
     app.config.from_object(config_class)
 
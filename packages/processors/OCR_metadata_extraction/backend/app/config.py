@@ -75,6 +75,11 @@ class Config:
     # Bulk Processing
     BULK_PARALLEL_JOBS = int(os.getenv('BULK_PARALLEL_JOBS', '4'))  # Number of parallel jobs for bulk processing
     BULK_MAX_PARALLEL_JOBS = 16  # Maximum allowed parallel jobs to prevent resource exhaustion
+    BULK_PROGRESS_STREAM_INTERVAL = float(os.getenv('BULK_PROGRESS_STREAM_INTERVAL', '1'))  # Seconds between progress reads per SSE stream
+    BULK_PROGRESS_STREAM_HEARTBEAT = int(os.getenv('BULK_PROGRESS_STREAM_HEARTBEAT', '15'))  # Seconds between keep-alive comments when nothing changed
+    BULK_PROGRESS_STREAM_MAX_SECONDS = int(os.getenv('BULK_PROGRESS_STREAM_MAX_SECONDS', '3600'))  # Streams close after this; EventSource reconnects
+    FOLDER_LISTING_CACHE_SIZE = int(os.getenv('FOLDER_LISTING_CACHE_SIZE', '4096'))  # Directory listings cached by mtime for scans and browsing (0 = off)
+    INCREMENTAL_MANIFEST_BATCH_SIZE = int(os.getenv('INCREMENTAL_MANIFEST_BATCH_SIZE', '500'))  # Files compared with / merged from the folder manifest per round trip
 
     # Ollama Configuration
     OLLAMA_HOST = os.getenv('OLLAMA_HOST', 'http://172.12.0.83:11434')
@@ -97,6 +102,7 @@ class Config:
     LMSTUDIO_ENABLED = os.getenv('LMSTUDIO_ENABLED', 'true').lower() == 'true'
     LMSTUDIO_TIMEOUT = int(os.getenv('LMSTUDIO_TIMEOUT', '600'))  # Request timeout in seconds
     LMSTUDIO_MAX_TOKENS = int(os.getenv('LMSTUDIO_MAX_TOKENS', '4096'))  # Max tokens in response
+    LMSTUDIO_MAX_IMAGE_DIMENSION = int(os.getenv('LMSTUDIO_MAX_IMAGE_DIMENSION', '2048'))  # Longest image side sent to the vision model (0 = no cap)
 
     # Google Lens / Vision API
     GOOGLE_LENS_MAX_IMAGE_SIZE_MB = int(os.getenv('GOOGLE_LENS_MAX_IMAGE_SIZE_MB', '3'))  # Max image size before compression
@@ -107,21 +113,89 @@ class Config:
     OCR_PDF_DPI_HIGH_QUALITY = int(os.getenv('OCR_PDF_DPI_HIGH_QUALITY', '300'))  # High-quality/small text
     OCR_PDF_DPI_LOW_QUALITY = int(os.getenv('OCR_PDF_DPI_LOW_QUALITY', '150'))  # Large, clean text
     OCR_PDF_DPI_HANDWRITING = int(os.getenv('OCR_PDF_DPI_HANDWRITING', '300'))  # Handwritten documents
+    OCR_PDF_PAGE_WORKERS = int(os.getenv('OCR_PDF_PAGE_WORKERS', '4'))  # Pages of one PDF OCRed concurrently
+    OCR_PDF_PAGE_CHUNK_SIZE = int(os.getenv('OCR_PDF_PAGE_CHUNK_SIZE', '4'))  # Pages rasterised per pdf2image call
+    OCR_CHAIN_MAX_PARALLEL_STEPS = int(os.getenv('OCR_CHAIN_MAX_PARALLEL_STEPS', '4'))  # Independent chain steps run concurrently
 
     # Image size optimization
     OCR_MAX_IMAGE_DIMENSION = int(os.getenv('OCR_MAX_IMAGE_DIMENSION', '2048'))  # Max width/height in pixels
     OCR_MIN_IMAGE_DIMENSION = int(os.getenv('OCR_MIN_IMAGE_DIMENSION', '512'))  # Min width/height for quality check
     OCR_IMAGE_QUALITY = int(os.getenv('OCR_IMAGE_QUALITY', '95'))  # JPEG quality (1-100)
+    OCR_LOSSLESS_FORMAT = os.getenv('OCR_LOSSLESS_FORMAT', 'PNG').upper()  # Lossless encoding for vision models: PNG or WEBP
+    OCR_PNG_COMPRESS_LEVEL = int(os.getenv('OCR_PNG_COMPRESS_LEVEL', '1'))  # zlib level 0-9 (higher = smaller but slower)
 
     # Auto-optimization settings
     OCR_AUTO_OPTIMIZE_IMAGES = os.getenv('OCR_AUTO_OPTIMIZE_IMAGES', 'false').lower() == 'true'  # Enable auto-resize
     OCR_AUTO_CROP_DOCUMENT = os.getenv('OCR_AUTO_CROP_DOCUMENT', 'false').lower() == 'true'  # Enable auto document cropping
     OCR_DOCUMENT_MIN_AREA_RATIO = float(os.getenv('OCR_DOCUMENT_MIN_AREA_RATIO', '0.1'))  # Min document area (10% of image)
+    OCR_DETECTION_MAX_DIMENSION = int(os.getenv('OCR_DETECTION_MAX_DIMENSION', '1000'))  # Longest side of the document detection proxy
+    OCR_DETECTION_CACHE_SIZE = int(os.getenv('OCR_DETECTION_CACHE_SIZE', '256'))  # Detected document corners memoised per file
+
+    # OCR result cache (content hash + provider/model/languages/handwriting/prompt)
+    OCR_CACHE_ENABLED = os.getenv('OCR_CACHE_ENABLED', 'true').lower() == 'true'  # Reuse results for identical inputs
+    OCR_CACHE_TTL_DAYS = int(os.getenv('OCR_CACHE_TTL_DAYS', '30'))  # Expire entries not read for N days (0 = never)
+    OCR_CACHE_MAX_ENTRIES = int(os.getenv('OCR_CACHE_MAX_ENTRIES', '100000'))  # LRU bound on cached results (0 = unbounded)
+
+    # Shared HTTP sessions for inference-server providers (Ollama, vLLM, llama.cpp, LM Studio, LangChain)
+    HTTP_POOL_CONNECTIONS = int(os.getenv('HTTP_POOL_CONNECTIONS', '4'))  # Host pools kept per session
+    HTTP_POOL_MAXSIZE = int(os.getenv('HTTP_POOL_MAXSIZE', '16'))  # Keep-alive connections per host
+    HTTP_KEEP_ALIVE = os.getenv('HTTP_KEEP_ALIVE', 'true').lower() == 'true'  # Reuse connections between requests
+    HTTP_AVAILABILITY_TTL = int(os.getenv('HTTP_AVAILABILITY_TTL', '30'))  # Seconds a provider availability probe is cached
+    OCR_PROVIDER_AVAILABILITY_TTL = int(os.getenv('OCR_PROVIDER_AVAILABILITY_TTL', '30'))  # Seconds OCRService reuses a provider's is_available()
+
+    # Tesseract
+    TESSERACT_PAGE_WORKERS = int(os.getenv('TESSERACT_PAGE_WORKERS', '0'))  # Parallel tesseract processes per PDF (0 = cores / WORKER_MAX_CONCURRENCY)
+    TESSERACT_OMP_THREAD_LIMIT = int(os.getenv('TESSERACT_OMP_THREAD_LIMIT', '1'))  # OpenMP threads per tesseract process (0 = tesseract default)
+    TESSERACT_PDF_DPI = int(os.getenv('TESSERACT_PDF_DPI', '150'))  # DPI used to rasterise PDF pages for Tesseract
+    TESSERACT_TIMEOUT = int(os.getenv('TESSERACT_TIMEOUT', '300'))  # Seconds per page before tesseract is killed (0 = no limit)
+
+    # EasyOCR
+    EASYOCR_MAX_READERS = int(os.getenv('EASYOCR_MAX_READERS', '2'))  # Language-set models kept loaded (LRU)
+    EASYOCR_WARM_LANGUAGES = [
+        [lang.strip() for lang in langs.split('+') if lang.strip()]
+        for langs in os.getenv('EASYOCR_WARM_LANGUAGES', '').split(',') if langs.strip()
+    ]  # Language sets loaded at startup, e.g. "en+hi,en"
 
     # NSQ Configuration for distributed message queue
     USE_NSQ = os.getenv('USE_NSQ', 'false').lower() == 'true'  # Enable NSQ-based bulk processing
     NSQD_ADDRESS = os.getenv('NSQD_ADDRESS', 'nsqd:4150')  # NSQ daemon TCP address
     NSQLOOKUPD_ADDRESSES = [addr.strip() for addr in os.getenv('NSQLOOKUPD_ADDRESSES', 'nsqlookupd:4161').split(',')]  # NSQ lookupd HTTP addresses
+    NSQ_PUBLISH_CHUNK_SIZE = int(os.getenv('NSQ_PUBLISH_CHUNK_SIZE', '500'))  # File tasks per MPUB when starting a job
+    NSQ_SCAN_STALE_SECONDS = int(os.getenv('NSQ_SCAN_STALE_SECONDS', '1800'))  # Seconds without scan progress before a scanning job is failed
+    # Priority lanes for file tasks with their scheduling weights, highest priority first
+    NSQ_PRIORITY_LANES = {
+        name.strip(): max(1, int(weight))
+        for name, weight in (
+            item.split('=', 1) for item in os.getenv('NSQ_PRIORITY_LANES', 'high=8,normal=3,low=1').split(',') if '=' in item
+        )
+    }
+    NSQ_DEFAULT_PRIORITY = os.getenv('NSQ_DEFAULT_PRIORITY', 'normal')  # Lane of jobs that do not set a priority
+    # Cap queued tasks per job so a large backfill cannot starve smaller jobs in its lane; the
+    # task-dispatcher service (run_dispatcher.py) releases the rest, so only enable this where
+    # that service runs, otherwise jobs larger than NSQ_JOB_DISPATCH_WINDOW never finish
+    NSQ_FAIR_DISPATCH = os.getenv('NSQ_FAIR_DISPATCH', 'false').lower() == 'true'
+    NSQ_JOB_DISPATCH_WINDOW = int(os.getenv('NSQ_JOB_DISPATCH_WINDOW', '1000'))  # Tasks of one job queued in NSQ at a time (fair dispatch)
+    TASK_DISPATCHER_INTERVAL = float(os.getenv('TASK_DISPATCHER_INTERVAL', '1'))  # Seconds between task dispatcher passes
+
+    # OCR worker concurrency
+    WORKER_MAX_IN_FLIGHT = int(os.getenv('WORKER_MAX_IN_FLIGHT', '5'))  # NSQ messages held by one worker at a time
+    WORKER_MAX_CONCURRENCY = int(os.getenv('WORKER_MAX_CONCURRENCY', '5'))  # Threads running OCR tasks in one worker
+    # Per-provider caps, e.g. "lmstudio=8,ollama=4,easyocr=1" (unlisted providers use WORKER_MAX_CONCURRENCY)
+    WORKER_PROVIDER_CONCURRENCY = {
+        name.strip(): int(limit)
+        for name, limit in (
+            item.split('=', 1) for item in os.getenv('WORKER_PROVIDER_CONCURRENCY', 'easyocr=1,tesseract=2').split(',') if '=' in item
+        )
+    }
+    WORKER_TOUCH_INTERVAL = int(os.getenv('WORKER_TOUCH_INTERVAL', '30'))  # Seconds between keepalive touches on running messages
+
+    # Result aggregation (NSQ bulk jobs)
+    AGGREGATOR_SAFETY_SCAN_INTERVAL = int(os.getenv('AGGREGATOR_SAFETY_SCAN_INTERVAL', '60'))  # Seconds between scans for jobs whose done signal was lost
+    AGGREGATOR_CLAIM_TIMEOUT = int(os.getenv('AGGREGATOR_CLAIM_TIMEOUT', '600'))  # Seconds before a stale aggregation claim can be taken over
+    AGGREGATOR_RECONCILE_IDLE_SECONDS = int(os.getenv('AGGREGATOR_RECONCILE_IDLE_SECONDS', '600'))  # Seconds without updates before a short consumed_count is recounted
+    AGGREGATOR_CURSOR_BATCH_SIZE = int(os.getenv('AGGREGATOR_CURSOR_BATCH_SIZE', '200'))  # Results fetched per cursor round trip
+    AGGREGATOR_PREVIEW_MAX_SAMPLES = int(os.getenv('AGGREGATOR_PREVIEW_MAX_SAMPLES', '50'))  # Samples stored in job results_preview
+    AGGREGATOR_PREVIEW_MAX_TEXT_CHARS = int(os.getenv('AGGREGATOR_PREVIEW_MAX_TEXT_CHARS', '500'))  # Text chars kept per preview sample
 
     # SSHFS Configuration for remote worker file sharing
     SSHFS_ENABLED = os.getenv('SSHFS_ENABLED', 'true').lower() == 'true'
@@ -30,4 +30,9 @@ from app.models.user import User
 from app.models.role import Role
 from app.models.audit_log import AuditLog
 from app.models.bulk_job import BulkJob
+from app.models.bulk_job_result import BulkJobResult
+from app.models.bulk_job_idempotency import BulkJobIdempotency
+from app.models.ocr_result_cache import OCRResultCache
+from app.models.folder_manifest import FolderManifest
+from app.models.bulk_task_backlog import BulkTaskBacklog
 from app.models.export import Export
@@ -1,11 +1,43 @@
-from datetime import datetime
+import os
+import hashlib
+import json
+from datetime import datetime, timedelta
 from bson import ObjectId
+from pymongo import ReturnDocument
 from pymongo.write_concern import WriteConcern
+from app.models.bulk_job_result import BulkJobResult
+from app.models.bulk_job_idempotency import BulkJobIdempotency
+from app.models.bulk_task_backlog import BulkTaskBacklog
 
 
 class BulkJob:
     """BulkJob model for database operations"""
 
+    # Projection that skips the unbounded checkpoint arrays of the job document
+    EXCLUDE_CHECKPOINT_ARRAYS = {
+        'checkpoint.results': 0,
+        'checkpoint.errors': 0,
+        'checkpoint.processed_files': 0,
+        'checkpoint.processed_message_ids': 0
+    }
+
+    # Projection for polled progress/status reads: counters only, no results or checkpoint data
+    PROGRESS_PROJECTION = {
+        '_id': 0,
+        'job_id': 1,
+        'status': 1,
+        'progress': 1,
+        'error': 1,
+        'updated_at': 1,
+        'total_files': 1,
+        'published_count': 1,
+        'consumed_count': 1,
+        'processed_count': 1,
+        'failed_count': 1,
+        'archipelago_result': 1,
+        'archipelago_uploaded_at': 1
+    }
+
     @staticmethod
     def create(mongo, user_id, job_data):
         """
@@ -25,6 +57,7 @@ class BulkJob:
                 - status: Job status (processing, completed, error)
                 - processing_mode: "single" or "chain" (default: "single")
                 - chain_config: Chain configuration (required if processing_mode is "chain")
+                - priority: Optional priority lane of the job's file tasks
         """
         bulk_job = {
             'user_id': ObjectId(user_id),
@@ -59,6 +92,9 @@ class BulkJob:
             'completed_at': None
         }
 
+        if job_data.get('priority'):
+            bulk_job['priority'] = job_data['priority']
+
         # Add chain config if in chain mode
         if job_data.get('processing_mode') == 'chain':
             bulk_job['chain_config'] = {
@@ -71,12 +107,47 @@ class BulkJob:
         return bulk_job
 
     @staticmethod
-    def find_by_job_id(mongo, job_id, user_id=None):
+    def find_by_job_id(mongo, job_id, user_id=None, projection=None):
         """Find bulk job by job_id"""
         query = {'job_id': job_id}
         if user_id:
             query['user_id'] = ObjectId(user_id)
-        return mongo.db.bulk_jobs.find_one(query)
+        return mongo.db.bulk_jobs.find_one(query, projection)
+
+    @staticmethod
+    def get_progress(mongo, job_id, user_id=None):
+        """
+        Read only the status and progress counters of a job
+
+        Args:
+            mongo: MongoDB connection
+            job_id: Job identifier
+            user_id: Restrict to this user's jobs (optional)
+
+        Returns:
+            Projected job document (see PROGRESS_PROJECTION) or None
+        """
+        return BulkJob.find_by_job_id(mongo, job_id, user_id, BulkJob.PROGRESS_PROJECTION)
+
+    @staticmethod
+    def get_results(mongo, job_id, user_id=None):
+        """Read only the final results summary of a job (None if not found or not set)"""
+        job = BulkJob.find_by_job_id(mongo, job_id, user_id, {'_id': 0, 'results': 1})
+        return job.get('results') if job else None
+
+    @staticmethod
+    def progress_etag(progress_doc):
+        """
+        Version tag of a progress document; changes whenever any projected field changes
+
+        Args:
+            progress_doc: Document returned by get_progress
+
+        Returns:
+            Hex digest string
+        """
+        encoded = json.dumps(progress_doc, sort_keys=True, default=str).encode('utf-8')
+        return hashlib.sha1(encoded).hexdigest()
 
     @staticmethod
     def find_by_id(mongo, bulk_job_id, user_id=None):
@@ -172,13 +243,70 @@ class BulkJob:
             'user_id': ObjectId(user_id)
         })
 
+    @staticmethod
+    def get_successful_samples(mongo, job):
+        """
+        Get all successful results of a job in results_preview sample format
+
+        NSQ jobs only keep a bounded preview in the job document, so their
+        samples are read from bulk_job_results with full text.
+
+        Args:
+            mongo: MongoDB connection
+            job: Job document
+
+        Returns:
+            List of sample dictionaries
+        """
+        preview = (job.get('results') or {}).get('results_preview', {})
+        if preview.get('samples_truncated'):
+            return list(BulkJobResult.iter_samples(mongo, job['job_id']))
+        return preview.get('successful_samples', [])
+
+    @staticmethod
+    def get_results_page(mongo, job, record_type=BulkJobResult.RECORD_RESULT, skip=0, limit=100):
+        """
+        Get one page of a job's per-file results in results_preview sample format
+
+        Unlike results_preview, which NSQ jobs cap at a few truncated
+        samples, pages cover every file with full text. Jobs whose preview
+        is complete (threading jobs) are paged from the preview itself.
+
+        Args:
+            mongo: MongoDB connection
+            job: Job document
+            record_type: 'result' for successful files or 'error' for failed files
+            skip: Number of entries to skip
+            limit: Maximum number of entries in the page
+
+        Returns:
+            Tuple of (list of sample dictionaries, total number of entries)
+        """
+        preview = (job.get('results') or {}).get('results_preview', {})
+        if not preview.get('samples_truncated'):
+            key = 'successful_samples' if record_type == BulkJobResult.RECORD_RESULT else 'error_samples'
+            entries = preview.get(key) or []
+            return entries[skip:skip + limit], len(entries)
+
+        job_id = job['job_id']
+        if record_type == BulkJobResult.RECORD_RESULT:
+            page = BulkJobResult.iter_samples(mongo, job_id, batch_size=limit, skip=skip, limit=limit)
+        else:
+            page = BulkJobResult.iter_error_samples(mongo, job_id, batch_size=limit, skip=skip, limit=limit)
+        return list(page), BulkJobResult.count_by_job(mongo, job_id, record_type)
+
     @staticmethod
     def delete_by_job_id(mongo, job_id, user_id):
-        """Delete bulk job by job_id"""
-        return mongo.db.bulk_jobs.delete_one({
+        """Delete bulk job by job_id, along with its per-file results and markers"""
+        result = mongo.db.bulk_jobs.delete_one({
             'job_id': job_id,
             'user_id': ObjectId(user_id)
         })
+        if result.deleted_count:
+            BulkJobResult.delete_by_job(mongo, job_id)
+            BulkJobIdempotency.delete_by_job(mongo, job_id)
+            BulkTaskBacklog.delete_by_job(mongo, job_id)
+        return result
 
     @staticmethod
     def save_checkpoint(mongo, job_id, checkpoint_data):
@@ -239,10 +367,69 @@ class BulkJob:
 
         return list(mongo.db.bulk_jobs.find(query).sort('updated_at', -1))
 
+    # Incremental jobs
+
+    @staticmethod
+    def set_incremental(mongo, job_id, manifest_key, base_job_id=None):
+        """
+        Mark a job as incremental against a folder manifest
+
+        Args:
+            mongo: MongoDB connection
+            job_id: Job identifier
+            manifest_key: Folder manifest key
+            base_job_id: Previous job whose results are reused (None: process everything)
+        """
+        return mongo.db.bulk_jobs.update_one(
+            {'job_id': job_id},
+            {'$set': {
+                'incremental': {'manifest_key': manifest_key, 'base_job_id': base_job_id},
+                'updated_at': datetime.utcnow()
+            }}
+        )
+
+    @staticmethod
+    def mark_incremental_merged(mongo, job_id, stats):
+        """
+        Record that a job's results were merged and its manifest committed
+
+        Args:
+            mongo: MongoDB connection
+            job_id: Job identifier
+            stats: Merge statistics
+        """
+        return mongo.db.bulk_jobs.update_one(
+            {'job_id': job_id},
+            {'$set': {
+                'incremental.merged_at': datetime.utcnow(),
+                'incremental.stats': stats,
+                'updated_at': datetime.utcnow()
+            }}
+        )
+
+    @staticmethod
+    def find_incremental_base(mongo, manifest_key):
+        """
+        Find the last job that committed a folder manifest
+
+        Args:
+            mongo: MongoDB connection
+            manifest_key: Folder manifest key
+
+        Returns:
+            Job ID or None
+        """
+        job = mongo.db.bulk_jobs.find_one(
+            {'incremental.manifest_key': manifest_key, 'incremental.merged_at': {'$exists': True}},
+            {'_id': 0, 'job_id': 1},
+            sort=[('incremental.merged_at', -1)]
+        )
+        return job['job_id'] if job else None
+
     # NSQ-specific methods
 
     @staticmethod
-    def initialize_nsq_job(mongo, job_id, total_files):
+    def initialize_nsq_job(mongo, job_id, total_files, scanning=False):
         """
         Initialize NSQ job with tracking fields
 
@@ -250,6 +437,8 @@ class BulkJob:
             mongo: MongoDB connection
             job_id: Job identifier
             total_files: Total number of files to process
+            scanning: Folder scan still running; tasks are published as files are found
+                and the job is never ready for aggregation until finish_nsq_scan()
         """
         return mongo.db.bulk_jobs.update_one(
             {'job_id': job_id},
@@ -258,6 +447,7 @@ class BulkJob:
                     'total_files': total_files,
                     'published_count': 0,
                     'consumed_count': 0,
+                    'scanning': scanning,
                     'progress.total': total_files,
                     'updated_at': datetime.utcnow()
                 }
@@ -265,22 +455,149 @@ class BulkJob:
         )
 
     @staticmethod
-    def increment_published_count(mongo, job_id):
+    def finish_nsq_scan(mongo, job_id, total_files):
+        """
+        Record the final file count once a streamed folder scan finished
+
+        Args:
+            mongo: MongoDB connection
+            job_id: Job identifier
+            total_files: Number of files found (and published)
+        """
+        consumed = (BulkJob.get_by_job_id(mongo, job_id, {'consumed_count': 1}) or {}).get('consumed_count', 0)
+        percentage = int((consumed / total_files * 100)) if total_files > 0 else 0
+        return mongo.db.bulk_jobs.update_one(
+            {'job_id': job_id},
+            {
+                '$set': {
+                    'total_files': total_files,
+                    'scanning': False,
+                    'progress.total': total_files,
+                    'updated_at': datetime.utcnow()
+                },
+                '$max': {'progress.percentage': percentage}
+            }
+        )
+
+    @staticmethod
+    def touch_scan(mongo, job_id):
+        """Record that a streamed folder scan of a job is still making progress"""
+        return mongo.db.bulk_jobs.update_one(
+            {'job_id': job_id, 'scanning': True},
+            {'$set': {'updated_at': datetime.utcnow()}}
+        )
+
+    @staticmethod
+    def find_interrupted_scans(mongo, idle_seconds):
+        """
+        Find processing jobs whose folder scan stopped without finishing
+
+        The scan updates the job after every chunk, so a job still flagged
+        as scanning without an update for idle_seconds lost its scan thread
+        (e.g. the API process restarted) and will never be aggregated.
+
+        Args:
+            mongo: MongoDB connection
+            idle_seconds: Seconds without an update after which a scan counts as interrupted
+
+        Returns:
+            List of job IDs
+        """
+        return [job['job_id'] for job in mongo.db.bulk_jobs.find({
+            'status': 'processing',
+            'scanning': True,
+            'updated_at': {'$lt': datetime.utcnow() - timedelta(seconds=idle_seconds)}
+        }, {'_id': 0, 'job_id': 1})]
+
+    @staticmethod
+    def increment_published_count(mongo, job_id, count=1):
         """
         Atomically increment published task count
 
         Args:
             mongo: MongoDB connection
             job_id: Job identifier
+            count: Number of tasks published (one $inc per published chunk)
         """
         return mongo.db.bulk_jobs.update_one(
             {'job_id': job_id},
             {
-                '$inc': {'published_count': 1},
+                '$inc': {'published_count': count},
                 '$set': {'updated_at': datetime.utcnow()}
             }
         )
 
+    @staticmethod
+    def record_queue_wait(mongo, job_id, wait_ms):
+        """
+        Add the time a file task waited between publishing and processing to the job's totals
+
+        Args:
+            mongo: MongoDB connection
+            job_id: Job identifier
+            wait_ms: Queue wait of one task in milliseconds
+        """
+        return mongo.db.bulk_jobs.update_one(
+            {'job_id': job_id},
+            {
+                '$inc': {'queue_wait.total_ms': wait_ms, 'queue_wait.count': 1},
+                '$max': {'queue_wait.max_ms': wait_ms}
+            }
+        )
+
+    @staticmethod
+    def get_dispatch_counters(mongo, job_ids):
+        """
+        Get status and task counters of several jobs for the task dispatcher
+
+        Args:
+            mongo: MongoDB connection
+            job_ids: Job identifiers
+
+        Returns:
+            Dictionary of job_id -> {'status', 'published_count', 'consumed_count'}
+        """
+        return {
+            job['job_id']: job
+            for job in mongo.db.bulk_jobs.find(
+                {'job_id': {'$in': list(job_ids)}},
+                {'_id': 0, 'job_id': 1, 'status': 1, 'published_count': 1, 'consumed_count': 1}
+            )
+        }
+
+    @staticmethod
+    def lane_stats(mongo):
+        """
+        Summarize running NSQ jobs per priority
+
+        Args:
+            mongo: MongoDB connection
+
+        Returns:
+            Dictionary of priority (None for jobs without one) -> {'active_jobs', 'queued_tasks', 'wait_total_ms', 'wait_count', 'wait_max_ms'}
+        """
+        stats = {}
+        for entry in mongo.db.bulk_jobs.aggregate([
+            {'$match': {'status': 'processing', 'published_count': {'$exists': True}}},
+            {'$group': {
+                '_id': '$priority',
+                'active_jobs': {'$sum': 1},
+                'published': {'$sum': '$published_count'},
+                'consumed': {'$sum': '$consumed_count'},
+                'wait_total_ms': {'$sum': '$queue_wait.total_ms'},
+                'wait_count': {'$sum': '$queue_wait.count'},
+                'wait_max_ms': {'$max': '$queue_wait.max_ms'}
+            }}
+        ]):
+            stats[entry['_id']] = {
+                'active_jobs': entry['active_jobs'],
+                'queued_tasks': max(0, entry['published'] - entry['consumed']),
+                'wait_total_ms': entry['wait_total_ms'] or 0,
+                'wait_count': entry['wait_count'] or 0,
+                'wait_max_ms': entry['wait_max_ms'] or 0
+            }
+        return stats
+
     @staticmethod
     def increment_consumed_count(mongo, job_id, filename=None):
         """
@@ -324,57 +641,155 @@ class BulkJob:
     @staticmethod
     def save_file_result(mongo, job_id, result):
         """
-        Atomically save file result and add to processed set
+        Save file result to the bulk_job_results collection and mark the file processed
 
         Args:
             mongo: MongoDB connection
             job_id: Job identifier
             result: Result dictionary
         """
+        BulkJobResult.upsert(mongo, job_id, result, BulkJobResult.RECORD_RESULT)
+        BulkJobIdempotency.claim(mongo, job_id, result['file_path'])
         return mongo.db.bulk_jobs.update_one(
             {'job_id': job_id},
-            {
-                '$push': {'checkpoint.results': result},
-                '$addToSet': {'checkpoint.processed_files': result['file_path']},
-                '$set': {'updated_at': datetime.utcnow()}
-            }
+            {'$set': {'updated_at': datetime.utcnow()}}
         )
 
     @staticmethod
-    def save_file_error(mongo, job_id, file_path, error):
+    def save_file_error(mongo, job_id, file_path, error, file_index=None):
         """
-        Atomically save file error
+        Save file error to the bulk_job_results collection
 
         Args:
             mongo: MongoDB connection
             job_id: Job identifier
             file_path: Path to failed file
             error: Error message
+            file_index: Index of the file in the job
         """
-        import os
+        BulkJobResult.upsert(mongo, job_id, BulkJob._build_error_doc(file_path, error, file_index),
+                             BulkJobResult.RECORD_ERROR)
+        BulkJobIdempotency.claim(mongo, job_id, file_path)
+        return mongo.db.bulk_jobs.update_one(
+            {'job_id': job_id},
+            {'$set': {'updated_at': datetime.utcnow()}}
+        )
+
+    @staticmethod
+    def _build_error_doc(file_path, error, file_index=None):
+        """Build the per-file error record stored for failed files"""
         error_doc = {
             'file': os.path.basename(file_path),
             'file_path': file_path,
             'error': error,
             'processed_at': datetime.utcnow().isoformat()
         }
+        if file_index is not None:
+            error_doc['file_index'] = file_index
+        return error_doc
 
-        return mongo.db.bulk_jobs.update_one(
+    @staticmethod
+    def _idempotency_collection(mongo):
+        """Handle on bulk_job_idempotency with majority write concern"""
+        BulkJobIdempotency.ensure_indexes(mongo)
+        return mongo.db.get_collection(
+            'bulk_job_idempotency', write_concern=WriteConcern(w='majority', j=True)
+        )
+
+    @staticmethod
+    def _claim_file(mongo, job_id, file_path, message_id=None):
+        """
+        Claim a file for counting with majority write concern
+
+        Returns:
+            True if the file still has to be counted: either this call inserted
+            the claim, or an earlier attempt claimed the file and died before
+            counting it (the redelivery then finishes the work). False if the
+            file was already counted or the message belongs to another file.
+        """
+        if BulkJobIdempotency.claim(mongo, job_id, file_path, message_id,
+                                    collection=BulkJob._idempotency_collection(mongo)):
+            return True
+        return BulkJobIdempotency.is_pending(mongo, job_id, file_path)
+
+    @staticmethod
+    def _insert_record(mongo, job_id, record, record_type):
+        """
+        Store a per-file record with majority write concern
+
+        An existing record is kept as it is: it was written by an earlier
+        attempt for the same file, which may not have been counted yet.
+        """
+        BulkJobResult.ensure_indexes(mongo)
+        collection = mongo.db.get_collection(
+            'bulk_job_results', write_concern=WriteConcern(w='majority', j=True)
+        )
+        return BulkJobResult.upsert(mongo, job_id, record, record_type, collection=collection)
+
+    @staticmethod
+    def _record_file_consumed(mongo, job_id, file_path, filename):
+        """
+        Count a file once: flip its claim to counted, then increment consumed count and progress
+
+        The flag is set before the increment, so a crash in between can only
+        leave the count short, never double it; reconcile_consumed_count
+        repairs such a stalled job. Progress fields use $max so that
+        concurrent workers finishing out of order never move the progress
+        bar backwards.
+
+        Returns:
+            Updated job counters ({'consumed_count', 'published_count', 'total_files'}),
+            or None if the file was already counted or the job was not found
+        """
+        if not BulkJobIdempotency.mark_counted(mongo, job_id, file_path,
+                                               collection=BulkJob._idempotency_collection(mongo)):
+            return None
+
+        collection = mongo.db.get_collection('bulk_jobs', write_concern=WriteConcern(w='majority', j=True))
+
+        job = collection.find_one_and_update(
             {'job_id': job_id},
             {
-                '$push': {'checkpoint.errors': error_doc},
-                '$addToSet': {'checkpoint.processed_files': file_path},
-                '$set': {'updated_at': datetime.utcnow()}
-            }
+                '$inc': {'consumed_count': 1},
+                '$set': {
+                    'updated_at': datetime.utcnow(),
+                    'progress.filename': filename
+                }
+            },
+            projection={'consumed_count': 1, 'published_count': 1, 'total_files': 1},
+            return_document=ReturnDocument.AFTER
+        )
+        if not job:
+            return None
+
+        BulkJob._raise_progress(collection, job_id, job)
+        return job
+
+    @staticmethod
+    def _raise_progress(collection, job_id, counters):
+        """Move progress.current/percentage up to the consumed count (never backwards)"""
+        consumed = counters.get('consumed_count', 0)
+        total_files = counters.get('total_files', 0)
+        percentage = int((consumed / total_files * 100)) if total_files > 0 else 0
+
+        collection.update_one(
+            {'job_id': job_id},
+            {'$max': {'progress.current': consumed, 'progress.percentage': percentage}}
         )
 
     @staticmethod
     def save_file_result_atomic(mongo, job_id, result, message_id=None):
         """
-        Atomically save file result AND increment consumed count in single operation.
+        Atomically save file result AND increment consumed count.
 
-        Uses a truly atomic check-and-insert operation to prevent race conditions
-        where multiple workers might process the same file simultaneously.
+        The file is first claimed in the bulk_job_idempotency collection: a
+        single indexed insert whose unique (job_id, file_path) and
+        (job_id, message_id) indexes reject duplicate workers and NSQ
+        redeliveries. The result is then stored and the claim is flipped to
+        counted together with the consumed count increment. A redelivery
+        that finds a claim which was never counted (the previous attempt
+        died in between) completes the insert and the increment instead of
+        being dropped, so the job still drains.
 
         Args:
             mongo: MongoDB connection
@@ -383,143 +798,141 @@ class BulkJob:
             message_id: Optional NSQ message ID for preventing redelivery duplicates
 
         Returns:
-            MongoDB update result, or None if file was already processed
+            Updated job counters, or None if file was already processed
         """
         import logging
         logger = logging.getLogger(__name__)
 
         file_path = result['file_path']
 
-        # Get current state to calculate new progress
-        job = mongo.db.bulk_jobs.find_one({'job_id': job_id})
-        if not job:
+        if not mongo.db.bulk_jobs.find_one({'job_id': job_id}, {'_id': 1}):
             logger.error(f"save_file_result_atomic: Job {job_id} not found!")
             return None
 
-        new_consumed = job.get('consumed_count', 0) + 1
-        total_files = job.get('total_files', 0)
-        percentage = int((new_consumed / total_files * 100)) if total_files > 0 else 0
-
-        logger.info(f"save_file_result_atomic: Attempting to save result for {result.get('file', 'unknown')} (file {new_consumed}/{total_files})")
-
-        # Use collection with write concern for atomicity
-        collection = mongo.db.get_collection('bulk_jobs', write_concern=WriteConcern(w='majority', j=True))
+        logger.info(f"save_file_result_atomic: Attempting to save result for {result.get('file', 'unknown')}")
 
-        # Build query conditions
-        query_conditions = {
-            'job_id': job_id,
-            'checkpoint.processed_files': {'$ne': file_path}  # Only update if file NOT already processed
-        }
-
-        # Add message ID condition if provided (prevents NSQ redelivery duplicates)
-        if message_id:
-            query_conditions['checkpoint.processed_message_ids'] = {'$ne': message_id}
-
-        # Build update operations
-        update_operations = {
-            '$push': {'checkpoint.results': result},
-            '$addToSet': {'checkpoint.processed_files': file_path},
-            '$inc': {'consumed_count': 1},
-            '$set': {
-                'updated_at': datetime.utcnow(),
-                'progress.current': new_consumed,
-                'progress.percentage': percentage,
-                'progress.filename': result.get('file', '')
-            }
-        }
-
-        # Add message ID to update if provided
-        if message_id:
-            update_operations['$addToSet']['checkpoint.processed_message_ids'] = message_id
+        if not BulkJob._claim_file(mongo, job_id, file_path, message_id):
+            logger.warning(f"save_file_result_atomic: File {file_path} was already processed by another worker, skipping duplicate")
+            return None
 
-        # Atomic operation: Only update if file_path NOT in processed_files array
-        # This prevents race conditions where multiple workers process the same file
-        update_result = collection.update_one(query_conditions, update_operations)
+        if not BulkJob._insert_record(mongo, job_id, result, BulkJobResult.RECORD_RESULT):
+            logger.info(f"save_file_result_atomic: Record for {file_path} already exists, counting it if not counted yet")
 
-        if update_result.matched_count == 0:
-            logger.warning(f"save_file_result_atomic: File {file_path} was already processed by another worker, skipping duplicate")
+        job = BulkJob._record_file_consumed(mongo, job_id, file_path, result.get('file', ''))
+        if job is None:
+            logger.warning(f"save_file_result_atomic: File {file_path} was already counted, skipping duplicate")
             return None
 
-        logger.info(f"save_file_result_atomic: Successfully saved result - matched={update_result.matched_count}, modified={update_result.modified_count}")
+        logger.info(f"save_file_result_atomic: Successfully saved result - consumed={job.get('consumed_count')}")
 
-        return update_result
+        return job
 
     @staticmethod
-    def save_file_error_atomic(mongo, job_id, file_path, error):
+    def save_file_error_atomic(mongo, job_id, file_path, error, message_id=None, file_index=None):
         """
-        Atomically save file error AND increment consumed count in single operation.
+        Atomically save file error AND increment consumed count.
 
-        Uses a truly atomic check-and-insert operation to prevent race conditions
-        where multiple workers might process the same file simultaneously.
+        Uses the same (job_id, file_path) claim and counted flag as
+        save_file_result_atomic, so a file is counted exactly once whether
+        it succeeded or failed.
 
         Args:
             mongo: MongoDB connection
             job_id: Job identifier
             file_path: Path to failed file
             error: Error message
+            message_id: Optional NSQ message ID for preventing redelivery duplicates
+            file_index: Index of the file in the job (orders the error among the job's records)
 
         Returns:
-            MongoDB update result, or None if file was already processed
+            Updated job counters, or None if file was already processed
         """
-        import os
         import logging
         logger = logging.getLogger(__name__)
 
-        error_doc = {
-            'file': os.path.basename(file_path),
-            'file_path': file_path,
-            'error': error,
-            'processed_at': datetime.utcnow().isoformat()
-        }
+        error_doc = BulkJob._build_error_doc(file_path, error, file_index)
 
-        # Get current state to calculate new progress
-        job = mongo.db.bulk_jobs.find_one({'job_id': job_id})
-        if not job:
+        if not mongo.db.bulk_jobs.find_one({'job_id': job_id}, {'_id': 1}):
             logger.error(f"save_file_error_atomic: Job {job_id} not found!")
             return None
 
-        new_consumed = job.get('consumed_count', 0) + 1
-        total_files = job.get('total_files', 0)
-        percentage = int((new_consumed / total_files * 100)) if total_files > 0 else 0
-
         logger.info(f"save_file_error_atomic: Attempting to save error for {os.path.basename(file_path)}")
 
-        # Use collection with write concern for atomicity
-        collection = mongo.db.get_collection('bulk_jobs', write_concern=WriteConcern(w='majority', j=True))
+        if not BulkJob._claim_file(mongo, job_id, file_path, message_id):
+            logger.warning(f"save_file_error_atomic: File {file_path} was already processed by another worker, skipping duplicate error")
+            return None
 
-        # Atomic operation: Only update if file_path NOT in processed_files array
-        # This prevents race conditions where multiple workers process the same file
-        update_result = collection.update_one(
-            {
-                'job_id': job_id,
-                'checkpoint.processed_files': {'$ne': file_path}  # Only update if file NOT already processed
-            },
-            {
-                '$push': {'checkpoint.errors': error_doc},
-                '$addToSet': {'checkpoint.processed_files': file_path},
-                '$inc': {'consumed_count': 1},
-                '$set': {
-                    'updated_at': datetime.utcnow(),
-                    'progress.current': new_consumed,
-                    'progress.percentage': percentage,
-                    'progress.filename': os.path.basename(file_path)
-                }
-            }
-        )
+        if not BulkJob._insert_record(mongo, job_id, error_doc, BulkJobResult.RECORD_ERROR):
+            logger.info(f"save_file_error_atomic: Record for {file_path} already exists, counting it if not counted yet")
 
-        if update_result.matched_count == 0:
-            logger.warning(f"save_file_error_atomic: File {file_path} was already processed by another worker, skipping duplicate error")
+        job = BulkJob._record_file_consumed(mongo, job_id, file_path, os.path.basename(file_path))
+        if job is None:
+            logger.warning(f"save_file_error_atomic: File {file_path} was already counted, skipping duplicate error")
             return None
 
-        logger.info(f"save_file_error_atomic: Successfully saved error - matched={update_result.matched_count}, modified={update_result.modified_count}")
+        logger.info(f"save_file_error_atomic: Successfully saved error - consumed={job.get('consumed_count')}")
 
-        return update_result
+        return job
+
+    @staticmethod
+    def reconcile_consumed_count(mongo, job_id):
+        """
+        Raise consumed_count to the number of counted files of a job
+
+        Repairs the one window save_file_*_atomic cannot close on its own: a
+        worker that died after flipping a claim to counted but before the
+        increment. Only call this for a job whose workers have gone quiet;
+        it never lowers the count.
+
+        Args:
+            mongo: MongoDB connection
+            job_id: Job identifier
+
+        Returns:
+            Updated job counters, or None if the count was already correct
+        """
+        counted = BulkJobIdempotency.count_counted(mongo, job_id)
+        job = mongo.db.bulk_jobs.find_one_and_update(
+            {'job_id': job_id, 'consumed_count': {'$lt': counted}},
+            {'$set': {'consumed_count': counted, 'updated_at': datetime.utcnow()}},
+            projection={'consumed_count': 1, 'published_count': 1, 'total_files': 1},
+            return_document=ReturnDocument.AFTER
+        )
+        if job:
+            BulkJob._raise_progress(mongo.db.bulk_jobs, job_id, job)
+        return job
+
+    @staticmethod
+    def find_stalled(mongo, idle_seconds):
+        """
+        Find fully published processing jobs whose consumed count has stopped short
+
+        Args:
+            mongo: MongoDB connection
+            idle_seconds: Seconds without any update after which a job counts as stalled
+
+        Returns:
+            List of job IDs
+        """
+        return [job['job_id'] for job in mongo.db.bulk_jobs.find({
+            '$expr': {'$and': [
+                {'$lt': ['$consumed_count', '$published_count']},
+                {'$gte': ['$published_count', '$total_files']}
+            ]},
+            'status': 'processing',
+            'scanning': {'$ne': True},
+            'updated_at': {'$lt': datetime.utcnow() - timedelta(seconds=idle_seconds)}
+        }, {'_id': 0, 'job_id': 1})]
 
     @staticmethod
     def is_file_processed(mongo, job_id, file_path):
         """
         Check if file already processed (idempotency)
 
+        A file whose claim was never counted (the previous attempt died
+        before incrementing the consumed count) is not processed yet, so
+        its redelivery goes on to finish the work.
+
         Args:
             mongo: MongoDB connection
             job_id: Job identifier
@@ -528,22 +941,15 @@ class BulkJob:
         Returns:
             True if file already processed, False otherwise
         """
-        job = mongo.db.bulk_jobs.find_one(
-            {'job_id': job_id},
-            {'checkpoint.processed_files': 1}
-        )
-
-        if not job:
-            return False
-
-        processed_files = job.get('checkpoint', {}).get('processed_files', [])
-        return file_path in processed_files
+        return BulkJobIdempotency.is_file_counted(mongo, job_id, file_path)
 
     @staticmethod
     def is_message_processed(mongo, job_id, message_id):
         """
         Check if NSQ message already processed (prevents redelivery duplicates)
 
+        Like is_file_processed, a pending (uncounted) claim does not count.
+
         Args:
             mongo: MongoDB connection
             job_id: Job identifier
@@ -552,55 +958,94 @@ class BulkJob:
         Returns:
             True if message already processed, False otherwise
         """
-        import logging
-        logger = logging.getLogger(__name__)
+        return BulkJobIdempotency.is_message_counted(mongo, job_id, message_id)
 
-        job = mongo.db.bulk_jobs.find_one(
-            {'job_id': job_id},
-            {'checkpoint.processed_message_ids': 1}
-        )
+    @staticmethod
+    def find_ready_for_aggregation(mongo):
+        """
+        Find fully published jobs where consumed_count == published_count and status == 'processing'
 
-        if not job:
-            return False
+        Args:
+            mongo: MongoDB connection
 
-        processed_ids = job.get('checkpoint', {}).get('processed_message_ids', [])
-        is_processed = message_id in processed_ids
+        Returns:
+            List of job documents ready for aggregation
+        """
+        return list(mongo.db.bulk_jobs.find({
+            '$expr': {'$and': [
+                {'$eq': ['$consumed_count', '$published_count']},
+                # Workers can catch up with a chunk while later chunks are still being published
+                {'$gte': ['$published_count', '$total_files']}
+            ]},
+            'status': 'processing',
+            'scanning': {'$ne': True},  # Streamed scan still publishing tasks
+            '$or': [
+                {'published_count': {'$gt': 0}},  # Ensure tasks were published
+                {'incremental.base_job_id': {'$ne': None}}  # Incremental run where nothing changed
+            ]
+        }, BulkJob.EXCLUDE_CHECKPOINT_ARRAYS))
 
-        if is_processed:
-            logger.debug(f"Message {message_id} already in processed_message_ids")
+    @staticmethod
+    def is_drained(counters):
+        """
+        Check whether every file of a job has been consumed
 
-        return is_processed
+        Args:
+            counters: Job document or counters returned by save_file_*_atomic
+
+        Returns:
+            True if consumed_count has reached total_files
+        """
+        total_files = counters.get('total_files', 0)
+        return total_files > 0 and counters.get('consumed_count', 0) >= total_files
 
     @staticmethod
-    def find_ready_for_aggregation(mongo):
+    def claim_for_aggregation(mongo, job_id, stale_after_seconds=600):
         """
-        Find jobs where consumed_count == published_count and status == 'processing'
+        Atomically claim a processing job for aggregation
+
+        Completion can be signalled by several workers and by the safety-net
+        scan at the same time; only the caller that wins the claim aggregates.
+        Claims older than stale_after_seconds can be taken over, so a crashed
+        aggregator does not leave the job stuck in 'processing'.
 
         Args:
             mongo: MongoDB connection
+            job_id: Job identifier
+            stale_after_seconds: Age after which an existing claim expires
 
         Returns:
-            List of job documents ready for aggregation
+            Job document (without checkpoint arrays) if claimed, otherwise None
         """
-        return list(mongo.db.bulk_jobs.find({
-            '$expr': {'$eq': ['$consumed_count', '$published_count']},
-            'status': 'processing',
-            'published_count': {'$gt': 0}  # Ensure tasks were published
-        }))
+        now = datetime.utcnow()
+        return mongo.db.bulk_jobs.find_one_and_update(
+            {
+                'job_id': job_id,
+                'status': 'processing',
+                '$or': [
+                    {'aggregation_started_at': {'$exists': False}},
+                    {'aggregation_started_at': {'$lt': now - timedelta(seconds=stale_after_seconds)}}
+                ]
+            },
+            {'$set': {'aggregation_started_at': now, 'updated_at': now}},
+            projection=BulkJob.EXCLUDE_CHECKPOINT_ARRAYS,
+            return_document=ReturnDocument.AFTER
+        )
 
     @staticmethod
-    def get_by_job_id(mongo, job_id):
+    def get_by_job_id(mongo, job_id, projection=None):
         """
         Get job by job_id
 
         Args:
             mongo: MongoDB connection
             job_id: Job identifier
+            projection: Optional field projection (e.g. BulkJob.EXCLUDE_CHECKPOINT_ARRAYS)
 
         Returns:
             Job document or None
         """
-        return mongo.db.bulk_jobs.find_one({'job_id': job_id})
+        return mongo.db.bulk_jobs.find_one({'job_id': job_id}, projection)
 
     @staticmethod
     def mark_as_completed(mongo, job_id, final_results):
@@ -0,0 +1,143 @@
+from datetime import datetime
+import pymongo
+from pymongo.errors import DuplicateKeyError
+
+
+class BulkJobIdempotency:
+    """Processed-file and processed-message markers for NSQ bulk jobs"""
+
+    _indexes_ensured = False
+
+    @staticmethod
+    def ensure_indexes(mongo):
+        """
+        Create indexes for the bulk_job_idempotency collection (idempotent)
+
+        Args:
+            mongo: MongoDB connection
+        """
+        if BulkJobIdempotency._indexes_ensured:
+            return
+
+        collection = mongo.db.bulk_job_idempotency
+        collection.create_index(
+            [('job_id', pymongo.ASCENDING), ('file_path', pymongo.ASCENDING)],
+            unique=True,
+            name='job_id_file_path_unique'
+        )
+        # Partial: markers saved without a message ID must not collide on null
+        collection.create_index(
+            [('job_id', pymongo.ASCENDING), ('message_id', pymongo.ASCENDING)],
+            unique=True,
+            partialFilterExpression={'message_id': {'$exists': True}},
+            name='job_id_message_id_unique'
+        )
+        BulkJobIdempotency._indexes_ensured = True
+
+    @staticmethod
+    def claim(mongo, job_id, file_path, message_id=None, collection=None):
+        """
+        Claim a file (and optionally its NSQ message) for a job
+
+        A single indexed insert: it fails with a duplicate key error if the
+        file or the message has already been claimed. New claims start with
+        counted=False until the job's consumed count has been incremented
+        for the file (see mark_counted).
+
+        Args:
+            mongo: MongoDB connection
+            job_id: Job identifier
+            file_path: Path of the processed file
+            message_id: Optional NSQ message ID
+            collection: Optional collection handle (e.g. with a custom write concern)
+
+        Returns:
+            True if the claim was inserted, False if it already existed
+        """
+        if collection is None:
+            collection = mongo.db.bulk_job_idempotency
+
+        document = {
+            'job_id': job_id,
+            'file_path': file_path,
+            'counted': False,
+            'created_at': datetime.utcnow()
+        }
+        if message_id:
+            document['message_id'] = message_id
+
+        try:
+            collection.insert_one(document)
+        except DuplicateKeyError:
+            return False
+        return True
+
+    @staticmethod
+    def is_pending(mongo, job_id, file_path):
+        """
+        Check whether a file was claimed but never counted
+
+        True after a worker died between claiming a file and incrementing
+        the job's consumed count; the redelivered message must then finish
+        the work instead of being dropped as a duplicate. Markers written
+        before the counted flag existed are treated as counted.
+        """
+        return mongo.db.bulk_job_idempotency.count_documents(
+            {'job_id': job_id, 'file_path': file_path, 'counted': False},
+            limit=1
+        ) > 0
+
+    @staticmethod
+    def mark_counted(mongo, job_id, file_path, collection=None):
+        """
+        Atomically flip a claim from uncounted to counted
+
+        Only one caller wins the flip, so the consumed count of the job is
+        incremented at most once per file even when a redelivery races with
+        the original worker.
+
+        Args:
+            mongo: MongoDB connection
+            job_id: Job identifier
+            file_path: Path of the processed file
+            collection: Optional collection handle (e.g. with a custom write concern)
+
+        Returns:
+            True if this call flipped the flag, False if the file was already counted
+        """
+        if collection is None:
+            collection = mongo.db.bulk_job_idempotency
+
+        update_result = collection.update_one(
+            {'job_id': job_id, 'file_path': file_path, 'counted': False},
+            {'$set': {'counted': True, 'counted_at': datetime.utcnow()}}
+        )
+        return update_result.modified_count == 1
+
+    @staticmethod
+    def count_counted(mongo, job_id):
+        """Count the files of a job whose claim has been counted (legacy markers included)"""
+        return mongo.db.bulk_job_idempotency.count_documents(
+            {'job_id': job_id, 'counted': {'$ne': False}}
+        )
+
+    @staticmethod
+    def is_file_counted(mongo, job_id, file_path):
+        """Check whether (job_id, file_path) has been claimed and counted (pending claims excluded)"""
+        return mongo.db.bulk_job_idempotency.count_documents(
+            {'job_id': job_id, 'file_path': file_path, 'counted': {'$ne': False}},
+            limit=1
+        ) > 0
+
+    @staticmethod
+    def is_message_counted(mongo, job_id, message_id):
+        """Check whether (job_id, message_id) has been claimed and counted (pending claims excluded)"""
+        return mongo.db.bulk_job_idempotency.count_documents(
+            {'job_id': job_id, 'message_id': message_id, 'counted': {'$ne': False}},
+            limit=1
+        ) > 0
+
+    @staticmethod
+    def delete_by_job(mongo, job_id):
+        """Delete all markers for a job"""
+        return mongo.db.bulk_job_idempotency.delete_many({'job_id': job_id})
@@ -0,0 +1,281 @@
+from datetime import datetime
+import pymongo
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+
+
+class BulkJobResult:
+    """Per-file OCR results for bulk jobs, stored outside the bulk_jobs document"""
+
+    RECORD_RESULT = 'result'
+    RECORD_ERROR = 'error'
+
+    _indexes_ensured = False
+
+    @staticmethod
+    def ensure_indexes(mongo):
+        """
+        Create indexes for the bulk_job_results collection (idempotent)
+
+        Args:
+            mongo: MongoDB connection
+        """
+        if BulkJobResult._indexes_ensured:
+            return
+
+        collection = mongo.db.bulk_job_results
+        collection.create_index(
+            [('job_id', pymongo.ASCENDING), ('file_path', pymongo.ASCENDING)],
+            unique=True,
+            name='job_id_file_path_unique'
+        )
+        collection.create_index(
+            [('job_id', pymongo.ASCENDING), ('record_type', pymongo.ASCENDING), ('file_index', pymongo.ASCENDING)],
+            name='job_id_record_type_file_index'
+        )
+        BulkJobResult._indexes_ensured = True
+
+    @staticmethod
+    def upsert(mongo, job_id, record, record_type=RECORD_RESULT, collection=None):
+        """
+        Insert a per-file record if no record exists yet for (job_id, file_path)
+
+        Args:
+            mongo: MongoDB connection
+            job_id: Job identifier
+            record: Result or error dictionary (must contain 'file_path')
+            record_type: 'result' or 'error'
+            collection: Optional collection handle (e.g. with a custom write concern)
+
+        Returns:
+            True if the record was inserted, False if the file already had a record
+            (an existing record does not mean the file was counted; see BulkJob._record_file_consumed)
+        """
+        if collection is None:
+            collection = mongo.db.bulk_job_results
+
+        document = dict(record)
+        document['job_id'] = job_id
+        document['record_type'] = record_type
+        document['created_at'] = datetime.utcnow()
+
+        try:
+            update_result = collection.update_one(
+                {'job_id': job_id, 'file_path': record['file_path']},
+                {'$setOnInsert': document},
+                upsert=True
+            )
+        except DuplicateKeyError:
+            # Concurrent upsert from another worker won the race
+            return False
+
+        return update_result.upserted_id is not None
+
+    @staticmethod
+    def iter_by_job(mongo, job_id, record_type=RECORD_RESULT, projection=None, limit=0, batch_size=100, skip=0):
+        """
+        Stream records for a job in file order using a server-side cursor
+
+        Records sharing a file_index (or missing one) keep insertion order, so
+        skip/limit pages are stable.
+
+        Args:
+            mongo: MongoDB connection
+            job_id: Job identifier
+            record_type: 'result' or 'error'
+            projection: Optional field projection
+            limit: Maximum number of records (0 = no limit)
+            batch_size: Documents fetched per cursor round trip
+            skip: Number of records to skip (for paginated reads)
+
+        Returns:
+            pymongo Cursor yielding record dictionaries
+        """
+        if projection is None:
+            projection = {'_id': 0, 'job_id': 0, 'record_type': 0, 'created_at': 0}
+
+        return mongo.db.bulk_job_results.find(
+            {'job_id': job_id, 'record_type': record_type},
+            projection
+        ).sort([('file_index', pymongo.ASCENDING), ('_id', pymongo.ASCENDING)]).skip(skip).limit(limit).batch_size(batch_size)
+
+    @staticmethod
+    def to_sample(record, max_text_chars=None):
+        """
+        Convert a result record to the results_preview sample format
+
+        Args:
+            record: Result dictionary
+            max_text_chars: Optional cap on the number of text characters kept
+
+        Returns:
+            Sample dictionary (text_length is always the full text length)
+        """
+        text = record.get('text', '') or ''
+        sample = {
+            'file': record.get('file') or record.get('filename') or record.get('file_info', {}).get('filename', 'unknown'),
+            'file_path': record.get('file_path', ''),
+            'confidence': record.get('confidence', 0),
+            'text': text,
+            'text_length': len(text),
+            'language': record.get('detected_language', 'unknown'),
+            'provider': record.get('provider', 'unknown')
+        }
+        if max_text_chars is not None and len(text) > max_text_chars:
+            sample['text'] = text[:max_text_chars]
+            sample['text_truncated'] = True
+        return sample
+
+    @staticmethod
+    def to_error_sample(record):
+        """Convert an error record to the results_preview error sample format"""
+        return {
+            'file': record.get('file') or record.get('filename') or record.get('file_info', {}).get('filename', 'unknown'),
+            'file_path': record.get('file_path', ''),
+            'error': record.get('error', 'Unknown error')
+        }
+
+    @staticmethod
+    def iter_samples(mongo, job_id, batch_size=100, skip=0, limit=0):
+        """
+        Stream successful results of a job in results_preview sample format
+
+        Args:
+            mongo: MongoDB connection
+            job_id: Job identifier
+            batch_size: Documents fetched per cursor round trip
+            skip: Number of results to skip (for paginated reads)
+            limit: Maximum number of results (0 = no limit)
+
+        Returns:
+            Generator of sample dictionaries with full text
+        """
+        projection = {
+            '_id': 0, 'file': 1, 'filename': 1, 'file_info.filename': 1, 'file_path': 1,
+            'confidence': 1, 'text': 1, 'detected_language': 1, 'provider': 1
+        }
+        for record in BulkJobResult.iter_by_job(mongo, job_id, BulkJobResult.RECORD_RESULT,
+                                                projection=projection, limit=limit,
+                                                batch_size=batch_size, skip=skip):
+            yield BulkJobResult.to_sample(record)
+
+    @staticmethod
+    def iter_error_samples(mongo, job_id, batch_size=100, skip=0, limit=0):
+        """
+        Stream failed files of a job in results_preview error sample format
+
+        Args:
+            mongo: MongoDB connection
+            job_id: Job identifier
+            batch_size: Documents fetched per cursor round trip
+            skip: Number of errors to skip (for paginated reads)
+            limit: Maximum number of errors (0 = no limit)
+
+        Returns:
+            Generator of error sample dictionaries
+        """
+        projection = {'_id': 0, 'file': 1, 'filename': 1, 'file_info.filename': 1, 'file_path': 1, 'error': 1}
+        for record in BulkJobResult.iter_by_job(mongo, job_id, BulkJobResult.RECORD_ERROR,
+                                                projection=projection, limit=limit,
+                                                batch_size=batch_size, skip=skip):
+            yield BulkJobResult.to_error_sample(record)
+
+    @staticmethod
+    def count_by_job(mongo, job_id, record_type=None):
+        """
+        Count records for a job
+
+        Args:
+            mongo: MongoDB connection
+            job_id: Job identifier
+            record_type: Optional 'result' or 'error' filter
+
+        Returns:
+            Number of matching records
+        """
+        query = {'job_id': job_id}
+        if record_type:
+            query['record_type'] = record_type
+        return mongo.db.bulk_job_results.count_documents(query)
+
+    @staticmethod
+    def is_file_recorded(mongo, job_id, file_path):
+        """Check whether a record already exists for (job_id, file_path)"""
+        return mongo.db.bulk_job_results.count_documents(
+            {'job_id': job_id, 'file_path': file_path},
+            limit=1
+        ) > 0
+
+    @staticmethod
+    def recorded_hashes(mongo, job_id, file_paths, record_type=RECORD_RESULT):
+        """
+        Find which of the given files have a record of a type in a job
+
+        Args:
+            mongo: MongoDB connection
+            job_id: Job identifier
+            file_paths: File paths to check
+            record_type: 'result' or 'error'
+
+        Returns:
+            Dictionary mapping each file path with a record to the content hash
+            stored with it by the worker (None if the record has none)
+        """
+        return {
+            record['file_path']: record.get('content_hash')
+            for record in mongo.db.bulk_job_results.find(
+                {'job_id': job_id, 'record_type': record_type, 'file_path': {'$in': list(file_paths)}},
+                {'_id': 0, 'file_path': 1, 'content_hash': 1}
+            )
+        }
+
+    @staticmethod
+    def copy_from_job(mongo, source_job_id, target_job_id, file_paths, first_index=0):
+        """
+        Copy the successful results of files from a previous job into another job
+
+        Files that already have a record in the target job are left as they are.
+        Copied records are renumbered from first_index in file_paths order, so
+        they do not share file indexes with the target job's own files.
+
+        Args:
+            mongo: MongoDB connection
+            source_job_id: Job whose results are reused
+            target_job_id: Job receiving the results
+            file_paths: File paths to copy
+            first_index: File index of the first copied record
+
+        Returns:
+            Set of file paths that had a result in the source job
+        """
+        file_paths = list(file_paths)
+        records = list(mongo.db.bulk_job_results.find(
+            {'job_id': source_job_id, 'record_type': BulkJobResult.RECORD_RESULT,
+             'file_path': {'$in': file_paths}},
+            {'_id': 0}
+        ))
+        if not records:
+            return set()
+
+        position = {file_path: idx for idx, file_path in enumerate(file_paths)}
+        records.sort(key=lambda record: position[record['file_path']])
+
+        now = datetime.utcnow()
+        for file_index, record in enumerate(records, first_index):
+            record['job_id'] = target_job_id
+            record['file_index'] = file_index
+            record['reused_from_job_id'] = record.get('reused_from_job_id') or source_job_id
+            record['created_at'] = now
+
+        try:
+            mongo.db.bulk_job_results.insert_many(records, ordered=False)
+        except BulkWriteError as e:
+            # Records copied by an earlier, interrupted aggregation run
+            if any(error.get('code') != 11000 for error in e.details.get('writeErrors', [])):
+                raise
+
+        return {record['file_path'] for record in records}
+
+    @staticmethod
+    def delete_by_job(mongo, job_id):
+        """Delete all per-file records for a job"""
+        return mongo.db.bulk_job_results.delete_many({'job_id': job_id})
@@ -0,0 +1,110 @@
+from datetime import datetime
+import pymongo
+from pymongo.errors import DuplicateKeyError
+
+
+class BulkTaskBacklog:
+    """File task chunks held back by fair dispatch until their job has room in NSQ"""
+
+    _indexes_ensured = False
+
+    @staticmethod
+    def ensure_indexes(mongo):
+        """
+        Create indexes for the bulk_task_backlog collection (idempotent)
+
+        Args:
+            mongo: MongoDB connection
+        """
+        if BulkTaskBacklog._indexes_ensured:
+            return
+
+        collection = mongo.db.bulk_task_backlog
+        collection.create_index(
+            [('job_id', pymongo.ASCENDING), ('seq', pymongo.ASCENDING)],
+            unique=True,
+            name='job_id_seq_unique'
+        )
+        BulkTaskBacklog._indexes_ensured = True
+
+    @staticmethod
+    def push(mongo, job_id, priority, seq, tasks):
+        """
+        Store a chunk of file tasks for later dispatch
+
+        Args:
+            mongo: MongoDB connection
+            job_id: Job identifier
+            priority: Priority lane of the job
+            seq: Chunk sequence number within the job (chunks are dispatched in order)
+            tasks: List of task messages from NSQService.build_file_task
+        """
+        return mongo.db.bulk_task_backlog.insert_one({
+            'job_id': job_id,
+            'priority': priority,
+            'seq': seq,
+            'task_count': len(tasks),
+            'tasks': tasks,
+            'created_at': datetime.utcnow()
+        })
+
+    @staticmethod
+    def pop_next(mongo, job_id):
+        """
+        Atomically take the oldest chunk of a job
+
+        Args:
+            mongo: MongoDB connection
+            job_id: Job identifier
+
+        Returns:
+            Chunk document, or None if the job has no backlog
+        """
+        return mongo.db.bulk_task_backlog.find_one_and_delete(
+            {'job_id': job_id},
+            sort=[('seq', pymongo.ASCENDING)]
+        )
+
+    @staticmethod
+    def restore(mongo, chunk):
+        """Put back a chunk taken by pop_next() that could not be published"""
+        try:
+            mongo.db.bulk_task_backlog.insert_one(chunk)
+        except DuplicateKeyError:
+            pass
+
+    @staticmethod
+    def pending_jobs(mongo):
+        """
+        Summarize the backlog per job
+
+        Args:
+            mongo: MongoDB connection
+
+        Returns:
+            List of {'job_id', 'priority', 'chunks', 'tasks', 'oldest_at'} ordered by oldest chunk
+        """
+        return [
+            {
+                'job_id': entry['_id'],
+                'priority': entry['priority'],
+                'chunks': entry['chunks'],
+                'tasks': entry['tasks'],
+                'oldest_at': entry['oldest_at']
+            }
+            for entry in mongo.db.bulk_task_backlog.aggregate([
+                {'$group': {
+                    '_id': '$job_id',
+                    'priority': {'$first': '$priority'},
+                    'chunks': {'$sum': 1},
+                    'tasks': {'$sum': '$task_count'},
+                    'oldest_at': {'$min': '$created_at'}
+                }},
+                {'$sort': {'oldest_at': 1}}
+            ])
+        ]
+
+    @staticmethod
+    def delete_by_job(mongo, job_id):
+        """Drop the backlog of a job"""
+        return mongo.db.bulk_task_backlog.delete_many({'job_id': job_id})
@@ -0,0 +1,278 @@
+from datetime import datetime
+import hashlib
+import json
+import logging
+import os
+import pymongo
+
+from app.models.ocr_result_cache import OCRResultCache
+
+logger = logging.getLogger(__name__)
+
+
+class FolderManifest:
+    """
+    Per-folder file fingerprints (size, mtime, content hash) for incremental bulk jobs
+
+    One document per file and manifest. 'fingerprint' is the state whose
+    result is held by the last merged job; 'pending' is the state a running
+    job is reprocessing and only becomes the fingerprint once that job
+    produced a result for the file.
+    """
+
+    _indexes_ensured = False
+
+    @staticmethod
+    def ensure_indexes(mongo):
+        """
+        Create indexes for the folder_manifest_entries collection (idempotent)
+
+        Args:
+            mongo: MongoDB connection
+        """
+        if FolderManifest._indexes_ensured:
+            return
+
+        collection = mongo.db.folder_manifest_entries
+        collection.create_index(
+            [('manifest_key', pymongo.ASCENDING), ('file_path', pymongo.ASCENDING)],
+            unique=True,
+            name='manifest_key_file_path_unique'
+        )
+        collection.create_index(
+            [('manifest_key', pymongo.ASCENDING), ('seen_job_id', pymongo.ASCENDING)],
+            name='manifest_key_seen_job_id'
+        )
+        collection.create_index(
+            [('manifest_key', pymongo.ASCENDING), ('pending_job_id', pymongo.ASCENDING)],
+            name='manifest_key_pending_job_id'
+        )
+        FolderManifest._indexes_ensured = True
+
+    @staticmethod
+    def build_key(folder_path, recursive=True, provider=None, languages=None, handwriting=False,
+                  processing_mode='single', chain_config=None):
+        """
+        Build the manifest key of a folder and the settings its results depend on
+
+        Args:
+            folder_path: Root folder of the job
+            recursive: Whether subfolders are scanned
+            provider: OCR provider name
+            languages: List of language codes
+            handwriting: Handwriting flag
+            processing_mode: "single" or "chain"
+            chain_config: Chain configuration (chain mode)
+
+        Returns:
+            Hex digest string
+        """
+        key_data = {
+            'folder': os.path.normpath(os.path.abspath(folder_path)),
+            'recursive': bool(recursive),
+            'provider': provider,
+            'languages': sorted(languages or []),
+            'handwriting': bool(handwriting),
+            'processing_mode': processing_mode or 'single',
+            'chain_config': chain_config if processing_mode == 'chain' else None
+        }
+        return hashlib.sha256(
+            json.dumps(key_data, sort_keys=True, default=str).encode('utf-8')
+        ).hexdigest()
+
+    @staticmethod
+    def plan_chunk(mongo, manifest_key, job_id, file_stats, reuse=True):
+        """
+        Compare a chunk of scanned files with the manifest and mark them seen by a job
+
+        A file is unchanged if its size and mtime match the fingerprint, or
+        if its size and content hash do (e.g. a copy that only touched the
+        mtime). Other files get a pending fingerprint for the job. Content
+        hashes are only computed for files with a fingerprint of the same
+        size, so new files and the first run of a folder are not read while
+        planning; their hash is the one the worker stored with the result,
+        added when the job commits the manifest.
+        All entries of the chunk are written in one bulk round trip.
+
+        Args:
+            mongo: MongoDB connection
+            manifest_key: Manifest key from build_key()
+            job_id: Job identifier
+            file_stats: List of (file_path, size, mtime_ns)
+            reuse: Whether fingerprints may be reused (False when no previous results exist)
+
+        Returns:
+            List of file paths that need processing, in scan order
+        """
+        if not file_stats:
+            return []
+
+        collection = mongo.db.folder_manifest_entries
+        known = {
+            entry['file_path']: entry.get('fingerprint')
+            for entry in collection.find(
+                {'manifest_key': manifest_key, 'file_path': {'$in': [path for path, _, _ in file_stats]}},
+                {'_id': 0, 'file_path': 1, 'fingerprint': 1}
+            )
+        } if reuse else {}
+
+        now = datetime.utcnow()
+        unchanged = []
+        changed = []
+        operations = []
+        for file_path, size, mtime_ns in file_stats:
+            fingerprint = known.get(file_path)
+            if fingerprint and fingerprint['size'] == size and fingerprint['mtime_ns'] == mtime_ns:
+                unchanged.append(file_path)
+                continue
+
+            content_hash = None
+            if fingerprint and fingerprint['size'] == size:
+                try:
+                    content_hash = OCRResultCache.hash_file(file_path)
+                except OSError as e:
+                    # Let the job report the unreadable file
+                    logger.warning(f"Could not hash {file_path}: {e}")
+
+            current = {'size': size, 'mtime_ns': mtime_ns, 'content_hash': content_hash}
+            update = {'seen_job_id': job_id, 'updated_at': now}
+            if content_hash and fingerprint.get('content_hash') == content_hash:
+                update['fingerprint'] = current
+            else:
+                update['pending'] = current
+                update['pending_job_id'] = job_id
+                changed.append(file_path)
+
+            operations.append(pymongo.UpdateOne(
+                {'manifest_key': manifest_key, 'file_path': file_path},
+                {'$set': update, '$setOnInsert': {'created_at': now}},
+                upsert=True
+            ))
+
+        if operations:
+            collection.bulk_write(operations, ordered=False)
+
+        # Unchanged files (the bulk of a re-run) are marked seen in one round trip
+        if unchanged:
+            collection.update_many(
+                {'manifest_key': manifest_key, 'file_path': {'$in': unchanged}},
+                {'$set': {'seen_job_id': job_id, 'updated_at': now}}
+            )
+        return changed
+
+    @staticmethod
+    def iter_unchanged(mongo, manifest_key, job_id, batch_size=200):
+        """
+        Stream the paths a job saw but did not reprocess
+
+        Args:
+            mongo: MongoDB connection
+            manifest_key: Manifest key
+            job_id: Job identifier
+            batch_size: Documents fetched per cursor round trip
+
+        Returns:
+            Generator of file paths
+        """
+        cursor = mongo.db.folder_manifest_entries.find(
+            {'manifest_key': manifest_key, 'seen_job_id': job_id, 'pending_job_id': {'$ne': job_id}},
+            {'_id': 0, 'file_path': 1}
+        ).batch_size(batch_size)
+        for entry in cursor:
+            yield entry['file_path']
+
+    @staticmethod
+    def forget(mongo, manifest_key, file_paths):
+        """
+        Drop the fingerprints of files so the next job reprocesses them
+
+        Args:
+            mongo: MongoDB connection
+            manifest_key: Manifest key
+            file_paths: File paths to forget
+        """
+        if not file_paths:
+            return
+        mongo.db.folder_manifest_entries.update_many(
+            {'manifest_key': manifest_key, 'file_path': {'$in': list(file_paths)}},
+            {'$unset': {'fingerprint': ''}}
+        )
+
+    @staticmethod
+    def _with_content_hash(fingerprint, content_hash):
+        """
+        Fill in the content hash of a fingerprint from the job's result
+
+        Workers hash the bytes they OCR (see OCRService.process_image), so the
+        hash matches the stored result and committing never reads the file
+        again. Without one the fingerprint falls back to size and mtime.
+        """
+        if not content_hash:
+            return fingerprint
+        return dict(fingerprint, content_hash=content_hash)
+
+    @staticmethod
+    def commit(mongo, manifest_key, job_id, has_result, batch_size=200, base_job_id=None):
+        """
+        Promote a job's pending fingerprints and drop files the job no longer saw
+
+        Files without a result keep no fingerprint, so the next job retries them.
+
+        Args:
+            mongo: MongoDB connection
+            manifest_key: Manifest key
+            job_id: Job identifier
+            has_result: Callable(file_paths) returning a dictionary of the files that have
+                a result in the job, mapped to the result's content hash (or None)
+            batch_size: Pending entries read per round trip
+            base_job_id: Job the results were reused from; its entries that this
+                job did not see again belong to files removed from the folder
+
+        Returns:
+            Dictionary with 'committed', 'uncommitted' and 'removed' counts
+        """
+        collection = mongo.db.folder_manifest_entries
+        stats = {'committed': 0, 'uncommitted': 0, 'removed': 0}
+
+        while True:
+            # Committed entries no longer match the query, so each pass reads the next batch
+            batch = list(collection.find(
+                {'manifest_key': manifest_key, 'pending_job_id': job_id},
+                {'_id': 0, 'file_path': 1, 'pending': 1}
+            ).limit(batch_size))
+            if not batch:
+                break
+
+            succeeded = has_result([entry['file_path'] for entry in batch])
+            failed = []
+            operations = []
+            for entry in batch:
+                if entry['file_path'] not in succeeded:
+                    failed.append(entry['file_path'])
+                    continue
+                operations.append(pymongo.UpdateOne(
+                    {'manifest_key': manifest_key, 'file_path': entry['file_path']},
+                    {'$set': {'fingerprint': FolderManifest._with_content_hash(
+                        entry['pending'], succeeded[entry['file_path']]
+                    )},
+                     '$unset': {'pending': '', 'pending_job_id': ''}}
+                ))
+
+            if operations:
+                collection.bulk_write(operations, ordered=False)
+                stats['committed'] += len(operations)
+
+            if failed:
+                collection.update_many(
+                    {'manifest_key': manifest_key, 'file_path': {'$in': failed}},
+                    {'$unset': {'fingerprint': '', 'pending': '', 'pending_job_id': ''}}
+                )
+                stats['uncommitted'] += len(failed)
+
+        # Only entries the base job saw and this job did not are gone from the
+        # folder; entries last seen by a concurrent job on the manifest stay
+        if base_job_id:
+            stats['removed'] = collection.delete_many(
+                {'manifest_key': manifest_key, 'seen_job_id': base_job_id}
+            ).deleted_count
+        return stats
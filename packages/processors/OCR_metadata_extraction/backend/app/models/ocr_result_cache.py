@@ -0,0 +1,189 @@
+from datetime import datetime
+import hashlib
+import json
+import logging
+import pymongo
+from bson.errors import InvalidDocument
+from pymongo.errors import DuplicateKeyError, OperationFailure, DocumentTooLarge
+
+logger = logging.getLogger(__name__)
+
+
+class OCRResultCache:
+    """Content-addressed OCR results, shared across jobs and workers"""
+
+    _indexes_ensured = False
+
+    HASH_CHUNK_SIZE = 1024 * 1024
+
+    # Result fields that belong to the job that produced them (e.g. GridFS
+    # images stored under its job_id) and must not be replayed into other jobs
+    JOB_SCOPED_KEYS = ('intermediate_images',)
+
+    @staticmethod
+    def ensure_indexes(mongo, ttl_seconds=None):
+        """
+        Create indexes for the ocr_result_cache collection (idempotent)
+
+        Args:
+            mongo: MongoDB connection
+            ttl_seconds: Expire entries not read for this many seconds (None: no TTL)
+        """
+        if OCRResultCache._indexes_ensured:
+            return
+
+        collection = mongo.db.ocr_result_cache
+        collection.create_index('cache_key', unique=True, name='cache_key_unique')
+        if ttl_seconds:
+            try:
+                collection.create_index(
+                    'last_accessed_at',
+                    expireAfterSeconds=int(ttl_seconds),
+                    name='last_accessed_at_ttl'
+                )
+            except OperationFailure as e:
+                # TTL changed since the index was created; keep the existing one
+                logger.warning(f"Could not create OCR cache TTL index: {e}")
+        else:
+            collection.create_index('last_accessed_at', name='last_accessed_at')
+        OCRResultCache._indexes_ensured = True
+
+    @staticmethod
+    def hash_file(file_path):
+        """
+        SHA-256 of a file's bytes, read in chunks
+
+        Args:
+            file_path: Path to the file
+
+        Returns:
+            Hex digest string
+        """
+        digest = hashlib.sha256()
+        with open(file_path, 'rb') as f:
+            for chunk in iter(lambda: f.read(OCRResultCache.HASH_CHUNK_SIZE), b''):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    @staticmethod
+    def hash_text(text):
+        """SHA-256 of a text input (for text-only chain steps)"""
+        return hashlib.sha256((text or '').encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def build_key(content_hash, provider, model=None, languages=None, handwriting=False, custom_prompt=None):
+        """
+        Build the cache key for an OCR call
+
+        Args:
+            content_hash: Hash of the input bytes (or text)
+            provider: Provider name
+            model: Provider model, if any
+            languages: List of language codes
+            handwriting: Handwriting flag
+            custom_prompt: Custom prompt, if any
+
+        Returns:
+            Hex digest string
+        """
+        parts = {
+            'content': content_hash,
+            'provider': provider,
+            'model': model,
+            'languages': sorted(languages) if languages else [],
+            'handwriting': bool(handwriting),
+            'prompt': custom_prompt or ''
+        }
+        return hashlib.sha256(json.dumps(parts, sort_keys=True).encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def get(mongo, cache_key):
+        """
+        Look up a cached result, refreshing its last access time
+
+        Args:
+            mongo: MongoDB connection
+            cache_key: Key from build_key
+
+        Returns:
+            Cached result dictionary or None
+        """
+        entry = mongo.db.ocr_result_cache.find_one_and_update(
+            {'cache_key': cache_key},
+            {'$set': {'last_accessed_at': datetime.utcnow()}, '$inc': {'hit_count': 1}},
+            projection={'_id': 0, 'result': 1}
+        )
+        return entry['result'] if entry else None
+
+    @staticmethod
+    def put(mongo, cache_key, result, provider=None, max_entries=None):
+        """
+        Store a result, evicting the least recently used entries beyond max_entries
+
+        Job-scoped fields (JOB_SCOPED_KEYS) are left out of the cached copy.
+
+        Args:
+            mongo: MongoDB connection
+            cache_key: Key from build_key
+            result: OCR result dictionary
+            provider: Provider name (informational)
+            max_entries: Maximum number of cached entries (None: unbounded)
+
+        Returns:
+            True if the result was stored
+        """
+        result = {key: value for key, value in result.items() if key not in OCRResultCache.JOB_SCOPED_KEYS}
+        now = datetime.utcnow()
+        try:
+            mongo.db.ocr_result_cache.update_one(
+                {'cache_key': cache_key},
+                {
+                    '$setOnInsert': {
+                        'provider': provider,
+                        'result': result,
+                        'hit_count': 0,
+                        'created_at': now
+                    },
+                    '$set': {'last_accessed_at': now}
+                },
+                upsert=True
+            )
+        except DuplicateKeyError:
+            # Another worker cached the same input concurrently
+            return True
+        except (InvalidDocument, DocumentTooLarge) as e:
+            logger.debug(f"OCR result not cacheable: {e}")
+            return False
+
+        if max_entries:
+            OCRResultCache.evict(mongo, max_entries)
+        return True
+
+    @staticmethod
+    def evict(mongo, max_entries):
+        """
+        Delete the least recently used entries beyond max_entries
+
+        Args:
+            mongo: MongoDB connection
+            max_entries: Number of entries to keep
+
+        Returns:
+            Number of deleted entries
+        """
+        collection = mongo.db.ocr_result_cache
+        excess = collection.estimated_document_count() - max_entries
+        if excess <= 0:
+            return 0
+
+        oldest = collection.find({}, {'_id': 1}).sort('last_accessed_at', pymongo.ASCENDING).limit(excess)
+        ids = [entry['_id'] for entry in oldest]
+        if not ids:
+            return 0
+        return collection.delete_many({'_id': {'$in': ids}}).deleted_count
+
+    @staticmethod
+    def clear(mongo, provider=None):
+        """Delete cached entries (optionally for one provider)"""
+        query = {'provider': provider} if provider else {}
+        return mongo.db.ocr_result_cache.delete_many(query)
@@ -253,7 +253,7 @@ def push_bulk_job(current_user_id):
 
         include_failed = data.get('include_failed', False)
 
-        successful_samples = results.get('results_preview', {}).get('successful_samples', [])
+        successful_samples = BulkJob.get_successful_samples(mongo, job)
 
         if not successful_samples:
             return jsonify({'error': 'No successful results to push'}), 400
@@ -450,8 +450,7 @@ def _push_bulk_ami_background(job_id, collection_title, collection_id, user_id):
             return
         
         # Get results
-        results = job.get('results', {})
-        successful_samples = results.get('results_preview', {}).get('successful_samples', [])
+        successful_samples = BulkJob.get_successful_samples(mongo, job)
         
         if not successful_samples:
             logger.error(f"Background: No successful samples for job {job_id}")
@@ -6,8 +6,9 @@ import os
 import json
 import tempfile
 import threading
+import time
 import uuid
-from flask import Blueprint, request, jsonify, send_file, current_app
+from flask import Blueprint, request, jsonify, send_file, current_app, Response, stream_with_context
 from werkzeug.utils import secure_filename
 from pathlib import Path
 import zipfile
@@ -16,10 +17,14 @@ import logging
 from app.services.ocr_service import OCRService
 from app.services.bulk_processor import BulkProcessor
 from app.services.nsq_job_coordinator import NSQJobCoordinator
+from app.services.nsq_service import NSQService
+from app.services.folder_scanner import FolderScanner
 from app.config import Config
-from app.utils.decorators import token_required
+from app.utils.decorators import token_required, token_required_sse
 from app.models import mongo
 from app.models.bulk_job import BulkJob
+from app.models.bulk_job_result import BulkJobResult
+from app.models.bulk_task_backlog import BulkTaskBacklog
 
 logger = logging.getLogger(__name__)
 
@@ -188,23 +193,19 @@ def browse_folders(current_user_id):
                 if os.path.isdir(root):
                     try:
                         # Get immediate subfolders only
-                        items = os.listdir(root)
-                        for item in items:
-                            full_path = os.path.join(root, item)
-                            if os.path.isdir(full_path) and not item.startswith('.'):
+                        for entry in FolderScanner.list_directory(root):
+                            if entry.is_dir and not entry.name.startswith('.'):
                                 try:
                                     # Count files in folder
-                                    file_count = len([f for f in os.listdir(full_path) 
-                                                    if os.path.isfile(os.path.join(full_path, f))])
                                     folders.append({
-                                        'name': item,
-                                        'path': full_path,
-                                        'file_count': file_count,
+                                        'name': entry.name,
+                                        'path': entry.path,
+                                        'file_count': FolderScanner.count_files(entry.path),
                                         'is_dir': True
                                     })
-                                except PermissionError:
+                                except OSError:
                                     pass
-                    except PermissionError:
+                    except OSError:
                         pass
             
             return jsonify({
@@ -223,33 +224,28 @@ def browse_folders(current_user_id):
         
         # Get subfolders and files
         try:
-            items = os.listdir(browse_path)
             folders = []
             files = []
             
-            for item in items:
-                full_path = os.path.join(browse_path, item)
-                if item.startswith('.'):
+            for entry in FolderScanner.list_directory(browse_path):
+                if entry.name.startswith('.'):
                     continue
                 
                 try:
-                    if os.path.isdir(full_path):
-                        file_count = len([f for f in os.listdir(full_path) 
-                                        if os.path.isfile(os.path.join(full_path, f))])
+                    if entry.is_dir:
                         folders.append({
-                            'name': item,
-                            'path': full_path,
-                            'file_count': file_count,
+                            'name': entry.name,
+                            'path': entry.path,
+                            'file_count': FolderScanner.count_files(entry.path),
                             'is_dir': True
                         })
-                    else:
+                    elif entry.is_file:
                         # Only show image files
-                        if item.lower().endswith(('.jpg', '.jpeg', '.png', '.bmp', '.gif', '.tiff', '.webp', '.pdf')):
-                            file_size = os.path.getsize(full_path)
+                        if os.path.splitext(entry.name)[1].lower() in FolderScanner.SUPPORTED_EXTENSIONS:
                             files.append({
-                                'name': item,
-                                'path': full_path,
-                                'size': file_size,
+                                'name': entry.name,
+                                'path': entry.path,
+                                'size': os.path.getsize(entry.path),
                                 'is_dir': False
                             })
                 except (PermissionError, OSError):
@@ -276,7 +272,29 @@ def browse_folders(current_user_id):
         return jsonify({'error': str(e)}), 500
 
 
-def _process_in_background(app, job_id, folder_path, recursive, provider, languages, handwriting, export_formats, parallel=True, max_workers=None):
+def _start_nsq_job_in_background(app, job_id, folder_path, provider, languages, handwriting, recursive, incremental, priority):
+    """Background function to scan a folder and publish the NSQ tasks of a job"""
+    with app.app_context():
+        try:
+            coordinator = NSQJobCoordinator()
+            job_info = coordinator.start_job(
+                mongo=mongo,
+                job_id=job_id,
+                folder_path=folder_path,
+                provider=provider,
+                languages=languages,
+                handwriting=handwriting,
+                recursive=recursive,
+                incremental=incremental,
+                priority=priority
+            )
+            logger.info(f"Published NSQ job {job_id} with {job_info['total_files']} files to process (priority: {priority})")
+        except Exception as e:
+            # start_job already marked the job as failed
+            logger.error(f"Failed to start NSQ job {job_id}: {str(e)}", exc_info=True)
+
+
+def _process_in_background(app, job_id, folder_path, recursive, provider, languages, handwriting, export_formats, parallel=True, max_workers=None, incremental=False):
     """Background function to process bulk images"""
     with app.app_context():
         try:
@@ -321,7 +339,9 @@ def _process_in_background(app, job_id, folder_path, recursive, provider, langua
                 languages=languages,
                 handwriting=handwriting,
                 recursive=recursive,
-                parallel=parallel
+                parallel=parallel,
+                incremental=incremental,
+                mongo=mongo
             )
 
             # Create output folder
@@ -436,15 +456,8 @@ def _process_in_background(app, job_id, folder_path, recursive, provider, langua
                 'results_preview': {
                     'total_results': len(results['results']),
                     'successful_samples': [
-                        {
-                            'file': r['file'],
-                            'file_path': r['file_path'],
-                            'confidence': r['confidence'],
-                            'text': r['text'],  # Include full OCR text
-                            'text_length': len(r['text']),
-                            'language': r['detected_language'],
-                            'provider': r['provider']
-                        }
+                        # Full OCR text; reused results of incremental jobs may come from NSQ workers
+                        BulkJobResult.to_sample(r)
                         for r in results['results']  # All successful files
                     ],
                     'error_samples': [
@@ -503,65 +516,162 @@ def _process_in_background(app, job_id, folder_path, recursive, provider, langua
                 logger.info(f"Cleaned up processor for job {job_id}")
 
 
-@bulk_bp.route('/progress/<job_id>', methods=['GET'])
-@token_required
-def get_progress(current_user_id, job_id):
+# Job states after which progress no longer changes
+TERMINAL_JOB_STATUSES = ('completed', 'error', 'cancelled')
+
+
+def _read_job_progress(job_id, user_id):
     """
-    Get the progress of a bulk processing job
+    Read a job's status and progress counters without its results or checkpoint arrays
 
     Returns:
-    {
-        "status": "processing" | "completed" | "error" | "not_found",
-        "progress": {
-            "current": 5,
-            "total": 10,
-            "percentage": 50,
-            "filename": "current_file.jpg"
-        },
-        "results": {...}  // Only present when status is "completed"
-    }
+        Progress dict (database job, else in-memory threading job) or None if not found
     """
     # Always check database first for NSQ jobs, fall back to in-memory for threading jobs
     try:
-        db_job = BulkJob.find_by_job_id(mongo, job_id, current_user_id)
+        db_job = BulkJob.get_progress(mongo, job_id, user_id)
         if db_job:
-            job = {
-                'status': db_job.get('status', 'unknown'),
-                'progress': db_job.get('progress', {}),
-                'results': db_job.get('results'),
-                'error': db_job.get('error')
-            }
-        else:
-            # Fall back to in-memory cache for threading-based jobs
-            job = processing_jobs.get(job_id)
-            if not job:
-                return jsonify({'status': 'not_found', 'error': 'Job not found'}), 404
+            return db_job
     except Exception as e:
         logger.error(f"Error fetching job from database: {str(e)}")
-        # Fall back to in-memory cache
-        job = processing_jobs.get(job_id)
-        if not job:
-            return jsonify({'status': 'not_found', 'error': 'Job not found'}), 404
 
+    job = processing_jobs.get(job_id)
+    if not job:
+        return None
+    return {
+        'status': job.get('status'),
+        'progress': job.get('progress'),
+        'results': job.get('results'),
+        'error': job.get('error')
+    }
+
+
+def _progress_payload(job_id, user_id, job):
+    """Build the /progress response body; results are read only once the job completed"""
     response = {
-        'status': job.get('status', 'unknown'),
-        'progress': job.get('progress', {
+        'status': job.get('status') or 'unknown',
+        'progress': job.get('progress') or {
             'current': 0,
             'total': 0,
             'percentage': 0,
             'filename': ''
-        })
+        }
     }
 
     # If completed, include results
     if job.get('status') == 'completed':
-        response['results'] = job.get('results')
+        response['results'] = job['results'] if 'results' in job else BulkJob.get_results(mongo, job_id, user_id)
 
     # If error, include error message
     if job.get('status') == 'error':
-        response['error'] = job.get('error', 'Unknown error occurred')
+        response['error'] = job.get('error') or 'Unknown error occurred'
+
+    return response
+
+
+def _conditional_json(payload, etag):
+    """JSON response carrying an ETag; clients must revalidate on every poll"""
+    response = jsonify(payload)
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+
+def _not_modified(etag):
+    """Empty 304 response for a poll whose If-None-Match matches the current ETag"""
+    response = current_app.response_class(status=304)
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+
+@bulk_bp.route('/progress/<job_id>', methods=['GET'])
+@token_required
+def get_progress(current_user_id, job_id):
+    """
+    Get the progress of a bulk processing job
+
+    Reads only status and progress fields. The response carries an ETag;
+    a poll sending it back in If-None-Match gets 304 while nothing changed.
+
+    Returns:
+    {
+        "status": "processing" | "completed" | "error" | "not_found",
+        "progress": {
+            "current": 5,
+            "total": 10,
+            "percentage": 50,
+            "filename": "current_file.jpg"
+        },
+        "results": {...}  // Only present when status is "completed"
+    }
+    """
+    job = _read_job_progress(job_id, current_user_id)
+    if not job:
+        return jsonify({'status': 'not_found', 'error': 'Job not found'}), 404
 
-    return jsonify(response), 200
+    etag = BulkJob.progress_etag(job)
+    if request.if_none_match.contains(etag):
+        return _not_modified(etag)
+
+    return _conditional_json(_progress_payload(job_id, current_user_id, job), etag), 200
+
+
+@bulk_bp.route('/progress/<job_id>/stream', methods=['GET'])
+@token_required_sse
+def stream_progress(current_user_id, job_id):
+    """
+    Stream progress of a bulk processing job as Server-Sent Events
+
+    The job's progress fields are read every BULK_PROGRESS_STREAM_INTERVAL
+    seconds; an event is sent only when they changed and contains only the
+    top-level fields that differ from the previous event. The stream ends
+    with an 'end' event once the job completed, failed or was cancelled.
+
+    Returns:
+        SSE stream of 'progress' events (JSON deltas of the /progress response)
+    """
+    interval = Config.BULK_PROGRESS_STREAM_INTERVAL
+    heartbeat = Config.BULK_PROGRESS_STREAM_HEARTBEAT
+    deadline = time.monotonic() + Config.BULK_PROGRESS_STREAM_MAX_SECONDS
+
+    def generate():
+        """Generator function for SSE"""
+        last_etag = request.headers.get('Last-Event-ID')
+        last_payload = {}
+        last_sent = time.monotonic()
+
+        try:
+            while time.monotonic() < deadline:
+                job = _read_job_progress(job_id, current_user_id)
+                if not job:
+                    yield f"event: error\ndata: {json.dumps({'status': 'not_found', 'error': 'Job not found'})}\n\n"
+                    return
+
+                etag = BulkJob.progress_etag(job)
+                if etag != last_etag:
+                    payload = _progress_payload(job_id, current_user_id, job)
+                    delta = {key: value for key, value in payload.items() if last_payload.get(key) != value}
+                    yield f"id: {etag}\nevent: progress\ndata: {json.dumps(delta, default=str)}\n\n"
+                    last_etag, last_payload, last_sent = etag, payload, time.monotonic()
+                elif time.monotonic() - last_sent >= heartbeat:
+                    yield ": keep-alive\n\n"
+                    last_sent = time.monotonic()
+
+                if job.get('status') in TERMINAL_JOB_STATUSES:
+                    yield f"event: end\ndata: {json.dumps({'status': job.get('status')})}\n\n"
+                    return
+
+                time.sleep(interval)
+        except Exception as e:
+            logger.error(f"Error streaming progress for job {job_id}: {str(e)}", exc_info=True)
+            yield f"event: error\ndata: {json.dumps({'error': str(e)})}\n\n"
+
+    return Response(stream_with_context(generate()), mimetype='text/event-stream',
+                    headers={
+                        'Cache-Control': 'no-cache',
+                        'X-Accel-Buffering': 'no'
+                    })
 
 
 @bulk_bp.route('/pause/<job_id>', methods=['POST'])
@@ -570,7 +680,7 @@ def pause_job(current_user_id, job_id):
     """Pause a running bulk processing job"""
     try:
         # Check if job exists and belongs to user
-        db_job = BulkJob.find_by_job_id(mongo, job_id, current_user_id)
+        db_job = BulkJob.find_by_job_id(mongo, job_id, current_user_id, BulkJob.EXCLUDE_CHECKPOINT_ARRAYS)
         if not db_job:
             return jsonify({'error': 'Job not found or unauthorized'}), 404
 
@@ -615,7 +725,7 @@ def resume_job(current_user_id, job_id):
     """Resume a paused bulk processing job"""
     try:
         # Check if job exists and belongs to user
-        db_job = BulkJob.find_by_job_id(mongo, job_id, current_user_id)
+        db_job = BulkJob.find_by_job_id(mongo, job_id, current_user_id, BulkJob.EXCLUDE_CHECKPOINT_ARRAYS)
         if not db_job:
             return jsonify({'error': 'Job not found or unauthorized'}), 404
 
@@ -660,7 +770,7 @@ def stop_job(current_user_id, job_id):
     """Stop/cancel a bulk processing job"""
     try:
         # Check if job exists and belongs to user
-        db_job = BulkJob.find_by_job_id(mongo, job_id, current_user_id)
+        db_job = BulkJob.find_by_job_id(mongo, job_id, current_user_id, BulkJob.EXCLUDE_CHECKPOINT_ARRAYS)
         if not db_job:
             return jsonify({'error': 'Job not found or unauthorized'}), 404
 
@@ -705,7 +815,7 @@ def get_job_state(current_user_id, job_id):
     """Get the current state of a job (running, paused, stopped)"""
     try:
         # Check if job exists and belongs to user
-        db_job = BulkJob.find_by_job_id(mongo, job_id, current_user_id)
+        db_job = BulkJob.find_by_job_id(mongo, job_id, current_user_id, BulkJob.EXCLUDE_CHECKPOINT_ARRAYS)
         if not db_job:
             return jsonify({'error': 'Job not found or unauthorized'}), 404
 
@@ -750,8 +860,17 @@ def process_bulk_images(current_user_id):
         "handwriting": false,
         "export_formats": ["json", "csv", "text"],
         "parallel": true,
-        "max_workers": 4
+        "max_workers": 4,
+        "incremental": false,
+        "priority": "normal"
     }
+
+    With "incremental": true only files that are new or changed since the last
+    incremental job on the same folder and settings are processed; the results
+    of that job are reused for the others.
+
+    "priority" picks the NSQ lane of the job's file tasks (one of
+    Config.NSQ_PRIORITY_LANES, default Config.NSQ_DEFAULT_PRIORITY).
     """
     try:
         from app.config import Config
@@ -797,6 +916,14 @@ def process_bulk_images(current_user_id):
         parallel = data.get('parallel', True)
         max_workers = data.get('max_workers', None)
 
+        # Only process new or changed files, reusing the previous incremental job's results
+        incremental = bool(data.get('incremental', False))
+
+        # Priority lane for NSQ processing
+        priority = data.get('priority') or Config.NSQ_DEFAULT_PRIORITY
+        if priority not in Config.NSQ_PRIORITY_LANES:
+            return jsonify({'error': f"priority must be one of: {', '.join(Config.NSQ_PRIORITY_LANES)}"}), 400
+
         # Validate and constrain max_workers
         if max_workers is not None:
             max_workers = int(max_workers)
@@ -834,6 +961,7 @@ def process_bulk_images(current_user_id):
                 'export_formats': export_formats,
                 'parallel': parallel,
                 'max_workers': max_workers or Config.BULK_PARALLEL_JOBS,
+                'priority': priority,
                 'status': 'processing'
             })
         except Exception as db_error:
@@ -845,18 +973,16 @@ def process_bulk_images(current_user_id):
         if Config.USE_NSQ:
             # Use NSQ-based processing
             logger.info(f"Using NSQ-based processing for job {job_id}")
-            coordinator = NSQJobCoordinator()
-            coordinator.start_job(
-                mongo=mongo,
-                job_id=job_id,
-                folder_path=folder_path,
-                provider=provider,
-                languages=languages,
-                handwriting=handwriting,
-                recursive=recursive
+            # Scanning (and hashing for incremental jobs) a large folder can take
+            # minutes, so tasks are published from a background thread
+            app = current_app._get_current_object()
+            thread = threading.Thread(
+                target=_start_nsq_job_in_background,
+                args=(app, job_id, folder_path, provider, languages, handwriting, recursive, incremental, priority),
+                daemon=True
             )
-            file_count = len(coordinator.scan_folder(folder_path, recursive))
-            logger.info(f"Published NSQ job {job_id} with {file_count} files to process")
+            thread.start()
+            logger.info(f"Started NSQ scan thread for job {job_id} (priority: {priority})")
         else:
             # Use traditional threading-based processing
             logger.info(f"Using threading-based processing for job {job_id}")
@@ -866,7 +992,7 @@ def process_bulk_images(current_user_id):
             # Start processing in background thread
             thread = threading.Thread(
                 target=_process_in_background,
-                args=(app, job_id, folder_path, recursive, provider, languages, handwriting, export_formats, parallel, max_workers),
+                args=(app, job_id, folder_path, recursive, provider, languages, handwriting, export_formats, parallel, max_workers, incremental),
                 daemon=True
             )
             thread.start()
@@ -956,7 +1082,7 @@ def download_reports(current_user_id, job_id):
             zip_path = output_info['zip']
         else:
             # Check database for completed jobs
-            job = BulkJob.find_by_job_id(mongo, job_id, user_id=current_user_id)
+            job = BulkJob.find_by_job_id(mongo, job_id, user_id=current_user_id, projection=BulkJob.EXCLUDE_CHECKPOINT_ARRAYS)
 
             if not job:
                 logger.warning(f"Download attempt for non-existent or unauthorized job: {job_id}")
@@ -1043,13 +1169,17 @@ def get_job_status(current_user_id, job_id):
     try:
         logger.info(f"Status request for job {job_id} by user {current_user_id}")
         
-        # Get job from database
-        job = BulkJob.find_by_job_id(mongo, job_id, current_user_id)
+        # Get status and counters only
+        job = BulkJob.get_progress(mongo, job_id, current_user_id)
         
         if not job:
             logger.warning(f"Job {job_id} not found for user {current_user_id}")
             return jsonify({'error': 'Job not found'}), 404
         
+        etag = BulkJob.progress_etag(job)
+        if request.if_none_match.contains(etag):
+            return _not_modified(etag)
+
         logger.info(f"Found job {job_id}, status: {job.get('status')}")
         
         # Return job status with all relevant fields
@@ -1069,12 +1199,75 @@ def get_job_status(current_user_id, job_id):
         }
         
         logger.debug(f"Returning status response: {response}")
-        return jsonify(response), 200
+        return _conditional_json(response, etag), 200
         
     except Exception as e:
         logger.error(f"Error getting job status: {str(e)}", exc_info=True)
         return jsonify({'error': f'Server error: {str(e)}', 'success': False}), 500
 
+@bulk_bp.route('/lanes', methods=['GET'])
+@token_required
+def get_lane_stats(current_user_id):
+    """
+    Get queue depth and wait times of the NSQ priority lanes
+
+    Per lane: the NSQ topic and its weight, messages queued and in flight in
+    nsqd, tasks held back by fair dispatch, and the running jobs with the
+    average and longest time their tasks waited before a worker took them.
+    """
+    try:
+        from datetime import datetime
+
+        nsq_service = NSQService()
+        depths = nsq_service.get_lane_depths()
+        job_stats = BulkJob.lane_stats(mongo)
+
+        backlog = {}
+        now = datetime.utcnow()
+        for entry in BulkTaskBacklog.pending_jobs(mongo):
+            lane = backlog.setdefault(NSQService.lane_for(entry['priority']), {'jobs': 0, 'tasks': 0, 'oldest_age_seconds': 0})
+            lane['jobs'] += 1
+            lane['tasks'] += entry['tasks']
+            lane['oldest_age_seconds'] = max(lane['oldest_age_seconds'], int((now - entry['oldest_at']).total_seconds()))
+
+        # Jobs started before priorities existed run in the default lane
+        jobs_by_lane = {}
+        for priority, stats in job_stats.items():
+            lane = jobs_by_lane.setdefault(NSQService.lane_for(priority), {
+                'active_jobs': 0, 'queued_tasks': 0, 'wait_total_ms': 0, 'wait_count': 0, 'wait_max_ms': 0
+            })
+            for key in ('active_jobs', 'queued_tasks', 'wait_total_ms', 'wait_count'):
+                lane[key] += stats[key]
+            lane['wait_max_ms'] = max(lane['wait_max_ms'], stats['wait_max_ms'])
+
+        lanes = {}
+        for lane, weight in Config.NSQ_PRIORITY_LANES.items():
+            jobs = jobs_by_lane.get(lane, {})
+            wait_count = jobs.get('wait_count', 0)
+            lanes[lane] = {
+                'topic': depths[lane]['topic'],
+                'weight': weight,
+                'depth': depths[lane]['depth'],
+                'in_flight': depths[lane]['in_flight'],
+                'backlog': backlog.get(lane, {'jobs': 0, 'tasks': 0, 'oldest_age_seconds': 0}),
+                'active_jobs': jobs.get('active_jobs', 0),
+                'queued_tasks': jobs.get('queued_tasks', 0),
+                'avg_wait_ms': round(jobs['wait_total_ms'] / wait_count) if wait_count else None,
+                'max_wait_ms': jobs.get('wait_max_ms') or None
+            }
+
+        return jsonify({
+            'success': True,
+            'default_priority': Config.NSQ_DEFAULT_PRIORITY,
+            'fair_dispatch': Config.NSQ_FAIR_DISPATCH,
+            'lanes': lanes
+        }), 200
+
+    except Exception as e:
+        logger.error(f"Error fetching lane stats: {str(e)}", exc_info=True)
+        return jsonify({'error': str(e)}), 500
+
+
 @bulk_bp.route('/history', methods=['GET'])
 @token_required
 def get_job_history(current_user_id):
@@ -1118,7 +1311,7 @@ def get_job_history(current_user_id):
 def get_job_details(current_user_id, job_id):
     """Get detailed information about a specific bulk job"""
     try:
-        job = BulkJob.find_by_job_id(mongo, job_id, current_user_id)
+        job = BulkJob.find_by_job_id(mongo, job_id, current_user_id, BulkJob.EXCLUDE_CHECKPOINT_ARRAYS)
 
         if not job:
             return jsonify({'error': 'Job not found'}), 404
@@ -1133,6 +1326,55 @@ def get_job_details(current_user_id, job_id):
         return jsonify({'error': str(e)}), 500
 
 
+@bulk_bp.route('/job/<job_id>/results', methods=['GET'])
+@token_required
+def get_job_results(current_user_id, job_id):
+    """
+    Get the per-file results of a bulk job, one page at a time
+
+    results_preview in the job document only holds a capped sample; this
+    endpoint pages through every file with full OCR text.
+
+    Query params:
+    - type: 'result' for successful files (default) or 'error' for failed files
+    - page: Page number (default: 1)
+    - limit: Items per page (default: 100, max: 500)
+    """
+    try:
+        record_type = request.args.get('type', BulkJobResult.RECORD_RESULT)
+        if record_type not in (BulkJobResult.RECORD_RESULT, BulkJobResult.RECORD_ERROR):
+            return jsonify({'error': "type must be 'result' or 'error'"}), 400
+
+        page = max(int(request.args.get('page', 1)), 1)
+        limit = max(min(int(request.args.get('limit', 100)), 500), 1)
+        skip = (page - 1) * limit
+
+        job = BulkJob.find_by_job_id(mongo, job_id, current_user_id, {'job_id': 1, 'results': 1})
+        if not job:
+            return jsonify({'error': 'Job not found'}), 404
+
+        results, total_count = BulkJob.get_results_page(mongo, job, record_type, skip=skip, limit=limit)
+
+        return jsonify({
+            'success': True,
+            'job_id': job_id,
+            'type': record_type,
+            'results': results,
+            'pagination': {
+                'page': page,
+                'limit': limit,
+                'total': total_count,
+                'pages': (total_count + limit - 1) // limit
+            }
+        }), 200
+
+    except ValueError:
+        return jsonify({'error': 'page and limit must be integers'}), 400
+    except Exception as e:
+        logger.error(f"Error fetching results for job {job_id}: {str(e)}", exc_info=True)
+        return jsonify({'error': str(e)}), 500
+
+
 @bulk_bp.route('/job/<job_id>', methods=['DELETE'])
 @token_required
 def delete_job(current_user_id, job_id):
@@ -1203,7 +1445,7 @@ def get_sample_results(current_user_id, job_id):
         import tempfile
 
         # Check if job exists and belongs to user
-        db_job = BulkJob.find_by_job_id(mongo, job_id, current_user_id)
+        db_job = BulkJob.find_by_job_id(mongo, job_id, current_user_id, BulkJob.EXCLUDE_CHECKPOINT_ARRAYS)
         if not db_job:
             return jsonify({'error': 'Job not found or unauthorized'}), 404
 
@@ -1235,9 +1477,17 @@ def get_sample_results(current_user_id, job_id):
                 logger.error(f"Error generating sample results for job {job_id}: {str(e)}")
                 return jsonify({'error': str(e)}), 500
         else:
-            # Job is not currently running, check if it has checkpoint data
-            checkpoint = BulkJob.get_checkpoint(mongo, job_id)
-            if not checkpoint or not checkpoint.get('results'):
+            # Job is not currently running: NSQ jobs keep per-file records in
+            # bulk_job_results, threading jobs keep them in the checkpoint
+            limit = sample_size or 0
+            results = list(BulkJobResult.iter_by_job(mongo, job_id, BulkJobResult.RECORD_RESULT, limit=limit))
+            errors = list(BulkJobResult.iter_by_job(mongo, job_id, BulkJobResult.RECORD_ERROR, limit=limit))
+            if not results and not errors:
+                checkpoint = BulkJob.get_checkpoint(mongo, job_id) or {}
+                results = checkpoint.get('results', [])
+                errors = checkpoint.get('errors', [])
+
+            if not results:
                 return jsonify({
                     'error': 'Job is not currently running and has no checkpoint data. Sample results are only available for active jobs.'
                 }), 400
@@ -1253,9 +1503,9 @@ def get_sample_results(current_user_id, job_id):
                     job_id=job_id
                 )
 
-                # Restore results from checkpoint
-                temp_processor.results = checkpoint.get('results', [])
-                temp_processor.errors = checkpoint.get('errors', [])
+                # Restore saved results
+                temp_processor.results = results
+                temp_processor.errors = errors
 
                 # Generate sample
                 zip_path = temp_processor.generate_sample_results(output_folder, sample_size)
@@ -1289,7 +1539,7 @@ def restore_job(current_user_id, job_id):
         from app.config import Config
 
         # Check if job exists and belongs to user
-        db_job = BulkJob.find_by_job_id(mongo, job_id, current_user_id)
+        db_job = BulkJob.find_by_job_id(mongo, job_id, current_user_id, BulkJob.EXCLUDE_CHECKPOINT_ARRAYS)
         if not db_job:
             return jsonify({'error': 'Job not found or unauthorized'}), 404
 
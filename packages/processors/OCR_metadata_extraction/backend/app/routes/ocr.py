@@ -21,7 +21,7 @@ def get_providers(current_user_id):
     """Get available OCR providers"""
     try:
         providers = ocr_service.get_available_providers()
-        return jsonify({'providers': providers}), 200
+        return jsonify({'providers': providers, 'timings': ocr_service.get_provider_timings()}), 200
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -46,6 +46,7 @@ def process_image(current_user_id, image_id):
         handwriting = data.get('handwriting', False)
         provider = data.get('provider', None)  # OCR provider to use
         custom_prompt = data.get('custom_prompt', None)  # Custom prompt for AI providers
+        use_cache = data.get('use_cache', True)  # Set false to bypass the OCR result cache
 
         # Update status to processing
         Image.update_status(mongo, image_id, 'processing')
@@ -57,7 +58,8 @@ def process_image(current_user_id, image_id):
                 languages=languages,
                 handwriting=handwriting,
                 provider=provider,
-                custom_prompt=custom_prompt
+                custom_prompt=custom_prompt,
+                use_cache=use_cache
             )
 
             # Update image with OCR text
@@ -235,6 +237,7 @@ def batch_process_images(current_user_id):
         handwriting = data.get('handwriting', False)
         provider = data.get('provider', None)  # OCR provider to use
         custom_prompt = data.get('custom_prompt', None)  # Custom prompt for AI providers
+        use_cache = data.get('use_cache', True)  # Set false to bypass the OCR result cache
 
         if not image_ids:
             return jsonify({'error': 'No image IDs provided'}), 400
@@ -271,7 +274,8 @@ def batch_process_images(current_user_id):
                     languages=languages,
                     handwriting=handwriting,
                     provider=provider,
-                    custom_prompt=custom_prompt
+                    custom_prompt=custom_prompt,
+                    use_cache=use_cache
                 )
 
                 # Update image with OCR text
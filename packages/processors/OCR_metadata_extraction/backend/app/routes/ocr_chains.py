@@ -8,7 +8,9 @@ from flask import Blueprint, jsonify, request, send_file
 from app.utils.decorators import token_required
 from app.models.ocr_chain_template import OCRChainTemplate
 from app.models.bulk_job import BulkJob
+from app.models.bulk_job_result import BulkJobResult
 from app.services.ocr_chain_service import OCRChainService
+from app.services.folder_scanner import FolderScanner
 from app.config import Config
 from bson import ObjectId
 
@@ -73,21 +75,19 @@ def list_folders(current_user_id):
         # List directories
         folders = []
         try:
-            items = os.listdir(path)
-            for item in sorted(items):
-                full_path = os.path.join(path, item)
-                if os.path.isdir(full_path) and not item.startswith('.'):
+            for entry in FolderScanner.list_directory(path):
+                if entry.is_dir and not entry.name.startswith('.'):
                     try:
-                        if os.access(full_path, os.R_OK):
+                        if os.access(entry.path, os.R_OK):
                             folders.append({
-                                'name': item,
-                                'path': full_path,
+                                'name': entry.name,
+                                'path': entry.path,
                                 'is_readable': True
                             })
                     except (OSError, PermissionError):
                         folders.append({
-                            'name': item,
-                            'path': full_path,
+                            'name': entry.name,
+                            'path': entry.path,
                             'is_readable': False
                         })
         except (OSError, PermissionError) as e:
@@ -377,7 +377,7 @@ def start_chain_job(current_user_id):
         if Config.USE_NSQ:
             try:
                 coordinator = NSQJobCoordinator()
-                coordinator.start_job(
+                job_info = coordinator.start_job(
                     mongo=mongo,
                     job_id=job_id,
                     folder_path=folder_path,
@@ -388,7 +388,7 @@ def start_chain_job(current_user_id):
                     processing_mode='chain',
                     chain_config=job_data.get('chain_config')
                 )
-                file_count = len(coordinator.scan_folder(folder_path, data.get('recursive', True)))
+                file_count = job_info['total_files']
                 logger.info(f"Published NSQ chain job {job_id} with {file_count} files to process")
             except Exception as worker_error:
                 logger.error(f"Error starting NSQ coordinator: {str(worker_error)}")
@@ -425,7 +425,7 @@ def get_chain_results(current_user_id, job_id):
         from app.models import mongo
 
         # Get job
-        job = BulkJob.find_by_job_id(mongo, job_id, current_user_id)
+        job = BulkJob.find_by_job_id(mongo, job_id, current_user_id, BulkJob.EXCLUDE_CHECKPOINT_ARRAYS)
         if not job:
             return jsonify({'error': 'Job not found'}), 404
 
@@ -438,8 +438,8 @@ def get_chain_results(current_user_id, job_id):
             timeline_data = {
                 'total_time_ms': job.get('progress', {}).get('total_processing_time_ms', 0),
                 'images_processed': job.get('consumed_count', 0),
-                'success_count': len(job.get('checkpoint', {}).get('results', [])),
-                'error_count': len(job.get('checkpoint', {}).get('errors', []))
+                'success_count': BulkJobResult.count_by_job(mongo, job_id, BulkJobResult.RECORD_RESULT),
+                'error_count': BulkJobResult.count_by_job(mongo, job_id, BulkJobResult.RECORD_ERROR)
             }
             job_dict['timeline'] = timeline_data
 
@@ -462,7 +462,7 @@ def export_chain_results(current_user_id, job_id):
         from app.services.storage import StorageService
 
         # Get job
-        job = BulkJob.find_by_job_id(mongo, job_id, current_user_id)
+        job = BulkJob.find_by_job_id(mongo, job_id, current_user_id, BulkJob.EXCLUDE_CHECKPOINT_ARRAYS)
         if not job:
             return jsonify({'error': 'Job not found'}), 404
 
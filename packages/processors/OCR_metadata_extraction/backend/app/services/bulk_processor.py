@@ -6,7 +6,7 @@ with progress tracking and report generation.
 import os
 import json
 import csv
-from pathlib import Path
+from .folder_scanner import FolderScanner
 from datetime import datetime
 from typing import List, Dict, Callable, Optional, Tuple
 import logging
@@ -16,6 +16,8 @@ import time
 
 from .ocr_service import OCRService
 from .pdf_service import PDFService
+from .incremental_planner import IncrementalPlanner
+from app.models.bulk_job_result import BulkJobResult
 
 logger = logging.getLogger(__name__)
 
@@ -119,22 +121,7 @@ class BulkProcessor:
         Returns:
             List of image file paths found
         """
-        if not os.path.isdir(folder_path):
-            raise ValueError(f"Invalid folder path: {folder_path}")
-        
-        image_files = []
-        folder_path = Path(folder_path)
-        
-        # Use glob pattern for recursion
-        pattern = "**/*" if recursive else "*"
-        
-        for file_path in folder_path.glob(pattern):
-            if file_path.is_file():
-                if file_path.suffix.lower() in self.SUPPORTED_EXTENSIONS:
-                    image_files.append(str(file_path))
-        
-        # Sort for consistent ordering
-        return sorted(image_files)
+        return list(FolderScanner.iter_files(folder_path, recursive, self.SUPPORTED_EXTENSIONS))
     
     def _process_single_file(
         self,
@@ -195,7 +182,7 @@ class BulkProcessor:
                 with self._lock:
                     self._consecutive_errors = 0
                     if image_path in self._retry_count:
-                        del self._retry_count[image_path/Bhushanji]
+                        del self._retry_count[image_path]
 
                 # Prepare result with metadata
                 result = {
@@ -220,6 +207,10 @@ class BulkProcessor:
                 if ocr_result.get('pages_processed'):
                     result['pages_processed'] = ocr_result.get('pages_processed')
 
+                # Hash of the OCR'd bytes, committed to incremental folder manifests
+                if ocr_result.get('content_hash'):
+                    result['content_hash'] = ocr_result['content_hash']
+
                 return result, None
 
             except Exception as e:
@@ -275,7 +266,9 @@ class BulkProcessor:
         languages: List[str] = None,
         handwriting: bool = False,
         recursive: bool = True,
-        parallel: bool = True
+        parallel: bool = True,
+        incremental: bool = False,
+        mongo=None
     ) -> Dict:
         """
         Process all images in a folder
@@ -287,6 +280,10 @@ class BulkProcessor:
             handwriting: Whether to detect handwriting
             recursive: Whether to process subfolders
             parallel: Whether to use parallel processing (default: True)
+            incremental: Only process files that are new or changed since the last
+                incremental job on this folder and reuse that job's results for the
+                others (requires mongo and job_id)
+            mongo: MongoDB connection (incremental mode)
 
         Returns:
             Dictionary with results, errors, and statistics
@@ -295,9 +292,21 @@ class BulkProcessor:
             languages = ['en']
 
         # Scan folder for images
-        image_files = self.scan_folder(folder_path, recursive=recursive)
+        incremental_info = None
+        if incremental:
+            if mongo is None or not self.job_id:
+                raise ValueError("Incremental processing requires a MongoDB connection and a job_id")
+            incremental_info = IncrementalPlanner.start(
+                mongo, self.job_id, folder_path, recursive, provider, languages, handwriting
+            )
+            image_files = list(IncrementalPlanner.iter_changed_files(
+                mongo, self.job_id, incremental_info, folder_path, recursive, self.SUPPORTED_EXTENSIONS
+            ))
+            logger.info(f"Incremental job {self.job_id}: {len(image_files)} new or changed files")
+        else:
+            image_files = self.scan_folder(folder_path, recursive=recursive)
 
-        if not image_files:
+        if not image_files and not (incremental_info and incremental_info['base_job_id']):
             raise ValueError(f"No supported image files found in {folder_path}")
 
         logger.info(f"Found {len(image_files)} image files to process")
@@ -379,28 +388,67 @@ class BulkProcessor:
                 if error:
                     self.errors.append(error)
 
+        total_files = len(image_files)
+        if incremental_info:
+            incremental_stats = self._merge_incremental(mongo, incremental_info, image_files)
+            total_files = len(self.results) + len(self.errors)
+
         # Generate summary statistics
         stats = self._generate_statistics()
 
+        summary = {
+            'total_files': total_files,
+            'successful': len(self.results),
+            'failed': len(self.errors),
+            'folder_path': folder_path,
+            'processed_at': datetime.now().isoformat(),
+            'parallel_processing': parallel,
+            'max_workers': self.max_workers if parallel else 1,
+            'state': self.get_state(),
+            'paused': self.is_paused(),
+            'stopped': self.is_stopped(),
+            'consecutive_errors': self._consecutive_errors,
+            'statistics': stats
+        }
+        if incremental_info:
+            summary['incremental'] = {
+                'base_job_id': incremental_info['base_job_id'],
+                'processed': len(image_files),
+                'reused': incremental_stats['reused']
+            }
+
         return {
-            'summary': {
-                'total_files': len(image_files),
-                'successful': len(self.results),
-                'failed': len(self.errors),
-                'folder_path': folder_path,
-                'processed_at': datetime.now().isoformat(),
-                'parallel_processing': parallel,
-                'max_workers': self.max_workers if parallel else 1,
-                'state': self.get_state(),
-                'paused': self.is_paused(),
-                'stopped': self.is_stopped(),
-                'consecutive_errors': self._consecutive_errors,
-                'statistics': stats
-            },
+            'summary': summary,
             'results': self.results,
             'errors': self.errors
         }
 
+    def _merge_incremental(self, mongo, incremental: Dict, image_files: List[str]) -> Dict:
+        """
+        Record this run's results, add the base job's results of unchanged files and commit the manifest
+
+        Args:
+            mongo: MongoDB connection
+            incremental: Dictionary returned by IncrementalPlanner.start()
+            image_files: Files processed by this run, in scan order
+
+        Returns:
+            Merge statistics from IncrementalPlanner.merge_previous_results()
+        """
+        BulkJobResult.ensure_indexes(mongo)
+        file_index = {file_path: idx for idx, file_path in enumerate(image_files)}
+        for result in self.results:
+            BulkJobResult.upsert(mongo, self.job_id, dict(result, file_index=file_index.get(result['file_path'], 0)))
+        for error in self.errors:
+            BulkJobResult.upsert(mongo, self.job_id, dict(error, file_index=file_index.get(error['file_path'], 0)),
+                                 BulkJobResult.RECORD_ERROR)
+
+        stats = IncrementalPlanner.merge_previous_results(mongo, self.job_id, incremental, len(image_files))
+
+        # Records of this run in scan order, followed by the reused ones
+        self.results = list(BulkJobResult.iter_by_job(mongo, self.job_id, BulkJobResult.RECORD_RESULT))
+        return stats
+
     def get_checkpoint_data(self) -> Dict:
         """Get checkpoint data for resuming"""
         with self._lock:
@@ -6,6 +6,8 @@ Automatically detects document boundaries and removes background.
 import cv2
 import numpy as np
 import logging
+import threading
+from collections import OrderedDict
 from typing import Optional, Tuple
 from PIL import Image
 
@@ -15,6 +17,10 @@ logger = logging.getLogger(__name__)
 class DocumentDetector:
     """Service for detecting and cropping documents from images"""
 
+    # Detected quads memoised by caller-supplied key (e.g. file hash); None results are cached too
+    _quad_cache = OrderedDict()
+    _quad_cache_lock = threading.Lock()
+
     @staticmethod
     def order_points(pts):
         """
@@ -82,13 +88,155 @@ class DocumentDetector:
         return warped
 
     @staticmethod
-    def detect_document(image: Image.Image, min_area_ratio: float = 0.1) -> Optional[Image.Image]:
+    def _downscale(gray, max_dimension):
+        """
+        Downscale a grayscale image so its longest side is at most max_dimension.
+
+        Returns:
+            Tuple of (proxy image, scale factor applied)
+        """
+        height, width = gray.shape[:2]
+        if not max_dimension or max(height, width) <= max_dimension:
+            return gray, 1.0
+
+        scale = max_dimension / float(max(height, width))
+        proxy = cv2.resize(
+            gray,
+            (max(1, int(round(width * scale))), max(1, int(round(height * scale)))),
+            interpolation=cv2.INTER_AREA
+        )
+        return proxy, scale
+
+    @staticmethod
+    def find_document_quad(gray, min_area_ratio: float = 0.1, max_dimension: Optional[int] = None,
+                           cache_key: Optional[str] = None, dilate: bool = True,
+                           max_contours: Optional[int] = 10, rect_fallback: bool = True) -> Optional[np.ndarray]:
+        """
+        Find the document's four corners in a grayscale image.
+
+        Edges and contours are computed on a proxy whose longest side is
+        max_dimension, and the corners are mapped back to full resolution.
+        The defaults are DocumentDetector's own search; LangChain's
+        preprocessing passes dilate=False, max_contours=None and
+        rect_fallback=False to keep its original contour search.
+
+        Args:
+            gray: Grayscale image (numpy array)
+            min_area_ratio: Minimum contour area as ratio of image area
+            max_dimension: Longest side of the detection proxy (default: Config.OCR_DETECTION_MAX_DIMENSION)
+            cache_key: Optional key (e.g. file hash) to memoise the result under
+            dilate: Dilate the edges to close gaps before finding contours
+            max_contours: Number of largest contours searched for a 4-sided polygon (None = all)
+            rect_fallback: Fall back to the bounding rectangle of a large contour
+
+        Returns:
+            4x2 float32 array of corners in full-resolution coordinates, or None
+        """
+        from app.config import Config
+
+        if max_dimension is None:
+            max_dimension = Config.OCR_DETECTION_MAX_DIMENSION
+
+        if cache_key is not None:
+            memo_key = (cache_key, gray.shape[:2], min_area_ratio, max_dimension, dilate, max_contours, rect_fallback)
+            with DocumentDetector._quad_cache_lock:
+                if memo_key in DocumentDetector._quad_cache:
+                    DocumentDetector._quad_cache.move_to_end(memo_key)
+                    quad = DocumentDetector._quad_cache[memo_key]
+                    return None if quad is None else quad.copy()
+
+        proxy, scale = DocumentDetector._downscale(gray, max_dimension)
+
+        # Get proxy dimensions
+        height, width = proxy.shape[:2]
+        image_area = height * width
+
+        # Apply Gaussian blur to reduce noise
+        blurred = cv2.GaussianBlur(proxy, (5, 5), 0)
+
+        # Apply edge detection
+        edged = cv2.Canny(blurred, 50, 150)
+
+        # Dilate edges to close gaps
+        if dilate:
+            kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (5, 5))
+            edged = cv2.dilate(edged, kernel, iterations=1)
+
+        # Find contours
+        contours, _ = cv2.findContours(edged, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+
+        # Sort contours by area (largest first)
+        contours = sorted(contours, key=cv2.contourArea, reverse=True)
+
+        document_contour = None
+
+        # Find the largest contour that looks like a document
+        for contour in contours[:max_contours]:  # Check the largest contours
+            area = cv2.contourArea(contour)
+
+            # Skip if contour is too small
+            if area < image_area * min_area_ratio:
+                continue
+
+            # Approximate contour to polygon
+            peri = cv2.arcLength(contour, True)
+            approx = cv2.approxPolyDP(contour, 0.02 * peri, True)
+
+            # If contour has 4 points, we found a document
+            if len(approx) == 4:
+                document_contour = approx
+                logger.info(f"Found document contour with area: {area} ({area/image_area*100:.1f}% of image)")
+                break
+
+        # If no 4-sided contour found, try to find largest rectangular contour
+        if document_contour is None and rect_fallback:
+            for contour in contours[:5]:
+                area = cv2.contourArea(contour)
+
+                if area < image_area * min_area_ratio:
+                    continue
+
+                # Get bounding rectangle
+                x, y, w, h = cv2.boundingRect(contour)
+                aspect_ratio = float(w) / h
+
+                # Check if aspect ratio is reasonable for a document (0.5 to 2.0)
+                if 0.5 <= aspect_ratio <= 2.0:
+                    document_contour = np.array([
+                        [[x, y]],
+                        [[x + w, y]],
+                        [[x + w, y + h]],
+                        [[x, y + h]]
+                    ])
+                    logger.info(f"Using bounding rectangle for document (area: {area}, aspect: {aspect_ratio:.2f})")
+                    break
+
+        quad = None
+        if document_contour is not None:
+            # Map proxy corners back to full resolution
+            quad = document_contour.reshape(4, 2).astype('float32') / scale
+
+        if cache_key is not None:
+            with DocumentDetector._quad_cache_lock:
+                DocumentDetector._quad_cache[memo_key] = quad
+                while len(DocumentDetector._quad_cache) > max(1, Config.OCR_DETECTION_CACHE_SIZE):
+                    DocumentDetector._quad_cache.popitem(last=False)
+
+        return None if quad is None else quad.copy()
+
+    @staticmethod
+    def detect_document(image: Image.Image, min_area_ratio: float = 0.1,
+                        cache_key: Optional[str] = None) -> Optional[Image.Image]:
         """
         Detect document in image and crop to document boundaries.
 
+        Detection runs on a downscaled proxy; the perspective warp uses the
+        full-resolution image.
+
         Args:
             image: PIL Image object
             min_area_ratio: Minimum contour area as ratio of image area (default 0.1)
+            cache_key: Optional key (e.g. file hash) to memoise the detected corners under
 
         Returns:
             Cropped PIL Image or None if detection fails
@@ -108,73 +256,12 @@ class DocumentDetector:
                 orig = img_array
                 gray = cv2.cvtColor(orig, cv2.COLOR_RGB2GRAY)
 
-            # Get image dimensions
-            height, width = gray.shape
-            image_area = height * width
-
-            # Apply Gaussian blur to reduce noise
-            blurred = cv2.GaussianBlur(gray, (5, 5), 0)
-
-            # Apply edge detection
-            edged = cv2.Canny(blurred, 50, 150)
-
-            # Dilate edges to close gaps
-            kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (5, 5))
-            dilated = cv2.dilate(edged, kernel, iterations=1)
-
-            # Find contours
-            contours, _ = cv2.findContours(dilated, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
-
-            # Sort contours by area (largest first)
-            contours = sorted(contours, key=cv2.contourArea, reverse=True)
-
-            document_contour = None
-
-            # Find the largest contour that looks like a document
-            for contour in contours[:10]:  # Check top 10 contours
-                area = cv2.contourArea(contour)
-
-                # Skip if contour is too small
-                if area < image_area * min_area_ratio:
-                    continue
-
-                # Approximate contour to polygon
-                peri = cv2.arcLength(contour, True)
-                approx = cv2.approxPolyDP(contour, 0.02 * peri, True)
-
-                # If contour has 4 points, we found a document
-                if len(approx) == 4:
-                    document_contour = approx
-                    logger.info(f"Found document contour with area: {area} ({area/image_area*100:.1f}% of image)")
-                    break
-
-            # If no 4-sided contour found, try to find largest rectangular contour
-            if document_contour is None:
-                for contour in contours[:5]:
-                    area = cv2.contourArea(contour)
-
-                    if area < image_area * min_area_ratio:
-                        continue
-
-                    # Get bounding rectangle
-                    x, y, w, h = cv2.boundingRect(contour)
-                    aspect_ratio = float(w) / h
-
-                    # Check if aspect ratio is reasonable for a document (0.5 to 2.0)
-                    if 0.5 <= aspect_ratio <= 2.0:
-                        document_contour = np.array([
-                            [[x, y]],
-                            [[x + w, y]],
-                            [[x + w, y + h]],
-                            [[x, y + h]]
-                        ])
-                        logger.info(f"Using bounding rectangle for document (area: {area}, aspect: {aspect_ratio:.2f})")
-                        break
+            quad = DocumentDetector.find_document_quad(gray, min_area_ratio, cache_key=cache_key)
 
             # If document found, apply perspective transform
-            if document_contour is not None:
+            if quad is not None:
                 # Apply four point transform to get top-down view
-                warped = DocumentDetector.four_point_transform(orig, document_contour.reshape(4, 2))
+                warped = DocumentDetector.four_point_transform(orig, quad)
 
                 # Convert back to PIL
                 cropped_image = Image.fromarray(warped)
@@ -190,18 +277,20 @@ class DocumentDetector:
             return None
 
     @staticmethod
-    def auto_crop_document(image: Image.Image, fallback_to_original: bool = True) -> Image.Image:
+    def auto_crop_document(image: Image.Image, fallback_to_original: bool = True,
+                           cache_key: Optional[str] = None) -> Image.Image:
         """
         Automatically detect and crop document, with fallback to original.
 
         Args:
             image: PIL Image object
             fallback_to_original: Return original image if detection fails
+            cache_key: Optional key (e.g. file hash) to memoise the detected corners under
 
         Returns:
             Cropped PIL Image (or original if detection fails and fallback enabled)
         """
-        cropped = DocumentDetector.detect_document(image)
+        cropped = DocumentDetector.detect_document(image, cache_key=cache_key)
 
         if cropped is not None:
             return cropped
@@ -0,0 +1,212 @@
+"""
+Folder scanning service built on os.scandir.
+Streams supported files of a folder tree and caches directory listings by mtime.
+"""
+
+import os
+import logging
+import threading
+import time
+from collections import OrderedDict, namedtuple
+from typing import Iterator, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+# One directory entry; is_dir/is_file come from the DirEntry type info, not a stat per entry
+ListingEntry = namedtuple('ListingEntry', ['name', 'path', 'is_dir', 'is_file'])
+
+# Scanned file with the stat fields used to fingerprint it
+FileStat = namedtuple('FileStat', ['path', 'size', 'mtime_ns'])
+
+
+class FolderScanner:
+    """Service for listing and scanning folders of documents"""
+
+    SUPPORTED_EXTENSIONS = {
+        '.jpg', '.jpeg', '.png', '.bmp', '.gif', '.tiff', '.webp',
+        '.pdf'  # Also support PDFs
+    }
+
+    # Listings modified this recently are not cached: a change within the same
+    # mtime tick would otherwise go unnoticed
+    MTIME_GRACE_SECONDS = 2
+
+    # Absolute directory path -> ((st_mtime_ns, st_ino), (name, is_dir, is_file) tuples), least recently used first
+    _listings = OrderedDict()
+    _listings_lock = threading.Lock()
+
+    @staticmethod
+    def _listing(path: str) -> Tuple[os.stat_result, Tuple[ListingEntry, ...]]:
+        """
+        List a directory, reusing the cached listing while its mtime is unchanged.
+
+        Returns:
+            Tuple of (directory stat, entries sorted by name)
+
+        Raises:
+            OSError: If the directory cannot be read
+        """
+        from app.config import Config
+
+        key = os.path.normpath(os.path.abspath(path))
+        dir_stat = os.stat(path)
+        version = (dir_stat.st_mtime_ns, dir_stat.st_ino)
+
+        with FolderScanner._listings_lock:
+            cached = FolderScanner._listings.get(key)
+            if cached is not None and cached[0] == version:
+                FolderScanner._listings.move_to_end(key)
+                names = cached[1]
+            else:
+                names = None
+
+        if names is None:
+            names = []
+            with os.scandir(path) as iterator:
+                for entry in iterator:
+                    try:
+                        is_dir = entry.is_dir()
+                        is_file = not is_dir and entry.is_file()
+                    except OSError:
+                        # Broken symlink or entry removed while listing
+                        continue
+                    names.append((entry.name, is_dir, is_file))
+            names.sort()
+            names = tuple(names)
+
+            cache_size = Config.FOLDER_LISTING_CACHE_SIZE
+            if cache_size > 0 and time.time() - dir_stat.st_mtime > FolderScanner.MTIME_GRACE_SECONDS:
+                with FolderScanner._listings_lock:
+                    FolderScanner._listings[key] = (version, names)
+                    FolderScanner._listings.move_to_end(key)
+                    while len(FolderScanner._listings) > cache_size:
+                        FolderScanner._listings.popitem(last=False)
+
+        # Paths are built from the caller's spelling of the directory, as os.scandir would
+        entries = tuple(
+            ListingEntry(name, os.path.join(path, name), is_dir, is_file)
+            for name, is_dir, is_file in names
+        )
+        return dir_stat, entries
+
+    @staticmethod
+    def list_directory(path: str) -> Tuple[ListingEntry, ...]:
+        """
+        List a directory's entries (cached while the directory is unchanged).
+
+        Args:
+            path: Directory path
+
+        Returns:
+            Tuple of ListingEntry sorted by name
+
+        Raises:
+            OSError: If the directory cannot be read
+        """
+        return FolderScanner._listing(path)[1]
+
+    @staticmethod
+    def count_files(path: str) -> int:
+        """
+        Count the files (not subfolders) directly inside a directory.
+
+        Args:
+            path: Directory path
+
+        Returns:
+            Number of files
+
+        Raises:
+            OSError: If the directory cannot be read
+        """
+        return sum(1 for entry in FolderScanner.list_directory(path) if entry.is_file)
+
+    @staticmethod
+    def iter_files(folder_path: str, recursive: bool = True,
+                   extensions: Optional[Set[str]] = None) -> Iterator[str]:
+        """
+        Stream the supported files of a folder.
+
+        Files are yielded depth-first with names sorted in each directory, so
+        the order is stable between scans and callers can start work before
+        the scan finishes. Unreadable subfolders are skipped; directory
+        symlink loops are followed only once.
+
+        Args:
+            folder_path: Root folder to scan
+            recursive: Whether to scan subfolders (default: True)
+            extensions: Lowercase extensions to include (default: SUPPORTED_EXTENSIONS)
+
+        Returns:
+            Iterator of file paths
+
+        Raises:
+            ValueError: If folder_path is not a directory
+        """
+        if not os.path.isdir(folder_path):
+            raise ValueError(f"Invalid folder path: {folder_path}")
+
+        return FolderScanner._walk(
+            folder_path, recursive, extensions or FolderScanner.SUPPORTED_EXTENSIONS, set()
+        )
+
+    @staticmethod
+    def iter_file_stats(folder_path: str, recursive: bool = True,
+                        extensions: Optional[Set[str]] = None) -> Iterator[FileStat]:
+        """
+        Stream the supported files of a folder with their size and mtime.
+
+        Same order and rules as iter_files(); files removed between listing
+        and stat are skipped.
+
+        Args:
+            folder_path: Root folder to scan
+            recursive: Whether to scan subfolders (default: True)
+            extensions: Lowercase extensions to include (default: SUPPORTED_EXTENSIONS)
+
+        Returns:
+            Iterator of FileStat(path, size, mtime_ns)
+
+        Raises:
+            ValueError: If folder_path is not a directory
+        """
+        files = FolderScanner.iter_files(folder_path, recursive, extensions)
+        return FolderScanner._stat_files(files)
+
+    @staticmethod
+    def _stat_files(files: Iterator[str]) -> Iterator[FileStat]:
+        """Yield a FileStat per file that can still be stat'ed"""
+        for file_path in files:
+            try:
+                file_stat = os.stat(file_path)
+            except OSError as e:
+                logger.warning(f"Skipping {file_path}: {e}")
+                continue
+            yield FileStat(file_path, file_stat.st_size, file_stat.st_mtime_ns)
+
+    @staticmethod
+    def _walk(path: str, recursive: bool, extensions: Set[str], visited: Set[Tuple[int, int]]) -> Iterator[str]:
+        """Yield matching files below path, recursing into subfolders in name order"""
+        try:
+            dir_stat, entries = FolderScanner._listing(path)
+        except OSError as e:
+            logger.warning(f"Skipping unreadable folder {path}: {e}")
+            return
+
+        directory_id = (dir_stat.st_dev, dir_stat.st_ino)
+        if directory_id in visited:
+            return
+        visited.add(directory_id)
+
+        for entry in entries:
+            if entry.is_file:
+                if os.path.splitext(entry.name)[1].lower() in extensions:
+                    yield entry.path
+            elif entry.is_dir and recursive:
+                yield from FolderScanner._walk(entry.path, recursive, extensions, visited)
+
+    @staticmethod
+    def clear_cache():
+        """Forget all cached directory listings"""
+        with FolderScanner._listings_lock:
+            FolderScanner._listings.clear()
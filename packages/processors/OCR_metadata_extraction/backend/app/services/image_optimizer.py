@@ -3,9 +3,11 @@ Image optimization service for OCR processing.
 Handles image resizing, quality optimization, and format conversion.
 """
 
+import base64
 import logging
-from typing import Tuple, Optional
-from PIL import Image
+import time
+from typing import Tuple, Optional, List
+from PIL import Image, features
 import io
 
 logger = logging.getLogger(__name__)
@@ -14,6 +16,9 @@ logger = logging.getLogger(__name__)
 class ImageOptimizer:
     """Service for optimizing images for OCR processing"""
 
+    # Formats vision model APIs accept as-is
+    MIME_TYPES = {'JPEG': 'image/jpeg', 'PNG': 'image/png', 'WEBP': 'image/webp'}
+
     @staticmethod
     def get_image_file_size(image: Image.Image, quality: int = 95) -> int:
         """
@@ -171,19 +176,169 @@ class ImageOptimizer:
 
         # Step 3: Encode to bytes
         buffer = io.BytesIO()
+        ImageOptimizer._save(optimized_image, buffer, format, quality)
+        return buffer.getvalue()
+
+    @staticmethod
+    def _save(image: Image.Image, buffer: io.BytesIO, format: str, quality: int) -> None:
+        """
+        Encode an image into a buffer using the configured encoding policy.
+
+        PNG uses Config.OCR_PNG_COMPRESS_LEVEL instead of optimize=True, whose
+        exhaustive zlib search costs seconds per multi-megapixel scan.
+        """
+        from app.config import Config
 
-        if format.upper() == 'JPEG':
+        format = format.upper()
+        if format == 'JPEG':
             # Ensure RGB for JPEG
-            if optimized_image.mode not in ('RGB', 'L'):
-                optimized_image = optimized_image.convert('RGB')
-            optimized_image.save(buffer, format='JPEG', quality=quality, optimize=True)
-        elif format.upper() == 'PNG':
-            optimized_image.save(buffer, format='PNG', optimize=True)
+            if image.mode not in ('RGB', 'L'):
+                image = image.convert('RGB')
+            image.save(buffer, format='JPEG', quality=quality, optimize=True)
+        elif format == 'PNG':
+            image.save(buffer, format='PNG', compress_level=Config.OCR_PNG_COMPRESS_LEVEL)
+        elif format == 'WEBP':
+            # method=0 is the fastest lossless WebP encoder setting
+            image.save(buffer, format='WEBP', lossless=True, method=0)
+        else:
+            image.save(buffer, format=format, quality=quality)
+
+    @staticmethod
+    def lossless_format(format: Optional[str] = None) -> str:
+        """
+        Resolve the lossless encoding for vision model requests.
+
+        Args:
+            format: PNG or WEBP (default: Config.OCR_LOSSLESS_FORMAT)
+
+        Returns:
+            'WEBP' if requested and supported by Pillow, otherwise 'PNG'
+        """
+        from app.config import Config
+
+        format = (format or Config.OCR_LOSSLESS_FORMAT).upper()
+        if format == 'WEBP' and not features.check('webp'):
+            logger.warning("Pillow was built without WebP support, encoding as PNG")
+            return 'PNG'
+        return format if format == 'WEBP' else 'PNG'
+
+    @staticmethod
+    def encode_base64(data: bytes) -> str:
+        """
+        Base64-encode bytes straight from a buffer (no intermediate bytes copy).
+
+        The JSON request body needs the whole data URL, so the result is held
+        in memory once; only the copy of the encode buffer is avoided.
+
+        Args:
+            data: Bytes-like object (bytes, bytearray, memoryview)
+
+        Returns:
+            Base64 string
+        """
+        return base64.b64encode(data).decode('ascii')
+
+    @staticmethod
+    def encode_for_model(
+        image: Optional[Image.Image] = None,
+        source_path: Optional[str] = None,
+        max_dimension: Optional[int] = None,
+        format: Optional[str] = None
+    ) -> Tuple[str, str, dict]:
+        """
+        Encode an image as base64 for a vision model request.
+
+        When only source_path is given and the file is already JPEG/PNG/WebP
+        within max_dimension, its bytes are sent unchanged. Otherwise the image
+        is downscaled to max_dimension and encoded with the lossless policy.
+
+        Args:
+            image: PIL Image object (already transformed by the caller)
+            source_path: Path to the original file, used when image is None
+            max_dimension: Longest side sent to the model (None/0: no cap)
+            format: Lossless format override (PNG or WEBP)
+
+        Returns:
+            Tuple of (base64 data, mime type, encoding stats)
+        """
+        start = time.perf_counter()
+        stats = {'reused_source': False, 'resized': False}
+
+        if image is not None:
+            image_bytes, encoded_format, width, height = ImageOptimizer._encode_lossless(
+                image, max_dimension, format, stats
+            )
+        elif source_path is None:
+            raise ValueError("encode_for_model needs an image or a source_path")
         else:
-            optimized_image.save(buffer, format=format, quality=quality)
+            with Image.open(source_path) as source:
+                width, height = source.size
+                if source.format in ImageOptimizer.MIME_TYPES and (
+                    not max_dimension or max(width, height) <= max_dimension
+                ):
+                    with open(source_path, 'rb') as f:
+                        image_bytes = f.read()
+                    encoded_format = source.format
+                    stats['reused_source'] = True
+                else:
+                    image_bytes, encoded_format, width, height = ImageOptimizer._encode_lossless(
+                        source, max_dimension, format, stats
+                    )
+
+        image_data = ImageOptimizer.encode_base64(image_bytes)
+        stats.update({
+            'format': encoded_format,
+            'width': width,
+            'height': height,
+            'bytes': len(image_bytes),
+            'base64_bytes': len(image_data),
+            'encode_ms': round((time.perf_counter() - start) * 1000, 1)
+        })
+        logger.debug(
+            f"Encoded {width}x{height} image as {encoded_format}: {stats['bytes']} bytes "
+            f"in {stats['encode_ms']}ms (reused source: {stats['reused_source']})"
+        )
+        return image_data, ImageOptimizer.MIME_TYPES[encoded_format], stats
+
+    @staticmethod
+    def _encode_lossless(image: Image.Image, max_dimension: Optional[int], format: Optional[str],
+                         stats: dict) -> Tuple[memoryview, str, int, int]:
+        """
+        Downscale an image to max_dimension and encode it with the lossless policy.
 
-        buffer.seek(0)
-        return buffer.read()
+        Returns:
+            Tuple of (encoded bytes, format, width, height)
+        """
+        width, height = image.size
+        if max_dimension and max(width, height) > max_dimension:
+            scale = max_dimension / max(width, height)
+            width, height = max(1, round(width * scale)), max(1, round(height * scale))
+            image = image.resize((width, height), Image.Resampling.LANCZOS)
+            stats['resized'] = True
+
+        encoded_format = ImageOptimizer.lossless_format(format)
+        buffer = io.BytesIO()
+        ImageOptimizer._save(image, buffer, encoded_format, quality=100)
+        return buffer.getbuffer(), encoded_format, width, height
+
+    @staticmethod
+    def summarize_encoding(page_stats: List[dict]) -> dict:
+        """
+        Combine per-page encoding stats into document totals.
+
+        Args:
+            page_stats: Stats dictionaries returned by encode_for_model
+
+        Returns:
+            Dictionary with total bytes, base64 bytes and encode time
+        """
+        return {
+            'format': page_stats[0]['format'] if page_stats else None,
+            'pages': len(page_stats),
+            'bytes': sum(stats['bytes'] for stats in page_stats),
+            'base64_bytes': sum(stats['base64_bytes'] for stats in page_stats),
+            'encode_ms': round(sum(stats['encode_ms'] for stats in page_stats), 1)
+        }
 
     @staticmethod
     def analyze_image_quality(image: Image.Image) -> dict:
@@ -0,0 +1,146 @@
+"""
+Incremental bulk jobs: process only new or changed files of a folder and
+reuse the previous job's results for the rest.
+"""
+
+import logging
+from itertools import islice
+from typing import Dict, Iterator, List, Optional, Set
+
+from app.config import Config
+from app.models.bulk_job import BulkJob
+from app.models.bulk_job_result import BulkJobResult
+from app.models.folder_manifest import FolderManifest
+from app.services.folder_scanner import FolderScanner
+
+logger = logging.getLogger(__name__)
+
+
+class IncrementalPlanner:
+    """Plans and merges incremental bulk jobs against a per-folder manifest"""
+
+    @staticmethod
+    def start(mongo, job_id: str, folder_path: str, recursive: bool = True, provider: str = None,
+              languages: List[str] = None, handwriting: bool = False, processing_mode: str = 'single',
+              chain_config: Optional[Dict] = None) -> Dict:
+        """
+        Mark a job as incremental and pick the job whose results it reuses
+
+        Args:
+            mongo: MongoDB connection
+            job_id: Job identifier
+            folder_path: Root folder of the job
+            recursive: Whether subfolders are scanned
+            provider: OCR provider name
+            languages: List of language codes
+            handwriting: Handwriting flag
+            processing_mode: "single" or "chain"
+            chain_config: Chain configuration (chain mode)
+
+        Returns:
+            Dictionary with 'manifest_key' and 'base_job_id' (None on the first run)
+        """
+        FolderManifest.ensure_indexes(mongo)
+        BulkJobResult.ensure_indexes(mongo)
+
+        manifest_key = FolderManifest.build_key(
+            folder_path, recursive, provider, languages, handwriting, processing_mode, chain_config
+        )
+        base_job_id = BulkJob.find_incremental_base(mongo, manifest_key)
+        BulkJob.set_incremental(mongo, job_id, manifest_key, base_job_id)
+
+        logger.info(f"Incremental job {job_id}: manifest {manifest_key[:12]}, base job {base_job_id or 'none (full run)'}")
+        return {'manifest_key': manifest_key, 'base_job_id': base_job_id}
+
+    @staticmethod
+    def iter_changed_files(mongo, job_id: str, incremental: Dict, folder_path: str, recursive: bool = True,
+                           extensions: Optional[Set[str]] = None) -> Iterator[str]:
+        """
+        Stream the new or changed files of a folder
+
+        Files are compared with the manifest one chunk at a time while the
+        folder is scanned, so publishing can start before the scan finishes.
+
+        Args:
+            mongo: MongoDB connection
+            job_id: Job identifier
+            incremental: Dictionary returned by start()
+            folder_path: Root folder to scan
+            recursive: Whether to scan subfolders
+            extensions: Lowercase extensions to include
+
+        Returns:
+            Iterator of file paths to process
+
+        Raises:
+            ValueError: If folder_path is not a directory
+        """
+        file_stats = FolderScanner.iter_file_stats(folder_path, recursive, extensions)
+        return IncrementalPlanner._plan(mongo, job_id, incremental, file_stats)
+
+    @staticmethod
+    def _plan(mongo, job_id, incremental, file_stats):
+        """Yield the files of each scanned chunk that need processing"""
+        chunk_size = max(1, Config.INCREMENTAL_MANIFEST_BATCH_SIZE)
+        reuse = incremental.get('base_job_id') is not None
+        while True:
+            chunk = list(islice(file_stats, chunk_size))
+            if not chunk:
+                break
+            changed = FolderManifest.plan_chunk(mongo, incremental['manifest_key'], job_id, chunk, reuse=reuse)
+            # Unchanged chunks publish nothing; keep the scan from looking interrupted
+            BulkJob.touch_scan(mongo, job_id)
+            yield from changed
+
+    @staticmethod
+    def merge_previous_results(mongo, job_id: str, incremental: Dict, first_index: int = 0) -> Dict:
+        """
+        Copy the base job's results of unchanged files into a job and commit the manifest
+
+        Must run once every task of the job has a result or error record.
+        Unchanged files whose result is missing from the base job are
+        forgotten, so the next run reprocesses them.
+
+        Args:
+            mongo: MongoDB connection
+            job_id: Job identifier
+            incremental: The job's 'incremental' dictionary
+            first_index: File index given to the first reused result; callers
+                pass the number of files the job processed itself, so reused
+                results are numbered after them
+
+        Returns:
+            Dictionary with base_job_id and reused, missing, committed, uncommitted and removed counts
+        """
+        manifest_key = incremental['manifest_key']
+        base_job_id = incremental.get('base_job_id')
+        batch_size = max(1, Config.INCREMENTAL_MANIFEST_BATCH_SIZE)
+        stats = {'base_job_id': base_job_id, 'reused': 0, 'missing': 0}
+
+        if base_job_id:
+            unchanged = FolderManifest.iter_unchanged(mongo, manifest_key, job_id, batch_size)
+            while True:
+                batch = list(islice(unchanged, batch_size))
+                if not batch:
+                    break
+                copied = BulkJobResult.copy_from_job(
+                    mongo, base_job_id, job_id, batch, first_index + stats['reused']
+                )
+                missing = [file_path for file_path in batch if file_path not in copied]
+                FolderManifest.forget(mongo, manifest_key, missing)
+                stats['reused'] += len(copied)
+                stats['missing'] += len(missing)
+
+            if stats['missing']:
+                logger.warning(f"Job {job_id}: {stats['missing']} unchanged files had no result in base job {base_job_id}")
+
+        stats.update(FolderManifest.commit(
+            mongo, manifest_key, job_id,
+            lambda file_paths: BulkJobResult.recorded_hashes(mongo, job_id, file_paths),
+            batch_size,
+            base_job_id
+        ))
+        BulkJob.mark_incremental_merged(mongo, job_id, stats)
+
+        logger.info(f"Job {job_id}: reused {stats['reused']} results from {base_job_id}, committed {stats['committed']} files")
+        return stats
@@ -1,9 +1,12 @@
 """Coordinates NSQ-based bulk processing jobs"""
-import os
 import logging
-from pathlib import Path
+from itertools import islice
+from app.config import Config
 from app.services.nsq_service import NSQService
+from app.services.folder_scanner import FolderScanner
+from app.services.incremental_planner import IncrementalPlanner
 from app.models.bulk_job import BulkJob
+from app.models.bulk_task_backlog import BulkTaskBacklog
 
 logger = logging.getLogger(__name__)
 
@@ -31,24 +34,9 @@ class NSQJobCoordinator:
         Returns:
             List of image file paths found
         """
-        if not os.path.isdir(folder_path):
-            raise ValueError(f"Invalid folder path: {folder_path}")
+        return list(FolderScanner.iter_files(folder_path, recursive, self.SUPPORTED_EXTENSIONS))
 
-        image_files = []
-        folder_path = Path(folder_path)
-
-        # Use glob pattern for recursion
-        pattern = "**/*" if recursive else "*"
-
-        for file_path in folder_path.glob(pattern):
-            if file_path.is_file():
-                if file_path.suffix.lower() in self.SUPPORTED_EXTENSIONS:
-                    image_files.append(str(file_path))
-
-        # Sort for consistent ordering
-        return sorted(image_files)
-
-    def start_job(self, mongo, job_id, folder_path, provider, languages, handwriting, recursive=True, processing_mode='single', chain_config=None):
+    def start_job(self, mongo, job_id, folder_path, provider, languages, handwriting, recursive=True, processing_mode='single', chain_config=None, incremental=False, priority=None):
         """
         Start a new NSQ-based bulk processing job
 
@@ -62,61 +50,100 @@ class NSQJobCoordinator:
             recursive: Whether to scan subfolders
             processing_mode: "single" or "chain"
             chain_config: Chain configuration (required for chain mode)
+            incremental: Only publish files that are new or changed since the
+                last incremental job on this folder; the result aggregator merges
+                in that job's results for the others
+            priority: Priority lane of the job's tasks (default: Config.NSQ_DEFAULT_PRIORITY)
 
         Returns:
             Dictionary with job information
         """
-        logger.info(f"Starting NSQ job {job_id}: folder={folder_path}, provider={provider}, mode={processing_mode}")
+        priority = NSQService.lane_for(priority)
+        logger.info(f"Starting NSQ job {job_id}: folder={folder_path}, provider={provider}, mode={processing_mode}, priority={priority}")
 
         try:
-            # Scan folder for files
-            image_files = self.scan_folder(folder_path, recursive)
-            total_files = len(image_files)
-
-            logger.error(f"NSQ Coordinator: Scanned folder {folder_path}, found {total_files} files")
-            if image_files:
-                logger.error(f"NSQ Coordinator: Files found: {image_files[:5]}..." if len(image_files) > 5 else f"NSQ Coordinator: Files found: {image_files}")
-
-            if total_files == 0:
-                raise ValueError(f"No supported files found in {folder_path}")
-
-            logger.error(f"NSQ Coordinator: Found {total_files} files to process in job {job_id}")
-
-            # Initialize job in MongoDB with NSQ tracking
-            BulkJob.initialize_nsq_job(mongo, job_id, total_files)
-
-            # Publish tasks to NSQ
+            # Initialize job in MongoDB with NSQ tracking; total_files is only known
+            # once the scan finishes, until then 'scanning' keeps the job from
+            # looking complete when workers catch up with the published chunks.
+            # This must precede marking the job incremental: an incremental job
+            # without counters would otherwise match find_ready_for_aggregation
+            BulkJob.initialize_nsq_job(mongo, job_id, 0, scanning=True)
+
+            # Stream files from the scan so publishing starts with the first chunk
+            if incremental:
+                incremental_info = IncrementalPlanner.start(
+                    mongo, job_id, folder_path, recursive, provider, languages, handwriting,
+                    processing_mode, chain_config
+                )
+                image_files = IncrementalPlanner.iter_changed_files(
+                    mongo, job_id, incremental_info, folder_path, recursive, self.SUPPORTED_EXTENSIONS
+                )
+            else:
+                incremental_info = None
+                image_files = FolderScanner.iter_files(folder_path, recursive, self.SUPPORTED_EXTENSIONS)
+
+            # Publish tasks to NSQ in MPUB chunks; workers start on the first chunk.
+            # With fair dispatch, chunks beyond the job's window of queued tasks
+            # go to the backlog and the task dispatcher releases them as the job drains
+            chunk_size = max(1, Config.NSQ_PUBLISH_CHUNK_SIZE)
             published_count = 0
-            for idx, file_path in enumerate(image_files):
-                logger.error(f"NSQ Coordinator: Publishing file {idx+1}/{total_files}: {file_path}")
-
-                # Prepare task data based on mode
-                task_data = {
-                    'job_id': job_id,
-                    'file_path': file_path,
-                    'file_index': idx,
-                    'total_files': total_files,
-                    'processing_mode': processing_mode,
-                    'languages': languages,
-                    'handwriting': handwriting
-                }
-
-                if processing_mode == 'chain':
-                    task_data['chain_config'] = chain_config
-                else:
-                    task_data['provider'] = provider
-
-                self.nsq_service.publish_file_task(**task_data)
-
-                # Increment published count in MongoDB
-                BulkJob.increment_published_count(mongo, job_id)
-                published_count += 1
+            backlog_count = 0
+            try:
+                while True:
+                    chunk_files = list(islice(image_files, chunk_size))
+                    if not chunk_files:
+                        break
+
+                    chunk = [
+                        self.nsq_service.build_file_task(
+                            job_id, file_path, idx, None,
+                            provider=provider,
+                            languages=languages,
+                            handwriting=handwriting,
+                            processing_mode=processing_mode,
+                            chain_config=chain_config,
+                            priority=priority
+                        )
+                        for idx, file_path in enumerate(chunk_files, published_count + backlog_count)
+                    ]
+
+                    if backlog_count or self._window_full(mongo, job_id, published_count):
+                        BulkTaskBacklog.push(mongo, job_id, priority, published_count + backlog_count, chunk)
+                        backlog_count += len(chunk)
+                        BulkJob.touch_scan(mongo, job_id)
+                        continue
+
+                    self.nsq_service.publish_file_tasks(chunk)
+
+                    # One published_count increment per chunk
+                    BulkJob.increment_published_count(mongo, job_id, len(chunk))
+                    published_count += len(chunk)
+                    logger.info(f"NSQ Coordinator: Published {published_count} tasks for job {job_id} (scan in progress)")
+            finally:
+                self.nsq_service.close()
+
+            total_files = published_count + backlog_count
+            if total_files == 0 and not (incremental_info and incremental_info['base_job_id']):
+                raise ValueError(f"No supported files found in {folder_path}")
 
+            BulkJob.finish_nsq_scan(mongo, job_id, total_files)
             logger.error(f"NSQ Coordinator: Published {published_count} tasks to NSQ for job {job_id}")
+            if backlog_count:
+                logger.info(f"NSQ Coordinator: {backlog_count} tasks of job {job_id} wait in the backlog for the task dispatcher")
+
+            if total_files == 0:
+                # Nothing changed since the base job: aggregation only merges its results
+                logger.info(f"NSQ Coordinator: No new or changed files for incremental job {job_id}")
+                self._signal_done(job_id)
+            else:
+                # Workers may have consumed every task before the scan finished,
+                # in which case their done signal was not ready yet
+                self._signal_if_drained(mongo, job_id)
 
             return {
                 "job_id": job_id,
                 "total_files": total_files,
+                "priority": priority,
                 "status": "processing"
             }
 
@@ -124,11 +151,39 @@ class NSQJobCoordinator:
             logger.error(f"Failed to start NSQ job {job_id}: {e}")
             # Update job status to error
             try:
-                BulkJob.update_status(mongo, job_id, 'error', str(e))
+                BulkJob.update_status(mongo, job_id, 'error', error=str(e))
             except:
                 pass
             raise
 
+    def _window_full(self, mongo, job_id, published_count):
+        """Whether fair dispatch holds back further tasks of a job (its queued tasks reached the window)"""
+        if not Config.NSQ_FAIR_DISPATCH:
+            return False
+        if published_count < Config.NSQ_JOB_DISPATCH_WINDOW:
+            return False
+        consumed = (BulkJob.get_by_job_id(mongo, job_id, {'consumed_count': 1}) or {}).get('consumed_count', 0)
+        return published_count - consumed >= Config.NSQ_JOB_DISPATCH_WINDOW
+
+    def _signal_if_drained(self, mongo, job_id):
+        """Publish the job done signal if all tasks were consumed during publishing"""
+        try:
+            counters = BulkJob.get_by_job_id(mongo, job_id, {'consumed_count': 1, 'total_files': 1})
+            if counters and BulkJob.is_drained(counters):
+                self._signal_done(job_id)
+        except Exception as e:
+            # The aggregator's safety-net scan still picks the job up
+            logger.warning(f"Could not signal completion of job {job_id}: {e}")
+
+    def _signal_done(self, job_id):
+        """Publish the job done signal; a lost signal is covered by the aggregator's safety-net scan"""
+        try:
+            self.nsq_service.publish_job_done(job_id, source='coordinator')
+        except Exception as e:
+            logger.warning(f"Could not signal completion of job {job_id}: {e}")
+        finally:
+            self.nsq_service.close()
+
     def pause_job(self, job_id):
         """
         Pause a running job
@@ -7,6 +7,12 @@ from app.config import Config
 
 logger = logging.getLogger(__name__)
 
+# Topic signalled when the last file task of a job has been consumed
+JOB_DONE_TOPIC = 'bulk_ocr_job_done'
+
+# File task topic of the default priority lane; other lanes append their name
+FILE_TASKS_TOPIC = 'bulk_ocr_file_tasks'
+
 
 class NSQService:
     """Service for interacting with NSQ message queue"""
@@ -14,22 +20,78 @@ class NSQService:
     def __init__(self):
         self.nsqd_address = Config.NSQD_ADDRESS  # "nsqd:4150"
         self.nsqlookupd_addresses = Config.NSQLOOKUPD_ADDRESSES  # ["nsqlookupd:4161"]
+        self._producer = None  # Persistent producer for batched publishing
         logger.info(f"NSQ Service initialized: nsqd={self.nsqd_address}, lookupd={self.nsqlookupd_addresses}")
 
-    def publish_file_task(self, job_id, file_path, file_index, total_files, provider=None, languages=None, handwriting=False, processing_mode='single', chain_config=None):
+    def close(self):
+        """Close the persistent producer used for batched publishing"""
+        if self._producer is not None:
+            try:
+                self._producer.close()
+            except Exception as e:
+                logger.warning(f"Error closing NSQ producer: {e}")
+            self._producer = None
+
+    def _get_producer(self):
+        """Get the persistent producer, starting it on first use"""
+        if self._producer is None:
+            producer = gnsq.Producer(self.nsqd_address)
+            producer.start()
+            self._producer = producer
+        return self._producer
+
+    @staticmethod
+    def lane_for(priority=None):
         """
-        Publish a file processing task to NSQ
+        Resolve a job priority to a configured lane
+
+        Args:
+            priority: Lane name (e.g. 'high', 'normal', 'low')
+
+        Returns:
+            The lane name, or Config.NSQ_DEFAULT_PRIORITY if priority is not a configured lane
+        """
+        if priority in Config.NSQ_PRIORITY_LANES:
+            return priority
+        return Config.NSQ_DEFAULT_PRIORITY
+
+    @staticmethod
+    def task_topic(priority=None):
+        """
+        NSQ topic of a priority lane
+
+        The default lane keeps the original 'bulk_ocr_file_tasks' topic.
+
+        Args:
+            priority: Lane name
+
+        Returns:
+            Topic name
+        """
+        lane = NSQService.lane_for(priority)
+        if lane == Config.NSQ_DEFAULT_PRIORITY:
+            return FILE_TASKS_TOPIC
+        return f"{FILE_TASKS_TOPIC}_{lane}"
+
+    @staticmethod
+    def build_file_task(job_id, file_path, file_index, total_files, provider=None, languages=None, handwriting=False, processing_mode='single', chain_config=None, priority=None):
+        """
+        Build a file processing task message
 
         Args:
             job_id: Unique job identifier
             file_path: Path to the file to process
             file_index: Index of this file in the job
-            total_files: Total number of files in the job
+            total_files: Total number of files in the job (None while the folder is still being scanned)
             provider: OCR provider to use (single mode)
             languages: List of languages for OCR
             handwriting: Whether to optimize for handwriting
             processing_mode: "single" or "chain"
             chain_config: Chain configuration (required for chain mode)
+            priority: Priority lane of the job (default: Config.NSQ_DEFAULT_PRIORITY)
+
+        Returns:
+            Message dictionary
         """
         message = {
             "job_id": job_id,
@@ -40,6 +102,7 @@ class NSQService:
             "languages": languages or [],
             "handwriting": handwriting,
             "attempt": 0,
+            "priority": NSQService.lane_for(priority),
             "enqueued_at": datetime.utcnow().isoformat()
         }
 
@@ -49,18 +112,79 @@ class NSQService:
         else:
             message['provider'] = provider
 
+        return message
+
+    def publish_file_task(self, job_id, file_path, file_index, total_files, provider=None, languages=None, handwriting=False, processing_mode='single', chain_config=None, priority=None):
+        """
+        Publish a file processing task to NSQ
+
+        Args:
+            job_id: Unique job identifier
+            file_path: Path to the file to process
+            file_index: Index of this file in the job
+            total_files: Total number of files in the job
+            provider: OCR provider to use (single mode)
+            languages: List of languages for OCR
+            handwriting: Whether to optimize for handwriting
+            processing_mode: "single" or "chain"
+            chain_config: Chain configuration (required for chain mode)
+            priority: Priority lane of the job
+        """
+        message = self.build_file_task(
+            job_id, file_path, file_index, total_files, provider=provider, languages=languages,
+            handwriting=handwriting, processing_mode=processing_mode, chain_config=chain_config,
+            priority=priority
+        )
+        topic = self.task_topic(message['priority'])
+
         try:
             logger.error(f"NSQService: Creating producer for {self.nsqd_address}")
             producer = gnsq.Producer(self.nsqd_address)
             producer.start()
-            logger.error(f"NSQService: Publishing to topic 'bulk_ocr_file_tasks': job_id={job_id}, file={file_path}")
-            producer.publish('bulk_ocr_file_tasks', json.dumps(message).encode('utf-8'))
+            logger.error(f"NSQService: Publishing to topic '{topic}': job_id={job_id}, file={file_path}")
+            producer.publish(topic, json.dumps(message).encode('utf-8'))
             producer.close()
             logger.error(f"NSQService: Successfully published file task: job_id={job_id}, file={file_path}")
         except Exception as e:
             logger.error(f"NSQService: FAILED to publish file task: {e}", exc_info=True)
             raise
 
+    def publish_file_tasks(self, messages):
+        """
+        Publish a chunk of file processing tasks with a single MPUB
+
+        Uses the persistent producer, so consecutive chunks share one
+        connection. If the connection has gone away the producer is
+        recreated and the chunk is retried once. A chunk belongs to one
+        job and is published to the topic of its priority lane.
+
+        Args:
+            messages: List of message dictionaries from build_file_task
+
+        Returns:
+            Number of messages published
+        """
+        if not messages:
+            return 0
+
+        topic = self.task_topic(messages[0].get('priority'))
+        bodies = [json.dumps(message).encode('utf-8') for message in messages]
+
+        try:
+            self._get_producer().multipublish(topic, bodies)
+        except Exception as e:
+            logger.warning(f"NSQService: MPUB failed ({e}), reconnecting and retrying chunk")
+            self.close()
+            try:
+                self._get_producer().multipublish(topic, bodies)
+            except Exception as retry_error:
+                logger.error(f"NSQService: FAILED to publish {len(bodies)} file tasks: {retry_error}", exc_info=True)
+                self.close()
+                raise
+
+        logger.info(f"NSQService: Published {len(bodies)} file tasks to '{topic}'")
+        return len(bodies)
+
     def publish_control_message(self, job_id, action):
         """
         Publish pause/resume/cancel control message
@@ -85,6 +209,39 @@ class NSQService:
             logger.error(f"Failed to publish control message: {e}")
             raise
 
+    def publish_job_done(self, job_id, source=None):
+        """
+        Publish a job completion signal for the result aggregator
+
+        Uses the persistent producer, recreated and retried once if its
+        connection has gone away. Like every gnsq call it must run on the
+        gevent hub thread that owns the producer.
+
+        Args:
+            job_id: Unique job identifier
+            source: Optional identifier of the publisher (worker ID or 'coordinator')
+        """
+        message = {
+            "job_id": job_id,
+            "source": source,
+            "timestamp": datetime.utcnow().isoformat()
+        }
+        body = json.dumps(message).encode('utf-8')
+
+        try:
+            self._get_producer().publish(JOB_DONE_TOPIC, body)
+        except Exception as e:
+            logger.warning(f"Job done publish failed ({e}), reconnecting and retrying")
+            self.close()
+            try:
+                self._get_producer().publish(JOB_DONE_TOPIC, body)
+            except Exception as retry_error:
+                logger.error(f"Failed to publish job done signal: {retry_error}")
+                self.close()
+                raise
+
+        logger.info(f"Published job done signal: job_id={job_id}, source={source}")
+
     def get_topic_stats(self, topic):
         """
         Get statistics for a topic from NSQ
@@ -109,3 +266,34 @@ class NSQService:
         except Exception as e:
             logger.error(f"Error getting topic stats: {e}")
             return None
+
+    def get_lane_depths(self):
+        """
+        Get the queued and in-flight message counts of every priority lane topic
+
+        Returns:
+            Dictionary of lane -> {'topic', 'depth', 'in_flight'}; counts are None if nsqd could not be queried
+        """
+        lanes = {
+            lane: {'topic': self.task_topic(lane), 'depth': None, 'in_flight': None}
+            for lane in Config.NSQ_PRIORITY_LANES
+        }
+        try:
+            import requests
+            nsqd_host = self.nsqd_address.replace(':4150', ':4151')
+            response = requests.get(f"http://{nsqd_host}/stats?format=json", timeout=5)
+            response.raise_for_status()
+            stats = response.json()
+        except Exception as e:
+            logger.warning(f"Could not read nsqd stats: {e}")
+            return lanes
+
+        # nsqd < 1.0 wraps the stats in 'data'
+        topics = {topic['topic_name']: topic for topic in stats.get('data', stats).get('topics', [])}
+        for lane in lanes.values():
+            topic = topics.get(lane['topic'])
+            channels = topic.get('channels', []) if topic else []
+            # Messages wait in the channel once it exists, in the topic before that
+            lane['depth'] = sum(channel.get('depth', 0) for channel in channels) if channels else (topic or {}).get('depth', 0)
+            lane['in_flight'] = sum(channel.get('in_flight_count', 0) for channel in channels)
+        return lanes
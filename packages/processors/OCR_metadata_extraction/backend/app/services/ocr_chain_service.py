@@ -1,26 +1,43 @@
 """
-OCR Chain Service for executing sequential OCR provider chains
+OCR Chain Service for executing OCR provider chains
 """
 
 import logging
 import os
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
 from datetime import datetime
-from .ocr_service import OCRService
+from app.config import Config
+from app.models.ocr_result_cache import OCRResultCache
+from .ocr_service import OCRService, cached_ocr_call
 
 logger = logging.getLogger(__name__)
 
 
+class ChainConfigurationError(ValueError):
+    """Raised when chain steps can never all run (e.g. their inputs form a cycle)"""
+
+
 class OCRChainService:
     """Service for executing chains of OCR providers"""
 
-    def __init__(self):
-        """Initialize the chain service with OCR service"""
-        self.ocr_service = OCRService()
+    def __init__(self, ocr_service=None):
+        """
+        Initialize the chain service with OCR service
+
+        Args:
+            ocr_service: OCRService to run steps with (default: a new instance)
+        """
+        self.ocr_service = ocr_service or OCRService()
 
     def execute_chain(self, image_path, steps, languages=None, handwriting=False, job_id=None):
         """
         Execute a chain of OCR providers on a single image
 
+        Steps run as soon as the steps they read from have finished, so steps
+        that only depend on the original image (or on disjoint earlier steps)
+        run concurrently, up to Config.OCR_CHAIN_MAX_PARALLEL_STEPS at a time.
+
         Args:
             image_path: Path to the image file
             steps: List of step configurations, each containing:
@@ -52,6 +69,8 @@ class OCRChainService:
                             'metadata': {
                                 'processing_time_ms': int,
                                 'timestamp': str (ISO format),
+                                'start_offset_ms': int (from chain start),
+                                'end_offset_ms': int (from chain start),
                                 'input_length': int,
                                 'output_length': int,
                             },
@@ -59,10 +78,13 @@ class OCRChainService:
                         }
                     ],
                     'final_output': str,
-                    'total_processing_time_ms': int,
+                    'total_processing_time_ms': int (wall clock),
+                    'sequential_processing_time_ms': int (sum of step times),
                 }
+
+        Raises:
+            ChainConfigurationError: If remaining steps wait on inputs no step will produce
         """
-        import time
         start_time = time.time()
 
         logger.info(f"Starting chain execution with {len(steps)} steps for image: {image_path}")
@@ -77,124 +99,210 @@ class OCRChainService:
                 'steps': []
             }
 
+        # Skip disabled steps; steps reading their output get empty input
+        enabled_steps = {}
+        for step in steps:
+            if step.get('enabled', True):
+                enabled_steps[step.get('step_number')] = step
+            else:
+                logger.debug(f"Skipping disabled step {step.get('step_number')}")
+
+        dependencies = {
+            step_number: self._step_dependencies(step) & enabled_steps.keys()
+            for step_number, step in enabled_steps.items()
+        }
+
         # Track outputs from all steps for input routing
         previous_outputs = {}
         step_results = []
+        waiting = dict(enabled_steps)
+        workers = max(1, Config.OCR_CHAIN_MAX_PARALLEL_STEPS)
+
+        # Run every step whose inputs are ready; independent steps overlap on the pool
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='ocr-chain') as executor:
+            running = set()
+            while waiting or running:
+                for step_number in sorted(waiting):
+                    if len(running) >= workers:
+                        break
+                    if dependencies[step_number] <= previous_outputs.keys():
+                        running.add(executor.submit(
+                            self._execute_step,
+                            waiting.pop(step_number),
+                            dict(previous_outputs),
+                            image_path,
+                            languages,
+                            handwriting,
+                            job_id,
+                            start_time
+                        ))
+
+                if not running:
+                    # Nothing can start and nothing will finish to unblock the rest
+                    blocked = ', '.join(
+                        f"step {step_number} (needs {sorted(dependencies[step_number] - previous_outputs.keys())})"
+                        for step_number in sorted(waiting)
+                    )
+                    raise ChainConfigurationError(f"Chain steps can never run: {blocked}")
+
+                done, running = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    step_result, output = future.result()
+                    previous_outputs[step_result['step_number']] = output
+                    step_results.append(step_result)
+
+        step_results.sort(key=lambda step_result: step_result['step_number'])
+
+        # Final output is the last successful step's text, as in sequential execution
         final_output = None
+        for step_result in step_results:
+            if 'error' not in step_result:
+                final_output = step_result['output']['text']
 
-        # Execute each step
-        for step in steps:
-            step_number = step.get('step_number')
-            provider_name = step.get('provider')
-            input_source = step.get('input_source', 'original_image')
-            prompt = step.get('prompt', '')
-            enabled = step.get('enabled', True)
+        total_time = (time.time() - start_time) * 1000
 
-            # Skip disabled steps
-            if not enabled:
-                logger.debug(f"Skipping disabled step {step_number}")
-                continue
+        return {
+            'success': len(step_results) > 0,
+            'steps': step_results,
+            'final_output': final_output or '',
+            'total_processing_time_ms': int(total_time),
+            'sequential_processing_time_ms': sum(
+                step_result['metadata']['processing_time_ms'] for step_result in step_results
+            ),
+        }
 
-            step_start = time.time()
+    @staticmethod
+    def _step_dependencies(step):
+        """
+        Step numbers whose output a step reads
 
-            try:
-                # Determine input for this step
-                input_for_step = self._resolve_input(
-                    step,
-                    previous_outputs,
-                    image_path
-                )
+        Args:
+            step: Step configuration
 
-                # Determine if we're processing text or image
-                is_image_input = (input_source == 'original_image')
-
-                logger.info(f"Executing step {step_number} with provider '{provider_name}' (input: {input_source})")
-
-                # Validate file exists for image input
-                if is_image_input and not os.path.exists(input_for_step):
-                    raise FileNotFoundError(f"Image file not found: {input_for_step}")
-
-                # Process with the specified provider
-                if is_image_input:
-                    # Original image processing
-                    output = self.ocr_service.process_image(
-                        image_path=input_for_step,
-                        languages=languages,
-                        handwriting=handwriting,
-                        provider=provider_name,
-                        custom_prompt=prompt if prompt else None,
-                        job_id=job_id
-                    )
-                else:
-                    # Text-based processing (for AI providers like Claude)
-                    output = self._process_text_with_provider(
-                        text_input=input_for_step,
-                        provider_name=provider_name,
-                        prompt=prompt,
-                        languages=languages
-                    )
+        Returns:
+            set: Step numbers (empty for original_image steps)
+        """
+        input_source = step.get('input_source', 'original_image')
+        step_number = step.get('step_number')
 
-                step_time = (time.time() - step_start) * 1000  # Convert to ms
-
-                # Prepare step result
-                step_result = {
-                    'step_number': step_number,
-                    'provider': provider_name,
-                    'input_source': input_source,
-                    'prompt': prompt,
-                    'output': {
-                        'text': output.get('text', ''),
-                        'full_text': output.get('full_text', output.get('text', '')),
-                        'confidence': output.get('confidence', 0.0),
-                    },
-                    'metadata': {
-                        'processing_time_ms': int(step_time),
-                        'timestamp': datetime.utcnow().isoformat(),
-                        'input_length': len(str(input_for_step)),
-                        'output_length': len(output.get('text', '')),
-                    }
-                }
+        if input_source == 'previous_step':
+            return {step_number - 1} if step_number > 1 else set()
+        if input_source == 'step_N':
+            return set(step.get('input_step_numbers', [])[:1])
+        if input_source == 'combined':
+            return set(step.get('input_step_numbers', []))
+        return set()
+
+    def _execute_step(self, step, previous_outputs, image_path, languages, handwriting, job_id, chain_start):
+        """
+        Run a single chain step whose inputs are available
+
+        Args:
+            step: Step configuration
+            previous_outputs: Outputs of completed steps
+            image_path: Path to the original image
+            languages: List of language codes
+            handwriting: Boolean for handwriting detection
+            job_id: Optional job ID for tracking intermediate images
+            chain_start: time.time() at which the chain started
+
+        Returns:
+            Tuple of (step_result, output); a failed step yields an empty output
+        """
+        step_number = step.get('step_number')
+        provider_name = step.get('provider')
+        input_source = step.get('input_source', 'original_image')
+        prompt = step.get('prompt', '')
+
+        step_start = time.time()
+
+        try:
+            # Determine input for this step
+            input_for_step = self._resolve_input(
+                step,
+                previous_outputs,
+                image_path
+            )
+
+            # Determine if we're processing text or image
+            is_image_input = (input_source == 'original_image')
+
+            logger.info(f"Executing step {step_number} with provider '{provider_name}' (input: {input_source})")
+
+            # Validate file exists for image input
+            if is_image_input and not os.path.exists(input_for_step):
+                raise FileNotFoundError(f"Image file not found: {input_for_step}")
+
+            # Process with the specified provider
+            if is_image_input:
+                # Original image processing
+                output = self.ocr_service.process_image(
+                    image_path=input_for_step,
+                    languages=languages,
+                    handwriting=handwriting,
+                    provider=provider_name,
+                    custom_prompt=prompt if prompt else None,
+                    job_id=job_id
+                )
+            else:
+                # Text-based processing (for AI providers like Claude)
+                output = self._process_text_with_provider(
+                    text_input=input_for_step,
+                    provider_name=provider_name,
+                    prompt=prompt,
+                    languages=languages
+                )
 
-                # Store output for future steps
-                previous_outputs[step_number] = output
-                final_output = output.get('text', '')
-
-                step_results.append(step_result)
-                logger.info(f"Step {step_number} completed successfully in {int(step_time)}ms")
-
-            except Exception as e:
-                step_time = (time.time() - step_start) * 1000
-                error_msg = str(e)
-
-                logger.error(f"Error in step {step_number}: {error_msg}", exc_info=True)
-
-                step_result = {
-                    'step_number': step_number,
-                    'provider': provider_name,
-                    'input_source': input_source,
-                    'prompt': prompt,
-                    'error': error_msg,
-                    'metadata': {
-                        'processing_time_ms': int(step_time),
-                        'timestamp': datetime.utcnow().isoformat(),
-                    }
+            step_end = time.time()
+            step_time = (step_end - step_start) * 1000  # Convert to ms
+
+            # Prepare step result
+            step_result = {
+                'step_number': step_number,
+                'provider': provider_name,
+                'input_source': input_source,
+                'prompt': prompt,
+                'output': {
+                    'text': output.get('text', ''),
+                    'full_text': output.get('full_text', output.get('text', '')),
+                    'confidence': output.get('confidence', 0.0),
+                },
+                'metadata': {
+                    'processing_time_ms': int(step_time),
+                    'timestamp': datetime.utcnow().isoformat(),
+                    'start_offset_ms': int((step_start - chain_start) * 1000),
+                    'end_offset_ms': int((step_end - chain_start) * 1000),
+                    'input_length': len(str(input_for_step)),
+                    'output_length': len(output.get('text', '')),
                 }
+            }
 
-                step_results.append(step_result)
+            logger.info(f"Step {step_number} completed successfully in {int(step_time)}ms")
+            return step_result, output
 
-                # If step fails, store empty output for next steps to handle gracefully
-                previous_outputs[step_number] = {'text': '', 'confidence': 0.0}
+        except Exception as e:
+            step_end = time.time()
+            step_time = (step_end - step_start) * 1000
+            error_msg = str(e)
 
-                # Continue to next step instead of stopping (fail gracefully)
+            logger.error(f"Error in step {step_number}: {error_msg}", exc_info=True)
 
-        total_time = (time.time() - start_time) * 1000
+            step_result = {
+                'step_number': step_number,
+                'provider': provider_name,
+                'input_source': input_source,
+                'prompt': prompt,
+                'error': error_msg,
+                'metadata': {
+                    'processing_time_ms': int(step_time),
+                    'timestamp': datetime.utcnow().isoformat(),
+                    'start_offset_ms': int((step_start - chain_start) * 1000),
+                    'end_offset_ms': int((step_end - chain_start) * 1000),
+                }
+            }
 
-        return {
-            'success': len(step_results) > 0,
-            'steps': step_results,
-            'final_output': final_output or '',
-            'total_processing_time_ms': int(total_time),
-        }
+            # If step fails, store empty output for dependent steps to handle gracefully
+            return step_result, {'text': '', 'confidence': 0.0}
 
     def _resolve_input(self, step, previous_outputs, original_image_path):
         """
@@ -264,8 +372,14 @@ class OCRChainService:
         try:
             # For AI providers, use text processing capability
             if hasattr(provider, 'process_text'):
-                result = provider.process_text(
-                    text=text_input,
+                # Paid text providers: reuse results for identical text and prompt
+                result = cached_ocr_call(
+                    provider,
+                    OCRResultCache.hash_text(text_input),
+                    lambda: provider.process_text(
+                        text=text_input,
+                        custom_prompt=prompt
+                    ),
                     custom_prompt=prompt
                 )
             else:
@@ -346,6 +460,7 @@ class OCRChainService:
         timeline = {
             'steps': [],
             'total_time_ms': chain_results.get('total_processing_time_ms', 0),
+            'sequential_time_ms': chain_results.get('sequential_processing_time_ms', 0),
             'success': chain_results.get('success', False),
         }
 
@@ -357,6 +472,8 @@ class OCRChainService:
                 'success': 'error' not in step_result,
                 'processing_time_ms': step_result.get('metadata', {}).get('processing_time_ms', 0),
                 'timestamp': step_result.get('metadata', {}).get('timestamp'),
+                'start_offset_ms': step_result.get('metadata', {}).get('start_offset_ms'),
+                'end_offset_ms': step_result.get('metadata', {}).get('end_offset_ms'),
             }
 
             if 'output' in step_result:
@@ -370,4 +487,23 @@ class OCRChainService:
 
             timeline['steps'].append(step_item)
 
+        timeline['max_concurrent_steps'] = self._max_overlap(timeline['steps'])
+
         return timeline
+
+    @staticmethod
+    def _max_overlap(timeline_steps):
+        """Largest number of steps that ran at the same time"""
+        events = []
+        for step_item in timeline_steps:
+            if step_item.get('start_offset_ms') is None or step_item.get('end_offset_ms') is None:
+                continue
+            events.append((step_item['start_offset_ms'], 1))
+            events.append((step_item['end_offset_ms'], -1))
+
+        # Ends sort before starts at the same instant, so back-to-back steps don't overlap
+        running = peak = 0
+        for _, change in sorted(events):
+            running += change
+            peak = max(peak, running)
+        return peak
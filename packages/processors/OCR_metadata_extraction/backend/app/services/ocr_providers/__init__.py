@@ -1,18 +1,14 @@
-"""OCR Provider modules"""
+"""OCR Provider modules
+
+Provider classes are imported on first attribute access, so importing this
+package does not pull in every provider SDK.
+"""
+import importlib
+
 from .base_provider import BaseOCRProvider
-from .google_vision_provider import GoogleVisionProvider
-from .google_lens_provider import GoogleLensProvider
-from .serpapi_google_lens_provider import SerpAPIGoogleLensProvider
-from .chrome_lens_provider import ChromeLensProvider
-from .ollama_provider import OllamaProvider
-from .vllm_provider import VLLMProvider
-from .azure_provider import AzureComputerVisionProvider
-from .tesseract_provider import TesseractProvider
-from .easyocr_provider import EasyOCRProvider
-from .llamacpp_provider import LlamaCppProvider
-from .claude_provider import ClaudeProvider
-from .lmstudio_provider import LMStudioProvider
-from .langchain_provider import LangChainProvider
+from .registry import PROVIDER_CLASSES
+
+_PROVIDER_MODULES = {class_name: module_name for module_name, class_name in PROVIDER_CLASSES.values()}
 
 __all__ = [
     'BaseOCRProvider',
@@ -31,3 +27,11 @@ __all__ = [
     'LangChainProvider'
 ]
 
+
+def __getattr__(name):
+    module_name = _PROVIDER_MODULES.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    provider_class = getattr(importlib.import_module(f".{module_name}", __name__), name)
+    globals()[name] = provider_class
+    return provider_class
@@ -144,7 +144,7 @@ class ChromeLensProvider(BaseOCRProvider):
             dict: OCR results with text and metadata
         """
         # Initialize cleanup variables before try block to ensure they're always defined
-        temp_image_paths = []
+        page_source = None
         resized_image_paths = []
         
         if not self.is_available():
@@ -159,17 +159,11 @@ class ChromeLensProvider(BaseOCRProvider):
             if not os.path.exists(image_path):
                 raise Exception(f"Image file not found: {image_path}")
             
-            # Check if PDF and convert to images if necessary
-            image_paths_to_process = []
-
+            # PDFs are rasterised to temporary page files lazily, one chunk at a time
             if PDFService.is_pdf(image_path):
-                try:
-                    temp_image_paths = PDFService.pdf_to_temp_images(image_path, dpi=150)
-                    image_paths_to_process = temp_image_paths
-                except Exception as pdf_error:
-                    raise Exception(f"Failed to convert PDF to images: {str(pdf_error)}")
+                page_source = PDFService.iter_pdf_pages(image_path, dpi=150, paths_only=True)
             else:
-                image_paths_to_process = [image_path]
+                page_source = iter([(1, image_path)])
 
             # Process each page/image
             all_results = {
@@ -180,7 +174,7 @@ class ChromeLensProvider(BaseOCRProvider):
                 'confidence': 0.0,
                 'detected_language': 'en',
                 'handwriting_detected': False,
-                'pages_processed': len(image_paths_to_process),
+                'pages_processed': 0,
                 'raw_response': []
             }
 
@@ -188,7 +182,9 @@ class ChromeLensProvider(BaseOCRProvider):
             all_blocks = []
             all_words_dict = {}  # Using dict to avoid duplicates
 
-            for page_idx, img_path in enumerate(image_paths_to_process):
+            for page_num, img_path in page_source:
+                page_idx = page_num - 1
+                all_results['pages_processed'] += 1
                 try:
                     # Resize image if needed (configurable threshold, default 5MB)
                     processed_img_path = self._resize_image_if_needed(img_path, max_size_mb=self.max_image_size_mb)
@@ -237,7 +233,7 @@ class ChromeLensProvider(BaseOCRProvider):
             all_results['file_info'] = {
                 'filename': os.path.basename(image_path),
                 'is_pdf': PDFService.is_pdf(image_path),
-                'pages_processed': len(image_paths_to_process),
+                'pages_processed': all_results['pages_processed'],
                 'processed_at': datetime.now().isoformat(),
                 'handwriting_detected': handwriting or all_results.get('handwriting_detected', False)
             }
@@ -248,9 +244,9 @@ class ChromeLensProvider(BaseOCRProvider):
         except Exception as e:
             raise Exception(f"Chrome Lens processing failed: {str(e)}")
         finally:
-            # Cleanup temporary image files from PDF conversion
-            if temp_image_paths:
-                PDFService.cleanup_temp_images(temp_image_paths)
+            # Closing the page generator removes the temporary page files
+            if page_source is not None and hasattr(page_source, 'close'):
+                page_source.close()
 
             # Cleanup resized temporary image files
             if resized_image_paths:
@@ -150,25 +150,19 @@ class ClaudeProvider(BaseOCRProvider):
             raise Exception(f"Claude OCR processing failed: {str(e)}")
 
     def _process_pdf(self, pdf_path, languages=None, handwriting=False, custom_prompt=None):
-        """Process PDF by converting pages to images and processing each page"""
+        """Process PDF by streaming pages to a bounded pool of concurrent page requests"""
         from app.services.pdf_service import PDFService
         from app.services.image_optimizer import ImageOptimizer
 
         try:
-            # Convert PDF pages to PIL Image objects with optimal DPI
-            page_images = PDFService.pdf_to_images(
-                pdf_path,
-                handwriting=handwriting
-            )
-
-            if not page_images:
+            page_count = PDFService.get_page_count(pdf_path)
+            if not page_count:
                 raise Exception("No pages found in PDF")
 
-            # Process each page
-            all_text = []
-            all_blocks = []
+            # Use custom prompt if provided, otherwise build default
+            base_prompt = custom_prompt or self._build_prompt(languages, handwriting)
 
-            for page_num, page_img in enumerate(page_images, 1):
+            def ocr_page(page_num, page_img):
                 # Optimize and encode page image (resize only if > 5MB)
                 optimized_bytes = ImageOptimizer.optimize_and_encode(
                     page_img,
@@ -180,15 +174,10 @@ class ClaudeProvider(BaseOCRProvider):
 
                 image_data = base64.b64encode(optimized_bytes).decode('utf-8')
 
-                # Use custom prompt if provided, otherwise build default
-                if custom_prompt:
-                    prompt = custom_prompt
-                else:
-                    prompt = self._build_prompt(languages, handwriting)
-
                 # Add page number context for multi-page PDFs
-                if len(page_images) > 1:
-                    prompt = f"[Page {page_num}/{len(page_images)}] {prompt}"
+                prompt = base_prompt
+                if page_count > 1:
+                    prompt = f"[Page {page_num}/{page_count}] {prompt}"
 
                 # Call Claude API for this page
                 message = self.client.messages.create(
@@ -222,22 +211,19 @@ class ClaudeProvider(BaseOCRProvider):
                     if block.type == "text":
                         page_text += block.text
 
-                page_text = page_text.strip()
+                return page_text.strip()
 
-                if page_text:
-                    # Add page separator for multi-page PDFs
-                    if len(page_images) > 1:
-                        all_text.append(f"\n--- Page {page_num} ---\n{page_text}")
-                    else:
-                        all_text.append(page_text)
-
-                    all_blocks.append({
-                        'text': page_text,
-                        'page': page_num
-                    })
+            # Convert PDF pages lazily with optimal DPI and OCR them concurrently
+            page_results = PDFService.ocr_pages(
+                PDFService.iter_pdf_pages(pdf_path, handwriting=handwriting),
+                ocr_page
+            )
 
-            # Combine all pages
-            combined_text = '\n\n'.join(all_text)
+            # Combine all pages in page order
+            combined_text, all_blocks = PDFService.merge_page_texts(
+                ((page_result['page'], page_result['result']) for page_result in page_results),
+                page_count
+            )
 
             return {
                 'text': combined_text,
@@ -245,7 +231,8 @@ class ClaudeProvider(BaseOCRProvider):
                 'words': [],
                 'blocks': all_blocks,
                 'confidence': 0.95,
-                'pages_processed': len(page_images)
+                'pages_processed': len(page_results),
+                'page_timings': PDFService.page_timings(page_results)
             }
 
         except Exception as e:
@@ -1,4 +1,6 @@
 import os
+import threading
+from collections import OrderedDict
 from .base_provider import BaseOCRProvider
 
 try:
@@ -13,33 +15,45 @@ class EasyOCRProvider(BaseOCRProvider):
 
     def __init__(self):
         """Initialize EasyOCR provider"""
+        from app.config import Config
+
+        # Readers keyed by language set, least recently used first.
+        # Each entry has its own lock: a reader is used by one thread at a time.
+        self._readers = OrderedDict()
+        self._readers_lock = threading.Lock()
+        self.max_readers = max(1, Config.EASYOCR_MAX_READERS)
+
         # Check if EasyOCR is enabled
         enabled = os.getenv('EASYOCR_ENABLED', 'true').lower() in ('true', '1', 'yes')
 
         if not enabled:
             self._available = False
-            self.reader = None
             print("EasyOCR provider is disabled via EASYOCR_ENABLED environment variable")
             return
 
         if not EASYOCR_AVAILABLE:
             self._available = False
-            self.reader = None
             print("EasyOCR not available: easyocr package not installed")
             return
 
         try:
-            # Initialize with default languages (English)
-            # Will be reinitialized with specific languages when processing
-            self.reader = None
+            # Readers are created per language set on first use (or warmed below)
             self._available = True
-            self._current_languages = []
             self.use_gpu = os.getenv('EASYOCR_GPU', 'True').lower() == 'true'
             print("EasyOCR initialized successfully")
         except Exception as e:
             print(f"EasyOCR initialization failed: {e}")
             self._available = False
-            self.reader = None
+            return
+
+        if Config.EASYOCR_WARM_LANGUAGES:
+            # Load configured models in the background so startup is not blocked
+            threading.Thread(
+                target=self.warm_up,
+                args=(Config.EASYOCR_WARM_LANGUAGES,),
+                name='easyocr-warmup',
+                daemon=True
+            ).start()
 
     def get_name(self):
         return "easyocr"
@@ -47,6 +61,56 @@ class EasyOCRProvider(BaseOCRProvider):
     def is_available(self):
         return self._available and EASYOCR_AVAILABLE
 
+    def warm_up(self, language_sets):
+        """
+        Load readers ahead of the first request
+
+        Args:
+            language_sets: List of language code lists, e.g. [['en', 'hi'], ['en']]
+        """
+        for languages in language_sets[:self.max_readers]:
+            try:
+                self._get_reader_entry(self._map_languages(languages))
+            except Exception as e:
+                print(f"EasyOCR warm-up failed for {languages}: {e}")
+
+    def _get_reader_entry(self, easyocr_langs):
+        """
+        Get (or load) the cached reader entry for a language set
+
+        At most max_readers readers stay resident; the least recently used
+        one is dropped when another language set is loaded.
+
+        Returns:
+            dict with 'reader' and its 'lock'
+        """
+        key = tuple(sorted(easyocr_langs))
+
+        with self._readers_lock:
+            entry = self._readers.get(key)
+            if entry is None:
+                entry = {'reader': None, 'lock': threading.Lock()}
+                self._readers[key] = entry
+            self._readers.move_to_end(key)
+
+        if entry['reader'] is None:
+            # Holding the entry lock: concurrent requests for this language set wait for one load
+            with entry['lock']:
+                if entry['reader'] is None:
+                    print(f"Initializing EasyOCR with languages: {easyocr_langs}")
+                    entry['reader'] = easyocr.Reader(
+                        easyocr_langs,
+                        gpu=self.use_gpu,
+                        verbose=False
+                    )
+
+            with self._readers_lock:
+                while len(self._readers) > self.max_readers:
+                    evicted_key, _ = self._readers.popitem(last=False)
+                    print(f"Evicting EasyOCR reader for languages: {list(evicted_key)}")
+
+        return entry
+
     def process_image(self, image_path, languages=None, handwriting=False, custom_prompt=None):
         """Process image using EasyOCR"""
         if not self.is_available():
@@ -57,23 +121,17 @@ class EasyOCRProvider(BaseOCRProvider):
             # Map language codes to EasyOCR format
             easyocr_langs = self._map_languages(languages)
 
-            # Initialize or reinitialize reader if languages changed
-            if self.reader is None or set(easyocr_langs) != set(self._current_languages):
-                print(f"Initializing EasyOCR with languages: {easyocr_langs}")
-                self.reader = easyocr.Reader(
-                    easyocr_langs,
-                    gpu=self.use_gpu,
-                    verbose=False
-                )
-                self._current_languages = easyocr_langs
+            # Cached reader for this language set, used by one thread at a time
+            entry = self._get_reader_entry(easyocr_langs)
 
             # Process image
             # paragraph=True combines text into paragraphs
-            results = self.reader.readtext(
-                image_path,
-                detail=1,  # Return coordinates and confidence
-                paragraph=True if not handwriting else False
-            )
+            with entry['lock']:
+                results = entry['reader'].readtext(
+                    image_path,
+                    detail=1,  # Return coordinates and confidence
+                    paragraph=True if not handwriting else False
+                )
 
             # Extract text and blocks
             full_text = []
@@ -0,0 +1,106 @@
+"""
+Shared keep-alive HTTP sessions and cached availability probes for HTTP-based OCR providers
+"""
+
+import logging
+import threading
+import time
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+_sessions = {}
+_sessions_lock = threading.Lock()
+
+_probes = {}
+_probes_lock = threading.Lock()
+
+
+def _host_key(url):
+    """scheme://host:port of a URL"""
+    parts = urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc}"
+
+
+def get_session(url):
+    """
+    Get the shared requests.Session for a URL's host
+
+    One session per scheme/host/port, with a connection pool sized by
+    Config.HTTP_POOL_MAXSIZE so concurrent page requests reuse sockets.
+
+    Args:
+        url: Any URL on the target host (e.g. the provider base URL)
+
+    Returns:
+        requests.Session
+    """
+    key = _host_key(url)
+    session = _sessions.get(key)
+    if session is not None:
+        return session
+
+    with _sessions_lock:
+        session = _sessions.get(key)
+        if session is None:
+            from app.config import Config
+
+            session = requests.Session()
+            adapter = HTTPAdapter(
+                pool_connections=Config.HTTP_POOL_CONNECTIONS,
+                pool_maxsize=Config.HTTP_POOL_MAXSIZE
+            )
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+            if not Config.HTTP_KEEP_ALIVE:
+                session.headers['Connection'] = 'close'
+            _sessions[key] = session
+            logger.debug(f"Created HTTP session for {key} (pool size: {Config.HTTP_POOL_MAXSIZE})")
+    return session
+
+
+def cached_probe(key, probe, ttl=None):
+    """
+    Run an availability probe at most once per ttl seconds for a key
+
+    Args:
+        key: Cache key (e.g. the probed URL)
+        probe: Callable returning True/False
+        ttl: Seconds a result stays valid (default: Config.HTTP_AVAILABILITY_TTL)
+
+    Returns:
+        Probe result
+    """
+    if ttl is None:
+        from app.config import Config
+        ttl = Config.HTTP_AVAILABILITY_TTL
+
+    now = time.monotonic()
+    with _probes_lock:
+        entry = _probes.get(key)
+    if entry is not None and now - entry[0] < ttl:
+        return entry[1]
+
+    result = probe()
+    with _probes_lock:
+        _probes[key] = (time.monotonic(), result)
+    return result
+
+
+def invalidate_probe(key):
+    """Forget a cached probe result so the next check re-probes"""
+    with _probes_lock:
+        _probes.pop(key, None)
+
+
+def close_sessions():
+    """Close all shared sessions and forget cached probes"""
+    with _sessions_lock:
+        for session in _sessions.values():
+            session.close()
+        _sessions.clear()
+    with _probes_lock:
+        _probes.clear()
@@ -1,8 +1,8 @@
 import base64
 import os
-import requests
 import tempfile
 from .base_provider import BaseOCRProvider
+from . import http_pool
 
 try:
     from PyPDF2 import PdfReader
@@ -20,6 +20,9 @@ except ImportError:
 class LangChainProvider(BaseOCRProvider):
     """LangChain Ollama OCR Provider with hybrid PDF handling"""
 
+    # Minimum document contour area in full-resolution pixels
+    DOCUMENT_MIN_AREA = 10000
+
     def __init__(self):
         """
         Initialize LangChain provider
@@ -32,12 +35,13 @@ class LangChainProvider(BaseOCRProvider):
         # Check if LangChain is enabled
         enabled = os.getenv('LANGCHAIN_ENABLED', 'true').lower() in ('true', '1', 'yes')
 
+        self._enabled = enabled
         if not enabled:
             self._available = False
             logger.info("LangChain provider is disabled via LANGCHAIN_ENABLED environment variable")
             return
 
-        self._available = self._check_availability()
+        self._available = self.is_available()
 
         if self._available:
             logger.info(f"✓ LangChain provider initialized successfully (hybrid PDF mode enabled)")
@@ -48,6 +52,10 @@ class LangChainProvider(BaseOCRProvider):
         return "langchain"
 
     def is_available(self):
+        if not self._enabled:
+            return False
+        # The health check invokes the LLM: share its result and refresh it every HTTP_AVAILABILITY_TTL seconds
+        self._available = http_pool.cached_probe('langchain', self._check_availability)
         return self._available
 
     def _check_availability(self):
@@ -95,41 +103,25 @@ class LangChainProvider(BaseOCRProvider):
             logger.info("🔄 Converting to grayscale for processing...")
             gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
 
-            # Apply Gaussian blur to reduce noise
-            logger.info("🔄 Applying Gaussian blur to reduce noise...")
-            blurred = cv2.GaussianBlur(gray, (5, 5), 0)
-
-            # Edge detection
-            logger.info("🔄 Performing Canny edge detection...")
-            edges = cv2.Canny(blurred, 50, 150)
-
-            # Find contours
-            logger.info("🔍 Finding contours in the image...")
-            contours, _ = cv2.findContours(edges, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
-            logger.info(f"  - Found {len(contours)} contours")
-
-            # Find the largest rectangular contour (likely the paper)
-            largest_contour = None
-            max_area = 0
-            candidate_count = 0
-
-            logger.info("🔍 Searching for document rectangle (4-sided polygon)...")
-            for idx, contour in enumerate(contours):
-                area = cv2.contourArea(contour)
-                if area > 10000:  # Minimum area threshold
-                    # Approximate the contour to a polygon
-                    peri = cv2.arcLength(contour, True)
-                    approx = cv2.approxPolyDP(contour, 0.02 * peri, True)
-
-                    # If it has 4 corners, it's likely the paper
-                    if len(approx) == 4:
-                        candidate_count += 1
-                        logger.debug(f"  - Candidate {candidate_count}: area={area:,.0f}, corners={len(approx)}")
-                        if area > max_area:
-                            max_area = area
-                            largest_contour = approx
-
-            if largest_contour is None:
+            # Detect the document on a downscaled proxy (shared with DocumentDetector);
+            # corners are mapped back to full resolution and memoised per file hash.
+            # The minimum area stays a fixed pixel count, expressed as a ratio of this image,
+            # and the search stays LangChain's own: undilated edges, every contour, no
+            # bounding-rectangle fallback (the brightness crop below covers misses)
+            logger.info("🔍 Searching for document rectangle on downscaled proxy...")
+            from app.models.ocr_result_cache import OCRResultCache
+            from app.services.document_detector import DocumentDetector
+
+            document_quad = DocumentDetector.find_document_quad(
+                gray,
+                min_area_ratio=self.DOCUMENT_MIN_AREA / float(width * height),
+                cache_key=OCRResultCache.hash_file(image_path),
+                dilate=False,
+                max_contours=None,
+                rect_fallback=False
+            )
+
+            if document_quad is None:
                 logger.warning("⚠ Could not detect document rectangle")
                 logger.info("🔄 Falling back to brightness-based cropping...")
 
@@ -160,11 +152,9 @@ class LangChainProvider(BaseOCRProvider):
                 detection_method = "brightness-based"
             else:
                 logger.info(f"✓ Document rectangle detected!")
-                logger.info(f"  - Area: {max_area:,.0f} pixels ({max_area/(width*height)*100:.1f}% of image)")
-                logger.info(f"  - Evaluated {candidate_count} rectangular candidates")
 
                 # Get bounding rectangle
-                x, y, w, h = cv2.boundingRect(largest_contour)
+                x, y, w, h = cv2.boundingRect(document_quad.astype(np.int32))
                 logger.info(f"  - Bounding box: x={x}, y={y}, w={w}, h={h}")
 
                 # Add margin
@@ -317,7 +307,7 @@ class LangChainProvider(BaseOCRProvider):
                 }
             }
 
-            response = requests.post(
+            response = http_pool.get_session(service.ollama_host).post(
                 f"{service.ollama_host}/api/generate",
                 json=payload,
                 timeout=600
@@ -467,21 +457,16 @@ class LangChainProvider(BaseOCRProvider):
             # Get metadata
             metadata = PDFService.extract_pdf_metadata(pdf_path)
 
-            # Convert PDF pages to PIL Image objects
-            page_images = PDFService.pdf_to_images(
-                pdf_path,
-                handwriting=handwriting
-            )
-
-            if not page_images:
+            page_count = metadata.get('page_count') or PDFService.get_page_count(pdf_path)
+            if not page_count:
                 raise Exception("No pages found in PDF")
 
-            # Process each page with OCR
-            all_text = []
-            all_blocks = []
             service = get_langchain_service()
 
-            for page_num, page_img in enumerate(page_images, 1):
+            # Use custom prompt if provided, otherwise build default
+            base_prompt = custom_prompt or self._build_prompt(languages, handwriting)
+
+            def ocr_page(page_num, page_img):
                 # Optimize and encode page image
                 image_data = base64.b64encode(
                     ImageOptimizer.optimize_and_encode(
@@ -493,15 +478,10 @@ class LangChainProvider(BaseOCRProvider):
                     )
                 ).decode('utf-8')
 
-                # Use custom prompt if provided, otherwise build default
-                if custom_prompt:
-                    prompt = custom_prompt
-                else:
-                    prompt = self._build_prompt(languages, handwriting)
-
                 # Add page number context for multi-page PDFs
-                if len(page_images) > 1:
-                    prompt = f"[Page {page_num}/{len(page_images)}] {prompt}"
+                prompt = base_prompt
+                if page_count > 1:
+                    prompt = f"[Page {page_num}/{page_count}] {prompt}"
 
                 # Use Ollama's proper multimodal API instead of embedding image in text
                 payload = {
@@ -516,7 +496,7 @@ class LangChainProvider(BaseOCRProvider):
                     }
                 }
 
-                response = requests.post(
+                response = http_pool.get_session(service.ollama_host).post(
                     f"{service.ollama_host}/api/generate",
                     json=payload,
                     timeout=600
@@ -525,24 +505,21 @@ class LangChainProvider(BaseOCRProvider):
                 if response.status_code != 200:
                     raise Exception(f"Ollama API error on page {page_num}: {response.status_code} - {response.text}")
 
-                result = response.json()
-                page_text = result.get('response', '').strip()
-
-                if page_text:
-                    # Add page separator for multi-page PDFs
-                    if len(page_images) > 1:
-                        all_text.append(f"\n--- Page {page_num} ---\n{page_text}")
-                    else:
-                        all_text.append(page_text)
+                return response.json().get('response', '').strip()
 
-                    all_blocks.append({
-                        'text': page_text,
-                        'page': page_num,
-                        'source': 'ocr'
-                    })
+            # Convert PDF pages lazily and OCR them concurrently
+            page_results = PDFService.ocr_pages(
+                PDFService.iter_pdf_pages(pdf_path, handwriting=handwriting),
+                ocr_page
+            )
 
-            # Combine all pages
-            combined_text = '\n\n'.join(all_text)
+            # Combine all pages in page order
+            combined_text, all_blocks = PDFService.merge_page_texts(
+                ((page_result['page'], page_result['result']) for page_result in page_results),
+                page_count
+            )
+            for block in all_blocks:
+                block['source'] = 'ocr'
 
             return {
                 'text': combined_text,
@@ -550,9 +527,10 @@ class LangChainProvider(BaseOCRProvider):
                 'words': [],
                 'blocks': all_blocks,
                 'confidence': 0.95,
-                'pages_processed': len(page_images),
+                'pages_processed': len(page_results),
                 'processing_method': 'ocr_gemma3',
-                'metadata': metadata
+                'metadata': metadata,
+                'page_timings': PDFService.page_timings(page_results)
             }
 
         except Exception as e:
@@ -2,6 +2,7 @@ import requests
 import base64
 import os
 from .base_provider import BaseOCRProvider
+from . import http_pool
 
 class LlamaCppProvider(BaseOCRProvider):
     """llama.cpp OCR Provider for running local LLMs"""
@@ -26,19 +27,23 @@ class LlamaCppProvider(BaseOCRProvider):
 
         self.host = host or os.getenv('LLAMACPP_HOST', 'http://localhost:8000')
         self.model = model or os.getenv('LLAMACPP_MODEL', 'gemma-3-12b')
-        self._available = self._check_availability()
+        self._available = self.is_available()
 
     def get_name(self):
         return "llamacpp"
 
     def is_available(self):
+        if not self.host:
+            return False
+        # Probe result is shared by all instances and refreshed every HTTP_AVAILABILITY_TTL seconds
+        self._available = http_pool.cached_probe(f"{self.host}/health", self._check_availability)
         return self._available
 
     def _check_availability(self):
         """Check if llama.cpp server is available"""
         try:
             # llama.cpp provides /health endpoint
-            response = requests.get(f"{self.host}/health", timeout=5)
+            response = http_pool.get_session(self.host).get(f"{self.host}/health", timeout=5)
             return response.status_code == 200
         except Exception as e:
             print(f"llama.cpp server not available at {self.host}: {e}")
@@ -89,7 +94,7 @@ class LlamaCppProvider(BaseOCRProvider):
                 "stream": False
             }
 
-            response = requests.post(
+            response = http_pool.get_session(self.host).post(
                 f"{self.host}/completion",
                 json=payload,
                 timeout=600
@@ -118,25 +123,19 @@ class LlamaCppProvider(BaseOCRProvider):
             raise Exception(f"llama.cpp OCR processing failed: {str(e)}")
 
     def _process_pdf(self, pdf_path, languages=None, handwriting=False, custom_prompt=None):
-        """Process PDF by converting pages to images and processing each page"""
+        """Process PDF by streaming pages to a bounded pool of concurrent page requests"""
         from app.services.pdf_service import PDFService
         from app.services.image_optimizer import ImageOptimizer
 
         try:
-            # Convert PDF pages to PIL Image objects with optimal DPI
-            page_images = PDFService.pdf_to_images(
-                pdf_path,
-                handwriting=handwriting
-            )
-
-            if not page_images:
+            page_count = PDFService.get_page_count(pdf_path)
+            if not page_count:
                 raise Exception("No pages found in PDF")
 
-            # Process each page
-            all_text = []
-            all_blocks = []
+            # Use custom prompt if provided, otherwise build default
+            base_prompt = custom_prompt or self._build_prompt(languages, handwriting)
 
-            for page_num, page_img in enumerate(page_images, 1):
+            def ocr_page(page_num, page_img):
                 # Optimize and encode page image
                 image_data = base64.b64encode(
                     ImageOptimizer.optimize_and_encode(
@@ -148,15 +147,10 @@ class LlamaCppProvider(BaseOCRProvider):
                     )
                 ).decode('utf-8')
 
-                # Use custom prompt if provided, otherwise build default
-                if custom_prompt:
-                    prompt = custom_prompt
-                else:
-                    prompt = self._build_prompt(languages, handwriting)
-
                 # Add page number context for multi-page PDFs
-                if len(page_images) > 1:
-                    prompt = f"{prompt}\n\n(This is page {page_num} of {len(page_images)})"
+                prompt = base_prompt
+                if page_count > 1:
+                    prompt = f"{prompt}\n\n(This is page {page_num} of {page_count})"
 
                 # Call llama.cpp API
                 payload = {
@@ -168,7 +162,7 @@ class LlamaCppProvider(BaseOCRProvider):
                     "stream": False
                 }
 
-                response = requests.post(
+                response = http_pool.get_session(self.host).post(
                     f"{self.host}/completion",
                     json=payload,
                     timeout=600
@@ -177,23 +171,28 @@ class LlamaCppProvider(BaseOCRProvider):
                 if response.status_code != 200:
                     raise Exception(f"llama.cpp API error on page {page_num}: {response.status_code}")
 
-                result = response.json()
-                page_text = result.get('content', '').strip()
-                all_text.append(page_text)
-                all_blocks.append({
-                    'page': page_num,
-                    'text': page_text
-                })
+                return response.json().get('content', '').strip()
+
+            # Convert PDF pages lazily with optimal DPI and OCR them concurrently
+            page_results = PDFService.ocr_pages(
+                PDFService.iter_pdf_pages(pdf_path, handwriting=handwriting),
+                ocr_page
+            )
 
-            # Combine results from all pages
-            combined_text = '\n\n'.join(all_text)
+            # Combine results from all pages in page order
+            all_blocks = [
+                {'page': page_result['page'], 'text': page_result['result']}
+                for page_result in page_results
+            ]
+            combined_text = '\n\n'.join(block['text'] for block in all_blocks)
 
             return {
                 'text': combined_text,
                 'full_text': combined_text,
                 'words': [],
                 'blocks': all_blocks,
-                'confidence': 0.95
+                'confidence': 0.95,
+                'page_timings': PDFService.page_timings(page_results)
             }
 
         except Exception as e:
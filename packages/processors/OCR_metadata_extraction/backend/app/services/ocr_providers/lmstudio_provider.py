@@ -1,9 +1,9 @@
 import requests
-import base64
 import os
 import logging
 from datetime import datetime
 from .base_provider import BaseOCRProvider
+from . import http_pool
 
 # Set up logger for LM Studio provider
 logger = logging.getLogger(__name__)
@@ -42,6 +42,7 @@ class LMStudioProvider(BaseOCRProvider):
         self.api_key = api_key or os.getenv('LMSTUDIO_API_KEY', 'lm-studio')
         self.timeout = int(os.getenv('LMSTUDIO_TIMEOUT', '600'))
         self.max_tokens = int(os.getenv('LMSTUDIO_MAX_TOKENS', '8192'))  # Increased for JSON responses
+        self.max_image_dimension = Config.LMSTUDIO_MAX_IMAGE_DIMENSION
         self.skip_availability_check = os.getenv('LMSTUDIO_SKIP_AVAILABILITY_CHECK', 'false').lower() in ('true', '1', 'yes')
 
         # Structured output configuration
@@ -71,14 +72,18 @@ class LMStudioProvider(BaseOCRProvider):
         return "lmstudio"
 
     def is_available(self):
-        # Lazy availability check - check on first call, then cache result
-        if not self._availability_checked:
-            self._available = self._check_availability()
-            self._availability_checked = True
-            if self._available:
+        # Disabled or check skipped: fixed result
+        if self._availability_checked:
+            return self._available
+
+        # Lazy availability check, shared by all instances and refreshed every HTTP_AVAILABILITY_TTL seconds
+        available = http_pool.cached_probe(f"{self.host}/v1/models", self._check_availability)
+        if available != self._available:
+            if available:
                 logger.info("LM Studio provider is available and ready")
             else:
                 logger.warning(f"LM Studio provider is NOT available at {self.host}")
+        self._available = available
         return self._available
 
     def _check_availability(self):
@@ -96,7 +101,7 @@ class LMStudioProvider(BaseOCRProvider):
             if self.api_key:
                 headers["Authorization"] = f"Bearer {self.api_key}"
 
-            response = requests.get(
+            response = http_pool.get_session(self.host).get(
                 f"{self.host}/v1/models",
                 headers=headers,
                 timeout=5,  # Quick 5-second timeout for availability check
@@ -143,12 +148,14 @@ class LMStudioProvider(BaseOCRProvider):
             from PIL import Image, ImageEnhance
             from app.services.image_optimizer import ImageOptimizer
 
-            logger.debug(f"Opening image file: {image_path}")
-            img = Image.open(image_path)
-            logger.debug(f"Image loaded: size={img.size}, format={img.format}")
+            img = None
 
             # Enhance image for better OCR accuracy (for typed documents)
             if not handwriting:
+                logger.debug(f"Opening image file: {image_path}")
+                img = Image.open(image_path)
+                logger.debug(f"Image loaded: size={img.size}, format={img.format}")
+
                 logger.debug("Applying image enhancement for document OCR")
                 # Increase contrast for better text clarity
                 enhancer = ImageEnhance.Contrast(img)
@@ -160,17 +167,13 @@ class LMStudioProvider(BaseOCRProvider):
 
                 logger.debug("Image enhancement applied")
 
-            # Optimize and encode image - use PNG (lossless) for better OCR accuracy
-            logger.debug("Encoding image to PNG format (lossless) for maximum OCR accuracy")
-            image_bytes = ImageOptimizer.optimize_and_encode(
+            # Encode losslessly for OCR accuracy; an unmodified file is sent as-is
+            image_data, mime_type, encoding = ImageOptimizer.encode_for_model(
                 img,
-                target_size_mb=5.0,
-                auto_optimize=False,  # Disable size optimization for OCR
-                auto_crop=False,
-                format='PNG'  # Use PNG for lossless encoding
+                source_path=image_path,
+                max_dimension=self.max_image_dimension
             )
-            image_data = base64.b64encode(image_bytes).decode('utf-8')
-            logger.debug(f"Image encoded to PNG, size: {len(image_data)} bytes")
+            logger.debug(f"Image encoded as {encoding['format']}, size: {encoding['base64_bytes']} bytes")
 
             # Determine if structured output should be used
             if enable_structured_output is None:
@@ -191,8 +194,6 @@ class LMStudioProvider(BaseOCRProvider):
 
             logger.debug(f"Prompt: {prompt[:100]}..." if len(prompt) > 100 else f"Prompt: {prompt}")
 
-            mime_type = 'image/png'  # PNG is lossless, better for OCR
-
             # Call LM Studio API using OpenAI-compatible format
             logger.debug(f"Preparing API request to {self.host}/v1/chat/completions")
             payload = {
@@ -228,7 +229,7 @@ class LMStudioProvider(BaseOCRProvider):
             logger.debug(f"Sending request with model={self.model}, max_tokens={self.max_tokens}, timeout={self.timeout}s")
             api_start = datetime.now()
 
-            response = requests.post(
+            response = http_pool.get_session(self.host).post(
                 f"{self.host}/v1/chat/completions",
                 json=payload,
                 headers=headers,
@@ -279,7 +280,8 @@ class LMStudioProvider(BaseOCRProvider):
                 'full_text': ocr_text,
                 'words': [],
                 'blocks': [{'text': ocr_text}] if ocr_text else [],
-                'confidence': 0.95  # LM Studio doesn't provide confidence scores
+                'confidence': 0.95,  # LM Studio doesn't provide confidence scores
+                'encoding': encoding
             }
 
             # Add structured data if available
@@ -311,7 +313,7 @@ class LMStudioProvider(BaseOCRProvider):
             raise Exception(f"LM Studio OCR processing failed: {str(e)}")
 
     def _process_pdf(self, pdf_path, languages=None, handwriting=False, custom_prompt=None, enable_structured_output=None):
-        """Process PDF by converting pages to images and processing each page"""
+        """Process PDF by streaming pages to a bounded pool of concurrent page requests"""
         from app.services.pdf_service import PDFService
         from app.services.image_optimizer import ImageOptimizer
 
@@ -319,58 +321,40 @@ class LMStudioProvider(BaseOCRProvider):
         logger.info(f"Starting PDF processing: {pdf_path}")
 
         try:
-            # Convert PDF pages to PIL Image objects with optimal DPI
-            logger.debug("Converting PDF to images")
-            page_images = PDFService.pdf_to_images(
-                pdf_path,
-                handwriting=handwriting
-            )
+            page_count = PDFService.get_page_count(pdf_path)
+            logger.info(f"PDF has {page_count} page(s)")
 
-            logger.info(f"PDF converted to {len(page_images)} page(s)")
-
-            if not page_images:
+            if not page_count:
                 raise Exception("No pages found in PDF")
 
             # Determine if structured output should be used
             if enable_structured_output is None:
                 enable_structured_output = self.enable_structured_output
 
-            # Process each page
-            all_text = []
-            all_blocks = []
-            all_structured_pages = []
-            page_count = len(page_images)
+            # Use custom prompt if provided, otherwise build default
+            if custom_prompt:
+                base_prompt = custom_prompt
+                page_enable_structured = False
+            elif enable_structured_output:
+                base_prompt = self._build_structured_prompt(languages, handwriting)
+                page_enable_structured = True
+            else:
+                base_prompt = self._build_prompt(languages, handwriting)
+                page_enable_structured = False
 
-            for page_num, page_img in enumerate(page_images, 1):
+            def ocr_page(page_num, page_img):
                 logger.debug(f"Processing page {page_num}/{page_count}")
 
-                # Optimize and encode page image - use PNG for lossless quality
-                image_data = base64.b64encode(
-                    ImageOptimizer.optimize_and_encode(
-                        page_img,
-                        target_size_mb=5.0,
-                        auto_optimize=False,  # Disable size optimization
-                        auto_crop=False,
-                        format='PNG'  # Lossless format
-                    )
-                ).decode('utf-8')
-
-                # Use custom prompt if provided, otherwise build default
-                if custom_prompt:
-                    prompt = custom_prompt
-                    page_enable_structured = False
-                else:
-                    if enable_structured_output:
-                        prompt = self._build_structured_prompt(languages, handwriting)
-                        page_enable_structured = True
-                    else:
-                        prompt = self._build_prompt(languages, handwriting)
-                        page_enable_structured = False
+                # Encode page image losslessly, capped at the model's input size
+                image_data, mime_type, encoding = ImageOptimizer.encode_for_model(
+                    page_img,
+                    max_dimension=self.max_image_dimension
+                )
 
                 # Add page number context for multi-page PDFs
+                prompt = base_prompt
                 if page_count > 1:
                     prompt = f"[Page {page_num}/{page_count}] {prompt}"
-                    logger.debug(f"Added page context to prompt")
 
                 # Call LM Studio API for this page
                 logger.debug(f"Calling LM Studio API for page {page_num}")
@@ -389,7 +373,7 @@ class LMStudioProvider(BaseOCRProvider):
                                 {
                                     "type": "image_url",
                                     "image_url": {
-                                        "url": f"data:image/png;base64,{image_data}"
+                                        "url": f"data:{mime_type};base64,{image_data}"
                                     }
                                 }
                             ]
@@ -406,7 +390,7 @@ class LMStudioProvider(BaseOCRProvider):
                 if self.api_key:
                     headers["Authorization"] = f"Bearer {self.api_key}"
 
-                response = requests.post(
+                response = http_pool.get_session(self.host).post(
                     f"{self.host}/v1/chat/completions",
                     json=payload,
                     headers=headers,
@@ -442,25 +426,27 @@ class LMStudioProvider(BaseOCRProvider):
                         page_text = parsed_json['ocr_text']
                         page_structured = parsed_json.get('structured_data', {})
                         logger.debug(f"Page {page_num} structured data extracted")
-                        all_structured_pages.append(page_structured)
                     else:
                         logger.debug(f"Page {page_num} JSON parsing failed or missing ocr_text, using text-only")
-                        page_structured = None
 
-                if page_text:
-                    # Add page separator for multi-page PDFs
-                    if page_count > 1:
-                        all_text.append(f"\n--- Page {page_num} ---\n{page_text}")
-                    else:
-                        all_text.append(page_text)
+                return {'text': page_text, 'structured': page_structured, 'encoding': encoding}
 
-                    all_blocks.append({
-                        'text': page_text,
-                        'page': page_num
-                    })
+            # Convert PDF pages lazily with optimal DPI and OCR them concurrently
+            page_results = PDFService.ocr_pages(
+                PDFService.iter_pdf_pages(pdf_path, handwriting=handwriting),
+                ocr_page
+            )
+
+            all_structured_pages = [
+                page_result['result']['structured'] for page_result in page_results
+                if page_result['result']['structured'] is not None
+            ]
 
-            # Combine all pages
-            combined_text = '\n\n'.join(all_text)
+            # Combine all pages in page order
+            combined_text, all_blocks = PDFService.merge_page_texts(
+                ((page_result['page'], page_result['result']['text']) for page_result in page_results),
+                page_count
+            )
             total_duration = (datetime.now() - start_time).total_seconds()
 
             logger.info(
@@ -475,7 +461,11 @@ class LMStudioProvider(BaseOCRProvider):
                 'words': [],
                 'blocks': all_blocks,
                 'confidence': 0.95,
-                'pages_processed': page_count
+                'pages_processed': page_count,
+                'page_timings': PDFService.page_timings(page_results),
+                'encoding': ImageOptimizer.summarize_encoding(
+                    [page_result['result']['encoding'] for page_result in page_results]
+                )
             }
 
             # Add structured data if any pages provided it
@@ -2,6 +2,7 @@ import requests
 import base64
 import os
 from .base_provider import BaseOCRProvider
+from . import http_pool
 
 class OllamaProvider(BaseOCRProvider):
     """Ollama (Gemma3) OCR Provider"""
@@ -29,7 +30,7 @@ class OllamaProvider(BaseOCRProvider):
 
         self.host = host or os.getenv('OLLAMA_HOST', 'http://ollama:11434')
         self.model = model or os.getenv('OLLAMA_MODEL', 'llama3.2-vision')
-        self._available = self._check_availability()
+        self._available = self.is_available()
         
         if self._available:
             logger.info(f"✓ Ollama provider initialized successfully (model: {self.model}, host: {self.host})")
@@ -40,12 +41,16 @@ class OllamaProvider(BaseOCRProvider):
         return "ollama"
 
     def is_available(self):
+        if not self.host:
+            return False
+        # Probe result is shared by all instances and refreshed every HTTP_AVAILABILITY_TTL seconds
+        self._available = http_pool.cached_probe(f"{self.host}/api/tags", self._check_availability)
         return self._available
 
     def _check_availability(self):
         """Check if Ollama server is available"""
         try:
-            response = requests.get(f"{self.host}/api/tags", timeout=5)
+            response = http_pool.get_session(self.host).get(f"{self.host}/api/tags", timeout=5)
             return response.status_code == 200
         except Exception as e:
             print(f"Ollama server not available: {e}")
@@ -97,7 +102,7 @@ class OllamaProvider(BaseOCRProvider):
                 }
             }
 
-            response = requests.post(
+            response = http_pool.get_session(self.host).post(
                 f"{self.host}/api/generate",
                 json=payload,
                 timeout=600
@@ -127,26 +132,19 @@ class OllamaProvider(BaseOCRProvider):
             raise Exception(f"Ollama OCR processing failed: {str(e)}")
 
     def _process_pdf(self, pdf_path, languages=None, handwriting=False, custom_prompt=None):
-        """Process PDF by converting pages to images and processing each page"""
+        """Process PDF by streaming pages to a bounded pool of concurrent page requests"""
         from app.services.pdf_service import PDFService
         from app.services.image_optimizer import ImageOptimizer
 
         try:
-            # Convert PDF pages to PIL Image objects with optimal DPI
-            # DPI is automatically selected based on handwriting flag
-            page_images = PDFService.pdf_to_images(
-                pdf_path,
-                handwriting=handwriting
-            )
-
-            if not page_images:
+            page_count = PDFService.get_page_count(pdf_path)
+            if not page_count:
                 raise Exception("No pages found in PDF")
 
-            # Process each page
-            all_text = []
-            all_blocks = []
+            # Use custom prompt if provided, otherwise build default
+            base_prompt = custom_prompt or self._build_prompt(languages, handwriting)
 
-            for page_num, page_img in enumerate(page_images, 1):
+            def ocr_page(page_num, page_img):
                 # Optimize and encode page image (resize only if > 5MB)
                 image_data = base64.b64encode(
                     ImageOptimizer.optimize_and_encode(
@@ -158,15 +156,10 @@ class OllamaProvider(BaseOCRProvider):
                     )
                 ).decode('utf-8')
 
-                # Use custom prompt if provided, otherwise build default
-                if custom_prompt:
-                    prompt = custom_prompt
-                else:
-                    prompt = self._build_prompt(languages, handwriting)
-
                 # Add page number context for multi-page PDFs
-                if len(page_images) > 1:
-                    prompt = f"[Page {page_num}/{len(page_images)}] {prompt}"
+                prompt = base_prompt
+                if page_count > 1:
+                    prompt = f"[Page {page_num}/{page_count}] {prompt}"
 
                 # Call Ollama API for this page
                 payload = {
@@ -180,7 +173,7 @@ class OllamaProvider(BaseOCRProvider):
                     }
                 }
 
-                response = requests.post(
+                response = http_pool.get_session(self.host).post(
                     f"{self.host}/api/generate",
                     json=payload,
                     timeout=600
@@ -189,23 +182,19 @@ class OllamaProvider(BaseOCRProvider):
                 if response.status_code != 200:
                     raise Exception(f"Ollama API error on page {page_num}: {response.status_code} - {response.text}")
 
-                result = response.json()
-                page_text = result.get('response', '').strip()
-
-                if page_text:
-                    # Add page separator for multi-page PDFs
-                    if len(page_images) > 1:
-                        all_text.append(f"\n--- Page {page_num} ---\n{page_text}")
-                    else:
-                        all_text.append(page_text)
+                return response.json().get('response', '').strip()
 
-                    all_blocks.append({
-                        'text': page_text,
-                        'page': page_num
-                    })
+            # Convert PDF pages lazily with optimal DPI (selected from handwriting flag)
+            page_results = PDFService.ocr_pages(
+                PDFService.iter_pdf_pages(pdf_path, handwriting=handwriting),
+                ocr_page
+            )
 
-            # Combine all pages
-            combined_text = '\n\n'.join(all_text)
+            # Combine all pages in page order
+            combined_text, all_blocks = PDFService.merge_page_texts(
+                ((page_result['page'], page_result['result']) for page_result in page_results),
+                page_count
+            )
 
             return {
                 'text': combined_text,
@@ -213,7 +202,8 @@ class OllamaProvider(BaseOCRProvider):
                 'words': [],
                 'blocks': all_blocks,
                 'confidence': 0.95,
-                'pages_processed': len(page_images)
+                'pages_processed': len(page_results),
+                'page_timings': PDFService.page_timings(page_results)
             }
 
         except Exception as e:
@@ -0,0 +1,166 @@
+"""
+Lazy OCR provider registry: providers are imported and constructed on first use
+"""
+
+import importlib
+import logging
+import threading
+import time
+from collections.abc import Mapping
+
+logger = logging.getLogger(__name__)
+
+# Provider name -> (module inside app.services.ocr_providers, class name)
+PROVIDER_CLASSES = {
+    'google_vision': ('google_vision_provider', 'GoogleVisionProvider'),
+    'google_lens': ('google_lens_provider', 'GoogleLensProvider'),
+    'serpapi_google_lens': ('serpapi_google_lens_provider', 'SerpAPIGoogleLensProvider'),
+    'chrome_lens': ('chrome_lens_provider', 'ChromeLensProvider'),
+    'azure': ('azure_provider', 'AzureComputerVisionProvider'),
+    'ollama': ('ollama_provider', 'OllamaProvider'),
+    'vllm': ('vllm_provider', 'VLLMProvider'),
+    'tesseract': ('tesseract_provider', 'TesseractProvider'),
+    'easyocr': ('easyocr_provider', 'EasyOCRProvider'),
+    'llamacpp': ('llamacpp_provider', 'LlamaCppProvider'),
+    'claude': ('claude_provider', 'ClaudeProvider'),
+    'lmstudio': ('lmstudio_provider', 'LMStudioProvider'),
+    'langchain': ('langchain_provider', 'LangChainProvider')
+}
+
+
+class ProviderRegistry(Mapping):
+    """
+    Read-only mapping of provider name -> provider instance
+
+    A provider module is imported and its class constructed the first time
+    the provider is looked up; the instance is then shared. is_available()
+    results are cached for availability_ttl seconds.
+    """
+
+    def __init__(self, provider_classes=None, availability_ttl=None):
+        """
+        Args:
+            provider_classes: Name -> (module, class) mapping (default: PROVIDER_CLASSES)
+            availability_ttl: Seconds an is_available() result is reused (default: Config.OCR_PROVIDER_AVAILABILITY_TTL)
+        """
+        if availability_ttl is None:
+            from app.config import Config
+            availability_ttl = Config.OCR_PROVIDER_AVAILABILITY_TTL
+
+        self._classes = dict(provider_classes or PROVIDER_CLASSES)
+        self._availability_ttl = availability_ttl
+        self._instances = {}
+        self._errors = {}
+        self._timings = {}
+        self._availability = {}
+        self._locks = {name: threading.Lock() for name in self._classes}
+
+    def __getitem__(self, name):
+        if name not in self._classes:
+            raise KeyError(name)
+        provider = self._load(name)
+        if provider is None:
+            raise KeyError(name)
+        return provider
+
+    def __iter__(self):
+        return iter(self._classes)
+
+    def __len__(self):
+        return len(self._classes)
+
+    def __contains__(self, name):
+        return name in self._classes
+
+    def _load(self, name):
+        """Import and construct a provider once; returns None if that failed"""
+        if name in self._instances:
+            return self._instances[name]
+        if name in self._errors:
+            return None
+
+        with self._locks[name]:
+            if name in self._instances:
+                return self._instances[name]
+            if name in self._errors:
+                return None
+
+            module_name, class_name = self._classes[name]
+            timing = {}
+            try:
+                start = time.perf_counter()
+                module = importlib.import_module(f"app.services.ocr_providers.{module_name}")
+                provider_class = getattr(module, class_name)
+                timing['import_ms'] = round((time.perf_counter() - start) * 1000, 1)
+
+                start = time.perf_counter()
+                provider = provider_class()
+                timing['init_ms'] = round((time.perf_counter() - start) * 1000, 1)
+            except Exception as e:
+                logger.error(f"Failed to load OCR provider '{name}': {e}")
+                timing['error'] = str(e)
+                self._timings[name] = timing
+                self._errors[name] = str(e)
+                return None
+
+            self._timings[name] = timing
+            self._instances[name] = provider
+            logger.info(
+                f"Loaded OCR provider '{name}' (import: {timing['import_ms']}ms, init: {timing['init_ms']}ms)"
+            )
+            return provider
+
+    def is_loaded(self, name):
+        """Whether the provider has already been constructed"""
+        return name in self._instances
+
+    def is_available(self, name):
+        """
+        Check provider availability, loading it if needed
+
+        Args:
+            name: Provider name
+
+        Returns:
+            False if unknown, failed to load or unavailable; the result is cached for availability_ttl seconds
+        """
+        if name not in self._classes:
+            return False
+
+        cached = self._availability.get(name)
+        now = time.monotonic()
+        if cached is not None and now - cached[0] < self._availability_ttl:
+            return cached[1]
+
+        provider = self._load(name)
+        try:
+            available = bool(provider is not None and provider.is_available())
+        except Exception as e:
+            logger.warning(f"Availability check for OCR provider '{name}' failed: {e}")
+            available = False
+
+        self._availability[name] = (time.monotonic(), available)
+        return available
+
+    def timings(self):
+        """
+        Per-provider import/init timings of loaded providers
+
+        Returns:
+            dict: name -> {'import_ms', 'init_ms'} (or {'error'} if loading failed)
+        """
+        return {name: dict(timing) for name, timing in self._timings.items()}
+
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def get_provider_registry():
+    """Process-wide provider registry shared by all OCRService instances"""
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = ProviderRegistry()
+    return _registry
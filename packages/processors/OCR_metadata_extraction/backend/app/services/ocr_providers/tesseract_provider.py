@@ -1,4 +1,7 @@
+import io
 import os
+import shlex
+import subprocess
 from PIL import Image
 from .base_provider import BaseOCRProvider
 from ..pdf_service import PDFService
@@ -55,117 +58,273 @@ class TesseractProvider(BaseOCRProvider):
         return self._available and TESSERACT_AVAILABLE
 
     def process_image(self, image_path, languages=None, handwriting=False, custom_prompt=None):
-        """Process image or PDF using Tesseract OCR"""
+        """
+        Process an image, a PDF or an in-memory PIL image using Tesseract OCR
+
+        Args:
+            image_path: Path to an image or PDF file, or a PIL Image
+            languages: List of language codes
+            handwriting: Boolean for handwriting detection
+            custom_prompt: Not used by Tesseract
+
+        Returns:
+            dict: OCR results with text, words, blocks and confidence
+        """
+        from app.config import Config
+
         if not self.is_available():
             raise Exception("Tesseract provider is not available")
 
         # Note: custom_prompt is not used by Tesseract OCR
         try:
-            # Check if file is a PDF and convert if necessary
-            temp_image_paths = []
-            image_paths_to_process = []
-            
-            if PDFService.is_pdf(image_path):
+            # Map language codes to Tesseract format
+            lang = self._map_languages(languages)
+
+            # Configure Tesseract
+            config = '--psm 3'  # Fully automatic page segmentation
+
+            # For handwriting, use different PSM mode
+            if handwriting:
+                config = '--psm 6'  # Assume a single uniform block of text
+
+            in_memory = isinstance(image_path, Image.Image)
+            is_pdf = not in_memory and PDFService.is_pdf(image_path)
+            page_timings = None
+
+            if is_pdf:
                 try:
-                    temp_image_paths = PDFService.pdf_to_temp_images(image_path, dpi=150)
-                    image_paths_to_process = temp_image_paths
+                    page_count = PDFService.get_page_count(image_path)
                 except Exception as pdf_error:
                     raise Exception(f"Failed to convert PDF to images: {str(pdf_error)}")
+
+                def ocr_page(page_num, image):
+                    try:
+                        return self._ocr_page(image, lang, config)
+                    except Exception as page_error:
+                        if page_count > 1:
+                            return {'error': str(page_error)}
+                        raise
+
+                # Rasterise pages lazily in memory; each page is one tesseract process,
+                # run in parallel within this task's share of the cores
+                page_results = PDFService.ocr_pages(
+                    PDFService.iter_pdf_pages(image_path, dpi=Config.TESSERACT_PDF_DPI),
+                    ocr_page,
+                    max_workers=self._page_workers()
+                )
+                page_timings = PDFService.page_timings(page_results)
+            elif in_memory:
+                page_count = 1
+                page_results = [{'page': 1, 'result': self._ocr_page(image_path, lang, config)}]
             else:
-                image_paths_to_process = [image_path]
-            
-            # Aggregate results from all pages
+                page_count = 1
+                with Image.open(image_path) as image:
+                    page_results = [{'page': 1, 'result': self._ocr_page(image, lang, config)}]
+
+            # Aggregate results from all pages in page order
             all_text = []
+            all_words = []
             all_blocks = []
             all_confidences = []
-            
-            for page_idx, img_path in enumerate(image_paths_to_process):
-                try:
-                    # Open image
-                    image = Image.open(img_path)
-
-                    # Convert RGBA to RGB if necessary
-                    if image.mode == 'RGBA':
-                        image = image.convert('RGB')
-                    # Convert other single-channel modes to RGB
-                    elif image.mode not in ('RGB', 'L'):
-                        image = image.convert('RGB')
-
-                    # Map language codes to Tesseract format
-                    lang = self._map_languages(languages)
-
-                    # Configure Tesseract
-                    config = '--psm 3'  # Fully automatic page segmentation
-
-                    # For handwriting, use different PSM mode
-                    if handwriting:
-                        config = '--psm 6'  # Assume a single uniform block of text
-
-                    # Extract text
-                    text = pytesseract.image_to_string(image, lang=lang, config=config)
-                    
-                    # Add page indicator for PDFs
-                    if len(image_paths_to_process) > 1:
-                        text = f"--- Page {page_idx + 1} ---\n{text}"
-                    
-                    all_text.append(text)
-
-                    # Get detailed data with bounding boxes and confidence
-                    data = pytesseract.image_to_data(image, lang=lang, config=config, output_type=pytesseract.Output.DICT)
-
-                    # Extract blocks with confidence
-                    current_block = {'text': '', 'confidence': 0, 'words': 0}
-
-                    for i in range(len(data['text'])):
-                        if data['text'][i].strip():
-                            conf = float(data['conf'][i])
-                            if conf > 0:  # Only include recognized text
-                                current_block['text'] += data['text'][i] + ' '
-                                current_block['confidence'] += conf
-                                current_block['words'] += 1
-
-                        # End of line or block
-                        if data['block_num'][i] != data['block_num'][min(i + 1, len(data['text']) - 1)]:
-                            if current_block['words'] > 0:
-                                current_block['confidence'] /= current_block['words']
-                                all_blocks.append({
-                                    'text': current_block['text'].strip(),
-                                    'confidence': current_block['confidence'] / 100.0,  # Tesseract uses 0-100 scale
-                                    'page': page_idx + 1 if len(image_paths_to_process) > 1 else None
-                                })
-                                all_confidences.append(current_block['confidence'] / 100.0)
-                            current_block = {'text': '', 'confidence': 0, 'words': 0}
-                
-                except Exception as page_error:
-                    if len(image_paths_to_process) > 1:
-                        all_text.append(f"--- Page {page_idx + 1} (Error) ---\n[Failed to process: {str(page_error)}]")
-                    else:
-                        raise
 
-            # Cleanup temporary files
-            if temp_image_paths:
-                PDFService.cleanup_temp_images(temp_image_paths)
-            
+            for page_result in page_results:
+                page_num = page_result['page']
+                page = page_result['result']
+
+                if 'error' in page:
+                    all_text.append(f"--- Page {page_num} (Error) ---\n[Failed to process: {page['error']}]")
+                    continue
+
+                text = page['text']
+                # Add page indicator for PDFs
+                if page_count > 1:
+                    text = f"--- Page {page_num} ---\n{text}"
+                all_text.append(text)
+
+                for block in page['blocks']:
+                    block['page'] = page_num if page_count > 1 else None
+                    all_blocks.append(block)
+                    all_confidences.append(block['confidence'])
+
+                for word in page['words']:
+                    word['page'] = page_num if page_count > 1 else None
+                    all_words.append(word)
+
             # Combine results
             combined_text = '\n\n'.join(all_text)
             avg_confidence = sum(all_confidences) / len(all_confidences) if all_confidences else 0
 
-            return {
+            result = {
                 'text': combined_text.strip(),
                 'full_text': combined_text.strip(),
-                'words': [],
+                'words': all_words,
                 'blocks': all_blocks,
                 'confidence': avg_confidence,
-                'pages_processed': len(image_paths_to_process),
+                'pages_processed': len(page_results),
                 'file_info': {
-                    'is_pdf': PDFService.is_pdf(image_path),
-                    'filename': os.path.basename(image_path)
+                    'is_pdf': is_pdf,
+                    'filename': 'in-memory image' if in_memory else os.path.basename(image_path)
                 }
             }
+            if page_timings is not None:
+                result['page_timings'] = page_timings
+            return result
 
         except Exception as e:
             raise Exception(f"Tesseract OCR processing failed: {str(e)}")
 
+    @staticmethod
+    def _page_workers():
+        """
+        Number of tesseract processes one PDF runs in parallel
+
+        Defaults to the cores divided by the tasks a worker runs at once
+        (WORKER_MAX_CONCURRENCY), so concurrent PDFs do not oversubscribe
+        the host.
+        """
+        from app.config import Config
+
+        if Config.TESSERACT_PAGE_WORKERS:
+            return Config.TESSERACT_PAGE_WORKERS
+        return max(1, (os.cpu_count() or 1) // max(1, Config.WORKER_MAX_CONCURRENCY))
+
+    def _ocr_page(self, image, lang, config):
+        """
+        Run Tesseract once on one page image and rebuild text, words and blocks from its TSV
+
+        Returns:
+            Dictionary with the page 'text', its 'words' (text, 0-1 confidence, bbox)
+            and its 'blocks' (text and 0-1 confidence)
+        """
+        # Convert RGBA to RGB if necessary
+        if image.mode == 'RGBA':
+            image = image.convert('RGB')
+        # Convert other single-channel modes to RGB
+        elif image.mode not in ('RGB', 'L'):
+            image = image.convert('RGB')
+
+        return self._parse_tsv(self._run_tesseract_tsv(image, lang, config))
+
+    def _run_tesseract_tsv(self, image, lang, config):
+        """
+        Pipe an image to a single tesseract process and return its TSV output
+
+        The image is PNG-encoded in memory and passed on stdin, so no
+        temporary files are written.
+        """
+        from app.config import Config
+
+        buffer = io.BytesIO()
+        image.save(buffer, format='PNG', compress_level=1)
+
+        command = [pytesseract.pytesseract.tesseract_cmd, 'stdin', 'stdout', '-l', lang]
+        command += shlex.split(config)
+        command.append('tsv')
+
+        try:
+            completed = subprocess.run(
+                command,
+                input=buffer.getvalue(),
+                capture_output=True,
+                timeout=Config.TESSERACT_TIMEOUT or None,
+                env=self._tesseract_env()
+            )
+        except subprocess.TimeoutExpired:
+            raise Exception(f"Tesseract timed out after {Config.TESSERACT_TIMEOUT}s")
+
+        if completed.returncode != 0:
+            raise Exception(f"Tesseract failed: {completed.stderr.decode('utf-8', errors='replace').strip()}")
+
+        return completed.stdout.decode('utf-8', errors='replace')
+
+    @staticmethod
+    def _tesseract_env():
+        """
+        Environment of a tesseract process
+
+        Pages run as parallel tesseract processes, so each one is kept to
+        TESSERACT_OMP_THREAD_LIMIT OpenMP threads. The limit is only passed
+        to the child process; OpenMP users in the worker itself (torch,
+        OpenCV) keep their own threading.
+        """
+        from app.config import Config
+
+        if not Config.TESSERACT_OMP_THREAD_LIMIT:
+            return None
+        return {**os.environ, 'OMP_THREAD_LIMIT': str(Config.TESSERACT_OMP_THREAD_LIMIT)}
+
+    @staticmethod
+    def _parse_tsv(tsv):
+        """
+        Rebuild page text, words and blocks from tesseract TSV output
+
+        Lines are joined with newlines and paragraphs separated by a blank
+        line, matching image_to_string's layout.
+        """
+        paragraphs = []
+        words = []
+        blocks = []
+        current_line = None
+        current_par = None
+        current_block = None
+        block_words = []
+
+        def flush_block():
+            recognised = [word for word in block_words if word['confidence'] > 0]
+            if recognised:
+                blocks.append({
+                    'text': ' '.join(word['text'] for word in recognised),
+                    'confidence': sum(word['confidence'] for word in recognised) / len(recognised)
+                })
+
+        for row in tsv.splitlines()[1:]:
+            columns = row.split('\t')
+            if len(columns) < 12 or columns[0] != '5':
+                continue
+
+            text = columns[11].strip()
+            if not text:
+                continue
+
+            block_key = columns[1:3]
+            par_key = columns[1:4]
+            line_key = columns[1:5]
+
+            if block_key != current_block:
+                flush_block()
+                block_words = []
+                current_block = block_key
+
+            if par_key != current_par:
+                paragraphs.append([])
+                current_par = par_key
+                current_line = None
+
+            if line_key != current_line:
+                paragraphs[-1].append([])
+                current_line = line_key
+
+            paragraphs[-1][-1].append(text)
+
+            conf = float(columns[10])
+            word = {
+                'text': text,
+                'confidence': conf / 100.0 if conf > 0 else 0.0,  # Tesseract uses 0-100 scale
+                'bbox': {
+                    'x': int(columns[6]),
+                    'y': int(columns[7]),
+                    'width': int(columns[8]),
+                    'height': int(columns[9])
+                }
+            }
+            words.append(word)
+            block_words.append(word)
+
+        flush_block()
+
+        text = '\n\n'.join('\n'.join(' '.join(line) for line in paragraph) for paragraph in paragraphs)
+        return {'text': text, 'words': words, 'blocks': blocks}
+
     def _map_languages(self, languages):
         """Map language codes to Tesseract format"""
         if not languages:
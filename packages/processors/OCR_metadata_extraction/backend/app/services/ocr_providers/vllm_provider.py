@@ -2,6 +2,7 @@ import requests
 import base64
 import os
 from .base_provider import BaseOCRProvider
+from . import http_pool
 
 class VLLMProvider(BaseOCRProvider):
     """VLLM OCR Provider"""
@@ -33,12 +34,16 @@ class VLLMProvider(BaseOCRProvider):
         self.api_key = api_key or Config.VLLM_API_KEY
         self.timeout = Config.VLLM_TIMEOUT
         self.max_tokens = Config.VLLM_MAX_TOKENS
-        self._available = self._check_availability()
+        self._available = self.is_available()
 
     def get_name(self):
         return "vllm"
 
     def is_available(self):
+        if not self.host:
+            return False
+        # Probe result is shared by all instances and refreshed every HTTP_AVAILABILITY_TTL seconds
+        self._available = http_pool.cached_probe(f"{self.host}/v1/models", self._check_availability)
         return self._available
 
     def _check_availability(self):
@@ -48,7 +53,7 @@ class VLLMProvider(BaseOCRProvider):
             if self.api_key:
                 headers["Authorization"] = f"Bearer {self.api_key}"
 
-            response = requests.get(
+            response = http_pool.get_session(self.host).get(
                 f"{self.host}/v1/models",
                 headers=headers,
                 timeout=5
@@ -120,7 +125,7 @@ class VLLMProvider(BaseOCRProvider):
             if self.api_key:
                 headers["Authorization"] = f"Bearer {self.api_key}"
 
-            response = requests.post(
+            response = http_pool.get_session(self.host).post(
                 f"{self.host}/v1/chat/completions",
                 json=payload,
                 headers=headers,
@@ -155,25 +160,19 @@ class VLLMProvider(BaseOCRProvider):
             raise Exception(f"VLLM OCR processing failed: {str(e)}")
 
     def _process_pdf(self, pdf_path, languages=None, handwriting=False, custom_prompt=None):
-        """Process PDF by converting pages to images and processing each page"""
+        """Process PDF by streaming pages to a bounded pool of concurrent page requests"""
         from app.services.pdf_service import PDFService
         from app.services.image_optimizer import ImageOptimizer
 
         try:
-            # Convert PDF pages to PIL Image objects with optimal DPI
-            page_images = PDFService.pdf_to_images(
-                pdf_path,
-                handwriting=handwriting
-            )
-
-            if not page_images:
+            page_count = PDFService.get_page_count(pdf_path)
+            if not page_count:
                 raise Exception("No pages found in PDF")
 
-            # Process each page
-            all_text = []
-            all_blocks = []
+            # Use custom prompt if provided, otherwise build default
+            base_prompt = custom_prompt or self._build_prompt(languages, handwriting)
 
-            for page_num, page_img in enumerate(page_images, 1):
+            def ocr_page(page_num, page_img):
                 # Optimize and encode page image (resize only if > 5MB)
                 image_data = base64.b64encode(
                     ImageOptimizer.optimize_and_encode(
@@ -185,15 +184,10 @@ class VLLMProvider(BaseOCRProvider):
                     )
                 ).decode('utf-8')
 
-                # Use custom prompt if provided, otherwise build default
-                if custom_prompt:
-                    prompt = custom_prompt
-                else:
-                    prompt = self._build_prompt(languages, handwriting)
-
                 # Add page number context for multi-page PDFs
-                if len(page_images) > 1:
-                    prompt = f"[Page {page_num}/{len(page_images)}] {prompt}"
+                prompt = base_prompt
+                if page_count > 1:
+                    prompt = f"[Page {page_num}/{page_count}] {prompt}"
 
                 # Call VLLM API for this page
                 payload = {
@@ -223,7 +217,7 @@ class VLLMProvider(BaseOCRProvider):
                 if self.api_key:
                     headers["Authorization"] = f"Bearer {self.api_key}"
 
-                response = requests.post(
+                response = http_pool.get_session(self.host).post(
                     f"{self.host}/v1/chat/completions",
                     json=payload,
                     headers=headers,
@@ -237,24 +231,20 @@ class VLLMProvider(BaseOCRProvider):
 
                 # Extract text from response
                 if 'choices' in result and len(result['choices']) > 0:
-                    page_text = result['choices'][0]['message']['content'].strip()
-                else:
-                    page_text = ''
-
-                if page_text:
-                    # Add page separator for multi-page PDFs
-                    if len(page_images) > 1:
-                        all_text.append(f"\n--- Page {page_num} ---\n{page_text}")
-                    else:
-                        all_text.append(page_text)
+                    return result['choices'][0]['message']['content'].strip()
+                return ''
 
-                    all_blocks.append({
-                        'text': page_text,
-                        'page': page_num
-                    })
+            # Convert PDF pages lazily with optimal DPI and OCR them concurrently
+            page_results = PDFService.ocr_pages(
+                PDFService.iter_pdf_pages(pdf_path, handwriting=handwriting),
+                ocr_page
+            )
 
-            # Combine all pages
-            combined_text = '\n\n'.join(all_text)
+            # Combine all pages in page order
+            combined_text, all_blocks = PDFService.merge_page_texts(
+                ((page_result['page'], page_result['result']) for page_result in page_results),
+                page_count
+            )
 
             return {
                 'text': combined_text,
@@ -262,7 +252,8 @@ class VLLMProvider(BaseOCRProvider):
                 'words': [],
                 'blocks': all_blocks,
                 'confidence': 0.95,
-                'pages_processed': len(page_images)
+                'pages_processed': len(page_results),
+                'page_timings': PDFService.page_timings(page_results)
             }
 
         except Exception as e:
@@ -1,41 +1,107 @@
 import os
-from .ocr_providers import (
-    GoogleVisionProvider,
-    GoogleLensProvider,
-    SerpAPIGoogleLensProvider,
-    ChromeLensProvider,
-    OllamaProvider,
-    VLLMProvider,
-    AzureComputerVisionProvider,
-    TesseractProvider,
-    EasyOCRProvider,
-    LlamaCppProvider,
-    ClaudeProvider,
-    LMStudioProvider,
-    LangChainProvider
-)
+import logging
+from app.config import Config
+from app.models.ocr_result_cache import OCRResultCache
+from .ocr_providers.registry import get_provider_registry
+
+logger = logging.getLogger(__name__)
+
+
+def cached_ocr_call(ocr_provider, content_hash, compute, languages=None, handwriting=False, custom_prompt=None,
+                    mongo=None):
+    """
+    Return the cached result for an input, or compute and cache it
+
+    Cache errors never fail the OCR call; results without text are not cached.
+
+    Args:
+        ocr_provider: Provider instance producing the result
+        content_hash: Hash of the input (file bytes or text)
+        compute: Callable returning the result on a cache miss
+        languages: List of language codes
+        handwriting: Boolean for handwriting detection
+        custom_prompt: Optional custom prompt
+        mongo: Optional MongoDB connection (default: app.models.mongo)
+
+    Returns:
+        dict: OCR result ('cached': True on cache hits)
+    """
+    mongo = _cache_mongo(mongo)
+    if mongo is None:
+        return compute()
+
+    provider_name = ocr_provider.get_name()
+    cache_key = OCRResultCache.build_key(
+        content_hash,
+        provider_name,
+        model=getattr(ocr_provider, 'model', None),
+        languages=languages,
+        handwriting=handwriting,
+        custom_prompt=custom_prompt
+    )
+
+    try:
+        cached = OCRResultCache.get(mongo, cache_key)
+    except Exception as e:
+        logger.warning(f"OCR cache lookup failed: {e}")
+        cached = None
+
+    if cached is not None:
+        logger.info(f"OCR cache hit for {provider_name} ({content_hash[:12]})")
+        cached['cached'] = True
+        return cached
+
+    result = compute()
+
+    if result.get('text'):
+        try:
+            OCRResultCache.put(
+                mongo,
+                cache_key,
+                result,
+                provider=provider_name,
+                max_entries=Config.OCR_CACHE_MAX_ENTRIES or None
+            )
+        except Exception as e:
+            logger.warning(f"OCR cache store failed: {e}")
+
+    return result
+
+
+def _cache_mongo(mongo=None):
+    """MongoDB connection for the result cache, or None if caching is disabled or unavailable"""
+    if not Config.OCR_CACHE_ENABLED:
+        return None
+
+    if mongo is None:
+        from app.models import mongo
+
+    if getattr(mongo, 'db', None) is None:
+        return None
+
+    try:
+        OCRResultCache.ensure_indexes(mongo, Config.OCR_CACHE_TTL_DAYS * 86400 or None)
+    except Exception as e:
+        logger.warning(f"OCR cache unavailable: {e}")
+        return None
+
+    return mongo
+
 
 class OCRService:
     """Service for OCR processing with multiple provider support"""
 
-    def __init__(self):
-        """Initialize OCR providers"""
-        # Initialize all available providers
-        self.providers = {
-            'google_vision': GoogleVisionProvider(),
-            'google_lens': GoogleLensProvider(),
-            'serpapi_google_lens': SerpAPIGoogleLensProvider(),
-            'chrome_lens': ChromeLensProvider(),
-            'azure': AzureComputerVisionProvider(),
-            'ollama': OllamaProvider(),
-            'vllm': VLLMProvider(),
-            'tesseract': TesseractProvider(),
-            'easyocr': EasyOCRProvider(),
-            'llamacpp': LlamaCppProvider(),
-            'claude': ClaudeProvider(),
-            'lmstudio': LMStudioProvider(),
-            'langchain': LangChainProvider()
-        }
+    def __init__(self, mongo=None):
+        """
+        Initialize the OCR service
+
+        Args:
+            mongo: Optional MongoDB connection for the result cache (default: app.models.mongo)
+        """
+        self._mongo = mongo
+
+        # Providers are imported and constructed lazily, on first use, and shared process-wide
+        self.providers = get_provider_registry()
 
         # Set default provider
         self.default_provider = os.getenv('DEFAULT_OCR_PROVIDER', 'google_vision')
@@ -53,9 +119,6 @@ class OCRService:
         Raises:
             ValueError if provider not found or not available
         """
-        import logging
-        logger = logging.getLogger(__name__)
-
         # If no provider specified, use default
         use_default = provider_name is None
         provider_name = provider_name or self.default_provider
@@ -65,28 +128,38 @@ class OCRService:
             # Only fall back if using default provider
             if use_default:
                 logger.warning(f"Unknown default provider, falling back to available provider")
-                for name, provider in self.providers.items():
-                    if provider.is_available():
-                        logger.info(f"Using fallback provider: {name}")
-                        return provider
+                fallback = self._first_available_provider()
+                if fallback:
+                    return fallback
             raise ValueError(f"Unknown OCR provider: {provider_name}")
 
-        provider = self.providers[provider_name]
-
-        if not provider.is_available():
+        if not self._is_available(provider_name):
             logger.error(f"OCR provider '{provider_name}' is not available")
             # Only fall back if using default provider
             if use_default:
                 logger.warning(f"Default provider not available, falling back to available provider")
-                for name, provider in self.providers.items():
-                    if provider.is_available():
-                        logger.info(f"Using fallback provider: {name}")
-                        return provider
+                fallback = self._first_available_provider()
+                if fallback:
+                    return fallback
                 raise ValueError(f"No OCR providers available. Please check configuration.")
             # If user explicitly requested this provider, raise error instead of silently falling back
             raise ValueError(f"OCR provider '{provider_name}' is not available. Please check the provider configuration and logs.")
 
-        return provider
+        return self.providers[provider_name]
+
+    def _is_available(self, provider_name):
+        """Provider availability, using the registry's TTL cache when available"""
+        if hasattr(self.providers, 'is_available'):
+            return self.providers.is_available(provider_name)
+        return self.providers[provider_name].is_available()
+
+    def _first_available_provider(self):
+        """First available provider in registry order, or None"""
+        for name in self.providers:
+            if self._is_available(name):
+                logger.info(f"Using fallback provider: {name}")
+                return self.providers[name]
+        return None
 
     def get_available_providers(self):
         """
@@ -96,14 +169,25 @@ class OCRService:
             list: List of dicts with provider info
         """
         available = []
-        for name, provider in self.providers.items():
+        for name in self.providers:
             available.append({
                 'name': name,
-                'available': provider.is_available(),
+                'available': self._is_available(name),
                 'display_name': self._get_display_name(name)
             })
         return available
 
+    def get_provider_timings(self):
+        """
+        Get import/init timings of the providers loaded so far
+
+        Returns:
+            dict: Provider name -> {'import_ms', 'init_ms'} or {'error'}
+        """
+        if hasattr(self.providers, 'timings'):
+            return self.providers.timings()
+        return {}
+
     def _get_display_name(self, provider_name):
         """Get human-readable display name for provider"""
         display_names = {
@@ -123,10 +207,14 @@ class OCRService:
         }
         return display_names.get(provider_name, provider_name)
 
-    def process_image(self, image_path, languages=None, handwriting=False, provider=None, custom_prompt=None, job_id=None):
+    def process_image(self, image_path, languages=None, handwriting=False, provider=None, custom_prompt=None, job_id=None,
+                      use_cache=True):
         """
         Process image and extract text using specified provider
 
+        Results are cached by file content, provider, model, languages,
+        handwriting flag and prompt, so identical inputs are OCRed once.
+
         Args:
             image_path: Path to the image file
             languages: List of language codes (e.g., ['en', 'hi'])
@@ -134,13 +222,15 @@ class OCRService:
             provider: Provider name ('google_vision', 'ollama', 'vllm')
             custom_prompt: Optional custom prompt for AI-based providers
             job_id: Optional job ID for tracking intermediate images
+            use_cache: Look up and store the result in the OCR result cache
 
         Returns:
-            dict: OCR results with text and metadata
+            dict: OCR results with text and metadata ('cached': True on cache hits,
+                'content_hash': SHA-256 of the file when it was hashed for the cache)
         """
         ocr_provider = self.get_provider(provider)
 
-        try:
+        def run_provider():
             # Check if provider supports job_id parameter (for intermediate image storage)
             import inspect
             sig = inspect.signature(ocr_provider.process_image)
@@ -167,6 +257,22 @@ class OCRService:
 
             return result
 
+        try:
+            if not use_cache:
+                return run_provider()
+
+            try:
+                content_hash = OCRResultCache.hash_file(image_path)
+            except (OSError, TypeError):
+                # Missing/unreadable file (reported by the provider) or in-memory image input
+                return run_provider()
+
+            result = cached_ocr_call(ocr_provider, content_hash, run_provider, languages, handwriting, custom_prompt,
+                                     mongo=self._mongo)
+            # Lets incremental jobs fingerprint the file without reading it again
+            result['content_hash'] = content_hash
+            return result
+
         except Exception as e:
             raise Exception(f"OCR processing failed with {ocr_provider.get_name()}: {str(e)}")
 
@@ -3,14 +3,19 @@ PDF handling service for converting PDFs to images for OCR processing.
 """
 
 import os
+import time
+import shutil
 import tempfile
 import logging
+import threading
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 from pathlib import Path
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Callable, Iterable, Iterator, List, Tuple
 from datetime import datetime
 
 try:
-    from pdf2image import convert_from_path
+    from pdf2image import convert_from_path, pdfinfo_from_path
     PDF2IMAGE_AVAILABLE = True
 except ImportError:
     PDF2IMAGE_AVAILABLE = False
@@ -23,6 +28,9 @@ except ImportError:
 
 logger = logging.getLogger(__name__)
 
+# Per-thread cap on ocr_pages concurrency, set by the OCR worker from its provider budget
+_page_budget = threading.local()
+
 
 class PDFService:
     """Service for handling PDF operations, including conversion to images."""
@@ -69,6 +77,8 @@ class PDFService:
         """
         Convert PDF to list of PIL Image objects.
 
+        Every page is held in memory at once; prefer iter_pdf_pages for large PDFs.
+
         Args:
             pdf_path: Path to PDF file
             dpi: DPI for conversion (uses optimal DPI if not specified)
@@ -81,6 +91,71 @@ class PDFService:
         Raises:
             Exception: If pdf2image is not installed or conversion fails
         """
+        images = [
+            image for _, image in PDFService.iter_pdf_pages(
+                pdf_path, dpi=dpi, document_type=document_type, handwriting=handwriting
+            )
+        ]
+        logger.info(f"Successfully converted PDF to {len(images)} page(s)")
+        return images
+
+    @staticmethod
+    def get_page_count(pdf_path: str) -> int:
+        """
+        Get the number of pages in a PDF without rasterising it.
+
+        Args:
+            pdf_path: Path to PDF file
+
+        Returns:
+            Number of pages
+
+        Raises:
+            Exception: If neither PyPDF2 nor pdf2image can read the page count
+        """
+        if PYPDF2_AVAILABLE:
+            try:
+                return len(PdfReader(pdf_path).pages)
+            except Exception as e:
+                logger.debug(f"PyPDF2 could not count pages of {pdf_path}: {e}")
+
+        if PDF2IMAGE_AVAILABLE:
+            try:
+                return int(pdfinfo_from_path(pdf_path)['Pages'])
+            except Exception as e:
+                raise Exception(f"Failed to read PDF page count: {str(e)}")
+
+        raise Exception("Neither PyPDF2 nor pdf2image is available to read the PDF page count")
+
+    @staticmethod
+    def iter_pdf_pages(pdf_path: str, dpi: Optional[int] = None, document_type: Optional[str] = None,
+                       handwriting: bool = False, chunk_size: Optional[int] = None,
+                       paths_only: bool = False, output_folder: Optional[str] = None) -> Iterator[Tuple[int, Any]]:
+        """
+        Lazily rasterise a PDF, yielding one page at a time.
+
+        Pages are converted chunk_size at a time with first_page/last_page, so
+        only the current chunk is held in memory. With paths_only, pages are
+        written as PNG files to output_folder (a temporary directory removed
+        when the generator is closed, if not given) and their paths yielded.
+
+        Args:
+            pdf_path: Path to PDF file
+            dpi: DPI for conversion (uses optimal DPI if not specified)
+            document_type: Type of document ('high_quality', 'low_quality', 'default')
+            handwriting: Whether document contains handwriting
+            chunk_size: Pages rasterised per pdf2image call (default: Config.OCR_PDF_PAGE_CHUNK_SIZE)
+            paths_only: Yield image file paths instead of PIL Images
+            output_folder: Folder for page files when paths_only is set
+
+        Yields:
+            (page_number, PIL Image or file path) tuples, page numbers starting at 1
+
+        Raises:
+            Exception: If pdf2image is not installed or conversion fails
+        """
+        from app.config import Config
+
         if not PDF2IMAGE_AVAILABLE:
             raise Exception(
                 "PDF2Image library not available. Install with: pip install pdf2image\n"
@@ -91,18 +166,159 @@ class PDFService:
         if not os.path.exists(pdf_path):
             raise Exception(f"PDF file not found: {pdf_path}")
 
-        # Use provided DPI or get optimal DPI based on document type
         if dpi is None:
             dpi = PDFService.get_optimal_dpi(document_type, handwriting)
+        chunk_size = max(1, chunk_size or Config.OCR_PDF_PAGE_CHUNK_SIZE)
+
+        page_count = PDFService.get_page_count(pdf_path)
+        logger.info(f"Streaming PDF pages: {pdf_path} ({page_count} pages, DPI: {dpi}, chunk: {chunk_size})")
+
+        temp_dir = None
+        convert_kwargs = {}
+        if paths_only:
+            if output_folder is None:
+                temp_dir = tempfile.mkdtemp(prefix=f"pdf_pages_{Path(pdf_path).stem}_")
+                output_folder = temp_dir
+            convert_kwargs = {'output_folder': output_folder, 'paths_only': True, 'fmt': 'png'}
 
         try:
-            logger.info(f"Converting PDF to images: {pdf_path} (DPI: {dpi}, type: {document_type or 'default'})")
-            images = convert_from_path(pdf_path, dpi=dpi)
-            logger.info(f"Successfully converted PDF to {len(images)} page(s)")
-            return images
-        except Exception as e:
-            raise Exception(f"Failed to convert PDF to images: {str(e)}")
-    
+            for first_page in range(1, page_count + 1, chunk_size):
+                last_page = min(first_page + chunk_size - 1, page_count)
+                try:
+                    pages = convert_from_path(pdf_path, dpi=dpi, first_page=first_page, last_page=last_page,
+                                              **convert_kwargs)
+                except Exception as e:
+                    raise Exception(f"Failed to convert PDF pages {first_page}-{last_page} to images: {str(e)}")
+
+                for offset, page in enumerate(pages):
+                    yield first_page + offset, page
+        finally:
+            if temp_dir:
+                shutil.rmtree(temp_dir, ignore_errors=True)
+
+    @staticmethod
+    @contextmanager
+    def page_budget(workers: int):
+        """
+        Cap the concurrent page calls of ocr_pages run from the current thread.
+
+        The OCR worker holds one provider slot per task; a PDF task that
+        reserved extra slots passes their count here so its page pool stays
+        within WORKER_PROVIDER_CONCURRENCY.
+
+        Args:
+            workers: Maximum concurrent page calls
+        """
+        previous = getattr(_page_budget, 'workers', None)
+        _page_budget.workers = max(1, workers)
+        try:
+            yield
+        finally:
+            _page_budget.workers = previous
+
+    @staticmethod
+    def ocr_pages(pages: Iterable[Tuple[int, Any]], page_fn: Callable[[int, Any], Dict[str, Any]],
+                  max_workers: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Run page OCR on a bounded thread pool and return the results in page order.
+
+        Pages are pulled from the iterable only as pool slots free up, so a
+        lazy page source (iter_pdf_pages) is never rasterised far ahead of
+        the OCR calls. The first page failure is re-raised.
+
+        Args:
+            pages: Iterable of (page_number, image) tuples
+            page_fn: Callable(page_number, image) returning the page's OCR result
+            max_workers: Concurrent page calls (default: Config.OCR_PDF_PAGE_WORKERS),
+                further capped by an enclosing page_budget
+
+        Returns:
+            List of {'page', 'result', 'processing_time'} dictionaries sorted by page
+        """
+        from app.config import Config
+
+        workers = max(1, max_workers or Config.OCR_PDF_PAGE_WORKERS)
+        budget = getattr(_page_budget, 'workers', None)
+        if budget:
+            workers = min(workers, budget)
+
+        def run_page(page_num, image):
+            start = time.perf_counter()
+            result = page_fn(page_num, image)
+            return {
+                'page': page_num,
+                'result': result,
+                'processing_time': round(time.perf_counter() - start, 3)
+            }
+
+        page_results = []
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='pdf-page') as executor:
+            pending = set()
+            try:
+                for page_num, image in pages:
+                    pending.add(executor.submit(run_page, page_num, image))
+                    if len(pending) >= workers:
+                        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                        page_results.extend(future.result() for future in done)
+
+                done, pending = wait(pending)
+                page_results.extend(future.result() for future in done)
+            except Exception:
+                for future in pending:
+                    future.cancel()
+                raise
+
+        page_results.sort(key=lambda page_result: page_result['page'])
+        return page_results
+
+    @staticmethod
+    def merge_page_texts(page_texts: Iterable[Tuple[int, str]], page_count: int) -> Tuple[str, List[Dict[str, Any]]]:
+        """
+        Merge per-page OCR text in page order, adding page separators for multi-page PDFs.
+
+        Args:
+            page_texts: (page_number, text) tuples in page order
+            page_count: Total number of pages in the PDF
+
+        Returns:
+            Tuple of (combined text, list of {'text', 'page'} blocks)
+        """
+        all_text = []
+        all_blocks = []
+
+        for page_num, page_text in page_texts:
+            if not page_text:
+                continue
+
+            # Add page separator for multi-page PDFs
+            if page_count > 1:
+                all_text.append(f"\n--- Page {page_num} ---\n{page_text}")
+            else:
+                all_text.append(page_text)
+
+            all_blocks.append({
+                'text': page_text,
+                'page': page_num
+            })
+
+        return '\n\n'.join(all_text), all_blocks
+
+    @staticmethod
+    def page_timings(page_results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Build per-page timing metadata from ocr_pages results.
+
+        Args:
+            page_results: Results returned by ocr_pages
+
+        Returns:
+            List of {'page', 'processing_time'} dictionaries
+        """
+        return [
+            {'page': page_result['page'], 'processing_time': page_result['processing_time']}
+            for page_result in page_results
+        ]
+
     @staticmethod
     def pdf_to_temp_images(pdf_path: str, dpi: int = 200) -> list:
         """
@@ -118,16 +334,17 @@ class PDFService:
         Raises:
             Exception: If conversion fails
         """
-        images = PDFService.pdf_to_images(pdf_path, dpi=dpi)
-        
         temp_paths = []
         temp_dir = tempfile.gettempdir()
-        
+
         try:
-            for idx, image in enumerate(images):
+            # Pages are rasterised and saved one chunk at a time
+            for page_num, image in PDFService.iter_pdf_pages(pdf_path, dpi=dpi):
+                idx = page_num - 1
                 # Create temporary image file for each page
                 temp_path = os.path.join(temp_dir, f"pdf_page_{idx}_{Path(pdf_path).stem}_{os.getpid()}.png")
                 image.save(temp_path, 'PNG')
+                image.close()
                 temp_paths.append(temp_path)
                 logger.info(f"Saved page {idx} to: {temp_path}")
         except Exception as e:
@@ -163,6 +380,9 @@ class PDFService:
         """
         Extract metadata from a PDF file.
 
+        Only the document structure is read; no page is rasterised. Falls back
+        to poppler's pdfinfo when PyPDF2 is not installed.
+
         Args:
             pdf_path: Path to PDF file
 
@@ -170,9 +390,9 @@ class PDFService:
             Dictionary containing PDF metadata
 
         Raises:
-            Exception: If PyPDF2 is not installed or extraction fails
+            Exception: If neither PyPDF2 nor pdf2image is installed or extraction fails
         """
-        if not PYPDF2_AVAILABLE:
+        if not PYPDF2_AVAILABLE and not PDF2IMAGE_AVAILABLE:
             raise Exception(
                 "PyPDF2 library not available. Install with: pip install PyPDF2"
             )
@@ -180,6 +400,9 @@ class PDFService:
         if not os.path.exists(pdf_path):
             raise Exception(f"PDF file not found: {pdf_path}")
 
+        if not PYPDF2_AVAILABLE:
+            return PDFService._extract_pdfinfo_metadata(pdf_path)
+
         try:
             reader = PdfReader(pdf_path)
             metadata = reader.metadata
@@ -235,6 +458,41 @@ class PDFService:
         except Exception as e:
             raise Exception(f"Failed to extract PDF metadata: {str(e)}")
 
+    @staticmethod
+    def _extract_pdfinfo_metadata(pdf_path: str) -> Dict[str, Any]:
+        """
+        Extract metadata with poppler's pdfinfo.
+
+        Args:
+            pdf_path: Path to PDF file
+
+        Returns:
+            Dictionary containing PDF metadata (same keys as extract_pdf_metadata)
+        """
+        try:
+            info = pdfinfo_from_path(pdf_path)
+        except Exception as e:
+            raise Exception(f"Failed to extract PDF metadata: {str(e)}")
+
+        file_size = os.path.getsize(pdf_path)
+
+        return {
+            'page_count': int(info.get('Pages', 0)),
+            'file_size_bytes': file_size,
+            'file_size_mb': round(file_size / (1024 * 1024), 2),
+            'encrypted': str(info.get('Encrypted', 'no')).startswith('yes'),
+            'title': info.get('Title', ''),
+            'author': info.get('Author', ''),
+            'subject': info.get('Subject', ''),
+            'creator': info.get('Creator', ''),
+            'producer': info.get('Producer', ''),
+            'keywords': info.get('Keywords', ''),
+            # pdfinfo already formats dates for display
+            'creation_date': info.get('CreationDate') or None,
+            'modification_date': info.get('ModDate') or None,
+            'custom_metadata': {}
+        }
+
     @staticmethod
     def _parse_pdf_date(date_str: str) -> Optional[str]:
         """
@@ -127,9 +127,10 @@ class StorageService:
         temp_dir = None
         try:
             from app.models.bulk_job import BulkJob
+            from app.models.bulk_job_result import BulkJobResult
 
             # Get job from database
-            job = BulkJob.get_by_job_id(mongo, job_id)
+            job = BulkJob.get_by_job_id(mongo, job_id, BulkJob.EXCLUDE_CHECKPOINT_ARRAYS)
             if not job:
                 raise ValueError(f"Job {job_id} not found")
 
@@ -149,8 +150,7 @@ class StorageService:
                     'images': [],
                 }
 
-                checkpoint = job.get('checkpoint', {})
-                results = checkpoint.get('results', [])
+                results = list(BulkJobResult.iter_by_job(mongo, job_id, BulkJobResult.RECORD_RESULT))
                 total_time = 0
 
                 for result in results:
@@ -0,0 +1,134 @@
+"""Weighted admission of file tasks from several priority lanes to a worker's task slots"""
+import logging
+import time
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from gevent.event import Event
+
+logger = logging.getLogger(__name__)
+
+
+class LaneScheduler:
+    """
+    Hands a fixed number of task slots to waiting tasks by lane weight
+
+    While slots are free, tasks start immediately. Once they are all taken,
+    a freed slot goes to a waiting lane chosen by smooth weighted round-robin
+    (a lane with weight 8 gets 8 slots for every slot of a weight-1 lane that
+    is also waiting), and within the lane to its jobs in turn. Meant to be
+    used from greenlets on the worker's hub; none of the methods yield except
+    while waiting for a slot.
+    """
+
+    def __init__(self, weights, slots):
+        """
+        Args:
+            weights: Lane name -> weight, highest priority first
+            slots: Number of tasks that may run at once
+        """
+        self.weights = dict(weights)
+        self.slots = max(1, slots)
+        self.active = 0
+        self._waiting = {lane: OrderedDict() for lane in self.weights}  # lane -> job_id -> deque of Events
+        self._current = {lane: 0 for lane in self.weights}
+        self._stats = {lane: {'admitted': 0, 'wait_ms_total': 0.0, 'wait_ms_max': 0.0} for lane in self.weights}
+
+    @contextmanager
+    def slot(self, lane, job_id=None):
+        """
+        Hold a task slot for the duration of the block, waiting for one if needed
+
+        Args:
+            lane: Lane of the task (must be one of the configured lanes)
+            job_id: Job of the task, for round-robin between jobs of a lane
+        """
+        started = time.monotonic()
+        if self.active < self.slots and not self.waiting():
+            self.active += 1
+        else:
+            event = Event()
+            self._waiting[lane].setdefault(job_id, deque()).append(event)
+            try:
+                event.wait()
+            except BaseException:
+                if event.is_set():
+                    # The slot was handed over just before the wait was interrupted
+                    self._release()
+                else:
+                    self._discard(lane, job_id, event)
+                raise
+
+        wait_ms = (time.monotonic() - started) * 1000
+        stats = self._stats[lane]
+        stats['admitted'] += 1
+        stats['wait_ms_total'] += wait_ms
+        stats['wait_ms_max'] = max(stats['wait_ms_max'], wait_ms)
+        try:
+            yield
+        finally:
+            self._release()
+
+    def waiting(self):
+        """Number of tasks waiting for a slot"""
+        return sum(len(queue) for jobs in self._waiting.values() for queue in jobs.values())
+
+    def stats(self):
+        """
+        Per-lane admission statistics
+
+        Returns:
+            dict: lane -> {'waiting', 'admitted', 'avg_wait_ms', 'max_wait_ms'}
+        """
+        return {
+            lane: {
+                'waiting': sum(len(queue) for queue in self._waiting[lane].values()),
+                'admitted': stats['admitted'],
+                'avg_wait_ms': round(stats['wait_ms_total'] / stats['admitted'], 1) if stats['admitted'] else 0,
+                'max_wait_ms': round(stats['wait_ms_max'], 1)
+            }
+            for lane, stats in self._stats.items()
+        }
+
+    def _release(self):
+        """Hand the slot to the next waiting task, or free it"""
+        event = self._next_waiter()
+        if event is None:
+            self.active -= 1
+        else:
+            event.set()
+
+    def _next_waiter(self):
+        """Pick the next waiting task: lane by smooth weighted round-robin, then the lane's jobs in turn"""
+        lanes = [lane for lane, jobs in self._waiting.items() if jobs]
+        if not lanes:
+            return None
+
+        total = sum(self.weights[lane] for lane in lanes)
+        for lane in lanes:
+            self._current[lane] += self.weights[lane]
+        lane = max(lanes, key=lambda name: self._current[name])
+        self._current[lane] -= total
+
+        jobs = self._waiting[lane]
+        job_id, queue = next(iter(jobs.items()))
+        event = queue.popleft()
+        del jobs[job_id]
+        if queue:
+            # The job goes to the back of its lane
+            jobs[job_id] = queue
+        if not any(self._waiting[name] for name in lanes):
+            # Idle lanes start from scratch next time
+            self._current = {name: 0 for name in self._current}
+        return event
+
+    def _discard(self, lane, job_id, event):
+        """Remove a waiter that stopped waiting"""
+        queue = self._waiting[lane].get(job_id)
+        if queue is None:
+            return
+        try:
+            queue.remove(event)
+        except ValueError:
+            return
+        if not queue:
+            del self._waiting[lane][job_id]
@@ -1,19 +1,58 @@
 """Standalone NSQ consumer worker for OCR processing"""
+import gevent
 import gnsq
 import json
 import logging
 import os
 import time
 import shutil
+import threading
 import requests
 from datetime import datetime
+from gevent.lock import BoundedSemaphore
+from gevent.threadpool import ThreadPool
 from app import create_app
+from app.config import Config
 from app.services.ocr_service import OCRService
+from app.services.nsq_service import NSQService
+from app.services.pdf_service import PDFService
 from app.models.bulk_job import BulkJob
+from app.workers.lane_scheduler import LaneScheduler
 
 logger = logging.getLogger(__name__)
 
 
+class _DeferredMessage:
+    """
+    Stand-in for an NSQ message while its task runs in a pool thread
+
+    gnsq connections belong to the gevent hub, so the task only records
+    finish/requeue here and the dispatcher applies it on the hub.
+    """
+
+    def __init__(self, message):
+        self.id = message.id
+        self.body = message.body
+        self.attempts = message.attempts
+        self.timestamp = message.timestamp
+        self.response = None
+
+    def finish(self):
+        if self.response is None:
+            self.response = ('finish', {})
+
+    def requeue(self, time_ms=0, backoff=True):
+        if self.response is None:
+            self.response = ('requeue', {'time_ms': time_ms, 'backoff': backoff})
+
+    def touch(self):
+        # Keepalive is sent by the dispatcher while the task runs
+        pass
+
+    def has_responded(self):
+        return self.response is not None
+
+
 class OCRWorker:
     """NSQ Consumer worker for distributed OCR processing"""
 
@@ -36,6 +75,7 @@ class OCRWorker:
         self.cancelled_jobs = set()
         self.processed_count = 0
         self.error_count = 0
+        self.stats_lock = threading.Lock()  # Counters are updated from pool threads
 
         # Initialize Flask app for MongoDB access
         self.app = create_app()
@@ -45,6 +85,22 @@ class OCRWorker:
         # Initialize OCR service
         self.ocr_service = OCRService()
 
+        # Load EasyOCR now so its configured language models warm up before the first task
+        if Config.EASYOCR_WARM_LANGUAGES:
+            self.ocr_service.providers.get('easyocr')
+
+        # Publisher for job completion signals; gnsq is only used from the hub
+        self.nsq_service = NSQService()
+        self.hub = gevent.get_hub()
+
+        # Concurrent task execution: bounded thread pool plus per-provider caps
+        self.max_in_flight = max(1, Config.WORKER_MAX_IN_FLIGHT)
+        self.task_pool = ThreadPool(max(1, Config.WORKER_MAX_CONCURRENCY))
+        self.provider_limits = {}
+
+        # Pool slots go to priority lanes by weight, and to a lane's jobs in turn
+        self.lane_scheduler = LaneScheduler(Config.NSQ_PRIORITY_LANES, self.task_pool.maxsize)
+
         # Get MongoDB connection directly from models
         from app.models import mongo
         self.mongo = mongo
@@ -53,6 +109,129 @@ class OCRWorker:
         logger.info(f"NSQ lookupd addresses (raw): {nsqlookupd_addresses}")
         logger.info(f"NSQ lookupd addresses (processed): {self.nsqlookupd_addresses}")
 
+    def dispatch_file_task(self, sender, message):
+        """
+        Hand an NSQ message to the task pool without blocking the reader
+
+        Args:
+            sender: The consumer that received the message
+            message: NSQ message containing task data
+        """
+        message.enable_async()
+        gevent.spawn(self._run_file_task, sender, message)
+
+    def _run_file_task(self, sender, message):
+        """
+        Run one file task in the thread pool, keeping the message alive meanwhile
+
+        Args:
+            sender: The consumer that received the message
+            message: NSQ message containing task data
+        """
+        deferred = _DeferredMessage(message)
+        keepalive = gevent.spawn(self._keep_alive, message)
+        task = self._peek_task(message)
+        provider_limit = self._provider_limit(self._concurrency_key(task))
+        try:
+            with provider_limit:
+                page_slots = self._reserve_page_slots(provider_limit, task)
+                try:
+                    with self.lane_scheduler.slot(NSQService.lane_for(task.get('priority')), task.get('job_id')):
+                        queue_wait_ms = self._queue_wait_ms(task)
+                        self.task_pool.spawn(self._handle_in_thread, sender, deferred, task.get('job_id'),
+                                             queue_wait_ms, 1 + page_slots).get()
+                finally:
+                    for _ in range(page_slots):
+                        provider_limit.release()
+        except Exception as e:
+            logger.error(f"Worker {self.worker_id}: Task dispatch failed: {e}", exc_info=True)
+            if deferred.response is None:
+                deferred.requeue()
+        finally:
+            keepalive.kill()
+
+        try:
+            action, kwargs = deferred.response or ('finish', {})
+            if action == 'requeue':
+                message.requeue(**kwargs)
+            else:
+                message.finish()
+        except Exception as e:
+            logger.warning(f"Worker {self.worker_id}: Could not respond to message {deferred.id}: {e}")
+
+    @staticmethod
+    def _reserve_page_slots(provider_limit, task):
+        """
+        Take free provider slots for a PDF task's page pool without waiting
+
+        PDF pages are OCRed concurrently (OCR_PDF_PAGE_WORKERS), and each page
+        is a provider call, so the extra calls must come out of the same
+        per-provider budget as whole tasks.
+
+        Returns:
+            Number of extra slots taken (the caller releases them)
+        """
+        if not str(task.get('file_path', '')).lower().endswith('.pdf'):
+            return 0
+        slots = 0
+        while slots < Config.OCR_PDF_PAGE_WORKERS - 1 and provider_limit.acquire(blocking=False):
+            slots += 1
+        return slots
+
+    def _handle_in_thread(self, sender, message, job_id=None, queue_wait_ms=None, page_workers=1):
+        """Run handle_file_task in a pool thread with the Flask app context and page budget"""
+        with self.app.app_context(), PDFService.page_budget(page_workers):
+            if job_id and queue_wait_ms is not None:
+                try:
+                    BulkJob.record_queue_wait(self.mongo, job_id, queue_wait_ms)
+                except Exception as e:
+                    logger.warning(f"Worker {self.worker_id}: Could not record queue wait for job {job_id}: {e}")
+            self.handle_file_task(sender, message)
+
+    def _keep_alive(self, message):
+        """Touch a long-running message so nsqd does not time it out and redeliver it"""
+        interval = max(1, Config.WORKER_TOUCH_INTERVAL)
+        while True:
+            gevent.sleep(interval)
+            try:
+                if message.has_responded():
+                    return
+                message.touch()
+            except Exception as e:
+                logger.warning(f"Worker {self.worker_id}: Could not touch message: {e}")
+                return
+
+    @staticmethod
+    def _peek_task(message):
+        """Decode a task message for scheduling ({} if it is malformed; handle_file_task reports that)"""
+        try:
+            return json.loads(message.body.decode('utf-8'))
+        except Exception:
+            return {}
+
+    @staticmethod
+    def _concurrency_key(task):
+        """Provider name used for the per-provider concurrency cap"""
+        if task.get('processing_mode') == 'chain':
+            return 'chain'
+        return task.get('provider') or 'default'
+
+    @staticmethod
+    def _queue_wait_ms(task):
+        """Milliseconds between a task's enqueued_at and now (None if unknown)"""
+        try:
+            enqueued_at = datetime.fromisoformat(task['enqueued_at'])
+        except (KeyError, TypeError, ValueError):
+            return None
+        return max(0, int((datetime.utcnow() - enqueued_at).total_seconds() * 1000))
+
+    def _provider_limit(self, key):
+        """Get the semaphore capping concurrent tasks for a provider"""
+        if key not in self.provider_limits:
+            limit = Config.WORKER_PROVIDER_CONCURRENCY.get(key, self.task_pool.maxsize)
+            self.provider_limits[key] = BoundedSemaphore(max(1, limit))
+        return self.provider_limits[key]
+
     def handle_file_task(self, sender, message):
         """
         Process a single file OCR task (single mode) or chain mode
@@ -144,7 +323,8 @@ class OCRWorker:
 
         except Exception as e:
             logger.error(f"Worker {self.worker_id}: Error processing file: {e}", exc_info=True)
-            self.error_count += 1
+            with self.stats_lock:
+                self.error_count += 1
 
             # Handle retry with exponential backoff
             try:
@@ -165,9 +345,12 @@ class OCRWorker:
                     # Max retries reached, save error atomically
                     logger.error(f"Max retries reached for {file_path}, marking as failed")
                     error_msg = str(e)
-                    BulkJob.save_file_error_atomic(self.mongo, job_id, file_path, error_msg)
+                    message_id = message.id.decode('utf-8') if isinstance(message.id, bytes) else str(message.id)
+                    save_result = BulkJob.save_file_error_atomic(self.mongo, job_id, file_path, error_msg, message_id,
+                                                                 data.get('file_index'))
 
                     message.finish()
+                    self._signal_if_job_done(job_id, save_result)
             except Exception as cleanup_error:
                 logger.error(f"Error during error handling: {cleanup_error}")
                 message.finish()
@@ -230,6 +413,18 @@ class OCRWorker:
             if result.get('intermediate_images'):
                 file_result['intermediate_images'] = result.get('intermediate_images')
 
+            # Include per-page timings for page-parallel PDF OCR
+            if result.get('page_timings'):
+                file_result['metadata']['page_timings'] = result['page_timings']
+
+            # Hash of the OCR'd bytes, committed to incremental folder manifests
+            if result.get('content_hash'):
+                file_result['content_hash'] = result['content_hash']
+
+            # Include image encoding stats (bytes, encode time) for per-provider tuning
+            if result.get('encoding'):
+                file_result['metadata']['encoding'] = result['encoding']
+
             # CRITICAL: Double-check idempotency right before save (closes race window)
             # This prevents duplicates when multiple workers pass the initial check simultaneously
             if BulkJob.is_file_processed(self.mongo, job_id, file_path):
@@ -244,7 +439,9 @@ class OCRWorker:
             message.finish()
 
             if save_result is not None:
-                self.processed_count += 1
+                with self.stats_lock:
+                    self.processed_count += 1
+                self._signal_if_job_done(job_id, save_result)
                 logger.info(f"Worker {self.worker_id}: Successfully processed {os.path.basename(file_path)} in {processing_time:.2f}s")
             else:
                 logger.info(f"Worker {self.worker_id}: File {os.path.basename(file_path)} was already processed by another worker, skipping")
@@ -271,7 +468,7 @@ class OCRWorker:
             from app.services.ocr_chain_service import OCRChainService
 
             # Get job to retrieve chain config
-            job = BulkJob.get_by_job_id(self.mongo, job_id)
+            job = BulkJob.get_by_job_id(self.mongo, job_id, {'chain_config': 1})
             if not job:
                 logger.error(f"Job {job_id} not found")
                 raise Exception(f"Job {job_id} not found")
@@ -283,8 +480,8 @@ class OCRWorker:
                 logger.error(f"No steps found in chain config for job {job_id}")
                 raise Exception("No chain steps configured")
 
-            # Execute chain
-            chain_service = OCRChainService()
+            # Execute chain; independent steps run concurrently on the worker's OCR service
+            chain_service = OCRChainService(ocr_service=self.ocr_service)
             start_time = time.time()
             chain_result = chain_service.execute_chain(
                 file_path,
@@ -315,7 +512,8 @@ class OCRWorker:
                 'metadata': {
                     'processing_time': round(processing_time, 2),
                     'worker_id': self.worker_id,
-                    'total_chain_time_ms': chain_result.get('total_processing_time_ms', 0)
+                    'total_chain_time_ms': chain_result.get('total_processing_time_ms', 0),
+                    'sequential_chain_time_ms': chain_result.get('sequential_processing_time_ms', 0)
                 },
                 'processed_at': datetime.utcnow().isoformat(),
                 'retry_count': attempt
@@ -335,7 +533,9 @@ class OCRWorker:
             message.finish()
 
             if save_result is not None:
-                self.processed_count += 1
+                with self.stats_lock:
+                    self.processed_count += 1
+                self._signal_if_job_done(job_id, save_result)
                 logger.info(f"Worker {self.worker_id}: Successfully processed chain for {os.path.basename(file_path)} in {processing_time:.2f}s")
             else:
                 logger.info(f"Worker {self.worker_id}: File {os.path.basename(file_path)} was already processed by another worker, skipping")
@@ -344,6 +544,30 @@ class OCRWorker:
             logger.error(f"Error in chain task processing: {e}", exc_info=True)
             raise
 
+    def _signal_if_job_done(self, job_id, save_result):
+        """
+        Signal the result aggregator when this worker consumed the job's last task
+
+        Runs in a pool thread, so the publish is handed to the hub, which owns
+        the worker's producer.
+
+        Args:
+            job_id: Job identifier
+            save_result: Job counters returned by save_file_*_atomic (None if not saved)
+        """
+        if not save_result or not BulkJob.is_drained(save_result):
+            return
+
+        self.hub.loop.run_callback_threadsafe(gevent.spawn, self._publish_job_done, job_id)
+
+    def _publish_job_done(self, job_id):
+        """Publish a job done signal from the hub"""
+        try:
+            self.nsq_service.publish_job_done(job_id, source=self.worker_id)
+        except Exception as e:
+            # The aggregator's safety-net scan still picks the job up
+            logger.warning(f"Worker {self.worker_id}: Could not signal completion of job {job_id}: {e}")
+
     def _is_directory_readonly(self, directory_path):
         """
         Check if a directory is mounted as read-only by attempting a test write.
@@ -476,16 +700,20 @@ class OCRWorker:
             # Create task consumer with extended timeout for long-running OCR tasks
             # timeout: socket timeout in seconds
             # heartbeat_interval: in seconds to keep connection alive
-            task_reader = gnsq.Reader(
-                topic='bulk_ocr_file_tasks',
-                channel='bulk_ocr_workers',
-                lookupd_http_addresses=self.nsqlookupd_addresses,
-                max_in_flight=5,  # Process 5 files concurrently per worker
-                message_handler=self.handle_file_task,
-                timeout=900,  # 15 minutes socket timeout for long OCR processing
-                heartbeat_interval=5,  # 5 seconds heartbeat to keep connection alive
-                output_buffer_size=16384  # Increase buffer for faster processing
-            )
+            # One reader per priority lane; lane_scheduler decides which lane's tasks run next
+            task_readers = {
+                lane: gnsq.Reader(
+                    topic=NSQService.task_topic(lane),
+                    channel='bulk_ocr_workers',
+                    lookupd_http_addresses=self.nsqlookupd_addresses,
+                    max_in_flight=self.max_in_flight,  # Messages dispatched concurrently to the task pool
+                    message_handler=self.dispatch_file_task,
+                    timeout=900,  # 15 minutes socket timeout for long OCR processing
+                    heartbeat_interval=5,  # 5 seconds heartbeat to keep connection alive
+                    output_buffer_size=16384  # Increase buffer for faster processing
+                )
+                for lane in Config.NSQ_PRIORITY_LANES
+            }
 
             # Create control message consumer with standard timeout
             control_reader = gnsq.Reader(
@@ -499,14 +727,15 @@ class OCRWorker:
             )
 
             # Start consumers
-            task_reader.start()
-            control_reader.start()
+            for task_reader in task_readers.values():
+                task_reader.start(block=False)
+            control_reader.start(block=False)
 
-            logger.info(f"Worker {self.worker_id} is ready and listening for messages")
+            logger.info(f"Worker {self.worker_id} is ready and listening for messages "
+                        f"(lanes={','.join(task_readers)}, max_in_flight={self.max_in_flight}, pool={self.task_pool.maxsize})")
 
-            # Keep running
-            while True:
-                time.sleep(1)
+            # Keep running (cooperative wait so reader greenlets are scheduled)
+            gevent.joinall([gevent.spawn(task_reader.join) for task_reader in task_readers.values()])
 
         except KeyboardInterrupt:
             logger.info(f"Worker {self.worker_id} shutting down...")
@@ -514,5 +743,6 @@ class OCRWorker:
             logger.error(f"Worker {self.worker_id} error: {e}", exc_info=True)
         finally:
             logger.info(f"Worker {self.worker_id} processed {self.processed_count} files with {self.error_count} errors")
+            self.nsq_service.close()
             if hasattr(self, 'app_context'):
                 self.app_context.pop()
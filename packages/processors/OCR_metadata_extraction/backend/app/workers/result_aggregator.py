@@ -1,15 +1,23 @@
 """Service to monitor job completion and trigger final aggregation"""
+import gnsq
 import time
 import logging
 import os
 import json
 import csv
+import shutil
+import tempfile
 import zipfile
 from datetime import datetime
 from pathlib import Path
+from gevent import queue
 from flask import current_app
 from app import create_app
+from app.config import Config
 from app.models.bulk_job import BulkJob
+from app.models.bulk_job_result import BulkJobResult
+from app.services.nsq_service import JOB_DONE_TOPIC
+from app.services.incremental_planner import IncrementalPlanner
 
 logger = logging.getLogger(__name__)
 
@@ -23,18 +31,75 @@ except ImportError:
     ENRICHMENT_AVAILABLE = False
     logger.warning("Enrichment service not available")
 
+# Column order of the CSV report
+CSV_FIELDNAMES = [
+    'File', 'File Path', 'Status', 'Provider', 'Languages', 'Confidence',
+    'Detected Language', 'Handwriting', 'Character Count', 'Blocks Count',
+    'Words Count', 'Pages Processed', 'Processed At', 'File Size',
+    'File Extension', 'Processing Time', 'Worker ID', 'OCR Text', 'Error'
+]
+
+
+class _StatisticsAccumulator:
+    """Running totals for result statistics, updated one result at a time"""
+
+    def __init__(self):
+        self.count = 0
+        self.total_characters = 0
+        self.total_confidence = 0
+        self.total_words = 0
+        self.total_blocks = 0
+        self.languages = set()
+
+    def add(self, result):
+        self.count += 1
+        self.total_characters += len(result.get('text', ''))
+        self.total_confidence += result.get('confidence', 0) or 0
+        self.total_words += result.get('words_count', 0) or 0
+        self.total_blocks += result.get('blocks_count', 0) or 0
+        lang = result.get('detected_language', '')
+        if lang:
+            self.languages.add(lang)
+
+    def summary(self):
+        if not self.count:
+            return {
+                'total_characters': 0,
+                'average_confidence': 0,
+                'average_words': 0,
+                'average_blocks': 0,
+                'languages': []
+            }
+
+        return {
+            'total_characters': self.total_characters,
+            'average_confidence': round(self.total_confidence / self.count, 2),
+            'average_words': round(self.total_words / self.count, 2),
+            'average_blocks': round(self.total_blocks / self.count, 2),
+            'languages': sorted(self.languages)
+        }
+
 
 class ResultAggregator:
     """Monitors NSQ jobs for completion and generates final reports"""
 
-    def __init__(self, check_interval=10):
+    def __init__(self, check_interval=None):
         """
         Initialize result aggregator
 
+        Jobs are aggregated as soon as a worker publishes a job done signal.
+        The periodic scan only acts as a safety net for lost signals.
+
         Args:
-            check_interval: Seconds between completion checks (default: 10)
+            check_interval: Seconds between safety-net scans (default: Config.AGGREGATOR_SAFETY_SCAN_INTERVAL)
         """
-        self.check_interval = check_interval
+        self.check_interval = check_interval or Config.AGGREGATOR_SAFETY_SCAN_INTERVAL
+        self.pending_jobs = queue.Queue()
+        self.nsqlookupd_addresses = [
+            addr if addr.startswith('http://') or addr.startswith('https://')
+            else f'http://{addr}'
+            for addr in Config.NSQLOOKUPD_ADDRESSES
+        ]
 
         # Initialize Flask app for MongoDB access
         self.app = create_app()
@@ -44,166 +109,240 @@ class ResultAggregator:
         # Get MongoDB connection directly from models
         from app.models import mongo
         self.mongo = mongo
+        BulkJobResult.ensure_indexes(self.mongo)
 
-        logger.info(f"Result Aggregator initialized (check interval: {check_interval}s)")
+        logger.info(f"Result Aggregator initialized (safety-net scan interval: {self.check_interval}s)")
 
     def run(self):
-        """Continuously monitor for completed jobs"""
+        """Aggregate jobs on completion signals, with a periodic safety-net scan"""
         logger.info("Result Aggregator starting...")
 
+        done_reader = None
         try:
+            try:
+                done_reader = gnsq.Reader(
+                    topic=JOB_DONE_TOPIC,
+                    channel='result_aggregator',
+                    lookupd_http_addresses=self.nsqlookupd_addresses,
+                    max_in_flight=10,
+                    message_handler=self.handle_job_done,
+                    timeout=60,
+                    heartbeat_interval=5
+                )
+                done_reader.start(block=False)
+                logger.info(f"Listening for job completion signals on '{JOB_DONE_TOPIC}'")
+            except Exception as e:
+                done_reader = None
+                logger.error(f"Could not subscribe to '{JOB_DONE_TOPIC}', relying on safety-net scan: {e}")
+
+            # Catch up on jobs that finished while the aggregator was down
+            self.check_for_completed_jobs()
+            next_scan = time.monotonic() + self.check_interval
+
             while True:
-                self.check_for_completed_jobs()
-                time.sleep(self.check_interval)
+                try:
+                    job_id = self.pending_jobs.get(timeout=max(0, next_scan - time.monotonic()))
+                    self.process_job(job_id)
+                except queue.Empty:
+                    pass
+
+                if time.monotonic() >= next_scan:
+                    self.check_for_completed_jobs()
+                    next_scan = time.monotonic() + self.check_interval
         except KeyboardInterrupt:
             logger.info("Result Aggregator shutting down...")
         except Exception as e:
             logger.error(f"Result Aggregator error: {e}", exc_info=True)
         finally:
+            if done_reader is not None:
+                done_reader.close()
             if hasattr(self, 'app_context'):
                 self.app_context.pop()
 
+    def handle_job_done(self, sender, message):
+        """
+        Queue a job for aggregation when a worker signals its last task was consumed
+
+        Aggregation itself runs in the main loop; the gevent queue lets the
+        reader greenlets run while the loop waits for work.
+
+        Args:
+            sender: NSQ reader
+            message: NSQ message containing the job_id
+        """
+        try:
+            data = json.loads(message.body.decode('utf-8'))
+            job_id = data.get('job_id')
+            if job_id:
+                logger.info(f"Job done signal received for {job_id} (from {data.get('source')})")
+                self.pending_jobs.put(job_id)
+        except Exception as e:
+            logger.error(f"Invalid job done message: {e}")
+        finally:
+            message.finish()
+
     def check_for_completed_jobs(self):
         """
-        Find jobs where consumed_count == published_count
-        and status == 'processing'
+        Safety-net scan for jobs where consumed_count == published_count
+        and status == 'processing' whose done signal was lost
         """
         try:
+            self.fail_interrupted_scans()
+            self.reconcile_stalled_jobs()
             completed_jobs = BulkJob.find_ready_for_aggregation(self.mongo)
 
             if completed_jobs:
-                logger.info(f"Found {len(completed_jobs)} jobs ready for aggregation")
+                logger.info(f"Safety-net scan found {len(completed_jobs)} jobs ready for aggregation")
 
             for job in completed_jobs:
-                job_id = job['job_id']
-                published = job.get('published_count', 0)
-                consumed = job.get('consumed_count', 0)
-
-                # Verify job has at least some checkpoint data
-                checkpoint = job.get('checkpoint', {})
-                results_count = len(checkpoint.get('results', []))
-                errors_count = len(checkpoint.get('errors', []))
-                total_saved = results_count + errors_count
-
-                logger.info(f"Job {job_id}: published={published}, consumed={consumed}, results={results_count}, errors={errors_count}, total_saved={total_saved}")
-
-                # CRITICAL CHECK: Ensure saved results match published count
-                # This prevents race condition where consumed_count == published_count
-                # but results haven't been committed to MongoDB yet
-                if total_saved < published:
-                    logger.warning(f"Job {job_id} data incomplete: {total_saved}/{published} results saved. Waiting for data to settle...")
-                    # Skip this round, will retry on next check in 10 seconds
-                    continue
-
-                # Additional safety: check if counts make sense
-                if total_saved > published:
-                    logger.error(f"Job {job_id} data corruption: {total_saved} saved but only {published} published!")
-                    try:
-                        BulkJob.mark_as_error(self.mongo, job_id, "Data corruption detected: more results than tasks")
-                    except Exception as mark_error:
-                        logger.error(f"Failed to mark job {job_id} as error: {mark_error}")
-                    continue
+                self.process_job(job['job_id'], job)
+
+        except Exception as e:
+            logger.error(f"Error checking for completed jobs: {e}", exc_info=True)
 
-                # Safety check: ensure we have results or errors (not just completed message processing)
-                if total_saved == 0 and published > 0:
-                    logger.warning(f"Job {job_id} marked complete but has no results! published={published}, consumed={consumed}")
-                    # This might indicate a race condition, skip for now
-                    continue
+    def fail_interrupted_scans(self):
+        """Mark jobs as failed whose folder scan died before publishing every task"""
+        for job_id in BulkJob.find_interrupted_scans(self.mongo, Config.NSQ_SCAN_STALE_SECONDS):
+            logger.error(f"Job {job_id}: folder scan made no progress for {Config.NSQ_SCAN_STALE_SECONDS}s, marking as error")
+            BulkJob.mark_as_error(self.mongo, job_id, "Folder scan was interrupted before all files were published")
 
-                # All validation passed, proceed with aggregation
-                logger.info(f"Aggregating results for job {job_id}")
+    def reconcile_stalled_jobs(self):
+        """
+        Recount consumed files of jobs that stopped just short of draining
 
-                # Wait briefly to ensure MongoDB write consistency
-                time.sleep(2)
+        A worker that died after marking a file counted but before the
+        increment leaves consumed_count one short with no message left to
+        redeliver; the recount lets the job reach aggregation.
+        """
+        for job_id in BulkJob.find_stalled(self.mongo, Config.AGGREGATOR_RECONCILE_IDLE_SECONDS):
+            job = BulkJob.reconcile_consumed_count(self.mongo, job_id)
+            if job:
+                logger.warning(f"Job {job_id}: consumed_count reconciled to {job.get('consumed_count')}")
 
-                # Re-fetch job to get latest data
-                latest_job = BulkJob.get_by_job_id(self.mongo, job_id)
-                if latest_job:
-                    job = latest_job
+    def process_job(self, job_id, job=None):
+        """
+        Validate that a job is complete, claim it and aggregate its results
 
-                self.aggregate_job_results(job_id)
+        Args:
+            job_id: Job identifier
+            job: Optional job document already fetched (without checkpoint arrays)
+        """
+        try:
+            if job is None:
+                job = BulkJob.get_by_job_id(self.mongo, job_id, BulkJob.EXCLUDE_CHECKPOINT_ARRAYS)
+            if not job or not self._is_job_ready(job):
+                return
+
+            # Only one aggregator run per job, even with duplicate signals
+            if not BulkJob.claim_for_aggregation(self.mongo, job_id, Config.AGGREGATOR_CLAIM_TIMEOUT):
+                logger.info(f"Job {job_id} already claimed for aggregation, skipping")
+                return
+
+            logger.info(f"Aggregating results for job {job_id}")
+            self.aggregate_job_results(job_id)
 
         except Exception as e:
-            logger.error(f"Error checking for completed jobs: {e}", exc_info=True)
+            logger.error(f"Error processing completed job {job_id}: {e}", exc_info=True)
+
+    def _is_job_ready(self, job):
+        """
+        Check that all published tasks were consumed and their records saved
+
+        Args:
+            job: Job document
+
+        Returns:
+            True if the job can be aggregated
+        """
+        job_id = job['job_id']
+        published = job.get('published_count', 0)
+        consumed = job.get('consumed_count', 0)
+
+        # An incremental job with nothing new to process only merges its base job's results
+        nothing_published = published == 0 and not (job.get('incremental') or {}).get('base_job_id')
+
+        # Workers can catch up with a chunk while later chunks are still being published
+        if (job.get('status') != 'processing' or job.get('scanning') or nothing_published
+                or consumed < published or published < job.get('total_files', 0)):
+            logger.debug(f"Job {job_id} not ready: status={job.get('status')}, published={published}, consumed={consumed}")
+            return False
+
+        # Verify job has saved per-file records for every consumed task
+        results_count = BulkJobResult.count_by_job(self.mongo, job_id, BulkJobResult.RECORD_RESULT)
+        errors_count = BulkJobResult.count_by_job(self.mongo, job_id, BulkJobResult.RECORD_ERROR)
+        total_saved = results_count + errors_count
+
+        logger.info(f"Job {job_id}: published={published}, consumed={consumed}, results={results_count}, errors={errors_count}, total_saved={total_saved}")
+
+        # Records are written before consumed_count is incremented, so this
+        # only happens if records were deleted; the safety net retries later
+        if total_saved < published:
+            logger.warning(f"Job {job_id} data incomplete: {total_saved}/{published} results saved")
+            return False
+
+        # Additional safety: check if counts make sense (an interrupted incremental
+        # aggregation may already have copied results from the base job)
+        if total_saved > published and not job.get('incremental'):
+            logger.error(f"Job {job_id} data corruption: {total_saved} saved but only {published} published!")
+            try:
+                BulkJob.mark_as_error(self.mongo, job_id, "Data corruption detected: more results than tasks")
+            except Exception as mark_error:
+                logger.error(f"Failed to mark job {job_id} as error: {mark_error}")
+            return False
+
+        return True
 
     def aggregate_job_results(self, job_id):
         """
         Generate final reports and update job status
 
+        Results are streamed from the bulk_job_results collection in a single
+        cursor pass that writes every export format incrementally, so memory
+        use does not depend on the number of files in the job.
+
         Args:
             job_id: Job identifier to aggregate
         """
         try:
-            # Fetch job from MongoDB
-            job = BulkJob.get_by_job_id(self.mongo, job_id)
+            # Fetch job from MongoDB (per-file records live in bulk_job_results)
+            job = BulkJob.get_by_job_id(self.mongo, job_id, BulkJob.EXCLUDE_CHECKPOINT_ARRAYS)
             if not job:
                 logger.error(f"Job {job_id} not found")
                 return
 
-            # Check entire checkpoint structure
-            checkpoint = job.get('checkpoint', {})
-            logger.error(f"Job {job_id} checkpoint keys: {list(checkpoint.keys())}")
-            logger.error(f"Job {job_id} checkpoint size: {len(str(checkpoint))} bytes")
-            logger.error(f"Job {job_id} full checkpoint structure: {checkpoint}")
-
-            results = checkpoint.get('results', [])
-            errors = checkpoint.get('errors', [])
-
-            # CRITICAL FIX: Deduplicate results by filename
-            # Some files may be processed twice due to NSQ redelivery or race conditions
-            # Keep only the first occurrence of each file
-            results_before_dedup = len(results)
-            results = self._deduplicate_results(results)
-            results_after_dedup = len(results)
-
-            if results_before_dedup > results_after_dedup:
-                logger.warning(f"Job {job_id}: Removed {results_before_dedup - results_after_dedup} duplicate results")
-
-            logger.error(f"Job {job_id}: {len(results)} successful, {len(errors)} failed")
-
-            # Critical: Log if results exist
-            if len(results) > 0:
-                logger.error(f"Job {job_id} has {len(results)} results")
-                logger.error(f"Job {job_id} first result: {results[0]}")
-            else:
-                logger.error(f"Job {job_id} has NO results in checkpoint! This is the problem.")
-                logger.error(f"Job {job_id} published_count={job.get('published_count', 0)}, consumed_count={job.get('consumed_count', 0)}")
+            # Incremental jobs only processed new or changed files; copy the rest from the base job
+            incremental = job.get('incremental')
+            if incremental:
+                # Reused results are numbered after the files this job published
+                incremental = IncrementalPlanner.merge_previous_results(
+                    self.mongo, job_id, incremental, job.get('total_files', 0)
+                )
 
-            # Generate statistics
-            statistics = self._generate_statistics(results)
+            successful = BulkJobResult.count_by_job(self.mongo, job_id, BulkJobResult.RECORD_RESULT)
+            failed = BulkJobResult.count_by_job(self.mongo, job_id, BulkJobResult.RECORD_ERROR)
+
+            logger.info(f"Job {job_id}: {successful} successful, {failed} failed")
+
+            if successful == 0:
+                logger.error(f"Job {job_id} has no successful results in bulk_job_results")
+                logger.error(f"Job {job_id} published_count={job.get('published_count', 0)}, consumed_count={job.get('consumed_count', 0)}")
 
             # Create output directory
             output_dir = self._get_output_dir(job_id)
             os.makedirs(output_dir, exist_ok=True)
 
-            # Export results to various formats
-            export_files = {}
-
-            # JSON export
-            json_file = self._export_to_json(output_dir, job_id, results, errors, statistics)
-            export_files['json'] = json_file
-
-            # CSV export
-            csv_file = self._export_to_csv(output_dir, job_id, results, errors)
-            export_files['csv'] = csv_file
-
-            # Text export
-            txt_file = self._export_to_text(output_dir, job_id, results, errors, statistics)
-            export_files['txt'] = txt_file
-
-            # Create individual JSON files for each result (for compatibility with threading mode)
-            individual_json_files = self._create_individual_json_files(output_dir, results)
-
-            # Create ZIP archive with main reports and individual JSON files
-            zip_file = self._create_zip_archive(output_dir, job_id, export_files, individual_json_files)
-            export_files['zip'] = zip_file
+            # Export results to all formats and the ZIP archive in one streaming pass
+            export_files, statistics, results_preview = self._stream_exports(
+                output_dir, job_id, successful, failed
+            )
+            zip_file = export_files['zip']
 
             # Update job with final results (match threading job format for frontend compatibility)
             final_results = {
                 'summary': {
-                    'total_files': job.get('total_files', 0),
-                    'successful': len(results),
-                    'failed': len(errors),
+                    'total_files': successful + failed if incremental else job.get('total_files', 0),
+                    'successful': successful,
+                    'failed': failed,
                     'processed_at': datetime.utcnow().isoformat(),
                     'statistics': statistics
                 },
@@ -211,30 +350,15 @@ class ResultAggregator:
                 'zip_path': zip_file,
                 # Add download_url for frontend compatibility
                 'download_url': f'/api/bulk/download/{job_id}',
-                # Add results_preview for frontend compatibility
-                'results_preview': {
-                    'total_results': len(results),
-                    'successful_samples': [
-                        {
-                            'file': r.get('file') or r.get('filename') or r.get('file_info', {}).get('filename', 'unknown'),
-                            'file_path': r.get('file_path', ''),
-                            'confidence': r.get('confidence', 0),
-                            'text': r.get('text', ''),
-                            'text_length': len(r.get('text', '')),
-                            'language': r.get('detected_language', 'unknown'),
-                            'provider': r.get('provider', 'unknown')
-                        }
-                        for r in results
-                    ],
-                    'error_samples': [
-                        {
-                            'file': e.get('file') or e.get('filename') or e.get('file_info', {}).get('filename', 'unknown'),
-                            'error': e.get('error', 'Unknown error')
-                        }
-                        for e in errors
-                    ]
-                }
+                # Bounded preview for frontend compatibility (full results are in the exports)
+                'results_preview': results_preview
             }
+            if incremental:
+                final_results['summary']['incremental'] = {
+                    'base_job_id': incremental['base_job_id'],
+                    'processed': job.get('published_count', 0),
+                    'reused': incremental['reused']
+                }
 
             BulkJob.mark_as_completed(self.mongo, job_id, final_results)
 
@@ -248,7 +372,7 @@ class ResultAggregator:
                         'collection_id': collection_id,
                         'collection_name': job.get('collection_name', 'Unknown'),
                         'archive_name': job.get('archive_name', 'Unknown'),
-                        'total_documents': len(results)
+                        'total_documents': successful
                     }
 
                     enrichment_job_id = trigger_enrichment_after_ocr(
@@ -272,176 +396,210 @@ class ResultAggregator:
             except:
                 pass
 
-    def _deduplicate_results(self, results):
+    def _stream_exports(self, output_dir, job_id, successful, failed):
         """
-        Remove duplicate results by filename, keeping only the first occurrence
+        Write JSON, JSON Lines, CSV, text and ZIP exports from a single cursor pass
+
+        Only one result is held in memory at a time: each record is appended
+        to every export file and written straight into the ZIP as its
+        individual JSON entry. Statistics are accumulated on the fly and the
+        text report header is prepended once the pass is complete.
 
         Args:
-            results: List of result dictionaries
+            output_dir: Directory for export files
+            job_id: Job identifier
+            successful: Number of successful results (for report headers)
+            failed: Number of failed files (for report headers)
 
         Returns:
-            List of results with duplicates removed
+            Tuple of (export_files dict, statistics dict, bounded results_preview dict)
         """
-        seen_files = set()
-        deduped = []
-        duplicates_removed = []
-
-        for result in results:
-            # Get filename from result (might be in 'file' or 'filename' field)
-            filename = result.get('file') or result.get('filename')
-
-            if filename not in seen_files:
-                # First occurrence - keep it
-                deduped.append(result)
-                seen_files.add(filename)
-            else:
-                # Duplicate - log and skip
-                logger.warning(
-                    f"Duplicate result found for: {filename} - "
-                    f"provider={result.get('provider')}, "
-                    f"text_len={len(result.get('text', ''))}"
-                )
-                duplicates_removed.append(filename)
-
-        if duplicates_removed:
-            logger.info(f"Removed {len(duplicates_removed)} duplicate results: {set(duplicates_removed)}")
-
-        return deduped
-
-    def _generate_statistics(self, results):
-        """Generate statistics from processed results"""
-        if not results:
-            return {
-                'total_characters': 0,
-                'average_confidence': 0,
-                'average_words': 0,
-                'average_blocks': 0,
-                'languages': []
-            }
-
-        total_chars = sum(len(r.get('text', '')) for r in results)
-        avg_confidence = sum(r.get('confidence', 0) for r in results) / len(results) if results else 0
-        avg_words = sum(r.get('words_count', 0) for r in results) / len(results) if results else 0
-        avg_blocks = sum(r.get('blocks_count', 0) for r in results) / len(results) if results else 0
-
-        # Collect unique languages
-        languages = set()
-        for result in results:
-            lang = result.get('detected_language', '')
-            if lang:
-                languages.add(lang)
-
-        return {
-            'total_characters': total_chars,
-            'average_confidence': round(avg_confidence, 2),
-            'average_words': round(avg_words, 2),
-            'average_blocks': round(avg_blocks, 2),
-            'languages': sorted(list(languages))
+        batch_size = Config.AGGREGATOR_CURSOR_BATCH_SIZE
+        max_samples = Config.AGGREGATOR_PREVIEW_MAX_SAMPLES
+
+        export_files = {
+            'json': os.path.join(output_dir, f'{job_id}_results.json'),
+            'jsonl': os.path.join(output_dir, f'{job_id}_results.jsonl'),
+            'csv': os.path.join(output_dir, f'{job_id}_results.csv'),
+            'txt': os.path.join(output_dir, f'{job_id}_results.txt'),
+            'zip': os.path.join(output_dir, f'{job_id}_bulk_ocr_results.zip')
         }
+        statistics = _StatisticsAccumulator()
+        results_preview = {
+            'total_results': successful,
+            # Set once the samples are known to be capped in number or text;
+            # full results live in bulk_job_results and the exports
+            'samples_truncated': False,
+            'successful_samples': [],
+            'error_samples': []
+        }
+        individual_count = 0
+        error_count = 0
 
-    def _get_output_dir(self, job_id):
-        """Get output directory for job"""
-        base_dir = current_app.config.get('UPLOAD_FOLDER', '/app/uploads')
-        return os.path.join(base_dir, 'bulk_results', job_id)
-
-    def _export_to_json(self, output_dir, job_id, results, errors, statistics):
-        """Export results to JSON file"""
-        output_file = os.path.join(output_dir, f'{job_id}_results.json')
+        with open(export_files['json'], 'w', encoding='utf-8') as json_f, \
+                open(export_files['jsonl'], 'w', encoding='utf-8') as jsonl_f, \
+                open(export_files['csv'], 'w', newline='', encoding='utf-8') as csv_f, \
+                tempfile.TemporaryFile('w+', encoding='utf-8', dir=output_dir) as txt_body, \
+                zipfile.ZipFile(export_files['zip'], 'w', zipfile.ZIP_DEFLATED) as zipf:
 
-        export_data = {
-            'metadata': {
+            metadata = {
                 'job_id': job_id,
                 'generated_at': datetime.utcnow().isoformat(),
-                'total_files': len(results) + len(errors),
-                'successful': len(results),
-                'failed': len(errors),
-            },
-            'summary': statistics,
-            'results': results,
-            'errors': errors
-        }
-
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(export_data, f, ensure_ascii=False, indent=2)
-
-        file_size = os.path.getsize(output_file)
-        logger.info(f"JSON report exported to: {output_file} ({file_size} bytes)")
-        logger.debug(f"JSON export: {len(results)} results, {len(errors)} errors")
-        return output_file
-
-    def _export_to_csv(self, output_dir, job_id, results, errors):
-        """Export results to CSV file"""
-        output_file = os.path.join(output_dir, f'{job_id}_results.csv')
-
-        # Combine successful and error results
-        all_results = []
-        for result in results:
-            file_info = result.get('file_info', {})
-            metadata = result.get('metadata', {})
-
-            row = {
-                'File': result.get('file', ''),
-                'File Path': result.get('file_path', ''),
-                'Status': 'Success',
-                'Provider': result.get('provider', ''),
-                'Languages': ','.join(result.get('languages', [])),
-                'Confidence': result.get('confidence', 0),
-                'Detected Language': result.get('detected_language', ''),
-                'Handwriting': result.get('handwriting', False),
-                'Character Count': len(result.get('text', '')),
-                'Blocks Count': result.get('blocks_count', 0),
-                'Words Count': result.get('words_count', 0),
-                'Pages Processed': result.get('pages_processed', 1),
-                'Processed At': result.get('processed_at', ''),
-                'File Size': file_info.get('size', ''),
-                'File Extension': file_info.get('extension', ''),
-                'Processing Time': metadata.get('processing_time', ''),
-                'Worker ID': metadata.get('worker_id', ''),
-                'OCR Text': result.get('text', ''),
-                'Error': ''
-            }
-            all_results.append(row)
-
-        for error in errors:
-            row = {
-                'File': error.get('file', ''),
-                'File Path': error.get('file_path', ''),
-                'Status': 'Error',
-                'Provider': '',
-                'Languages': '',
-                'Confidence': '',
-                'Detected Language': '',
-                'Handwriting': '',
-                'Character Count': '',
-                'Blocks Count': '',
-                'Words Count': '',
-                'Pages Processed': '',
-                'Processed At': error.get('processed_at', ''),
-                'File Size': '',
-                'File Extension': '',
-                'Processing Time': '',
-                'Worker ID': '',
-                'OCR Text': '',
-                'Error': error.get('error', '')
+                'total_files': successful + failed,
+                'successful': successful,
+                'failed': failed,
             }
-            all_results.append(row)
-
-        if all_results:
-            fieldnames = list(all_results[0].keys())
-            with open(output_file, 'w', newline='', encoding='utf-8') as f:
-                writer = csv.DictWriter(f, fieldnames=fieldnames)
-                writer.writeheader()
-                writer.writerows(all_results)
+            json_f.write('{\n  "metadata": ')
+            json_f.write(self._indent_json(metadata))
+            json_f.write(',\n  "results": [')
+
+            csv_writer = csv.DictWriter(csv_f, fieldnames=CSV_FIELDNAMES)
+            csv_writer.writeheader()
+
+            # Successful results
+            if successful:
+                txt_body.write("-" * 80 + "\n")
+                txt_body.write("SUCCESSFUL RESULTS\n")
+                txt_body.write("-" * 80 + "\n\n")
+
+            results_cursor = BulkJobResult.iter_by_job(
+                self.mongo, job_id, BulkJobResult.RECORD_RESULT, batch_size=batch_size
+            )
+            for idx, result in enumerate(results_cursor, 1):
+                statistics.add(result)
+
+                json_f.write(('\n    ' if idx == 1 else ',\n    ') + self._indent_json(result, level=2))
+                jsonl_f.write(json.dumps(dict(result, record_type='result'), ensure_ascii=False, default=str) + '\n')
+                csv_writer.writerow(self._result_csv_row(result))
+                self._write_text_result(txt_body, idx, result)
+                self._write_individual_json(zipf, result, idx)
+                individual_count += 1
+
+                if len(results_preview['successful_samples']) < max_samples:
+                    results_preview['successful_samples'].append(
+                        BulkJobResult.to_sample(result, Config.AGGREGATOR_PREVIEW_MAX_TEXT_CHARS)
+                    )
 
-        file_size = os.path.getsize(output_file) if os.path.exists(output_file) else 0
-        logger.info(f"CSV report exported to: {output_file} ({file_size} bytes)")
-        logger.debug(f"CSV export: {len(all_results)} total rows")
-        return output_file
+            json_f.write('\n  ],\n  "errors": [')
+
+            # Errors
+            if failed:
+                txt_body.write("-" * 80 + "\n")
+                txt_body.write("ERRORS\n")
+                txt_body.write("-" * 80 + "\n\n")
+
+            errors_cursor = BulkJobResult.iter_by_job(
+                self.mongo, job_id, BulkJobResult.RECORD_ERROR, batch_size=batch_size
+            )
+            for idx, error in enumerate(errors_cursor, 1):
+                json_f.write(('\n    ' if idx == 1 else ',\n    ') + self._indent_json(error, level=2))
+                jsonl_f.write(json.dumps(dict(error, record_type='error'), ensure_ascii=False, default=str) + '\n')
+                csv_writer.writerow(self._error_csv_row(error))
+
+                txt_body.write(f"[{idx}] {error.get('file', 'Unknown')}\n")
+                txt_body.write(f"Path: {error.get('file_path', '')}\n")
+                txt_body.write(f"Error: {error.get('error', '')}\n")
+                txt_body.write("\n")
+
+                error_count += 1
+
+                if len(results_preview['error_samples']) < max_samples:
+                    results_preview['error_samples'].append(BulkJobResult.to_error_sample(error))
+
+            results_preview['samples_truncated'] = (
+                individual_count > max_samples
+                or error_count > max_samples
+                or any(sample.get('text_truncated') for sample in results_preview['successful_samples'])
+            )
+
+            stats = statistics.summary()
+            json_f.write('\n  ],\n  "summary": ')
+            json_f.write(self._indent_json(stats))
+            json_f.write('\n}\n')
+
+            # Text report: header and statistics first, then the streamed body
+            self._write_text_report(export_files['txt'], job_id, successful, failed, stats, txt_body)
+
+            # Add main report files to the ZIP (copied from disk in chunks)
+            for report_file in (json_f, jsonl_f, csv_f):
+                report_file.flush()
+            for format_type, file_path in export_files.items():
+                if format_type != 'zip':
+                    zipf.write(file_path, os.path.basename(file_path))
+                    logger.debug(f"Added to zip: {os.path.basename(file_path)}")
+
+            # Add enrichment results if available
+            enrichment_count = self._add_enrichment_results_to_zip(zipf, job_id)
+            if enrichment_count > 0:
+                logger.info(f"Added {enrichment_count} enriched documents to ZIP")
+
+        for format_type, file_path in export_files.items():
+            logger.info(f"{format_type.upper()} report exported to: {file_path} ({os.path.getsize(file_path)} bytes)")
+        logger.info(f"Added {individual_count} individual JSON files to ZIP")
+
+        return export_files, stats, results_preview
+
+    @staticmethod
+    def _indent_json(data, level=1):
+        """Serialize data as indented JSON nested `level` levels deep in the JSON report"""
+        text = json.dumps(data, ensure_ascii=False, indent=2, default=str)
+        return text.replace('\n', '\n' + '  ' * level)
+
+    @staticmethod
+    def _result_csv_row(result):
+        """Build a CSV row for a successful result"""
+        file_info = result.get('file_info', {})
+        metadata = result.get('metadata', {})
 
-    def _export_to_text(self, output_dir, job_id, results, errors, statistics):
-        """Export results to plain text file"""
-        output_file = os.path.join(output_dir, f'{job_id}_results.txt')
+        return {
+            'File': result.get('file', ''),
+            'File Path': result.get('file_path', ''),
+            'Status': 'Success',
+            'Provider': result.get('provider', ''),
+            'Languages': ','.join(result.get('languages', []) or []),
+            'Confidence': result.get('confidence', 0),
+            'Detected Language': result.get('detected_language', ''),
+            'Handwriting': result.get('handwriting', False),
+            'Character Count': len(result.get('text', '')),
+            'Blocks Count': result.get('blocks_count', 0),
+            'Words Count': result.get('words_count', 0),
+            'Pages Processed': result.get('pages_processed', 1),
+            'Processed At': result.get('processed_at', ''),
+            'File Size': file_info.get('size', ''),
+            'File Extension': file_info.get('extension', ''),
+            'Processing Time': metadata.get('processing_time', ''),
+            'Worker ID': metadata.get('worker_id', ''),
+            'OCR Text': result.get('text', ''),
+            'Error': ''
+        }
 
+    @staticmethod
+    def _error_csv_row(error):
+        """Build a CSV row for a failed file"""
+        row = {field: '' for field in CSV_FIELDNAMES}
+        row.update({
+            'File': error.get('file', ''),
+            'File Path': error.get('file_path', ''),
+            'Status': 'Error',
+            'Processed At': error.get('processed_at', ''),
+            'Error': error.get('error', '')
+        })
+        return row
+
+    @staticmethod
+    def _write_text_result(f, idx, result):
+        """Append one successful result to the text report body"""
+        f.write(f"[{idx}] {result.get('file', 'Unknown')}\n")
+        f.write(f"Path: {result.get('file_path', '')}\n")
+        f.write(f"Provider: {result.get('provider', '')}\n")
+        f.write(f"Confidence: {result.get('confidence', 0):.2f}\n")
+        f.write(f"Text Length: {len(result.get('text', ''))} characters\n")
+        f.write(f"Extracted Text:\n{result.get('text', '')}\n")
+        f.write("\n" + "-" * 40 + "\n\n")
+
+    @staticmethod
+    def _write_text_report(output_file, job_id, successful, failed, statistics, body):
+        """Write the text report header and statistics, then copy the streamed body"""
         with open(output_file, 'w', encoding='utf-8') as f:
             # Write header
             f.write("=" * 80 + "\n")
@@ -451,9 +609,9 @@ class ResultAggregator:
             # Write summary
             f.write(f"Job ID: {job_id}\n")
             f.write(f"Generated: {datetime.utcnow().isoformat()}\n")
-            f.write(f"Total Files: {len(results) + len(errors)}\n")
-            f.write(f"Successful: {len(results)}\n")
-            f.write(f"Failed: {len(errors)}\n\n")
+            f.write(f"Total Files: {successful + failed}\n")
+            f.write(f"Successful: {successful}\n")
+            f.write(f"Failed: {failed}\n\n")
 
             # Write statistics
             if statistics:
@@ -469,113 +627,28 @@ class ResultAggregator:
                     f.write(f"Languages Detected: {', '.join(languages)}\n")
                 f.write("\n")
 
-            # Write successful results
-            if results:
-                f.write("-" * 80 + "\n")
-                f.write("SUCCESSFUL RESULTS\n")
-                f.write("-" * 80 + "\n\n")
-
-                for idx, result in enumerate(results, 1):
-                    f.write(f"[{idx}] {result.get('file', 'Unknown')}\n")
-                    f.write(f"Path: {result.get('file_path', '')}\n")
-                    f.write(f"Provider: {result.get('provider', '')}\n")
-                    f.write(f"Confidence: {result.get('confidence', 0):.2f}\n")
-                    f.write(f"Text Length: {len(result.get('text', ''))} characters\n")
-                    f.write(f"Extracted Text:\n{result.get('text', '')}\n")
-                    f.write("\n" + "-" * 40 + "\n\n")
-
-            # Write errors
-            if errors:
-                f.write("-" * 80 + "\n")
-                f.write("ERRORS\n")
-                f.write("-" * 80 + "\n\n")
-
-                for idx, error in enumerate(errors, 1):
-                    f.write(f"[{idx}] {error.get('file', 'Unknown')}\n")
-                    f.write(f"Path: {error.get('file_path', '')}\n")
-                    f.write(f"Error: {error.get('error', '')}\n")
-                    f.write("\n")
-
-        file_size = os.path.getsize(output_file) if os.path.exists(output_file) else 0
-        logger.info(f"Text report exported to: {output_file} ({file_size} bytes)")
-        logger.debug(f"Text export: {len(results)} successful, {len(errors)} failed")
-        return output_file
-
-    def _create_individual_json_files(self, output_dir, results):
-        """Create individual JSON file for each processed result"""
-        individual_json_folder = os.path.join(output_dir, 'individual_files')
-        os.makedirs(individual_json_folder, exist_ok=True)
-
-        individual_json_files = []
-        try:
-            for result in results:
-                # Get original filename without extension
-                original_filename = result.get('file', 'unknown')
-                base_name = os.path.splitext(original_filename)[0]
-
-                # Create JSON filename
-                json_filename = f"{base_name}.json"
-                json_filepath = os.path.join(individual_json_folder, json_filename)
+            body.seek(0)
+            shutil.copyfileobj(body, f)
 
-                # Write individual JSON file
-                with open(json_filepath, 'w', encoding='utf-8') as f:
-                    json.dump(result, f, indent=2, ensure_ascii=False)
-
-                individual_json_files.append(json_filepath)
-                logger.debug(f"Created individual JSON: {json_filename}")
-
-            logger.info(f"Created {len(individual_json_files)} individual JSON files")
-        except Exception as e:
-            logger.error(f"Error creating individual JSON files: {str(e)}")
-
-        return individual_json_files
+    @staticmethod
+    def _write_individual_json(zipf, result, position):
+        """
+        Write one result as its own JSON entry in the ZIP's individual_files/ folder
 
-    def _create_zip_archive(self, output_dir, job_id, export_files, individual_json_files=None):
-        """Create ZIP archive containing all reports, individual JSON files, and enrichment results"""
-        zip_file = os.path.join(output_dir, f'{job_id}_bulk_ocr_results.zip')
+        The file index keeps names unique across subfolders holding the same
+        file name, without remembering every name written so far.
+        """
+        base_name = os.path.splitext(result.get('file', 'unknown'))[0]
+        json_filename = f"{base_name}_{result.get('file_index', position)}.json"
 
-        try:
-            with zipfile.ZipFile(zip_file, 'w', zipfile.ZIP_DEFLATED) as zipf:
-                # Add main report files
-                for format_type, file_path in export_files.items():
-                    if format_type != 'zip' and file_path and os.path.exists(file_path):
-                        arcname = os.path.basename(file_path)
-                        zipf.write(file_path, arcname)
-                        logger.debug(f"Added to zip: {arcname}")
-
-                # Add individual JSON files in a subfolder
-                if individual_json_files:
-                    for json_file in individual_json_files:
-                        if os.path.exists(json_file):
-                            # Store in 'individual_files/' folder within zip
-                            arcname = os.path.join('individual_files', os.path.basename(json_file))
-                            zipf.write(json_file, arcname=arcname)
-                            logger.debug(f"Added to zip: {arcname}")
-
-                # Add enrichment results if available
-                enrichment_count = self._add_enrichment_results_to_zip(zipf, job_id)
-                if enrichment_count > 0:
-                    logger.info(f"Added {enrichment_count} enriched documents to ZIP")
-
-            # Log zip file information
-            if os.path.exists(zip_file):
-                zip_size = os.path.getsize(zip_file)
-                logger.info(f"ZIP archive created successfully: {zip_file} ({zip_size} bytes)")
-
-                # List contents for debugging
-                try:
-                    with zipfile.ZipFile(zip_file, 'r') as zipf_check:
-                        file_list = zipf_check.namelist()
-                        logger.debug(f"ZIP contents ({len(file_list)} files): {file_list}")
-                except Exception as e:
-                    logger.error(f"Error reading ZIP contents: {e}")
-            else:
-                logger.error(f"ZIP file not created at: {zip_file}")
-        except Exception as e:
-            logger.error(f"Error creating ZIP archive: {str(e)}", exc_info=True)
-            raise
+        arcname = os.path.join('individual_files', json_filename)
+        zipf.writestr(arcname, json.dumps(result, indent=2, ensure_ascii=False, default=str))
+        logger.debug(f"Added to zip: {arcname}")
 
-        return zip_file
+    def _get_output_dir(self, job_id):
+        """Get output directory for job"""
+        base_dir = current_app.config.get('UPLOAD_FOLDER', '/app/uploads')
+        return os.path.join(base_dir, 'bulk_results', job_id)
 
     def _add_enrichment_results_to_zip(self, zipf, ocr_job_id):
         """
@@ -605,15 +678,11 @@ class ResultAggregator:
             for enrichment_job in enrichment_jobs:
                 enrichment_job_id = enrichment_job['_id']
                 
-                # Fetch enriched documents for this job
-                enriched_docs = list(self.mongo.db.enriched_documents.find({
+                # Stream enriched documents for this job
+                enriched_docs = self.mongo.db.enriched_documents.find({
                     'enrichment_job_id': enrichment_job_id
-                }))
-                
-                if not enriched_docs:
-                    logger.debug(f"No enriched documents found for job {enrichment_job_id}")
-                    continue
-                
+                }).batch_size(Config.AGGREGATOR_CURSOR_BATCH_SIZE)
+
                 # Create enriched_results folder in ZIP
                 enrichment_folder = 'enriched_results'
                 
@@ -0,0 +1,135 @@
+"""Service releasing backlogged file tasks to NSQ as jobs drain (fair dispatch)"""
+import logging
+import time
+from app.config import Config
+from app.models.bulk_job import BulkJob
+from app.models.bulk_task_backlog import BulkTaskBacklog
+from app.services.nsq_service import NSQService
+
+logger = logging.getLogger(__name__)
+
+# Job states whose backlog is kept but not released
+HELD_JOB_STATUSES = ('paused',)
+
+
+class TaskDispatcher:
+    """
+    Publishes backlogged task chunks so that no job has more than
+    Config.NSQ_JOB_DISPATCH_WINDOW tasks queued in NSQ
+
+    NSQJobCoordinator only puts tasks in the backlog when Config.NSQ_FAIR_DISPATCH
+    is enabled. Jobs are served one chunk at a time in turn, lanes in priority
+    order, so a large backfill cannot queue its whole backlog ahead of a job
+    started after it.
+    """
+
+    def __init__(self, mongo=None, nsq_service=None, interval=None, window=None):
+        """
+        Initialize task dispatcher
+
+        Args:
+            mongo: MongoDB connection (default: the app's connection)
+            nsq_service: NSQService used for publishing (default: a new one)
+            interval: Seconds between passes when nothing was released (default: Config.TASK_DISPATCHER_INTERVAL)
+            window: Tasks of one job queued in NSQ at a time (default: Config.NSQ_JOB_DISPATCH_WINDOW)
+        """
+        self.interval = interval or Config.TASK_DISPATCHER_INTERVAL
+        self.window = max(1, window or Config.NSQ_JOB_DISPATCH_WINDOW)
+        self.nsq_service = nsq_service or NSQService()
+        self.app_context = None
+
+        if mongo is None:
+            # Initialize Flask app for MongoDB access
+            from app import create_app
+            self.app = create_app()
+            self.app_context = self.app.app_context()
+            self.app_context.push()
+            from app.models import mongo
+        self.mongo = mongo
+        BulkTaskBacklog.ensure_indexes(self.mongo)
+
+        logger.info(f"Task Dispatcher initialized (window: {self.window} tasks per job, interval: {self.interval}s)")
+
+    def run(self):
+        """Release backlogged tasks until interrupted"""
+        logger.info("Task Dispatcher starting...")
+
+        try:
+            while True:
+                try:
+                    released = self.dispatch_once()
+                except Exception as e:
+                    logger.error(f"Task dispatch pass failed: {e}", exc_info=True)
+                    released = 0
+
+                # Keep going while jobs drain quickly, otherwise wait for the next pass
+                if not released:
+                    time.sleep(self.interval)
+        except KeyboardInterrupt:
+            logger.info("Task Dispatcher shutting down...")
+        finally:
+            self.nsq_service.close()
+            if self.app_context is not None:
+                self.app_context.pop()
+
+    def dispatch_once(self):
+        """
+        Release backlogged chunks of every job below its window, one chunk per job per round
+
+        Backlogs of jobs that were deleted, cancelled or failed are dropped.
+
+        Returns:
+            Number of tasks published
+        """
+        pending = BulkTaskBacklog.pending_jobs(self.mongo)
+        if not pending:
+            return 0
+
+        counters = BulkJob.get_dispatch_counters(self.mongo, [entry['job_id'] for entry in pending])
+        lanes = {lane: [] for lane in Config.NSQ_PRIORITY_LANES}
+        queued = {}
+
+        # Oldest backlog first within each lane
+        for entry in pending:
+            job_id = entry['job_id']
+            job = counters.get(job_id)
+            status = job.get('status') if job else None
+            if status in HELD_JOB_STATUSES:
+                continue
+            if status != 'processing':
+                logger.info(f"Dropping backlog of job {job_id} (status: {status or 'deleted'})")
+                BulkTaskBacklog.delete_by_job(self.mongo, job_id)
+                continue
+
+            queued[job_id] = job.get('published_count', 0) - job.get('consumed_count', 0)
+            lanes[NSQService.lane_for(entry['priority'])].append(job_id)
+
+        published = 0
+        released = True
+        while released:
+            released = False
+            for lane_jobs in lanes.values():
+                for job_id in list(lane_jobs):
+                    if queued[job_id] >= self.window:
+                        lane_jobs.remove(job_id)
+                        continue
+
+                    chunk = BulkTaskBacklog.pop_next(self.mongo, job_id)
+                    if chunk is None:
+                        lane_jobs.remove(job_id)
+                        continue
+
+                    try:
+                        self.nsq_service.publish_file_tasks(chunk['tasks'])
+                    except Exception:
+                        BulkTaskBacklog.restore(self.mongo, chunk)
+                        raise
+
+                    BulkJob.increment_published_count(self.mongo, job_id, chunk['task_count'])
+                    queued[job_id] += chunk['task_count']
+                    published += chunk['task_count']
+                    released = True
+
+        if published:
+            logger.info(f"Task Dispatcher: Released {published} backlogged tasks")
+        return published
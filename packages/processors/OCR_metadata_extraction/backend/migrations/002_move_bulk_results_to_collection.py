@@ -0,0 +1,123 @@
+"""
+Migration 002: Move per-file bulk OCR results out of bulk_jobs documents
+- Create bulk_job_results collection with unique (job_id, file_path) index
+- Copy checkpoint.results / checkpoint.errors of NSQ jobs into bulk_job_results
+- Remove the copied arrays from the bulk_jobs documents
+"""
+
+from datetime import datetime
+import pymongo
+from pymongo.errors import BulkWriteError
+
+
+def _copy_records(mongo, job_id, records, record_type):
+    """Upsert checkpoint records of one job into bulk_job_results"""
+    operations = []
+    for position, record in enumerate(records):
+        if not isinstance(record, dict) or not record.get('file_path'):
+            continue
+        document = dict(record)
+        document['job_id'] = job_id
+        document['record_type'] = record_type
+        # Legacy records without an index keep their checkpoint order
+        document.setdefault('file_index', position)
+        document['created_at'] = datetime.utcnow()
+        operations.append(pymongo.UpdateOne(
+            {'job_id': job_id, 'file_path': record['file_path']},
+            {'$setOnInsert': document},
+            upsert=True
+        ))
+
+    if not operations:
+        return 0
+
+    try:
+        result = mongo.db.bulk_job_results.bulk_write(operations, ordered=False)
+        return result.upserted_count
+    except BulkWriteError as e:
+        return e.details.get('nUpserted', 0)
+
+
+def upgrade(mongo):
+    """Apply migration"""
+    print("Starting Migration 002: Move bulk results to bulk_job_results...")
+
+    # ========================================================================
+    # 1. Create bulk_job_results indexes
+    # ========================================================================
+    print("  • Creating bulk_job_results indexes...")
+
+    mongo.db.bulk_job_results.create_index(
+        [('job_id', pymongo.ASCENDING), ('file_path', pymongo.ASCENDING)],
+        unique=True,
+        name='job_id_file_path_unique'
+    )
+    mongo.db.bulk_job_results.create_index(
+        [('job_id', pymongo.ASCENDING), ('record_type', pymongo.ASCENDING), ('file_index', pymongo.ASCENDING)],
+        name='job_id_record_type_file_index'
+    )
+    print("    ✓ Created indexes for bulk_job_results collection")
+
+    # ========================================================================
+    # 2. Copy checkpoint results of NSQ jobs
+    # ========================================================================
+    print("  • Moving checkpoint results of NSQ jobs...")
+
+    nsq_jobs = mongo.db.bulk_jobs.find(
+        {'published_count': {'$exists': True}},
+        {'job_id': 1, 'checkpoint.results': 1, 'checkpoint.errors': 1}
+    ).batch_size(1)
+
+    moved_jobs = 0
+    moved_records = 0
+    for job in nsq_jobs:
+        checkpoint = job.get('checkpoint', {})
+        results = checkpoint.get('results', [])
+        errors = checkpoint.get('errors', [])
+        if not results and not errors:
+            continue
+
+        moved_records += _copy_records(mongo, job['job_id'], results, 'result')
+        moved_records += _copy_records(mongo, job['job_id'], errors, 'error')
+
+        mongo.db.bulk_jobs.update_one(
+            {'_id': job['_id']},
+            {'$set': {'checkpoint.results': [], 'checkpoint.errors': []}}
+        )
+        moved_jobs += 1
+
+    print(f"    ✓ Moved {moved_records} records from {moved_jobs} jobs")
+
+    print("\n✓ Migration 002 completed successfully!")
+
+
+def downgrade(mongo):
+    """Rollback migration"""
+    print("Rolling back Migration 002...")
+
+    job_ids = mongo.db.bulk_job_results.distinct('job_id')
+    for job_id in job_ids:
+        records = mongo.db.bulk_job_results.find(
+            {'job_id': job_id},
+            {'_id': 0, 'job_id': 0, 'created_at': 0}
+        ).sort('file_index', pymongo.ASCENDING)
+
+        results = []
+        errors = []
+        for record in records:
+            record_type = record.pop('record_type', 'result')
+            (errors if record_type == 'error' else results).append(record)
+
+        mongo.db.bulk_jobs.update_one(
+            {'job_id': job_id},
+            {'$set': {'checkpoint.results': results, 'checkpoint.errors': errors}}
+        )
+    print(f"  ✓ Restored checkpoint results for {len(job_ids)} jobs")
+
+    try:
+        mongo.db.bulk_job_results.drop()
+        print("  ✓ Dropped bulk_job_results collection")
+    except:
+        pass
+
+    print("\n✓ Migration 002 rolled back successfully!")
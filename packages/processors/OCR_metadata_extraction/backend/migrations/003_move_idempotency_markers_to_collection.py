@@ -0,0 +1,109 @@
+"""
+Migration 003: Move NSQ idempotency markers out of bulk_jobs documents
+- Create bulk_job_idempotency collection with unique (job_id, file_path)
+  and (job_id, message_id) indexes
+- Create a marker for every file of NSQ jobs in bulk_job_results
+- Remove checkpoint.processed_files / processed_message_ids from NSQ jobs
+"""
+
+from datetime import datetime
+import pymongo
+from pymongo.errors import BulkWriteError
+
+
+def upgrade(mongo):
+    """Apply migration"""
+    print("Starting Migration 003: Move idempotency markers to bulk_job_idempotency...")
+
+    # ========================================================================
+    # 1. Create bulk_job_idempotency indexes
+    # ========================================================================
+    print("  • Creating bulk_job_idempotency indexes...")
+
+    mongo.db.bulk_job_idempotency.create_index(
+        [('job_id', pymongo.ASCENDING), ('file_path', pymongo.ASCENDING)],
+        unique=True,
+        name='job_id_file_path_unique'
+    )
+    mongo.db.bulk_job_idempotency.create_index(
+        [('job_id', pymongo.ASCENDING), ('message_id', pymongo.ASCENDING)],
+        unique=True,
+        partialFilterExpression={'message_id': {'$exists': True}},
+        name='job_id_message_id_unique'
+    )
+    print("    ✓ Created indexes for bulk_job_idempotency collection")
+
+    # ========================================================================
+    # 2. Create markers for files already recorded in bulk_job_results
+    # ========================================================================
+    print("  • Creating markers for recorded files...")
+
+    records = mongo.db.bulk_job_results.find(
+        {}, {'_id': 0, 'job_id': 1, 'file_path': 1}
+    ).batch_size(1000)
+
+    created = 0
+    operations = []
+    for record in records:
+        operations.append(pymongo.UpdateOne(
+            {'job_id': record['job_id'], 'file_path': record['file_path']},
+            {'$setOnInsert': {'created_at': datetime.utcnow()}},
+            upsert=True
+        ))
+        if len(operations) >= 1000:
+            created += _apply(mongo, operations)
+            operations = []
+    created += _apply(mongo, operations)
+
+    print(f"    ✓ Created {created} markers")
+
+    # ========================================================================
+    # 3. Drop the unbounded marker arrays from NSQ jobs
+    # ========================================================================
+    print("  • Removing processed_files / processed_message_ids from NSQ jobs...")
+
+    jobs_result = mongo.db.bulk_jobs.update_many(
+        {'published_count': {'$exists': True}},
+        {'$unset': {'checkpoint.processed_files': '', 'checkpoint.processed_message_ids': ''}}
+    )
+    print(f"    ✓ Updated {jobs_result.modified_count} jobs")
+
+    print("\n✓ Migration 003 completed successfully!")
+
+
+def _apply(mongo, operations):
+    """Run marker upserts, ignoring markers created concurrently by workers"""
+    if not operations:
+        return 0
+    try:
+        return mongo.db.bulk_job_idempotency.bulk_write(operations, ordered=False).upserted_count
+    except BulkWriteError as e:
+        return e.details.get('nUpserted', 0)
+
+
+def downgrade(mongo):
+    """Rollback migration"""
+    print("Rolling back Migration 003...")
+
+    job_ids = mongo.db.bulk_job_idempotency.distinct('job_id')
+    for job_id in job_ids:
+        markers = list(mongo.db.bulk_job_idempotency.find(
+            {'job_id': job_id},
+            {'_id': 0, 'file_path': 1, 'message_id': 1}
+        ))
+        mongo.db.bulk_jobs.update_one(
+            {'job_id': job_id},
+            {'$set': {
+                'checkpoint.processed_files': [m['file_path'] for m in markers],
+                'checkpoint.processed_message_ids': [m['message_id'] for m in markers if m.get('message_id')]
+            }}
+        )
+    print(f"  ✓ Restored processed markers for {len(job_ids)} jobs")
+
+    try:
+        mongo.db.bulk_job_idempotency.drop()
+        print("  ✓ Dropped bulk_job_idempotency collection")
+    except:
+        pass
+
+    print("\n✓ Migration 003 rolled back successfully!")
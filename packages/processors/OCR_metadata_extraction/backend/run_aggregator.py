@@ -19,7 +19,7 @@ if __name__ == '__main__':
     logger.info("Starting Result Aggregator Service")
     logger.info("=" * 80)
 
-    aggregator = ResultAggregator(check_interval=10)
+    aggregator = ResultAggregator()
 
     try:
         aggregator.run()
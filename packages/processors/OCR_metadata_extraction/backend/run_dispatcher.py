@@ -0,0 +1,30 @@
+"""Entry point for task dispatcher service"""
+import logging
+import sys
+import os
+
+# Add the backend directory to the path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app.workers.task_dispatcher import TaskDispatcher
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+if __name__ == '__main__':
+    logger.info("=" * 80)
+    logger.info("Starting Task Dispatcher Service")
+    logger.info("=" * 80)
+
+    dispatcher = TaskDispatcher()
+
+    try:
+        dispatcher.run()
+    except KeyboardInterrupt:
+        logger.info("Task Dispatcher shutting down gracefully...")
+    except Exception as e:
+        logger.error(f"Task Dispatcher failed with error: {e}", exc_info=True)
+        sys.exit(1)
@@ -0,0 +1,38 @@
+"""
+Shared fixtures for the backend unit tests
+"""
+
+import pytest
+import sys
+import os
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+
+@pytest.fixture
+def mongo(monkeypatch):
+    """
+    Empty in-memory MongoDB (mongomock) shaped like flask_pymongo's ``mongo``
+
+    Model index caches are reset so every test creates its indexes on the
+    fresh database. Test modules that need seeded documents or a patched
+    module-level ``mongo`` override this fixture and request it by name.
+    """
+    mongomock = pytest.importorskip('mongomock')
+    from mongomock.collection import BulkOperationBuilder
+    from app.models.bulk_job_idempotency import BulkJobIdempotency
+    from app.models.bulk_job_result import BulkJobResult
+    from app.models.bulk_task_backlog import BulkTaskBacklog
+    from app.models.folder_manifest import FolderManifest
+    from app.models.ocr_result_cache import OCRResultCache
+
+    # pymongo >= 4.11 passes 'sort' to bulk updates, which mongomock does not accept yet
+    add_update = BulkOperationBuilder.add_update
+    monkeypatch.setattr(BulkOperationBuilder, 'add_update',
+                        lambda self, *args, sort=None, **kwargs: add_update(self, *args, **kwargs))
+
+    for model in (BulkJobIdempotency, BulkJobResult, BulkTaskBacklog, FolderManifest, OCRResultCache):
+        monkeypatch.setattr(model, '_indexes_ensured', False)
+
+    return SimpleNamespace(db=mongomock.MongoClient().db)
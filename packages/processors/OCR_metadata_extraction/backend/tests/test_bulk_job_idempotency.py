@@ -0,0 +1,156 @@
+"""
+Unit Tests for NSQ idempotency markers (bulk_job_idempotency collection)
+"""
+
+import pytest
+import sys
+import os
+import json
+import threading
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+
+@pytest.fixture
+def mongo(mongo):
+    """In-memory MongoDB with a single NSQ job"""
+    mongo.db.bulk_jobs.insert_one({
+        'job_id': 'job-1',
+        'total_files': 3,
+        'published_count': 3,
+        'consumed_count': 0,
+        'status': 'processing',
+        'progress': {'current': 0, 'total': 3, 'percentage': 0},
+        'checkpoint': {}
+    })
+    return mongo
+
+
+def _result(file_path):
+    return {'file': os.path.basename(file_path), 'file_path': file_path, 'file_index': 0, 'text': 'x'}
+
+
+class TestBulkJobIdempotency:
+    """Test suite for file and message claims"""
+
+    def test_claim_rejects_duplicate_file(self, mongo):
+        from app.models.bulk_job_idempotency import BulkJobIdempotency
+
+        BulkJobIdempotency.ensure_indexes(mongo)
+
+        assert BulkJobIdempotency.claim(mongo, 'job-1', '/data/a.jpg', 'msg-1')
+        assert not BulkJobIdempotency.claim(mongo, 'job-1', '/data/a.jpg', 'msg-2')
+        assert BulkJobIdempotency.claim(mongo, 'job-2', '/data/a.jpg', 'msg-1')
+
+    def test_claim_rejects_duplicate_message(self, mongo):
+        from app.models.bulk_job_idempotency import BulkJobIdempotency
+
+        BulkJobIdempotency.ensure_indexes(mongo)
+
+        assert BulkJobIdempotency.claim(mongo, 'job-1', '/data/a.jpg', 'msg-1')
+        assert not BulkJobIdempotency.claim(mongo, 'job-1', '/data/b.jpg', 'msg-1')
+
+    def test_claims_without_message_id_do_not_collide(self, mongo):
+        from app.models.bulk_job_idempotency import BulkJobIdempotency
+
+        BulkJobIdempotency.ensure_indexes(mongo)
+
+        assert BulkJobIdempotency.claim(mongo, 'job-1', '/data/a.jpg')
+        assert BulkJobIdempotency.claim(mongo, 'job-1', '/data/b.jpg')
+
+
+class TestBulkJobProcessedChecks:
+    """Test suite for BulkJob processed checks backed by markers"""
+
+    def test_saved_file_and_message_marked_processed(self, mongo):
+        from app.models.bulk_job import BulkJob
+
+        BulkJob.save_file_result_atomic(mongo, 'job-1', _result('/data/a.jpg'), 'msg-1')
+
+        assert BulkJob.is_file_processed(mongo, 'job-1', '/data/a.jpg')
+        assert BulkJob.is_message_processed(mongo, 'job-1', 'msg-1')
+        assert not BulkJob.is_file_processed(mongo, 'job-1', '/data/b.jpg')
+        job = mongo.db.bulk_jobs.find_one({'job_id': 'job-1'})
+        assert 'processed_files' not in job['checkpoint']
+
+    def test_redelivered_message_not_counted(self, mongo):
+        from app.models.bulk_job import BulkJob
+
+        BulkJob.save_file_result_atomic(mongo, 'job-1', _result('/data/a.jpg'), 'msg-1')
+        duplicate = BulkJob.save_file_error_atomic(mongo, 'job-1', '/data/b.jpg', 'boom', 'msg-1')
+
+        assert duplicate is None
+        job = mongo.db.bulk_jobs.find_one({'job_id': 'job-1'})
+        assert job['consumed_count'] == 1
+
+    def test_redelivery_after_crash_following_claim_counts_file(self, mongo, monkeypatch):
+        from app.models.bulk_job import BulkJob
+
+        def crash(*args, **kwargs):
+            raise ConnectionError('worker lost its connection')
+
+        with monkeypatch.context() as patched:
+            patched.setattr(BulkJob, '_insert_record', staticmethod(crash))
+            with pytest.raises(ConnectionError):
+                BulkJob.save_file_result_atomic(mongo, 'job-1', _result('/data/a.jpg'), 'msg-1')
+
+        redelivered = BulkJob.save_file_result_atomic(mongo, 'job-1', _result('/data/a.jpg'), 'msg-1')
+        duplicate = BulkJob.save_file_result_atomic(mongo, 'job-1', _result('/data/a.jpg'), 'msg-1')
+
+        assert redelivered['consumed_count'] == 1
+        assert duplicate is None
+        assert mongo.db.bulk_job_results.count_documents({'job_id': 'job-1'}) == 1
+
+    def test_reconcile_recovers_increment_lost_after_counted_flag(self, mongo):
+        from app.models.bulk_job import BulkJob
+        from app.models.bulk_job_idempotency import BulkJobIdempotency
+
+        BulkJob.save_file_result_atomic(mongo, 'job-1', _result('/data/a.jpg'), 'msg-1')
+        # Worker died between flipping the claim to counted and the increment
+        BulkJobIdempotency.claim(mongo, 'job-1', '/data/b.jpg', 'msg-2')
+        BulkJobIdempotency.mark_counted(mongo, 'job-1', '/data/b.jpg')
+
+        job = BulkJob.reconcile_consumed_count(mongo, 'job-1')
+
+        assert job['consumed_count'] == 2
+        assert BulkJob.reconcile_consumed_count(mongo, 'job-1') is None
+
+    def test_worker_redelivery_after_crash_following_claim_counts_file(self, mongo, tmp_path):
+        pytest.importorskip('gevent')
+        pytest.importorskip('gnsq')
+        from unittest.mock import Mock
+        from app.models.bulk_job import BulkJob
+        from app.models.bulk_job_idempotency import BulkJobIdempotency
+        from app.workers.ocr_worker import OCRWorker
+
+        image = tmp_path / 'a.jpg'
+        image.write_bytes(b'x')
+        file_path = os.path.realpath(str(image))
+
+        # Worker died after claiming the file, before counting it
+        BulkJobIdempotency.claim(mongo, 'job-1', file_path, 'msg-1')
+        assert not BulkJob.is_file_processed(mongo, 'job-1', file_path)
+        assert not BulkJob.is_message_processed(mongo, 'job-1', 'msg-1')
+
+        worker = OCRWorker.__new__(OCRWorker)
+        worker.worker_id = 'worker-test'
+        worker.mongo = mongo
+        worker.paused_jobs = set()
+        worker.cancelled_jobs = set()
+        worker.processed_count = 0
+        worker.error_count = 0
+        worker.stats_lock = threading.Lock()
+        worker.ocr_service = Mock(process_image=Mock(return_value={'text': 'redelivered'}))
+        worker.nsq_service = Mock()
+        worker.hub = Mock()
+
+        message = Mock(id=b'msg-1', body=json.dumps({
+            'job_id': 'job-1', 'file_path': file_path, 'file_index': 0, 'provider': 'tesseract'
+        }).encode('utf-8'))
+        worker.handle_file_task(None, message)
+
+        message.finish.assert_called_once()
+        assert worker.processed_count == 1
+        assert mongo.db.bulk_jobs.find_one({'job_id': 'job-1'})['consumed_count'] == 1
+        assert BulkJob.is_file_processed(mongo, 'job-1', file_path)
+        assert BulkJob.is_message_processed(mongo, 'job-1', 'msg-1')
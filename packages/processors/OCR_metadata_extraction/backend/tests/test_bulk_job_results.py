@@ -0,0 +1,271 @@
+"""
+Unit Tests for per-file bulk job results (bulk_job_results collection)
+Tests cover atomic saves, duplicate prevention and cursor-based reads
+"""
+
+import pytest
+import sys
+import os
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+
+@pytest.fixture
+def mongo(mongo):
+    """In-memory MongoDB with a single NSQ job"""
+    mongo.db.bulk_jobs.insert_one({
+        'job_id': 'job-1',
+        'total_files': 4,
+        'published_count': 4,
+        'consumed_count': 0,
+        'status': 'processing',
+        'progress': {'current': 0, 'total': 4, 'percentage': 0},
+        'checkpoint': {'processed_files': [], 'results': [], 'errors': []}
+    })
+    return mongo
+
+
+def _result(file_path, file_index, text='hello'):
+    return {
+        'file': os.path.basename(file_path),
+        'file_path': file_path,
+        'file_index': file_index,
+        'status': 'success',
+        'text': text
+    }
+
+
+class TestSaveFileResultAtomic:
+    """Test suite for BulkJob.save_file_result_atomic"""
+
+    def test_result_stored_outside_job_document(self, mongo):
+        from app.models.bulk_job import BulkJob
+
+        saved = BulkJob.save_file_result_atomic(mongo, 'job-1', _result('/data/a.jpg', 0), 'msg-1')
+
+        assert saved is not None
+        job = mongo.db.bulk_jobs.find_one({'job_id': 'job-1'})
+        assert job['consumed_count'] == 1
+        assert job['checkpoint']['results'] == []
+        assert job['progress']['current'] == 1
+        assert job['progress']['percentage'] == 25
+        assert mongo.db.bulk_job_results.count_documents({'job_id': 'job-1'}) == 1
+
+    def test_duplicate_file_not_counted_twice(self, mongo):
+        from app.models.bulk_job import BulkJob
+
+        first = BulkJob.save_file_result_atomic(mongo, 'job-1', _result('/data/a.jpg', 0, 'first'), 'msg-1')
+        second = BulkJob.save_file_result_atomic(mongo, 'job-1', _result('/data/a.jpg', 0, 'second'), 'msg-2')
+
+        assert first is not None
+        assert second is None
+        job = mongo.db.bulk_jobs.find_one({'job_id': 'job-1'})
+        assert job['consumed_count'] == 1
+        record = mongo.db.bulk_job_results.find_one({'job_id': 'job-1'})
+        assert record['text'] == 'first'
+
+    def test_error_after_result_is_ignored(self, mongo):
+        from app.models.bulk_job import BulkJob
+
+        BulkJob.save_file_result_atomic(mongo, 'job-1', _result('/data/a.jpg', 0))
+        saved = BulkJob.save_file_error_atomic(mongo, 'job-1', '/data/a.jpg', 'boom')
+
+        assert saved is None
+        job = mongo.db.bulk_jobs.find_one({'job_id': 'job-1'})
+        assert job['consumed_count'] == 1
+
+    def test_existing_record_counted_when_never_counted(self, mongo, monkeypatch):
+        from app.models.bulk_job import BulkJob
+
+        def crash(*args, **kwargs):
+            raise ConnectionError('worker lost its connection')
+
+        with monkeypatch.context() as patched:
+            patched.setattr(BulkJob, '_record_file_consumed', staticmethod(crash))
+            with pytest.raises(ConnectionError):
+                BulkJob.save_file_error_atomic(mongo, 'job-1', '/data/a.jpg', 'boom', 'msg-1')
+
+        redelivered = BulkJob.save_file_error_atomic(mongo, 'job-1', '/data/a.jpg', 'boom', 'msg-1')
+
+        assert redelivered['consumed_count'] == 1
+        assert BulkJob.save_file_error_atomic(mongo, 'job-1', '/data/a.jpg', 'boom', 'msg-1') is None
+
+    def test_missing_job_returns_none(self, mongo):
+        from app.models.bulk_job import BulkJob
+
+        assert BulkJob.save_file_result_atomic(mongo, 'nope', _result('/data/a.jpg', 0)) is None
+        assert mongo.db.bulk_job_results.count_documents({}) == 0
+
+
+class TestBulkJobResultReads:
+    """Test suite for streaming reads from bulk_job_results"""
+
+    def test_iter_by_job_orders_by_file_index(self, mongo):
+        from app.models.bulk_job import BulkJob
+        from app.models.bulk_job_result import BulkJobResult
+
+        BulkJob.save_file_result_atomic(mongo, 'job-1', _result('/data/c.jpg', 2))
+        BulkJob.save_file_result_atomic(mongo, 'job-1', _result('/data/a.jpg', 0))
+        BulkJob.save_file_error_atomic(mongo, 'job-1', '/data/b.jpg', 'boom')
+
+        results = list(BulkJobResult.iter_by_job(mongo, 'job-1', BulkJobResult.RECORD_RESULT))
+        errors = list(BulkJobResult.iter_by_job(mongo, 'job-1', BulkJobResult.RECORD_ERROR))
+
+        assert [r['file'] for r in results] == ['a.jpg', 'c.jpg']
+        assert [e['error'] for e in errors] == ['boom']
+        assert 'job_id' not in results[0]
+        assert BulkJobResult.count_by_job(mongo, 'job-1') == 3
+
+    def test_iter_by_job_limit(self, mongo):
+        from app.models.bulk_job import BulkJob
+        from app.models.bulk_job_result import BulkJobResult
+
+        for idx in range(3):
+            BulkJob.save_file_result_atomic(mongo, 'job-1', _result(f'/data/{idx}.jpg', idx))
+
+        assert len(list(BulkJobResult.iter_by_job(mongo, 'job-1', limit=2))) == 2
+
+    def test_errors_keep_their_file_index(self, mongo):
+        from app.models.bulk_job import BulkJob
+        from app.models.bulk_job_result import BulkJobResult
+
+        BulkJob.save_file_error_atomic(mongo, 'job-1', '/data/c.jpg', 'boom', file_index=2)
+        BulkJob.save_file_error_atomic(mongo, 'job-1', '/data/a.jpg', 'boom', file_index=0)
+
+        errors = list(BulkJobResult.iter_by_job(mongo, 'job-1', BulkJobResult.RECORD_ERROR))
+
+        assert [(e['file'], e['file_index']) for e in errors] == [('a.jpg', 0), ('c.jpg', 2)]
+
+    def test_pages_stable_for_records_without_index(self, mongo):
+        from app.models.bulk_job import BulkJob
+        from app.models.bulk_job_result import BulkJobResult
+
+        for idx in range(4):
+            BulkJob.save_file_error_atomic(mongo, 'job-1', f'/data/{idx}.jpg', 'boom')
+
+        pages = [
+            [e['file'] for e in BulkJobResult.iter_by_job(mongo, 'job-1', BulkJobResult.RECORD_ERROR, skip=skip, limit=2)]
+            for skip in (0, 2)
+        ]
+
+        assert pages == [['0.jpg', '1.jpg'], ['2.jpg', '3.jpg']]
+
+
+class TestStreamingExports:
+    """Test suite for ResultAggregator streaming exports"""
+
+    def _aggregator(self, mongo):
+        from app.workers.result_aggregator import ResultAggregator
+
+        aggregator = ResultAggregator.__new__(ResultAggregator)
+        aggregator.mongo = mongo
+        return aggregator
+
+    def test_exports_written_from_cursor(self, mongo, tmp_path):
+        import csv
+        import json
+        import zipfile
+        from app.models.bulk_job import BulkJob
+
+        BulkJob.save_file_result_atomic(mongo, 'job-1', dict(_result('/data/b.jpg', 1, 'x' * 1000), confidence=0.5))
+        BulkJob.save_file_result_atomic(mongo, 'job-1', dict(_result('/data/a.jpg', 0, 'abc'), confidence=1.0))
+        BulkJob.save_file_error_atomic(mongo, 'job-1', '/data/c.jpg', 'boom')
+
+        export_files, stats, preview = self._aggregator(mongo)._stream_exports(str(tmp_path), 'job-1', 2, 1)
+
+        with open(export_files['json'], encoding='utf-8') as f:
+            report = json.load(f)
+        assert [r['file'] for r in report['results']] == ['a.jpg', 'b.jpg']
+        assert report['errors'][0]['error'] == 'boom'
+        assert report['summary'] == stats
+        assert stats['total_characters'] == 1003
+        assert stats['average_confidence'] == 0.75
+
+        with open(export_files['jsonl'], encoding='utf-8') as f:
+            assert len(f.readlines()) == 3
+
+        with open(export_files['csv'], newline='', encoding='utf-8') as f:
+            rows = list(csv.DictReader(f))
+        assert [row['Status'] for row in rows] == ['Success', 'Success', 'Error']
+
+        with open(export_files['txt'], encoding='utf-8') as f:
+            text = f.read()
+        assert text.index('STATISTICS') < text.index('SUCCESSFUL RESULTS') < text.index('ERRORS')
+
+        with zipfile.ZipFile(export_files['zip']) as zipf:
+            names = zipf.namelist()
+        assert 'individual_files/a_0.json' in names
+        assert 'individual_files/b_1.json' in names
+        assert 'job-1_results.jsonl' in names
+
+        assert preview['total_results'] == 2
+        assert preview['successful_samples'][1]['text_length'] == 1000
+        assert len(preview['successful_samples'][1]['text']) < 1000
+        assert preview['error_samples'] == [{'file': 'c.jpg', 'file_path': '/data/c.jpg', 'error': 'boom'}]
+        # Text of b.jpg was cut
+        assert preview['samples_truncated'] is True
+
+    def test_samples_truncated_follows_counts(self, mongo, tmp_path):
+        from app.config import Config
+        from app.models.bulk_job import BulkJob
+
+        for idx in range(3):
+            BulkJob.save_file_result_atomic(mongo, 'job-1', _result(f'/data/{idx}.jpg', idx, 'short'))
+
+        with patch.object(Config, 'AGGREGATOR_PREVIEW_MAX_SAMPLES', 3):
+            _, _, complete = self._aggregator(mongo)._stream_exports(str(tmp_path), 'job-1', 3, 0)
+        with patch.object(Config, 'AGGREGATOR_PREVIEW_MAX_SAMPLES', 2):
+            _, _, capped = self._aggregator(mongo)._stream_exports(str(tmp_path), 'job-1', 3, 0)
+
+        assert complete['samples_truncated'] is False
+        assert len(complete['successful_samples']) == 3
+        assert capped['samples_truncated'] is True
+
+    def test_successful_samples_read_full_text(self, mongo):
+        from app.models.bulk_job import BulkJob
+
+        BulkJob.save_file_result_atomic(mongo, 'job-1', _result('/data/a.jpg', 0, 'x' * 1000))
+        job = {
+            'job_id': 'job-1',
+            'results': {'results_preview': {'samples_truncated': True, 'successful_samples': []}}
+        }
+
+        samples = BulkJob.get_successful_samples(mongo, job)
+
+        assert len(samples) == 1
+        assert samples[0]['text'] == 'x' * 1000
+
+    def test_results_page_covers_every_file_with_full_text(self, mongo):
+        from app.models.bulk_job import BulkJob
+
+        for index, name in enumerate(['a', 'b', 'c']):
+            BulkJob.save_file_result_atomic(mongo, 'job-1', _result(f'/data/{name}.jpg', index, 'x' * 1000))
+        BulkJob.save_file_error_atomic(mongo, 'job-1', '/data/d.jpg', 'boom')
+        job = {
+            'job_id': 'job-1',
+            'results': {'results_preview': {'samples_truncated': True, 'successful_samples': []}}
+        }
+
+        first, total = BulkJob.get_results_page(mongo, job, skip=0, limit=2)
+        second, _ = BulkJob.get_results_page(mongo, job, skip=2, limit=2)
+        errors, error_total = BulkJob.get_results_page(mongo, job, 'error', skip=0, limit=2)
+
+        assert total == 3
+        assert [s['file'] for s in first + second] == ['a.jpg', 'b.jpg', 'c.jpg']
+        assert len(second[0]['text']) == 1000
+        assert error_total == 1
+        assert errors[0]['error'] == 'boom'
+
+    def test_results_page_of_complete_preview(self, mongo):
+        from app.models.bulk_job import BulkJob
+
+        job = {
+            'job_id': 'job-1',
+            'results': {'results_preview': {'successful_samples': [{'file': 'a.jpg'}, {'file': 'b.jpg'}]}}
+        }
+
+        page, total = BulkJob.get_results_page(mongo, job, skip=1, limit=5)
+
+        assert total == 2
+        assert page == [{'file': 'b.jpg'}]
@@ -0,0 +1,138 @@
+"""
+Unit Tests for the bulk job progress/status read path
+Tests cover field projection, ETag revalidation and the SSE progress stream
+"""
+
+import pytest
+import sys
+import os
+import json
+from bson import ObjectId
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+USER_ID = str(ObjectId())
+
+
+@pytest.fixture
+def mongo(mongo, monkeypatch):
+    """In-memory MongoDB with one processing job that has a large checkpoint"""
+    import app.routes.bulk as bulk_routes
+
+    mongo.db.bulk_jobs.insert_one({
+        'job_id': 'job-1',
+        'user_id': ObjectId(USER_ID),
+        'status': 'processing',
+        'total_files': 10,
+        'consumed_count': 2,
+        'progress': {'current': 2, 'total': 10, 'percentage': 20, 'filename': 'b.jpg'},
+        'results': None,
+        'checkpoint': {'results': [{'text': 'x' * 1000}] * 50, 'processed_files': ['a.jpg', 'b.jpg']}
+    })
+    monkeypatch.setattr(bulk_routes, 'mongo', mongo)
+    return mongo
+
+
+@pytest.fixture
+def client(mongo):
+    """Flask test client with the bulk blueprint and a valid token"""
+    import jwt
+    from flask import Flask
+    from app.config import Config
+    from app.routes.bulk import bulk_bp
+
+    app = Flask(__name__)
+    app.register_blueprint(bulk_bp)
+    token = jwt.encode({'user_id': USER_ID}, Config.JWT_SECRET_KEY, algorithm='HS256')
+    test_client = app.test_client()
+    test_client.headers = {'Authorization': f'Bearer {token}'}
+    return test_client
+
+
+class TestProgressProjection:
+    """Test suite for BulkJob.get_progress"""
+
+    def test_checkpoint_and_results_not_loaded(self, mongo):
+        from app.models.bulk_job import BulkJob
+
+        job = BulkJob.get_progress(mongo, 'job-1', USER_ID)
+
+        assert job['progress']['current'] == 2
+        assert 'checkpoint' not in job
+        assert 'results' not in job
+
+    def test_etag_follows_progress_changes(self, mongo):
+        from app.models.bulk_job import BulkJob
+
+        before = BulkJob.progress_etag(BulkJob.get_progress(mongo, 'job-1'))
+        mongo.db.bulk_jobs.update_one({'job_id': 'job-1'}, {'$push': {'checkpoint.processed_files': 'c.jpg'}})
+        unchanged = BulkJob.progress_etag(BulkJob.get_progress(mongo, 'job-1'))
+        mongo.db.bulk_jobs.update_one({'job_id': 'job-1'}, {'$set': {'progress.current': 3}})
+        changed = BulkJob.progress_etag(BulkJob.get_progress(mongo, 'job-1'))
+
+        assert before == unchanged
+        assert before != changed
+
+
+class TestProgressEndpoints:
+    """Test suite for /api/bulk/progress and /api/bulk/status"""
+
+    def test_unchanged_poll_returns_304(self, client):
+        first = client.get('/api/bulk/progress/job-1', headers=client.headers)
+        etag = first.headers['ETag']
+        second = client.get('/api/bulk/progress/job-1', headers={**client.headers, 'If-None-Match': etag})
+
+        assert first.status_code == 200
+        assert first.get_json()['progress']['percentage'] == 20
+        assert second.status_code == 304
+        assert second.data == b''
+
+    def test_changed_progress_returns_new_body(self, client, mongo):
+        etag = client.get('/api/bulk/status/job-1', headers=client.headers).headers['ETag']
+        mongo.db.bulk_jobs.update_one({'job_id': 'job-1'}, {'$set': {'consumed_count': 3}})
+
+        response = client.get('/api/bulk/status/job-1', headers={**client.headers, 'If-None-Match': etag})
+
+        assert response.status_code == 200
+        assert response.headers['ETag'] != etag
+
+    def test_completed_job_includes_results(self, client, mongo):
+        mongo.db.bulk_jobs.update_one(
+            {'job_id': 'job-1'},
+            {'$set': {'status': 'completed', 'results': {'summary': {'total_files': 10}}}}
+        )
+
+        body = client.get('/api/bulk/progress/job-1', headers=client.headers).get_json()
+
+        assert body['status'] == 'completed'
+        assert body['results'] == {'summary': {'total_files': 10}}
+
+    def test_stream_sends_deltas_until_job_ends(self, client, mongo, monkeypatch):
+        from app.config import Config
+        import app.routes.bulk as bulk_routes
+
+        monkeypatch.setattr(Config, 'BULK_PROGRESS_STREAM_INTERVAL', 0)
+
+        # Advance the job once per poll: one progress step, then completion
+        updates = iter([
+            {'$set': {'progress.current': 3}},
+            {'$set': {'status': 'completed', 'results': {'summary': {}}}}
+        ])
+
+        def advance(_seconds):
+            update = next(updates, None)
+            if update:
+                mongo.db.bulk_jobs.update_one({'job_id': 'job-1'}, update)
+
+        monkeypatch.setattr(bulk_routes.time, 'sleep', advance)
+
+        response = client.get('/api/bulk/progress/job-1/stream', headers=client.headers)
+        events = [
+            json.loads(line[len('data: '):])
+            for line in response.get_data(as_text=True).splitlines() if line.startswith('data: ')
+        ]
+
+        assert events[0]['status'] == 'processing'
+        assert events[1] == {'progress': {'current': 3, 'total': 10, 'percentage': 20, 'filename': 'b.jpg'}}
+        assert events[2] == {'status': 'completed', 'results': {'summary': {}}}
+        assert events[3] == {'status': 'completed'}
@@ -0,0 +1,118 @@
+"""
+Unit Tests for proxy-scale document detection
+Tests cover corner mapping back to full resolution and per-file memoisation
+"""
+
+import pytest
+import sys
+import os
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+cv2 = pytest.importorskip('cv2')
+np = pytest.importorskip('numpy')
+
+CORNERS = np.array([[400, 300], [3500, 450], [3400, 2700], [350, 2600]], dtype=np.int32)
+
+
+@pytest.fixture
+def scan():
+    """4000x3000 grayscale 'scan': a light page on a dark background"""
+    from app.services.document_detector import DocumentDetector
+
+    DocumentDetector._quad_cache.clear()
+    gray = np.full((3000, 4000), 30, dtype=np.uint8)
+    cv2.fillConvexPoly(gray, CORNERS, 220)
+    return gray
+
+
+def _sorted(quad):
+    from app.services.document_detector import DocumentDetector
+
+    return DocumentDetector.order_points(np.asarray(quad, dtype='float32'))
+
+
+class TestFindDocumentQuad:
+    """Test suite for DocumentDetector.find_document_quad"""
+
+    def test_proxy_corners_match_full_resolution(self, scan):
+        from app.services.document_detector import DocumentDetector
+
+        proxy_quad = DocumentDetector.find_document_quad(scan, max_dimension=800)
+        full_quad = DocumentDetector.find_document_quad(scan, max_dimension=0)
+
+        assert proxy_quad is not None and full_quad is not None
+        # Corners land within a few proxy pixels of the full-resolution result
+        assert np.abs(_sorted(proxy_quad) - _sorted(full_quad)).max() < 25
+        assert np.abs(_sorted(proxy_quad) - _sorted(CORNERS)).max() < 25
+
+    def test_quad_memoised_by_cache_key(self, scan):
+        from app.services.document_detector import DocumentDetector
+
+        first = DocumentDetector.find_document_quad(scan, max_dimension=800, cache_key='file-hash')
+        blank = np.zeros_like(scan)
+        second = DocumentDetector.find_document_quad(blank, max_dimension=800, cache_key='file-hash')
+
+        assert np.array_equal(first, second)
+        assert DocumentDetector.find_document_quad(blank, max_dimension=800, cache_key='other') is None
+
+    def test_detect_document_warps_full_resolution(self, scan):
+        from PIL import Image
+        from app.services.document_detector import DocumentDetector
+
+        cropped = DocumentDetector.detect_document(Image.fromarray(scan))
+
+        assert cropped is not None
+        assert abs(cropped.size[0] - 3100) < 60
+        assert abs(cropped.size[1] - 2300) < 60
+
+
+class TestLangChainPreprocess:
+    """Test suite for LangChainProvider._preprocess_image on top of the shared detector"""
+
+    def test_small_document_on_large_scan_cropped_by_contour(self, tmp_path):
+        from app.services.document_detector import DocumentDetector
+        from app.services.ocr_providers.langchain_provider import LangChainProvider
+
+        DocumentDetector._quad_cache.clear()
+        # A 600x500 page covers 2.5% of a 4000x3000 scan, well below the shared 10% default
+        image = np.full((3000, 4000, 3), 30, dtype=np.uint8)
+        cv2.rectangle(image, (1000, 1000), (1600, 1500), (220, 220, 220), -1)
+        # Stray bright mark a brightness-based crop would include
+        cv2.circle(image, (3800, 200), 10, (255, 255, 255), -1)
+        image_path = str(tmp_path / 'scan.png')
+        cv2.imwrite(image_path, image)
+
+        provider = LangChainProvider.__new__(LangChainProvider)
+        preprocessed_path = provider._preprocess_image(image_path)
+
+        try:
+            assert preprocessed_path != image_path
+            height, width = cv2.imread(preprocessed_path).shape[:2]
+            # Page bounding box plus the 20 px margin on each side
+            assert abs(width - 641) < 15
+            assert abs(height - 541) < 15
+        finally:
+            os.remove(preprocessed_path)
+
+    def test_langchain_search_kept_behind_shared_proxy(self):
+        from app.services.document_detector import DocumentDetector
+
+        DocumentDetector._quad_cache.clear()
+        # Sixteen round blobs larger than the page fill the detector's top-10 contour window
+        gray = np.full((3000, 4000), 30, dtype=np.uint8)
+        for row in (250, 750):
+            for column in range(250, 4000, 500):
+                cv2.circle(gray, (column, row), 210, 220, -1)
+        page = np.array([[1000, 1800], [1400, 1800], [1400, 2100], [1000, 2100]], dtype=np.int32)
+        cv2.fillConvexPoly(gray, page, 220)
+
+        shared = DocumentDetector.find_document_quad(gray, min_area_ratio=0.001, cache_key='scan')
+        langchain = DocumentDetector.find_document_quad(
+            gray, min_area_ratio=0.001, cache_key='scan', dilate=False, max_contours=None, rect_fallback=False
+        )
+
+        # The shared search settles for a blob's bounding rectangle; LangChain's finds the page
+        assert np.abs(_sorted(shared) - _sorted(page)).max() > 100
+        assert np.abs(_sorted(langchain) - _sorted(page)).max() < 25
+
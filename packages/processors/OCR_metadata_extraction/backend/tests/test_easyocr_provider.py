@@ -0,0 +1,83 @@
+"""
+Unit Tests for the EasyOCR reader cache
+Tests cover per-language-set reuse, LRU eviction and serialised reader use
+"""
+
+import pytest
+import sys
+import os
+import threading
+import time
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+
+class FakeReader:
+    """easyocr.Reader stand-in that records loads and detects concurrent use"""
+
+    loads = []
+
+    def __init__(self, languages, gpu=False, verbose=False):
+        FakeReader.loads.append(tuple(languages))
+        self.active = 0
+        self.max_active = 0
+
+    def readtext(self, image_path, detail=1, paragraph=True):
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        time.sleep(0.01)
+        self.active -= 1
+        return [([[0, 0], [1, 0], [1, 1], [0, 1]], 'text', 0.9)]
+
+
+@pytest.fixture
+def provider(monkeypatch):
+    """EasyOCR provider backed by FakeReader, two resident readers"""
+    from app.config import Config
+    from app.services.ocr_providers import easyocr_provider
+
+    monkeypatch.setenv('EASYOCR_ENABLED', 'true')
+    monkeypatch.setattr(Config, 'EASYOCR_MAX_READERS', 2)
+    monkeypatch.setattr(Config, 'EASYOCR_WARM_LANGUAGES', [])
+    FakeReader.loads = []
+    with patch.object(easyocr_provider, 'EASYOCR_AVAILABLE', True), \
+            patch.object(easyocr_provider, 'easyocr', create=True) as fake_easyocr:
+        fake_easyocr.Reader = FakeReader
+        yield easyocr_provider.EasyOCRProvider()
+
+
+class TestReaderCache:
+    """Test suite for EasyOCRProvider reader caching"""
+
+    def test_mixed_language_batches_reuse_readers(self, provider):
+        for languages in (['en', 'hi'], ['en'], ['hi', 'en'], ['en']):
+            provider.process_image('page.jpg', languages=languages)
+
+        assert FakeReader.loads == [('en', 'hi'), ('en',)]
+
+    def test_least_recently_used_reader_evicted(self, provider):
+        provider.process_image('page.jpg', languages=['en'])
+        provider.process_image('page.jpg', languages=['hi'])
+        provider.process_image('page.jpg', languages=['en'])
+        provider.process_image('page.jpg', languages=['ta'])
+
+        assert list(provider._readers) == [('en',), ('ta',)]
+
+    def test_concurrent_calls_serialised_per_reader(self, provider):
+        threads = [
+            threading.Thread(target=provider.process_image, args=('page.jpg',), kwargs={'languages': ['en']})
+            for _ in range(4)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert FakeReader.loads == [('en',)]
+        assert provider._readers[('en',)]['reader'].max_active == 1
+
+    def test_warm_up_loads_configured_sets(self, provider):
+        provider.warm_up([['en', 'hi'], ['en']])
+
+        assert FakeReader.loads == [('en', 'hi'), ('en',)]
@@ -0,0 +1,97 @@
+"""
+Unit Tests for FolderScanner
+Tests cover streamed scanning, extension filtering and mtime-validated listing cache
+"""
+
+import pytest
+import sys
+import os
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+
+@pytest.fixture
+def tree(tmp_path):
+    """Folder tree with images, a non-image file and a nested folder"""
+    from app.services.folder_scanner import FolderScanner
+
+    FolderScanner.clear_cache()
+    (tmp_path / 'b.JPG').write_bytes(b'x')
+    (tmp_path / 'a.pdf').write_bytes(b'x')
+    (tmp_path / 'notes.txt').write_bytes(b'x')
+    (tmp_path / 'sub').mkdir()
+    (tmp_path / 'sub' / 'c.png').write_bytes(b'x')
+    return tmp_path
+
+
+def _age(path, seconds=60):
+    """Backdate a directory so its listing is cacheable"""
+    past = time.time() - seconds
+    os.utime(path, (past, past))
+
+
+class TestIterFiles:
+    """Test suite for FolderScanner.iter_files"""
+
+    def test_recursive_scan_in_stable_order(self, tree):
+        from app.services.folder_scanner import FolderScanner
+
+        files = list(FolderScanner.iter_files(str(tree)))
+
+        assert files == [str(tree / 'a.pdf'), str(tree / 'b.JPG'), str(tree / 'sub' / 'c.png')]
+
+    def test_non_recursive_scan(self, tree):
+        from app.services.folder_scanner import FolderScanner
+
+        assert list(FolderScanner.iter_files(str(tree), recursive=False)) == [str(tree / 'a.pdf'), str(tree / 'b.JPG')]
+
+    def test_invalid_folder_raises_before_iteration(self, tmp_path):
+        from app.services.folder_scanner import FolderScanner
+
+        with pytest.raises(ValueError):
+            FolderScanner.iter_files(str(tmp_path / 'missing'))
+
+    def test_symlink_loop_visited_once(self, tree):
+        from app.services.folder_scanner import FolderScanner
+
+        os.symlink(str(tree), str(tree / 'sub' / 'loop'))
+
+        files = list(FolderScanner.iter_files(str(tree)))
+
+        assert len(files) == 3
+
+
+class TestListingCache:
+    """Test suite for mtime-validated directory listing cache"""
+
+    def test_unchanged_directory_not_rescanned(self, tree, monkeypatch):
+        from app.services import folder_scanner
+        from app.services.folder_scanner import FolderScanner
+
+        _age(tree)
+        assert FolderScanner.count_files(str(tree)) == 3
+
+        def fail_scandir(path):
+            raise AssertionError('listing should come from the cache')
+
+        monkeypatch.setattr(folder_scanner.os, 'scandir', fail_scandir)
+        assert FolderScanner.count_files(str(tree)) == 3
+
+    def test_changed_directory_relisted(self, tree):
+        from app.services.folder_scanner import FolderScanner
+
+        _age(tree, 120)
+        assert FolderScanner.count_files(str(tree)) == 3
+
+        (tree / 'd.tiff').write_bytes(b'x')
+        _age(tree, 60)
+
+        assert FolderScanner.count_files(str(tree)) == 4
+
+    def test_recently_modified_directory_not_cached(self, tree):
+        from app.services.folder_scanner import FolderScanner
+
+        FolderScanner.list_directory(str(tree))
+
+        assert FolderScanner._listings == {}
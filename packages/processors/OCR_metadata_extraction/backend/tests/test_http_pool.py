@@ -0,0 +1,95 @@
+"""
+Unit Tests for shared HTTP sessions and cached availability probes
+Tests cover per-host session reuse, probe TTL and provider availability checks
+"""
+
+import pytest
+import sys
+import os
+from unittest.mock import Mock, patch
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+
+@pytest.fixture(autouse=True)
+def reset_pool():
+    """Start every test without sessions or cached probes"""
+    from app.services.ocr_providers import http_pool
+
+    http_pool.close_sessions()
+    yield
+    http_pool.close_sessions()
+
+
+class TestSessions:
+    """Test suite for http_pool.get_session"""
+
+    def test_one_session_per_host(self):
+        from app.services.ocr_providers import http_pool
+
+        first = http_pool.get_session('http://ollama:11434/api/generate')
+        second = http_pool.get_session('http://ollama:11434')
+        other = http_pool.get_session('http://vllm:8000')
+
+        assert first is second
+        assert first is not other
+
+    def test_adapter_pool_size_from_config(self, monkeypatch):
+        from app.config import Config
+        from app.services.ocr_providers import http_pool
+
+        monkeypatch.setattr(Config, 'HTTP_POOL_MAXSIZE', 7)
+        adapter = http_pool.get_session('http://ollama:11434').get_adapter('http://ollama:11434')
+
+        assert adapter._pool_maxsize == 7
+
+
+class TestCachedProbe:
+    """Test suite for http_pool.cached_probe"""
+
+    def test_probe_cached_within_ttl(self):
+        from app.services.ocr_providers import http_pool
+
+        probe = Mock(return_value=True)
+
+        assert http_pool.cached_probe('key', probe, ttl=60) is True
+        assert http_pool.cached_probe('key', probe, ttl=60) is True
+        assert probe.call_count == 1
+
+    def test_probe_repeated_after_ttl(self):
+        from app.services.ocr_providers import http_pool
+
+        probe = Mock(side_effect=[False, True])
+
+        assert http_pool.cached_probe('key', probe, ttl=0) is False
+        assert http_pool.cached_probe('key', probe, ttl=0) is True
+
+
+class TestProviderAvailability:
+    """Test suite for HTTP provider availability checks"""
+
+    def test_ollama_probe_shared_between_instances(self, monkeypatch):
+        from app.services.ocr_providers import http_pool
+        from app.services.ocr_providers.ollama_provider import OllamaProvider
+
+        monkeypatch.setenv('OLLAMA_ENABLED', 'true')
+        session = Mock()
+        session.get.return_value = Mock(status_code=200)
+
+        with patch.object(http_pool, 'get_session', return_value=session):
+            first = OllamaProvider(host='http://ollama:11434')
+            second = OllamaProvider(host='http://ollama:11434')
+            assert first.is_available() and second.is_available()
+
+        assert session.get.call_count == 1
+
+    def test_disabled_provider_never_probes(self, monkeypatch):
+        from app.services.ocr_providers import http_pool
+        from app.services.ocr_providers.ollama_provider import OllamaProvider
+
+        monkeypatch.setenv('OLLAMA_ENABLED', 'false')
+
+        with patch.object(http_pool, 'get_session') as get_session:
+            assert OllamaProvider().is_available() is False
+
+        get_session.assert_not_called()
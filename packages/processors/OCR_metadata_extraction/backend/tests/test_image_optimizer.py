@@ -0,0 +1,128 @@
+"""
+Unit Tests for the vision model encoding policy in ImageOptimizer
+Tests cover source byte reuse, resolution capping, lossless formats and base64 output
+"""
+
+import base64
+import io
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+Image = pytest.importorskip('PIL.Image')
+
+
+def _image(width=400, height=300):
+    image = Image.new('RGB', (width, height), 'white')
+    for x in range(0, width, 7):
+        image.putpixel((x, height // 2), (0, 0, 0))
+    return image
+
+
+class TestEncodeForModel:
+    """Test suite for ImageOptimizer.encode_for_model"""
+
+    def test_unmodified_source_bytes_reused(self, tmp_path):
+        from app.services.image_optimizer import ImageOptimizer
+
+        path = tmp_path / 'scan.jpg'
+        _image().save(path, format='JPEG')
+
+        data, mime_type, stats = ImageOptimizer.encode_for_model(source_path=str(path), max_dimension=1000)
+
+        assert mime_type == 'image/jpeg'
+        assert stats['reused_source'] is True
+        assert base64.b64decode(data) == path.read_bytes()
+        assert stats['bytes'] == path.stat().st_size
+        assert stats['base64_bytes'] == len(data)
+        assert stats['encode_ms'] >= 0
+
+    def test_oversized_source_downscaled(self, tmp_path):
+        from app.services.image_optimizer import ImageOptimizer
+
+        path = tmp_path / 'scan.png'
+        _image(2000, 1000).save(path, format='PNG')
+
+        data, mime_type, stats = ImageOptimizer.encode_for_model(source_path=str(path), max_dimension=500)
+
+        decoded = Image.open(io.BytesIO(base64.b64decode(data)))
+        assert stats['reused_source'] is False
+        assert stats['resized'] is True
+        assert decoded.size == (500, 250) == (stats['width'], stats['height'])
+        assert mime_type == 'image/png'
+
+    @pytest.mark.parametrize('name, size', [('scan.png', (400, 300)), ('scan.tiff', (2000, 1000))])
+    def test_source_file_closed(self, tmp_path, monkeypatch, name, size):
+        from app.services import image_optimizer
+        from app.services.image_optimizer import ImageOptimizer
+
+        # A multi-page TIFF keeps its file open after load() to allow seeking
+        path = tmp_path / name
+        _image(*size).save(path, save_all=True, append_images=[_image(*size)])
+        files = []
+        real_open = Image.open
+
+        def open_image(*args, **kwargs):
+            image = real_open(*args, **kwargs)
+            files.append(image.fp)
+            return image
+
+        monkeypatch.setattr(image_optimizer.Image, 'open', open_image)
+        ImageOptimizer.encode_for_model(source_path=str(path), max_dimension=500)
+
+        assert files[0].closed
+
+    def test_png_uses_configured_compress_level(self, monkeypatch):
+        from app.config import Config
+        from app.services.image_optimizer import ImageOptimizer
+
+        image = _image()
+        sizes = {}
+        for level in (0, 9):
+            monkeypatch.setattr(Config, 'OCR_PNG_COMPRESS_LEVEL', level)
+            data, _, stats = ImageOptimizer.encode_for_model(image)
+            assert Image.open(io.BytesIO(base64.b64decode(data))).tobytes() == image.tobytes()
+            sizes[level] = stats['bytes']
+
+        assert sizes[9] < sizes[0]
+
+    def test_webp_lossless_policy(self, monkeypatch):
+        from PIL import features
+        from app.config import Config
+        from app.services.image_optimizer import ImageOptimizer
+
+        if not features.check('webp'):
+            pytest.skip('Pillow built without WebP')
+        monkeypatch.setattr(Config, 'OCR_LOSSLESS_FORMAT', 'WEBP')
+        image = _image()
+
+        data, mime_type, stats = ImageOptimizer.encode_for_model(image)
+
+        decoded = Image.open(io.BytesIO(base64.b64decode(data)))
+        assert mime_type == 'image/webp'
+        assert stats['format'] == 'WEBP'
+        assert decoded.convert('RGB').tobytes() == image.tobytes()
+
+
+class TestEncodeBase64:
+    """Test suite for base64 encoding and encoding stats"""
+
+    def test_encodes_buffer_views(self):
+        from app.services.image_optimizer import ImageOptimizer
+
+        data = bytes(range(256)) * 3 + b'tail'
+
+        assert ImageOptimizer.encode_base64(memoryview(data)) == base64.b64encode(data).decode('ascii')
+
+    def test_summarize_encoding_totals_pages(self):
+        from app.services.image_optimizer import ImageOptimizer
+
+        summary = ImageOptimizer.summarize_encoding([
+            {'format': 'PNG', 'bytes': 10, 'base64_bytes': 16, 'encode_ms': 1.5},
+            {'format': 'PNG', 'bytes': 20, 'base64_bytes': 28, 'encode_ms': 2.0}
+        ])
+
+        assert summary == {'format': 'PNG', 'pages': 2, 'bytes': 30, 'base64_bytes': 44, 'encode_ms': 3.5}
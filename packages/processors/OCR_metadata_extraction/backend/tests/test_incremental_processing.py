@@ -0,0 +1,267 @@
+"""
+Unit Tests for incremental bulk processing
+Tests cover manifest planning, result merging and the incremental modes of
+NSQJobCoordinator and BulkProcessor
+"""
+
+import pytest
+import sys
+import os
+from unittest.mock import Mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+
+@pytest.fixture
+def mongo(mongo):
+    """In-memory MongoDB with two pending bulk jobs"""
+    mongo.db.bulk_jobs.insert_many([
+        {'job_id': 'job-1', 'status': 'processing'},
+        {'job_id': 'job-2', 'status': 'processing'}
+    ])
+    return mongo
+
+
+@pytest.fixture
+def folder(tmp_path):
+    """Folder with three images"""
+    for name in ('a', 'b', 'c'):
+        (tmp_path / f'{name}.jpg').write_bytes(f'image-{name}'.encode())
+    return tmp_path
+
+
+def _plan(mongo, job_id, folder):
+    from app.services.incremental_planner import IncrementalPlanner
+
+    info = IncrementalPlanner.start(mongo, job_id, str(folder), True, 'tesseract', ['en'], False)
+    changed = list(IncrementalPlanner.iter_changed_files(mongo, job_id, info, str(folder)))
+    return info, [os.path.basename(path) for path in changed]
+
+
+def _record(mongo, job_id, folder, names, record_type='result'):
+    import hashlib
+    from app.models.bulk_job_result import BulkJobResult
+
+    for name in names:
+        record = {'file_path': str(folder / name), 'text': f'{job_id}:{name}'}
+        if record_type == 'result':
+            # Workers store the hash of the bytes they OCR'd with the result
+            record['content_hash'] = hashlib.sha256((folder / name).read_bytes()).hexdigest()
+        BulkJobResult.upsert(mongo, job_id, record, record_type)
+
+
+def _texts(mongo, job_id):
+    return sorted(record['text'] for record in mongo.db.bulk_job_results.find({'job_id': job_id, 'record_type': 'result'}))
+
+
+class TestIncrementalPlanner:
+    """Test suite for manifest planning and merging"""
+
+    def test_first_run_processes_every_file(self, mongo, folder):
+        info, changed = _plan(mongo, 'job-1', folder)
+
+        assert info['base_job_id'] is None
+        assert changed == ['a.jpg', 'b.jpg', 'c.jpg']
+
+    def test_only_new_or_changed_files_reprocessed(self, mongo, folder):
+        from app.services.incremental_planner import IncrementalPlanner
+
+        info, _ = _plan(mongo, 'job-1', folder)
+        _record(mongo, 'job-1', folder, ['a.jpg', 'b.jpg', 'c.jpg'])
+        IncrementalPlanner.merge_previous_results(mongo, 'job-1', info)
+
+        (folder / 'b.jpg').write_bytes(b'rescanned page b')
+        stat = os.stat(folder / 'c.jpg')
+        os.utime(folder / 'c.jpg', ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))  # Touched, same bytes
+        (folder / 'd.jpg').write_bytes(b'image-d')
+
+        info, changed = _plan(mongo, 'job-2', folder)
+        assert info['base_job_id'] == 'job-1'
+        assert changed == ['b.jpg', 'd.jpg']
+
+        _record(mongo, 'job-2', folder, changed)
+        stats = IncrementalPlanner.merge_previous_results(mongo, 'job-2', info)
+
+        assert stats['reused'] == 2
+        assert _texts(mongo, 'job-2') == ['job-1:a.jpg', 'job-1:c.jpg', 'job-2:b.jpg', 'job-2:d.jpg']
+
+        # Nothing changed since job-2
+        mongo.db.bulk_jobs.insert_one({'job_id': 'job-3', 'status': 'processing'})
+        info, changed = _plan(mongo, 'job-3', folder)
+        assert info['base_job_id'] == 'job-2'
+        assert changed == []
+
+    def test_reused_and_reprocessed_results_get_distinct_indexes(self, mongo, folder, tmp_path_factory):
+        import zipfile
+        from app.models.bulk_job_result import BulkJobResult
+        from app.services.incremental_planner import IncrementalPlanner
+        from app.workers.result_aggregator import ResultAggregator
+
+        (folder / 'sub').mkdir()
+        (folder / 'sub' / 'a.jpg').write_bytes(b'image-sub-a')
+        info, changed = _plan(mongo, 'job-1', folder)
+        for idx, name in enumerate(['a.jpg', 'b.jpg', 'c.jpg', 'sub/a.jpg']):
+            BulkJobResult.upsert(mongo, 'job-1', {'file': os.path.basename(name), 'file_path': str(folder / name),
+                                                  'file_index': idx, 'text': f'job-1:{name}'})
+        IncrementalPlanner.merge_previous_results(mongo, 'job-1', info, 4)
+
+        # Only sub/a.jpg changed; it is the job's first (index 0) published file
+        (folder / 'sub' / 'a.jpg').write_bytes(b'rescanned sub a')
+        info, changed = _plan(mongo, 'job-2', folder)
+        assert changed == ['a.jpg']
+        BulkJobResult.upsert(mongo, 'job-2', {'file': 'a.jpg', 'file_path': str(folder / 'sub' / 'a.jpg'),
+                                              'file_index': 0, 'text': 'job-2:sub/a.jpg'})
+        IncrementalPlanner.merge_previous_results(mongo, 'job-2', info, 1)
+
+        records = list(BulkJobResult.iter_by_job(mongo, 'job-2', BulkJobResult.RECORD_RESULT))
+        assert [record['file_index'] for record in records] == [0, 1, 2, 3]
+        assert records[0]['text'] == 'job-2:sub/a.jpg'
+
+        aggregator = ResultAggregator.__new__(ResultAggregator)
+        aggregator.mongo = mongo
+        export_files, _, _ = aggregator._stream_exports(str(tmp_path_factory.mktemp('exports')), 'job-2', 4, 0)
+        with zipfile.ZipFile(export_files['zip']) as zipf:
+            names = [name for name in zipf.namelist() if name.startswith('individual_files/')]
+        assert len(names) == len(set(names)) == 4
+
+    def test_failed_files_retried_and_deleted_files_dropped(self, mongo, folder):
+        from app.services.incremental_planner import IncrementalPlanner
+
+        info, _ = _plan(mongo, 'job-1', folder)
+        _record(mongo, 'job-1', folder, ['a.jpg', 'c.jpg'])
+        _record(mongo, 'job-1', folder, ['b.jpg'], record_type='error')
+        stats = IncrementalPlanner.merge_previous_results(mongo, 'job-1', info)
+        assert (stats['committed'], stats['uncommitted']) == (2, 1)
+
+        (folder / 'a.jpg').unlink()
+        info, changed = _plan(mongo, 'job-2', folder)
+        assert changed == ['b.jpg']
+
+        _record(mongo, 'job-2', folder, changed)
+        stats = IncrementalPlanner.merge_previous_results(mongo, 'job-2', info)
+
+        assert stats['removed'] == 1
+        assert _texts(mongo, 'job-2') == ['job-1:c.jpg', 'job-2:b.jpg']
+        assert mongo.db.folder_manifest_entries.count_documents({}) == 2
+
+    def test_new_files_not_hashed_while_planning_or_committing(self, mongo, folder, monkeypatch):
+        from app.models.ocr_result_cache import OCRResultCache
+        from app.services.incremental_planner import IncrementalPlanner
+
+        hashed = []
+        hash_file = OCRResultCache.hash_file
+        monkeypatch.setattr(OCRResultCache, 'hash_file', staticmethod(lambda path: hashed.append(path) or hash_file(path)))
+
+        info, changed = _plan(mongo, 'job-1', folder)
+        assert changed == ['a.jpg', 'b.jpg', 'c.jpg']
+        assert hashed == []
+
+        _record(mongo, 'job-1', folder, changed)
+        IncrementalPlanner.merge_previous_results(mongo, 'job-1', info)
+        assert hashed == []
+        entry = mongo.db.folder_manifest_entries.find_one({'file_path': str(folder / 'a.jpg')})
+        assert entry['fingerprint']['content_hash'] == hash_file(str(folder / 'a.jpg'))
+
+    def test_commit_keeps_entries_of_concurrent_job(self, mongo, folder):
+        from app.services.incremental_planner import IncrementalPlanner
+
+        info, _ = _plan(mongo, 'job-1', folder)
+        _record(mongo, 'job-1', folder, ['a.jpg', 'b.jpg', 'c.jpg'])
+        IncrementalPlanner.merge_previous_results(mongo, 'job-1', info)
+
+        # job-2 sees a new file, then job-3 runs and merges before job-2 does
+        (folder / 'd.jpg').write_bytes(b'image-d')
+        _plan(mongo, 'job-2', folder)
+        (folder / 'd.jpg').unlink()
+        mongo.db.bulk_jobs.insert_one({'job_id': 'job-3', 'status': 'processing'})
+        info, changed = _plan(mongo, 'job-3', folder)
+        assert changed == []
+        IncrementalPlanner.merge_previous_results(mongo, 'job-3', info)
+
+        assert mongo.db.folder_manifest_entries.count_documents({'seen_job_id': 'job-2'}) == 1
+
+    def test_settings_change_starts_a_new_manifest(self, mongo, folder):
+        from app.models.folder_manifest import FolderManifest
+
+        key = FolderManifest.build_key(str(folder), True, 'tesseract', ['en', 'hi'], False)
+
+        assert key == FolderManifest.build_key(str(folder) + '/', True, 'tesseract', ['hi', 'en'], False)
+        assert key != FolderManifest.build_key(str(folder), True, 'claude', ['en', 'hi'], False)
+        assert key != FolderManifest.build_key(str(folder), False, 'tesseract', ['en', 'hi'], False)
+
+
+class TestIncrementalModes:
+    """Test suite for incremental NSQ and threading jobs"""
+
+    def test_unchanged_folder_signals_done_without_publishing(self, mongo, folder):
+        from app.models.bulk_job import BulkJob
+        from app.services.incremental_planner import IncrementalPlanner
+        from app.services.nsq_job_coordinator import NSQJobCoordinator
+
+        info, _ = _plan(mongo, 'job-1', folder)
+        _record(mongo, 'job-1', folder, ['a.jpg', 'b.jpg', 'c.jpg'])
+        IncrementalPlanner.merge_previous_results(mongo, 'job-1', info)
+        mongo.db.bulk_jobs.update_one({'job_id': 'job-1'}, {'$set': {'status': 'completed'}})
+
+        coordinator = NSQJobCoordinator.__new__(NSQJobCoordinator)
+        coordinator.nsq_service = Mock()
+        job_info = coordinator.start_job(mongo, 'job-2', str(folder), 'tesseract', ['en'], False, incremental=True)
+
+        assert job_info['total_files'] == 0
+        coordinator.nsq_service.publish_file_tasks.assert_not_called()
+        coordinator.nsq_service.publish_job_done.assert_called_once_with('job-2', source='coordinator')
+        assert [job['job_id'] for job in BulkJob.find_ready_for_aggregation(mongo)] == ['job-2']
+
+    def test_incremental_job_not_ready_before_scan_publishes(self, mongo, folder, monkeypatch):
+        from app.services.incremental_planner import IncrementalPlanner
+        from app.services.nsq_job_coordinator import NSQJobCoordinator
+
+        info, _ = _plan(mongo, 'job-1', folder)
+        _record(mongo, 'job-1', folder, ['a.jpg', 'b.jpg', 'c.jpg'])
+        IncrementalPlanner.merge_previous_results(mongo, 'job-1', info)
+        mongo.db.bulk_jobs.update_one({'job_id': 'job-1'}, {'$set': {'status': 'completed'}})
+
+        jobs_after_start = []
+        start = IncrementalPlanner.start
+
+        def start_and_check(*args, **kwargs):
+            incremental_info = start(*args, **kwargs)
+            # The safety-net scan may run right after the job is marked incremental
+            jobs_after_start.append(mongo.db.bulk_jobs.find_one({'job_id': 'job-2'}))
+            return incremental_info
+
+        monkeypatch.setattr(IncrementalPlanner, 'start', staticmethod(start_and_check))
+        coordinator = NSQJobCoordinator.__new__(NSQJobCoordinator)
+        coordinator.nsq_service = Mock()
+        coordinator.start_job(mongo, 'job-2', str(folder), 'tesseract', ['en'], False, incremental=True)
+
+        job = jobs_after_start[0]
+        assert job['incremental']['base_job_id'] == 'job-1'
+        assert job['scanning'] is True
+        assert job['published_count'] == job['consumed_count'] == 0
+
+    def test_bulk_processor_merges_previous_results(self, mongo, folder):
+        from app.services.bulk_processor import BulkProcessor
+
+        ocr_service = Mock()
+        ocr_service.process_image.side_effect = lambda image_path, **kwargs: {
+            'text': os.path.basename(image_path), 'confidence': 0.9
+        }
+
+        first = BulkProcessor(ocr_service, max_workers=1, job_id='job-1')
+        first.process_folder(str(folder), parallel=False, incremental=True, mongo=mongo)
+        (folder / 'd.jpg').write_bytes(b'image-d')
+
+        second = BulkProcessor(ocr_service, max_workers=1, job_id='job-2')
+        results = second.process_folder(str(folder), parallel=False, incremental=True, mongo=mongo)
+
+        assert ocr_service.process_image.call_count == 4
+        assert sorted(result['text'] for result in results['results']) == ['a.jpg', 'b.jpg', 'c.jpg', 'd.jpg']
+        assert results['summary']['total_files'] == 4
+        assert results['summary']['incremental'] == {'base_job_id': 'job-1', 'processed': 1, 'reused': 3}
+
+    def test_incremental_processor_requires_mongo(self, folder):
+        from app.services.bulk_processor import BulkProcessor
+
+        with pytest.raises(ValueError):
+            BulkProcessor(Mock(), job_id='job-1').process_folder(str(folder), incremental=True)
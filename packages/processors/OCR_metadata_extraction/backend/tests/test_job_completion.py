@@ -0,0 +1,137 @@
+"""
+Unit Tests for event-driven NSQ job completion
+Tests cover drain detection, aggregation claims and job done signals
+"""
+
+import pytest
+import sys
+import os
+from datetime import datetime, timedelta
+from unittest.mock import Mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+
+@pytest.fixture
+def mongo(mongo):
+    """In-memory MongoDB with a single two-file NSQ job"""
+    mongo.db.bulk_jobs.insert_one({
+        'job_id': 'job-1',
+        'total_files': 2,
+        'published_count': 2,
+        'consumed_count': 0,
+        'status': 'processing',
+        'progress': {'current': 0, 'total': 2, 'percentage': 0},
+        'checkpoint': {'processed_files': [], 'results': [], 'errors': []}
+    })
+    return mongo
+
+
+def _result(file_path, file_index):
+    return {'file': os.path.basename(file_path), 'file_path': file_path, 'file_index': file_index, 'text': 'x'}
+
+
+class TestJobDrained:
+    """Test suite for BulkJob.is_drained"""
+
+    def test_last_save_reports_drained(self, mongo):
+        from app.models.bulk_job import BulkJob
+
+        first = BulkJob.save_file_result_atomic(mongo, 'job-1', _result('/data/a.jpg', 0))
+        last = BulkJob.save_file_error_atomic(mongo, 'job-1', '/data/b.jpg', 'boom')
+
+        assert not BulkJob.is_drained(first)
+        assert BulkJob.is_drained(last)
+
+    def test_empty_job_not_drained(self):
+        from app.models.bulk_job import BulkJob
+
+        assert not BulkJob.is_drained({'consumed_count': 0, 'total_files': 0})
+
+
+class TestClaimForAggregation:
+    """Test suite for BulkJob.claim_for_aggregation"""
+
+    def test_only_first_claim_wins(self, mongo):
+        from app.models.bulk_job import BulkJob
+
+        assert BulkJob.claim_for_aggregation(mongo, 'job-1') is not None
+        assert BulkJob.claim_for_aggregation(mongo, 'job-1') is None
+
+    def test_stale_claim_taken_over(self, mongo):
+        from app.models.bulk_job import BulkJob
+
+        mongo.db.bulk_jobs.update_one(
+            {'job_id': 'job-1'},
+            {'$set': {'aggregation_started_at': datetime.utcnow() - timedelta(hours=1)}}
+        )
+
+        assert BulkJob.claim_for_aggregation(mongo, 'job-1', stale_after_seconds=600) is not None
+
+    def test_finished_job_not_claimed(self, mongo):
+        from app.models.bulk_job import BulkJob
+
+        mongo.db.bulk_jobs.update_one({'job_id': 'job-1'}, {'$set': {'status': 'completed'}})
+
+        assert BulkJob.claim_for_aggregation(mongo, 'job-1') is None
+
+
+class TestAggregatorProcessJob:
+    """Test suite for ResultAggregator.process_job"""
+
+    def _aggregator(self, mongo):
+        from app.workers.result_aggregator import ResultAggregator
+
+        aggregator = ResultAggregator.__new__(ResultAggregator)
+        aggregator.mongo = mongo
+        aggregator.aggregate_job_results = Mock()
+        return aggregator
+
+    def test_incomplete_job_not_aggregated(self, mongo):
+        from app.models.bulk_job import BulkJob
+
+        BulkJob.save_file_result_atomic(mongo, 'job-1', _result('/data/a.jpg', 0))
+        aggregator = self._aggregator(mongo)
+
+        aggregator.process_job('job-1')
+
+        aggregator.aggregate_job_results.assert_not_called()
+
+    def test_duplicate_signals_aggregate_once(self, mongo):
+        from app.models.bulk_job import BulkJob
+
+        BulkJob.save_file_result_atomic(mongo, 'job-1', _result('/data/a.jpg', 0))
+        BulkJob.save_file_result_atomic(mongo, 'job-1', _result('/data/b.jpg', 1))
+        aggregator = self._aggregator(mongo)
+
+        aggregator.process_job('job-1')
+        aggregator.process_job('job-1')
+
+        aggregator.aggregate_job_results.assert_called_once_with('job-1')
+
+    def test_job_done_message_queued(self, mongo):
+        from gevent import queue
+
+        aggregator = self._aggregator(mongo)
+        aggregator.pending_jobs = queue.Queue()
+        message = Mock(body=b'{"job_id": "job-1", "source": "worker-1"}')
+
+        aggregator.handle_job_done(None, message)
+
+        assert aggregator.pending_jobs.get_nowait() == 'job-1'
+        message.finish.assert_called_once()
+
+    def test_interrupted_scan_marked_as_error(self, mongo):
+        mongo.db.bulk_jobs.update_one(
+            {'job_id': 'job-1'},
+            {'$set': {'scanning': True, 'updated_at': datetime.utcnow() - timedelta(hours=2)}}
+        )
+        mongo.db.bulk_jobs.insert_one({
+            'job_id': 'job-2', 'status': 'processing', 'scanning': True, 'updated_at': datetime.utcnow()
+        })
+        aggregator = self._aggregator(mongo)
+
+        aggregator.fail_interrupted_scans()
+
+        assert mongo.db.bulk_jobs.find_one({'job_id': 'job-1'})['status'] == 'error'
+        assert mongo.db.bulk_jobs.find_one({'job_id': 'job-2'})['status'] == 'processing'
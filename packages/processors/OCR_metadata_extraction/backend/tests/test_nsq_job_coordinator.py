@@ -0,0 +1,97 @@
+"""
+Unit Tests for NSQJobCoordinator batched task publishing
+"""
+
+import pytest
+import sys
+import os
+from unittest.mock import Mock, patch
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+
+@pytest.fixture
+def mongo(mongo):
+    """In-memory MongoDB with a pending bulk job"""
+    mongo.db.bulk_jobs.insert_one({'job_id': 'job-1', 'status': 'processing'})
+    return mongo
+
+
+@pytest.fixture
+def folder(tmp_path):
+    """Folder with five images"""
+    for idx in range(5):
+        (tmp_path / f'page_{idx}.jpg').write_bytes(b'x')
+    return str(tmp_path)
+
+
+@pytest.fixture
+def coordinator():
+    from app.services.nsq_job_coordinator import NSQJobCoordinator
+    from app.services.nsq_service import NSQService
+
+    coordinator = NSQJobCoordinator.__new__(NSQJobCoordinator)
+    coordinator.nsq_service = Mock()
+    coordinator.nsq_service.build_file_task.side_effect = NSQService.build_file_task
+    return coordinator
+
+
+class TestBatchedPublishing:
+    """Test suite for chunked MPUB publishing in start_job"""
+
+    def test_tasks_published_in_chunks(self, mongo, folder, coordinator):
+        from app.config import Config
+
+        with patch.object(Config, 'NSQ_PUBLISH_CHUNK_SIZE', 2):
+            info = coordinator.start_job(mongo, 'job-1', folder, 'tesseract', ['en'], False)
+
+        chunks = [call.args[0] for call in coordinator.nsq_service.publish_file_tasks.call_args_list]
+        assert [len(chunk) for chunk in chunks] == [2, 2, 1]
+        assert [task['file_index'] for chunk in chunks for task in chunk] == [0, 1, 2, 3, 4]
+        assert chunks[0][0]['provider'] == 'tesseract'
+        assert info['total_files'] == 5
+
+        job = mongo.db.bulk_jobs.find_one({'job_id': 'job-1'})
+        assert job['published_count'] == 5
+        coordinator.nsq_service.close.assert_called_once()
+
+    def test_chain_tasks_carry_chain_config(self, mongo, folder, coordinator):
+        chain_config = {'steps': [{'provider': 'tesseract'}]}
+
+        coordinator.start_job(mongo, 'job-1', folder, None, ['en'], False,
+                              processing_mode='chain', chain_config=chain_config)
+
+        task = coordinator.nsq_service.publish_file_tasks.call_args.args[0][0]
+        assert task['chain_config'] == chain_config
+        assert 'provider' not in task
+
+    def test_partially_published_job_not_ready(self, mongo):
+        from app.models.bulk_job import BulkJob
+
+        mongo.db.bulk_jobs.update_one(
+            {'job_id': 'job-1'},
+            {'$set': {'total_files': 5, 'published_count': 2, 'consumed_count': 2}}
+        )
+
+        assert BulkJob.find_ready_for_aggregation(mongo) == []
+
+    def test_job_not_ready_while_scan_streams_tasks(self, mongo, folder, coordinator):
+        from app.models.bulk_job import BulkJob
+
+        def consume_during_scan(chunk):
+            # Workers catch up with every published chunk before the scan finished
+            job = mongo.db.bulk_jobs.find_one({'job_id': 'job-1'})
+            assert job['scanning'] is True
+            mongo.db.bulk_jobs.update_one({'job_id': 'job-1'}, {'$inc': {'consumed_count': len(chunk)}})
+            mongo.db.bulk_jobs.update_one({'job_id': 'job-1'}, {'$inc': {'published_count': len(chunk)}})
+            assert BulkJob.find_ready_for_aggregation(mongo) == []
+            mongo.db.bulk_jobs.update_one({'job_id': 'job-1'}, {'$inc': {'published_count': -len(chunk)}})
+
+        coordinator.nsq_service.publish_file_tasks.side_effect = consume_during_scan
+        coordinator.start_job(mongo, 'job-1', folder, 'tesseract', ['en'], False)
+
+        job = mongo.db.bulk_jobs.find_one({'job_id': 'job-1'})
+        assert job['scanning'] is False
+        assert job['total_files'] == job['progress']['total'] == 5
+        assert [doc['job_id'] for doc in BulkJob.find_ready_for_aggregation(mongo)] == ['job-1']
+        coordinator.nsq_service.publish_job_done.assert_called_once_with('job-1', source='coordinator')
@@ -0,0 +1,135 @@
+"""
+Unit Tests for the content-addressed OCR result cache
+Tests cover key derivation, LRU eviction and cache use in OCRService
+"""
+
+import sys
+import os
+from datetime import datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+
+class FakeProvider:
+    """Provider stub counting OCR calls"""
+
+    def __init__(self, name='claude', model='model-a'):
+        self.name = name
+        self.model = model
+        self.calls = 0
+
+    def get_name(self):
+        return self.name
+
+    def is_available(self):
+        return True
+
+    def process_image(self, image_path, languages=None, handwriting=False, custom_prompt=None):
+        self.calls += 1
+        return {'text': f'text-{self.calls}', 'confidence': 0.9}
+
+
+def _ocr_service(mongo, provider):
+    from app.services.ocr_service import OCRService
+
+    service = OCRService.__new__(OCRService)
+    service._mongo = mongo
+    service.providers = {provider.get_name(): provider}
+    service.default_provider = provider.get_name()
+    return service
+
+
+class TestOCRResultCacheModel:
+    """Test suite for OCRResultCache"""
+
+    def test_key_covers_every_input(self):
+        from app.models.ocr_result_cache import OCRResultCache
+
+        base = OCRResultCache.build_key('hash', 'claude', 'm', ['en', 'hi'], False, None)
+
+        assert base == OCRResultCache.build_key('hash', 'claude', 'm', ['hi', 'en'], False, None)
+        assert base != OCRResultCache.build_key('other', 'claude', 'm', ['en', 'hi'], False, None)
+        assert base != OCRResultCache.build_key('hash', 'ollama', 'm', ['en', 'hi'], False, None)
+        assert base != OCRResultCache.build_key('hash', 'claude', 'n', ['en', 'hi'], False, None)
+        assert base != OCRResultCache.build_key('hash', 'claude', 'm', ['en'], False, None)
+        assert base != OCRResultCache.build_key('hash', 'claude', 'm', ['en', 'hi'], True, None)
+        assert base != OCRResultCache.build_key('hash', 'claude', 'm', ['en', 'hi'], False, 'prompt')
+
+    def test_least_recently_used_entries_evicted(self, mongo):
+        from app.models.ocr_result_cache import OCRResultCache
+
+        OCRResultCache.put(mongo, 'a', {'text': 'a'})
+        OCRResultCache.put(mongo, 'b', {'text': 'b'})
+        mongo.db.ocr_result_cache.update_many({}, {'$set': {'last_accessed_at': datetime(2024, 1, 1)}})
+        assert OCRResultCache.get(mongo, 'a') == {'text': 'a'}
+
+        OCRResultCache.put(mongo, 'c', {'text': 'c'}, max_entries=2)
+
+        assert OCRResultCache.get(mongo, 'b') is None
+        assert OCRResultCache.get(mongo, 'a') == {'text': 'a'}
+        assert OCRResultCache.get(mongo, 'c') == {'text': 'c'}
+
+
+class TestOCRServiceCache:
+    """Test suite for result caching in OCRService"""
+
+    def test_identical_file_processed_once(self, mongo, tmp_path):
+        from app.models.ocr_result_cache import OCRResultCache
+
+        provider = FakeProvider()
+        service = _ocr_service(mongo, provider)
+        first = tmp_path / 'a.jpg'
+        copy = tmp_path / 'copy.jpg'
+        first.write_bytes(b'image-bytes')
+        copy.write_bytes(b'image-bytes')
+
+        result = service.process_image(str(first), languages=['en'])
+        cached = service.process_image(str(copy), languages=['en'])
+
+        assert provider.calls == 1
+        assert cached['text'] == result['text']
+        assert cached['cached'] is True
+        assert 'cached' not in result
+        assert result['content_hash'] == cached['content_hash'] == OCRResultCache.hash_file(str(first))
+
+    def test_job_scoped_images_not_replayed_from_cache(self, mongo, tmp_path):
+        provider = FakeProvider()
+        images = {'preprocessed': {'file_id': 'gridfs-1', 'url': 'https://ocr/images/gridfs-1'}}
+        provider.process_image = lambda *args, **kwargs: {'text': 'text', 'intermediate_images': images}
+        service = _ocr_service(mongo, provider)
+        image = tmp_path / 'a.jpg'
+        image.write_bytes(b'image-bytes')
+
+        result = service.process_image(str(image))
+        cached = service.process_image(str(image))
+
+        assert result['intermediate_images'] == images
+        assert cached['cached'] is True
+        assert 'intermediate_images' not in cached
+
+    def test_changed_prompt_or_bypass_reprocesses(self, mongo, tmp_path):
+        provider = FakeProvider()
+        service = _ocr_service(mongo, provider)
+        image = tmp_path / 'a.jpg'
+        image.write_bytes(b'image-bytes')
+
+        service.process_image(str(image))
+        service.process_image(str(image), custom_prompt='Only dates')
+        service.process_image(str(image), use_cache=False)
+
+        assert provider.calls == 3
+
+    def test_disabled_cache_skips_mongo(self, mongo, tmp_path, monkeypatch):
+        from app.config import Config
+
+        monkeypatch.setattr(Config, 'OCR_CACHE_ENABLED', False)
+        provider = FakeProvider()
+        service = _ocr_service(mongo, provider)
+        image = tmp_path / 'a.jpg'
+        image.write_bytes(b'image-bytes')
+
+        service.process_image(str(image))
+        service.process_image(str(image))
+
+        assert provider.calls == 2
+        assert mongo.db.ocr_result_cache.count_documents({}) == 0
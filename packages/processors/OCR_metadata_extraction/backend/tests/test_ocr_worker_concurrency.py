@@ -0,0 +1,216 @@
+"""
+Unit Tests for concurrent task dispatch in OCRWorker
+"""
+
+import pytest
+import sys
+import os
+import json
+import threading
+import time
+from contextlib import nullcontext
+from unittest.mock import Mock, patch
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+gevent = pytest.importorskip('gevent')
+
+
+class FakeMessage:
+    """Minimal gnsq message double"""
+
+    def __init__(self, body):
+        self.id = b'msg-1'
+        self.body = json.dumps(body).encode('utf-8')
+        self.attempts = 1
+        self.timestamp = 0
+        self.responses = []
+        self.touches = 0
+        self.is_async = False
+
+    def enable_async(self):
+        self.is_async = True
+
+    def has_responded(self):
+        return bool(self.responses)
+
+    def finish(self):
+        self.responses.append('finish')
+
+    def requeue(self, time_ms=0, backoff=True):
+        self.responses.append('requeue')
+
+    def touch(self):
+        self.touches += 1
+
+
+@pytest.fixture
+def worker():
+    from gevent.threadpool import ThreadPool
+    from app.config import Config
+    from app.workers.lane_scheduler import LaneScheduler
+    from app.workers.ocr_worker import OCRWorker
+
+    worker = OCRWorker.__new__(OCRWorker)
+    worker.worker_id = 'worker-test'
+    worker.app = Mock(app_context=lambda: nullcontext())
+    worker.mongo = Mock()
+    worker.nsq_service = Mock()
+    worker.hub = gevent.get_hub()
+    worker.processed_count = 0
+    worker.error_count = 0
+    worker.stats_lock = threading.Lock()
+    worker.task_pool = ThreadPool(4)
+    worker.provider_limits = {}
+    worker.lane_scheduler = LaneScheduler(Config.NSQ_PRIORITY_LANES, worker.task_pool.maxsize)
+    yield worker
+    worker.task_pool.kill()
+
+
+class TestDispatchFileTask:
+    """Test suite for OCRWorker.dispatch_file_task"""
+
+    def test_response_applied_on_hub(self, worker):
+        worker.handle_file_task = lambda sender, message: message.requeue()
+        message = FakeMessage({'job_id': 'job-1', 'provider': 'lmstudio'})
+
+        worker.dispatch_file_task(None, message)
+        gevent.wait(timeout=5)
+
+        assert message.is_async
+        assert message.responses == ['requeue']
+
+    def test_unanswered_message_finished(self, worker):
+        worker.handle_file_task = lambda sender, message: None
+        message = FakeMessage({'job_id': 'job-1', 'provider': 'lmstudio'})
+
+        worker.dispatch_file_task(None, message)
+        gevent.wait(timeout=5)
+
+        assert message.responses == ['finish']
+
+    def test_long_task_touched(self, worker):
+        from app.config import Config
+
+        worker.handle_file_task = lambda sender, message: time.sleep(1.5)
+        message = FakeMessage({'job_id': 'job-1', 'provider': 'lmstudio'})
+
+        with patch.object(Config, 'WORKER_TOUCH_INTERVAL', 1):
+            worker.dispatch_file_task(None, message)
+            gevent.wait(timeout=5)
+
+        assert message.touches >= 1
+        assert message.responses == ['finish']
+
+    def test_provider_cap_serializes_tasks(self, worker):
+        from app.config import Config
+
+        running = []
+        overlaps = []
+        lock = threading.Lock()
+
+        def handle(sender, message):
+            with lock:
+                running.append(1)
+                overlaps.append(len(running))
+            time.sleep(0.1)
+            with lock:
+                running.pop()
+
+        worker.handle_file_task = handle
+        messages = [FakeMessage({'job_id': 'job-1', 'provider': 'easyocr'}) for _ in range(3)]
+
+        with patch.object(Config, 'WORKER_PROVIDER_CONCURRENCY', {'easyocr': 1}):
+            for message in messages:
+                worker.dispatch_file_task(None, message)
+            gevent.wait(timeout=5)
+
+        assert max(overlaps) == 1
+        assert all(message.responses == ['finish'] for message in messages)
+
+    def test_pdf_page_pool_sized_from_provider_budget(self, worker):
+        from app.config import Config
+        from app.services.pdf_service import _page_budget
+
+        budgets = []
+
+        def handle(sender, message):
+            budgets.append(_page_budget.workers)
+            time.sleep(0.1)
+
+        worker.handle_file_task = handle
+        messages = [
+            FakeMessage({'job_id': 'job-1', 'provider': 'claude', 'file_path': 'a.pdf'}),
+            FakeMessage({'job_id': 'job-1', 'provider': 'claude', 'file_path': 'b.png'}),
+        ]
+
+        with patch.object(Config, 'WORKER_PROVIDER_CONCURRENCY', {'claude': 3}), \
+                patch.object(Config, 'OCR_PDF_PAGE_WORKERS', 4):
+            for message in messages:
+                worker.dispatch_file_task(None, message)
+            gevent.wait(timeout=5)
+
+        # The PDF takes the two free slots; the image waits for one and gets no page pool
+        assert budgets == [3, 1]
+        assert worker.provider_limits['claude'].counter == 3
+
+
+class TestJobDoneSignal:
+    """Test suite for OCRWorker._signal_if_job_done"""
+
+    def test_published_on_hub_from_pool_thread(self, worker):
+        publish_threads = []
+        worker.nsq_service.publish_job_done.side_effect = lambda job_id, source: publish_threads.append(threading.get_ident())
+
+        pool_thread = worker.task_pool.spawn(lambda: (
+            worker._signal_if_job_done('job-1', {'total_files': 2, 'consumed_count': 2}),
+            threading.get_ident()
+        )[1]).get()
+        gevent.wait(timeout=5)
+
+        worker.nsq_service.publish_job_done.assert_called_once_with('job-1', source='worker-test')
+        assert publish_threads == [threading.get_ident()]
+        assert pool_thread != threading.get_ident()
+
+    def test_not_published_before_job_drained(self, worker):
+        worker._signal_if_job_done('job-1', {'total_files': 2, 'consumed_count': 1})
+        gevent.wait(timeout=5)
+
+        worker.nsq_service.publish_job_done.assert_not_called()
+
+    def test_counters_consistent_across_pool_threads(self, worker):
+        message = FakeMessage({})
+        message.body = b'not json'
+
+        def count_errors():
+            for _ in range(500):
+                worker.handle_file_task(None, message)
+
+        with patch('app.workers.ocr_worker.logger'):
+            for _ in range(4):
+                worker.task_pool.spawn(count_errors)
+            worker.task_pool.join()
+
+        assert worker.error_count == 2000
+
+
+class TestSingleTaskResult:
+    """Test suite for the result document built by OCRWorker._handle_single_task"""
+
+    def test_encoding_stats_kept_in_metadata(self, worker, tmp_path):
+        from app.models.bulk_job import BulkJob
+
+        image = tmp_path / 'a.png'
+        image.write_bytes(b'x')
+        encoding = {'format': 'PNG', 'bytes': 1024, 'base64_bytes': 1368, 'encode_ms': 4.2}
+        worker.processed_count = 0
+        worker.ocr_service = Mock(process_image=Mock(return_value={'text': 'x', 'encoding': encoding}))
+        message = FakeMessage({'job_id': 'job-1', 'provider': 'lmstudio'})
+
+        with patch.object(BulkJob, 'is_file_processed', return_value=False), \
+                patch.object(BulkJob, 'save_file_result_atomic', return_value=None) as save:
+            worker._handle_single_task('job-1', str(image), 0, 'lmstudio', ['en'], False, 0, message, 'msg-1')
+
+        file_result = save.call_args.args[2]
+        assert file_result['metadata']['encoding'] == encoding
+        assert message.responses == ['finish']
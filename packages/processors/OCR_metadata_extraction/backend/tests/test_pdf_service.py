@@ -0,0 +1,194 @@
+"""
+Unit Tests for the PDFService page pipeline
+Tests cover lazy page iteration, bounded concurrent page OCR and page-ordered merging
+"""
+
+import pytest
+import sys
+import os
+import threading
+import time
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+
+class TestIterPdfPages:
+    """Test suite for PDFService.iter_pdf_pages"""
+
+    def test_pages_rasterised_in_chunks(self, tmp_path):
+        from app.services import pdf_service
+        from app.services.pdf_service import PDFService
+
+        pdf_path = tmp_path / 'doc.pdf'
+        pdf_path.write_bytes(b'%PDF-1.4')
+        calls = []
+
+        def fake_convert(path, dpi, first_page, last_page):
+            calls.append((first_page, last_page))
+            return [f'img-{page}' for page in range(first_page, last_page + 1)]
+
+        with patch.object(pdf_service, 'PDF2IMAGE_AVAILABLE', True), \
+                patch.object(pdf_service, 'convert_from_path', fake_convert, create=True), \
+                patch.object(PDFService, 'get_page_count', return_value=5):
+            pages = PDFService.iter_pdf_pages(str(pdf_path), dpi=100, chunk_size=2)
+            assert calls == []
+            assert list(pages) == [(1, 'img-1'), (2, 'img-2'), (3, 'img-3'), (4, 'img-4'), (5, 'img-5')]
+
+        assert calls == [(1, 2), (3, 4), (5, 5)]
+
+    def test_paths_only_temp_dir_removed_on_close(self, tmp_path):
+        from app.services import pdf_service
+        from app.services.pdf_service import PDFService
+
+        pdf_path = tmp_path / 'doc.pdf'
+        pdf_path.write_bytes(b'%PDF-1.4')
+
+        def fake_convert(path, dpi, first_page, last_page, output_folder, paths_only, fmt):
+            assert paths_only
+            paths = []
+            for page in range(first_page, last_page + 1):
+                page_path = os.path.join(output_folder, f'page-{page}.png')
+                open(page_path, 'wb').close()
+                paths.append(page_path)
+            return paths
+
+        with patch.object(pdf_service, 'PDF2IMAGE_AVAILABLE', True), \
+                patch.object(pdf_service, 'convert_from_path', fake_convert, create=True), \
+                patch.object(PDFService, 'get_page_count', return_value=3):
+            pages = PDFService.iter_pdf_pages(str(pdf_path), dpi=100, chunk_size=2, paths_only=True)
+            page_num, page_path = next(pages)
+            assert page_num == 1 and os.path.exists(page_path)
+            pages.close()
+
+        assert not os.path.exists(os.path.dirname(page_path))
+
+    def test_pdf_to_images_uses_chunked_conversion(self, tmp_path):
+        from app.services import pdf_service
+        from app.services.pdf_service import PDFService
+
+        pdf_path = tmp_path / 'doc.pdf'
+        pdf_path.write_bytes(b'%PDF-1.4')
+
+        def fake_convert(path, dpi, first_page, last_page):
+            return [f'img-{page}' for page in range(first_page, last_page + 1)]
+
+        with patch.object(pdf_service, 'PDF2IMAGE_AVAILABLE', True), \
+                patch.object(pdf_service, 'convert_from_path', fake_convert, create=True), \
+                patch.object(PDFService, 'get_page_count', return_value=3):
+            assert PDFService.pdf_to_images(str(pdf_path), dpi=100) == ['img-1', 'img-2', 'img-3']
+
+
+class TestExtractPdfMetadata:
+    """Test suite for PDFService.extract_pdf_metadata"""
+
+    def test_pdfinfo_fallback_without_pypdf2(self, tmp_path):
+        from app.services import pdf_service
+        from app.services.pdf_service import PDFService
+
+        pdf_path = tmp_path / 'doc.pdf'
+        pdf_path.write_bytes(b'%PDF-1.4')
+        info = {'Pages': 12, 'Title': 'Letters', 'Encrypted': 'no'}
+
+        with patch.object(pdf_service, 'PYPDF2_AVAILABLE', False), \
+                patch.object(pdf_service, 'PDF2IMAGE_AVAILABLE', True), \
+                patch.object(pdf_service, 'pdfinfo_from_path', return_value=info, create=True):
+            metadata = PDFService.extract_pdf_metadata(str(pdf_path))
+
+        assert metadata['page_count'] == 12
+        assert metadata['title'] == 'Letters'
+        assert metadata['encrypted'] is False
+
+
+class TestOcrPages:
+    """Test suite for PDFService.ocr_pages"""
+
+    def test_results_in_page_order(self):
+        from app.services.pdf_service import PDFService
+
+        def page_fn(page_num, image):
+            # Later pages finish first
+            time.sleep(0.01 * (5 - page_num))
+            return f'text-{image}'
+
+        pages = [(num, f'img{num}') for num in range(1, 5)]
+        results = PDFService.ocr_pages(pages, page_fn, max_workers=4)
+
+        assert [r['page'] for r in results] == [1, 2, 3, 4]
+        assert results[0]['result'] == 'text-img1'
+        assert all(r['processing_time'] >= 0 for r in results)
+        assert PDFService.page_timings(results)[0].keys() == {'page', 'processing_time'}
+
+    def test_pages_pulled_only_as_workers_free_up(self):
+        from app.services.pdf_service import PDFService
+
+        lock = threading.Lock()
+        state = {'pulled': 0, 'done': 0, 'max_ahead': 0}
+
+        def pages():
+            for num in range(1, 11):
+                with lock:
+                    state['pulled'] += 1
+                    state['max_ahead'] = max(state['max_ahead'], state['pulled'] - state['done'])
+                yield num, None
+
+        def page_fn(page_num, image):
+            time.sleep(0.01)
+            with lock:
+                state['done'] += 1
+            return ''
+
+        PDFService.ocr_pages(pages(), page_fn, max_workers=2)
+
+        assert state['max_ahead'] <= 3
+
+    def test_page_error_propagates(self):
+        from app.services.pdf_service import PDFService
+
+        def page_fn(page_num, image):
+            if page_num == 2:
+                raise ValueError('page failed')
+            return 'ok'
+
+        with pytest.raises(ValueError):
+            PDFService.ocr_pages([(1, None), (2, None), (3, None)], page_fn, max_workers=2)
+
+    def test_page_budget_caps_workers(self):
+        from app.services.pdf_service import PDFService
+
+        lock = threading.Lock()
+        state = {'running': 0, 'max_running': 0}
+
+        def page_fn(page_num, image):
+            with lock:
+                state['running'] += 1
+                state['max_running'] = max(state['max_running'], state['running'])
+            time.sleep(0.02)
+            with lock:
+                state['running'] -= 1
+            return ''
+
+        with PDFService.page_budget(1):
+            PDFService.ocr_pages([(num, None) for num in range(1, 5)], page_fn, max_workers=4)
+
+        assert state['max_running'] == 1
+
+
+class TestMergePageTexts:
+    """Test suite for PDFService.merge_page_texts"""
+
+    def test_multi_page_separators_and_empty_pages(self):
+        from app.services.pdf_service import PDFService
+
+        text, blocks = PDFService.merge_page_texts([(1, 'first'), (2, ''), (3, 'third')], 3)
+
+        assert text == '\n--- Page 1 ---\nfirst\n\n\n--- Page 3 ---\nthird'
+        assert blocks == [{'text': 'first', 'page': 1}, {'text': 'third', 'page': 3}]
+
+    def test_single_page_without_separator(self):
+        from app.services.pdf_service import PDFService
+
+        text, blocks = PDFService.merge_page_texts([(1, 'only')], 1)
+
+        assert text == 'only'
+        assert blocks == [{'text': 'only', 'page': 1}]
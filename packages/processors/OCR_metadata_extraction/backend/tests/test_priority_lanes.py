@@ -0,0 +1,263 @@
+"""
+Unit Tests for priority lanes and fair dispatch of NSQ file tasks
+"""
+
+import pytest
+import sys
+import os
+from unittest.mock import Mock, patch
+
+import gevent
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+
+@pytest.fixture
+def folder(tmp_path):
+    """Folder with five images"""
+    for idx in range(5):
+        (tmp_path / f'page_{idx}.jpg').write_bytes(b'x')
+    return str(tmp_path)
+
+
+def _tasks(job_id, count, priority='normal'):
+    return [{'job_id': job_id, 'file_index': idx, 'priority': priority} for idx in range(count)]
+
+
+class TestLaneTopics:
+    """Test suite for NSQService lane helpers"""
+
+    def test_default_lane_keeps_original_topic(self):
+        from app.services.nsq_service import NSQService
+
+        assert NSQService.task_topic('normal') == 'bulk_ocr_file_tasks'
+        assert NSQService.task_topic('high') == 'bulk_ocr_file_tasks_high'
+        assert NSQService.task_topic(None) == 'bulk_ocr_file_tasks'
+
+    def test_unknown_priority_uses_default_lane(self):
+        from app.services.nsq_service import NSQService
+
+        assert NSQService.lane_for('urgent') == 'normal'
+        assert NSQService.lane_for('low') == 'low'
+
+    def test_default_priority_must_be_a_lane(self):
+        from app import _validate_priority_lanes
+        from app.config import Config
+
+        _validate_priority_lanes(Config)
+        with patch.object(Config, 'NSQ_DEFAULT_PRIORITY', 'urgent'):
+            with pytest.raises(ValueError, match='urgent'):
+                _validate_priority_lanes(Config)
+
+    def test_fair_dispatch_disabled_by_default(self):
+        from app.config import Config
+
+        if 'NSQ_FAIR_DISPATCH' in os.environ:
+            pytest.skip('NSQ_FAIR_DISPATCH set in the environment')
+        # Requires the task-dispatcher service, which is opted into per deployment
+        assert not Config.NSQ_FAIR_DISPATCH
+
+    def test_lanes_not_validated_without_nsq(self):
+        from app import create_app
+        from app.config import Config
+
+        with patch.object(Config, 'USE_NSQ', False), \
+                patch.object(Config, 'NSQ_DEFAULT_PRIORITY', 'urgent'), \
+                patch('app.Flask', side_effect=RuntimeError('app created')):
+            with pytest.raises(RuntimeError, match='app created'):
+                create_app(Config)
+
+        with patch.object(Config, 'USE_NSQ', True), \
+                patch.object(Config, 'NSQ_DEFAULT_PRIORITY', 'urgent'):
+            with pytest.raises(ValueError, match='urgent'):
+                create_app(Config)
+
+    def test_chunk_published_to_lane_topic(self):
+        from app.services.nsq_service import NSQService
+
+        service = NSQService()
+        producer = Mock()
+        service._producer = producer
+
+        service.publish_file_tasks(_tasks('job-1', 2, priority='high'))
+
+        assert producer.multipublish.call_args.args[0] == 'bulk_ocr_file_tasks_high'
+
+
+class TestFairDispatchBacklog:
+    """Test suite for NSQJobCoordinator holding back tasks beyond the job window"""
+
+    def test_chunks_beyond_window_backlogged(self, mongo, folder):
+        from app.config import Config
+        from app.services.nsq_job_coordinator import NSQJobCoordinator
+        from app.services.nsq_service import NSQService
+
+        mongo.db.bulk_jobs.insert_one({'job_id': 'job-1', 'status': 'processing'})
+        coordinator = NSQJobCoordinator.__new__(NSQJobCoordinator)
+        coordinator.nsq_service = Mock()
+        coordinator.nsq_service.build_file_task.side_effect = NSQService.build_file_task
+
+        with patch.object(Config, 'NSQ_PUBLISH_CHUNK_SIZE', 2), \
+                patch.object(Config, 'NSQ_FAIR_DISPATCH', True), \
+                patch.object(Config, 'NSQ_JOB_DISPATCH_WINDOW', 2):
+            info = coordinator.start_job(mongo, 'job-1', folder, 'tesseract', ['en'], False, priority='low')
+
+        chunks = [call.args[0] for call in coordinator.nsq_service.publish_file_tasks.call_args_list]
+        assert [len(chunk) for chunk in chunks] == [2]
+        assert chunks[0][0]['priority'] == 'low'
+
+        backlog = list(mongo.db.bulk_task_backlog.find().sort('seq', 1))
+        assert [entry['seq'] for entry in backlog] == [2, 4]
+        assert [task['file_index'] for entry in backlog for task in entry['tasks']] == [2, 3, 4]
+
+        assert info['total_files'] == 5
+        job = mongo.db.bulk_jobs.find_one({'job_id': 'job-1'})
+        assert job['published_count'] == 2
+        assert job['total_files'] == 5
+
+    def test_no_backlog_without_fair_dispatch(self, mongo, folder):
+        from app.config import Config
+        from app.services.nsq_job_coordinator import NSQJobCoordinator
+        from app.services.nsq_service import NSQService
+
+        mongo.db.bulk_jobs.insert_one({'job_id': 'job-1', 'status': 'processing'})
+        coordinator = NSQJobCoordinator.__new__(NSQJobCoordinator)
+        coordinator.nsq_service = Mock()
+        coordinator.nsq_service.build_file_task.side_effect = NSQService.build_file_task
+
+        with patch.object(Config, 'NSQ_PUBLISH_CHUNK_SIZE', 2), \
+                patch.object(Config, 'NSQ_FAIR_DISPATCH', False), \
+                patch.object(Config, 'NSQ_JOB_DISPATCH_WINDOW', 2):
+            coordinator.start_job(mongo, 'job-1', folder, 'tesseract', ['en'], False)
+
+        assert coordinator.nsq_service.publish_file_tasks.call_count == 3
+        assert mongo.db.bulk_task_backlog.count_documents({}) == 0
+
+
+class TestTaskDispatcher:
+    """Test suite for TaskDispatcher.dispatch_once"""
+
+    def _dispatcher(self, mongo, window):
+        from app.workers.task_dispatcher import TaskDispatcher
+
+        return TaskDispatcher(mongo=mongo, nsq_service=Mock(), window=window)
+
+    def test_jobs_served_in_turn_within_window(self, mongo):
+        from app.models.bulk_task_backlog import BulkTaskBacklog
+
+        for job_id in ('backfill', 'small'):
+            mongo.db.bulk_jobs.insert_one({'job_id': job_id, 'status': 'processing', 'published_count': 0, 'consumed_count': 0})
+        for seq in range(3):
+            BulkTaskBacklog.push(mongo, 'backfill', 'normal', seq * 2, _tasks('backfill', 2))
+        BulkTaskBacklog.push(mongo, 'small', 'normal', 0, _tasks('small', 2))
+
+        dispatcher = self._dispatcher(mongo, window=4)
+        assert dispatcher.dispatch_once() == 6
+
+        published = [call.args[0][0]['job_id'] for call in dispatcher.nsq_service.publish_file_tasks.call_args_list]
+        assert published == ['backfill', 'small', 'backfill']
+        assert mongo.db.bulk_jobs.find_one({'job_id': 'backfill'})['published_count'] == 4
+        assert mongo.db.bulk_task_backlog.count_documents({'job_id': 'backfill'}) == 1
+
+        # Nothing more until the backfill drains
+        assert dispatcher.dispatch_once() == 0
+        mongo.db.bulk_jobs.update_one({'job_id': 'backfill'}, {'$set': {'consumed_count': 2}})
+        assert dispatcher.dispatch_once() == 2
+
+    def test_higher_lane_released_first(self, mongo):
+        from app.models.bulk_task_backlog import BulkTaskBacklog
+
+        for job_id in ('low-job', 'high-job'):
+            mongo.db.bulk_jobs.insert_one({'job_id': job_id, 'status': 'processing', 'published_count': 0, 'consumed_count': 0})
+        BulkTaskBacklog.push(mongo, 'low-job', 'low', 0, _tasks('low-job', 1, 'low'))
+        BulkTaskBacklog.push(mongo, 'high-job', 'high', 0, _tasks('high-job', 1, 'high'))
+
+        dispatcher = self._dispatcher(mongo, window=10)
+        dispatcher.dispatch_once()
+
+        published = [call.args[0][0]['job_id'] for call in dispatcher.nsq_service.publish_file_tasks.call_args_list]
+        assert published == ['high-job', 'low-job']
+
+    def test_backlog_of_cancelled_job_dropped_and_paused_held(self, mongo):
+        from app.models.bulk_task_backlog import BulkTaskBacklog
+
+        mongo.db.bulk_jobs.insert_one({'job_id': 'cancelled', 'status': 'cancelled', 'published_count': 2, 'consumed_count': 0})
+        mongo.db.bulk_jobs.insert_one({'job_id': 'paused', 'status': 'paused', 'published_count': 2, 'consumed_count': 0})
+        BulkTaskBacklog.push(mongo, 'cancelled', 'normal', 2, _tasks('cancelled', 2))
+        BulkTaskBacklog.push(mongo, 'paused', 'normal', 2, _tasks('paused', 2))
+
+        dispatcher = self._dispatcher(mongo, window=10)
+        assert dispatcher.dispatch_once() == 0
+
+        assert mongo.db.bulk_task_backlog.count_documents({'job_id': 'cancelled'}) == 0
+        assert mongo.db.bulk_task_backlog.count_documents({'job_id': 'paused'}) == 1
+
+    def test_chunk_restored_when_publish_fails(self, mongo):
+        from app.models.bulk_task_backlog import BulkTaskBacklog
+
+        mongo.db.bulk_jobs.insert_one({'job_id': 'job-1', 'status': 'processing', 'published_count': 0, 'consumed_count': 0})
+        BulkTaskBacklog.push(mongo, 'job-1', 'normal', 0, _tasks('job-1', 2))
+
+        dispatcher = self._dispatcher(mongo, window=10)
+        dispatcher.nsq_service.publish_file_tasks.side_effect = ConnectionError('nsqd down')
+
+        with pytest.raises(ConnectionError):
+            dispatcher.dispatch_once()
+
+        assert mongo.db.bulk_task_backlog.count_documents({'job_id': 'job-1'}) == 1
+        assert mongo.db.bulk_jobs.find_one({'job_id': 'job-1'})['published_count'] == 0
+
+
+class TestLaneScheduler:
+    """Test suite for weighted admission of tasks to worker slots"""
+
+    def _run(self, scheduler, tasks):
+        """Queue (lane, job_id) tasks behind a held slot and return their start order"""
+        order = []
+        gate = gevent.event.Event()
+
+        def task(lane, job_id):
+            with scheduler.slot(lane, job_id):
+                order.append((lane, job_id))
+
+        def blocker():
+            with scheduler.slot(next(iter(scheduler.weights))):
+                gate.wait()
+
+        holder = gevent.spawn(blocker)
+        gevent.sleep(0)
+        greenlets = [gevent.spawn(task, lane, job_id) for lane, job_id in tasks]
+        gevent.sleep(0)
+        assert scheduler.waiting() == len(tasks)
+
+        gate.set()
+        gevent.joinall([holder] + greenlets, timeout=5)
+        return order
+
+    def test_lanes_admitted_by_weight(self):
+        from app.workers.lane_scheduler import LaneScheduler
+
+        scheduler = LaneScheduler({'high': 3, 'low': 1}, slots=1)
+        order = self._run(scheduler, [('low', 'a')] * 4 + [('high', 'b')] * 4)
+
+        assert [lane for lane, _ in order] == ['high', 'high', 'low', 'high', 'high', 'low', 'low', 'low']
+        assert scheduler.active == 0
+        assert scheduler.stats()['low']['admitted'] == 4
+
+    def test_jobs_of_a_lane_take_turns(self):
+        from app.workers.lane_scheduler import LaneScheduler
+
+        scheduler = LaneScheduler({'normal': 1}, slots=1)
+        order = self._run(scheduler, [('normal', 'backfill')] * 3 + [('normal', 'small')] * 2)
+
+        assert [job_id for _, job_id in order] == ['backfill', 'small', 'backfill', 'small', 'backfill']
+
+    def test_free_slots_admit_immediately(self):
+        from app.workers.lane_scheduler import LaneScheduler
+
+        scheduler = LaneScheduler({'normal': 1}, slots=2)
+        with scheduler.slot('normal', 'a'):
+            with scheduler.slot('normal', 'b'):
+                assert scheduler.active == 2
+        assert scheduler.active == 0
+        assert scheduler.waiting() == 0
@@ -0,0 +1,78 @@
+"""
+Unit Tests for the lazy OCR provider registry
+Tests cover on-demand loading, availability TTL caching and load timings
+"""
+
+import pytest
+import sys
+import os
+from unittest.mock import Mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+
+@pytest.fixture
+def registry(monkeypatch):
+    """Registry with a single (disabled, network-free) Ollama provider"""
+    from app.services.ocr_providers.registry import ProviderRegistry
+
+    monkeypatch.setenv('OLLAMA_ENABLED', 'false')
+    return ProviderRegistry(
+        {'ollama': ('ollama_provider', 'OllamaProvider'), 'broken': ('ollama_provider', 'MissingProvider')},
+        availability_ttl=60
+    )
+
+
+class TestProviderRegistry:
+    """Test suite for ProviderRegistry"""
+
+    def test_provider_constructed_on_first_lookup(self, registry):
+        assert 'ollama' in registry
+        assert not registry.is_loaded('ollama')
+        assert registry.timings() == {}
+
+        provider = registry['ollama']
+
+        assert registry.is_loaded('ollama')
+        assert registry['ollama'] is provider
+        assert set(registry.timings()['ollama']) == {'import_ms', 'init_ms'}
+
+    def test_availability_cached_within_ttl(self, registry):
+        provider = registry['ollama']
+        provider.is_available = Mock(return_value=True)
+
+        assert registry.is_available('ollama') is True
+        assert registry.is_available('ollama') is True
+        assert provider.is_available.call_count == 1
+
+    def test_failed_load_reported_as_unavailable(self, registry):
+        assert registry.is_available('broken') is False
+        assert 'error' in registry.timings()['broken']
+        with pytest.raises(KeyError):
+            registry['broken']
+
+    def test_unknown_provider(self, registry):
+        assert 'nope' not in registry
+        assert registry.is_available('nope') is False
+
+
+class TestOCRServiceRegistry:
+    """Test suite for OCRService on top of the registry"""
+
+    def test_service_construction_loads_nothing(self):
+        from app.services.ocr_service import OCRService
+
+        service = OCRService()
+
+        assert not any(service.providers.is_loaded(name) for name in ('easyocr', 'chrome_lens', 'google_vision'))
+
+    def test_unavailable_explicit_provider_raises(self, registry):
+        from app.services.ocr_service import OCRService
+
+        service = OCRService.__new__(OCRService)
+        service.providers = registry
+        service.default_provider = 'ollama'
+
+        with pytest.raises(ValueError):
+            service.get_provider('ollama')
+        assert [p['name'] for p in service.get_available_providers()] == ['ollama', 'broken']
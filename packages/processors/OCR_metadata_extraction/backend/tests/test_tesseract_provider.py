@@ -0,0 +1,106 @@
+"""
+Unit Tests for the single-pass Tesseract provider
+Tests cover TSV parsing, the single tesseract invocation per page and in-memory images
+"""
+
+import pytest
+import sys
+import os
+import subprocess
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+pytest.importorskip('pytesseract')
+
+HEADER = 'level\tpage_num\tblock_num\tpar_num\tline_num\tword_num\tleft\ttop\twidth\theight\tconf\ttext'
+
+TSV = '\n'.join([
+    HEADER,
+    '1\t1\t0\t0\t0\t0\t0\t0\t100\t100\t-1\t',
+    '2\t1\t1\t0\t0\t0\t0\t0\t100\t40\t-1\t',
+    '5\t1\t1\t1\t1\t1\t0\t0\t10\t10\t90\tHello',
+    '5\t1\t1\t1\t1\t2\t12\t0\t10\t10\t80\tworld',
+    '5\t1\t1\t1\t2\t1\t0\t12\t10\t10\t70\tsecond',
+    '5\t1\t2\t1\t1\t1\t0\t50\t10\t10\t60\tNext',
+    '5\t1\t2\t1\t1\t2\t12\t50\t10\t10\t-1\t ',
+])
+
+
+def _provider():
+    from app.services.ocr_providers.tesseract_provider import TesseractProvider
+
+    provider = TesseractProvider.__new__(TesseractProvider)
+    provider._available = True
+    return provider
+
+
+class TestParseTsv:
+    """Test suite for TesseractProvider._parse_tsv"""
+
+    def test_text_words_and_blocks_rebuilt(self):
+        from app.services.ocr_providers.tesseract_provider import TesseractProvider
+
+        page = TesseractProvider._parse_tsv(TSV)
+
+        assert page['text'] == 'Hello world\nsecond\n\nNext'
+        assert [w['text'] for w in page['words']] == ['Hello', 'world', 'second', 'Next']
+        assert page['words'][1]['bbox'] == {'x': 12, 'y': 0, 'width': 10, 'height': 10}
+        assert page['blocks'][0]['text'] == 'Hello world second'
+        assert page['blocks'][0]['confidence'] == pytest.approx(0.8)
+        assert page['blocks'][1] == {'text': 'Next', 'confidence': 0.6}
+
+
+class TestSinglePass:
+    """Test suite for the single tesseract invocation"""
+
+    def test_one_process_fed_from_stdin(self):
+        from PIL import Image
+
+        calls = []
+
+        def fake_run(command, input, capture_output, timeout, env):
+            calls.append(command)
+            assert input.startswith(b'\x89PNG')
+            assert env['OMP_THREAD_LIMIT'] == '1'
+            return subprocess.CompletedProcess(command, 0, TSV.encode('utf-8'), b'')
+
+        with patch('app.services.ocr_providers.tesseract_provider.subprocess.run', fake_run):
+            result = _provider().process_image(Image.new('RGB', (20, 20), 'white'), languages=['en', 'hi'])
+
+        assert len(calls) == 1
+        assert calls[0][1:5] == ['stdin', 'stdout', '-l', 'eng+hin']
+        assert calls[0][-1] == 'tsv'
+        assert result['text'] == 'Hello world\nsecond\n\nNext'
+        assert len(result['words']) == 4
+        assert result['file_info']['is_pdf'] is False
+
+    def test_tesseract_failure_raises(self):
+        from PIL import Image
+
+        failed = subprocess.CompletedProcess([], 1, b'', b'Failed loading language')
+
+        with patch('app.services.ocr_providers.tesseract_provider.subprocess.run', return_value=failed):
+            with pytest.raises(Exception, match='Failed loading language'):
+                _provider().process_image(Image.new('L', (20, 20)))
+
+
+class TestPageWorkers:
+    """Test suite for the per-PDF tesseract process count"""
+
+    def test_cores_shared_between_concurrent_tasks(self):
+        from app.config import Config
+        from app.services.ocr_providers.tesseract_provider import TesseractProvider
+
+        with patch.object(Config, 'TESSERACT_PAGE_WORKERS', 0), \
+                patch.object(Config, 'WORKER_MAX_CONCURRENCY', 5), \
+                patch('app.services.ocr_providers.tesseract_provider.os.cpu_count', return_value=16):
+            assert TesseractProvider._page_workers() == 3
+
+        with patch.object(Config, 'TESSERACT_PAGE_WORKERS', 0), \
+                patch.object(Config, 'WORKER_MAX_CONCURRENCY', 8), \
+                patch('app.services.ocr_providers.tesseract_provider.os.cpu_count', return_value=4):
+            assert TesseractProvider._page_workers() == 1
+
+        with patch.object(Config, 'TESSERACT_PAGE_WORKERS', 6):
+            assert TesseractProvider._page_workers() == 6
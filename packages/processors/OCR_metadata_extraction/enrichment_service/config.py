@@ -20,6 +20,11 @@ class EnrichmentConfig:
     MCP_AGENT_TOKEN = os.getenv("MCP_AGENT_TOKEN", "")
     MCP_JWT_SECRET = os.getenv("MCP_JWT_SECRET", "")
 
+    # MCP Connection Pool (connections per client, outstanding requests per client and per agent)
+    MCP_POOL_SIZE = int(os.getenv("MCP_POOL_SIZE", "4"))
+    MCP_MAX_IN_FLIGHT = int(os.getenv("MCP_MAX_IN_FLIGHT", "64"))
+    MCP_MAX_IN_FLIGHT_PER_AGENT = int(os.getenv("MCP_MAX_IN_FLIGHT_PER_AGENT", "8"))
+
     # MongoDB Configuration
     MONGO_URI = os.getenv("MONGO_URI", "mongodb://localhost:27017/gvpocr")
     MONGO_USERNAME = os.getenv("MONGO_USERNAME", "")
@@ -33,6 +33,10 @@ TOOL_TIMEOUTS: Dict[str, int] = {
     "_default": 120
 }
 
+# Deadline of a tool in the tool graph (all attempts together), as a multiple
+# of its per-attempt timeout above
+TOOL_DEADLINE_MULTIPLIER: float = 2.0
+
 
 def get_tool_timeout(tool_name: str, default_seconds: int = 120) -> int:
     """
@@ -48,12 +52,28 @@ def get_tool_timeout(tool_name: str, default_seconds: int = 120) -> int:
     return TOOL_TIMEOUTS.get(tool_name, TOOL_TIMEOUTS.get("_default", default_seconds))
 
 
+def get_tool_deadline(tool_name: str) -> float:
+    """
+    Get the time a tool may take in the orchestrator's tool graph, retries included
+
+    When it passes, the tool resolves to its fallback result so that the
+    tools depending on it are not held up.
+
+    Args:
+        tool_name: Name of the tool
+
+    Returns:
+        Deadline in seconds
+    """
+    return get_tool_timeout(tool_name) * TOOL_DEADLINE_MULTIPLIER
+
+
 def get_phase_timeout(phase: int, tool_name: str) -> int:
     """
     Get timeout for a tool in a specific phase
 
-    Phase 1 (extraction): Fast tools run in parallel
-    Phase 2 (analysis): Slower tools run sequentially
+    Phase 1 (extraction): Fast tools, no dependencies
+    Phase 2 (analysis): Start once the entities they need are extracted
     Phase 3 (context): Slowest tools with Claude Opus
 
     Args:
@@ -67,7 +87,7 @@ def get_phase_timeout(phase: int, tool_name: str) -> int:
 
     # Apply phase multipliers if needed
     # Phase 1: As-is (parallel execution)
-    # Phase 2: As-is (sequential but faster)
+    # Phase 2: As-is (parallel once entities are available)
     # Phase 3: As-is (uses Opus, can be slower)
 
     return tool_timeout
@@ -9,7 +9,7 @@ import json
 import logging
 import os
 from datetime import datetime
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Iterable, Optional
 from pymongo import MongoClient
 from pymongo.errors import ConnectionFailure
 import gnsq
@@ -17,6 +17,23 @@ import time
 
 logger = logging.getLogger(__name__)
 
+# Fields of a bulk_job_results document needed to build an enrichment task
+OCR_RESULT_PROJECTION = {
+    '_id': 0,
+    'text': 1,
+    'full_text': 1,
+    'confidence': 1,
+    'detected_language': 1,
+    'blocks_count': 1,
+    'words_count': 1,
+    'provider': 1,
+    'file': 1,
+    'file_path': 1,
+    'file_index': 1,
+    'status': 1,
+    'ocr_job_id': 1
+}
+
 
 class EnrichmentCoordinator:
     """
@@ -117,7 +134,7 @@ class EnrichmentCoordinator:
 
         try:
             # Fetch OCR job details
-            ocr_job = self.db.bulk_jobs.find_one({'job_id': ocr_job_id})
+            ocr_job = self.db.bulk_jobs.find_one({'job_id': ocr_job_id}, {'status': 1})
             if not ocr_job:
                 logger.error(f"OCR job {ocr_job_id} not found")
                 return None
@@ -127,14 +144,14 @@ class EnrichmentCoordinator:
                 logger.warning(f"OCR job {ocr_job_id} not completed, skipping enrichment")
                 return None
 
-            # Get list of processed documents from job checkpoint
-            checkpoint = ocr_job.get('checkpoint', {})
-            ocr_results = checkpoint.get('results', [])
-            if not ocr_results:
-                logger.warning(f"No OCR results found in checkpoint for job {ocr_job_id}")
+            # Per-file OCR results are stored in the bulk_job_results collection
+            results_query = {'job_id': ocr_job_id, 'record_type': 'result'}
+            total_documents = self.db.bulk_job_results.count_documents(results_query)
+            if not total_documents:
+                logger.warning(f"No OCR results found in bulk_job_results for job {ocr_job_id}")
                 return None
 
-            logger.info(f"Creating enrichment job for {len(ocr_results)} documents")
+            logger.info(f"Creating enrichment job for {total_documents} documents")
 
             # Create enrichment job record
             enrichment_job_id = f"enrich_{ocr_job_id}_{int(time.time())}"
@@ -145,7 +162,7 @@ class EnrichmentCoordinator:
                 'collection_metadata': collection_metadata or {},
                 'status': 'created',
                 'created_at': datetime.utcnow(),
-                'total_documents': len(ocr_results),
+                'total_documents': total_documents,
                 'processed_count': 0,
                 'success_count': 0,
                 'error_count': 0,
@@ -162,6 +179,11 @@ class EnrichmentCoordinator:
             self.db.enrichment_jobs.insert_one(enrichment_job)
             logger.info(f"Created enrichment job: {enrichment_job_id}")
 
+            # Stream results with a cursor instead of loading them all at once
+            ocr_results = self.db.bulk_job_results.find(
+                results_query, OCR_RESULT_PROJECTION
+            ).sort('file_index', 1).batch_size(self.config['BATCH_SIZE'])
+
             # Publish enrichment tasks to NSQ
             published_count = self._publish_tasks(
                 enrichment_job_id,
@@ -176,7 +198,7 @@ class EnrichmentCoordinator:
                 {'$set': {'status': 'published', 'started_at': datetime.utcnow()}}
             )
 
-            logger.info(f"Published {published_count}/{len(ocr_results)} enrichment tasks")
+            logger.info(f"Published {published_count}/{total_documents} enrichment tasks")
             return enrichment_job_id
 
         except Exception as e:
@@ -186,7 +208,7 @@ class EnrichmentCoordinator:
     def _publish_tasks(
         self,
         enrichment_job_id: str,
-        ocr_results: list,
+        ocr_results: Iterable[Dict[str, Any]],
         collection_id: str,
         collection_metadata: Optional[Dict[str, Any]]
     ) -> int:
@@ -195,7 +217,7 @@ class EnrichmentCoordinator:
 
         Args:
             enrichment_job_id: Parent enrichment job ID
-            ocr_results: List of OCR result documents
+            ocr_results: Iterable (e.g. MongoDB cursor) of OCR result documents
             collection_id: Collection ID
             collection_metadata: Collection metadata
 
@@ -6,14 +6,14 @@ Handles connection pooling, retries, and tool invocation
 import asyncio
 import json
 import logging
-import uuid
-from typing import Dict, Any, Optional, Callable, List
-from datetime import datetime, timedelta
-from threading import Lock
+import time
+from collections import deque
+from typing import Dict, Any, Optional, List
 import websockets
 from websockets.asyncio.client import ClientConnection
 
 from enrichment_service.config import config
+from enrichment_service.utils.metrics import MetricsRecorder
 
 
 logger = logging.getLogger(__name__)
@@ -29,39 +29,192 @@ class MCPInvocationError(Exception):
     pass
 
 
+class MCPConnection:
+    """
+    One WebSocket connection of the pool
+
+    Requests are multiplexed on the connection and matched to their responses
+    by JSON-RPC id.
+    """
+
+    def __init__(self, index: int, server_url: str, token: Optional[str] = None):
+        self.index = index
+        self.server_url = server_url
+        self.token = token
+        self.connection: Optional[ClientConnection] = None
+        self.pending_requests: Dict[str, asyncio.Future] = {}
+        self.listener: Optional[asyncio.Task] = None
+        self.bytes_sent = 0
+        self.bytes_received = 0
+
+    @property
+    def is_open(self) -> bool:
+        return self.connection is not None
+
+    @property
+    def outstanding(self) -> int:
+        return len(self.pending_requests)
+
+    async def open(self) -> None:
+        """Open the WebSocket and start listening for responses"""
+        headers = {}
+        if self.token:
+            headers["Authorization"] = f"Bearer {self.token}"
+
+        self.connection = await websockets.connect(self.server_url, additional_headers=headers)
+        self.listener = asyncio.create_task(self._listen())
+
+    async def close(self) -> None:
+        """Close the WebSocket and fail its pending requests"""
+        connection, self.connection = self.connection, None
+        if connection is not None:
+            try:
+                await connection.close()
+            except Exception as e:
+                logger.warning(f"Error closing MCP connection {self.index}: {e}")
+        if self.listener is not None and self.listener is not asyncio.current_task():
+            self.listener.cancel()
+        self.listener = None
+        self._fail_pending(MCPConnectionError("Connection closed"))
+
+    async def request(self, request_id: str, payload: str, timeout: float) -> Any:
+        """
+        Send a request and wait for its response
+
+        Args:
+            request_id: JSON-RPC id of the request
+            payload: Serialized request
+            timeout: Seconds to wait for the response
+
+        Returns:
+            The "result" of the response
+        """
+        response_future = asyncio.get_running_loop().create_future()
+        self.pending_requests[request_id] = response_future
+        try:
+            await self.connection.send(payload)
+            self.bytes_sent += len(payload)
+            return await asyncio.wait_for(response_future, timeout=timeout)
+        finally:
+            self.pending_requests.pop(request_id, None)
+
+    def _fail_pending(self, error: Exception) -> None:
+        for future in self.pending_requests.values():
+            if not future.done():
+                future.set_exception(error)
+        self.pending_requests.clear()
+
+    async def _listen(self) -> None:
+        """Listen for messages from MCP server"""
+        connection = self.connection
+        try:
+            async for message in connection:
+                self.bytes_received += len(message)
+
+                try:
+                    data = json.loads(message)
+
+                    # Handle response (result or error)
+                    if "id" in data and ("result" in data or "error" in data):
+                        future = self.pending_requests.get(data["id"])
+                        if future is None:
+                            logger.warning(f"Received response for unknown request: {data['id']}")
+                        elif future.done():
+                            # Prevent setting result on already-done future (timeout case)
+                            logger.debug(f"Response for already-completed request: {data['id']}")
+                        elif "error" in data:
+                            error = data["error"]
+                            future.set_exception(
+                                MCPInvocationError(f"MCP error {error.get('code')}: {error.get('message')}")
+                            )
+                        else:
+                            future.set_result(data.get("result"))
+
+                    # Handle notification
+                    elif "method" in data and "id" not in data:
+                        logger.debug(f"Received notification: {data.get('method')}")
+
+                except json.JSONDecodeError as e:
+                    logger.error(f"Failed to parse message (malformed JSON): {e}")
+                    # Log the message for debugging but continue listening
+                    logger.debug(f"Malformed message (first 100 chars): {message[:100]}")
+                    continue
+
+                except Exception as e:
+                    logger.error(f"Error processing message: {e}", exc_info=True)
+                    # Continue processing on individual message errors
+                    continue
+
+            logger.warning(f"MCP connection {self.index} closed by server")
+
+        except asyncio.CancelledError:
+            logger.debug(f"MCP connection {self.index} stopped listening")
+            raise
+        except Exception as e:
+            logger.error(f"MCP connection {self.index} lost: {e}")
+        finally:
+            # The pool reopens the connection on next use
+            if self.connection is connection:
+                self.connection = None
+            self._fail_pending(MCPConnectionError("Connection lost"))
+
+
 class MCPClient:
     """
     WebSocket client for MCP server communication
 
     Features:
-    - Automatic reconnection with exponential backoff
-    - Connection pooling for multiple concurrent requests
+    - Pool of connections; each request goes to the one with the fewest outstanding requests
+    - Per-agent and total limits on outstanding requests; callers wait for a slot (backpressure)
     - Request/response correlation via IDs
     - Timeout handling
-    - Error recovery with retries
+    - Automatic reconnection with exponential backoff
+    - Pool statistics (queue depth, RTT percentiles, bytes) exported through utils/metrics.py
     """
 
-    def __init__(self, server_url: str = None, token: str = None):
+    # Round trip times kept for percentiles
+    RTT_WINDOW = 1024
+
+    def __init__(
+        self,
+        server_url: str = None,
+        token: str = None,
+        pool_size: Optional[int] = None,
+        max_in_flight: Optional[int] = None,
+        max_in_flight_per_agent: Optional[int] = None
+    ):
         """
         Initialize MCP client
 
         Args:
             server_url: WebSocket URL of MCP server
             token: Optional JWT token for authentication
+            pool_size: Number of connections (default: config.MCP_POOL_SIZE)
+            max_in_flight: Outstanding requests across all agents (default: config.MCP_MAX_IN_FLIGHT)
+            max_in_flight_per_agent: Outstanding requests per agent (default: config.MCP_MAX_IN_FLIGHT_PER_AGENT)
         """
         self.server_url = server_url or config.MCP_SERVER_URL
         self.token = token or config.MCP_AGENT_TOKEN
         self.timeout = config.AGENT_TIMEOUT_SECONDS
 
-        # Connection management
-        self.connection: Optional[ClientConnection] = None
-        self.is_connected = False
-        self.pending_requests: Dict[str, asyncio.Future] = {}
-        self.pending_requests_lock = Lock()  # Thread-safe access to pending_requests
-
-        # Request ID tracking to prevent collisions
+        # Connection pool
+        self.pool_size = max(1, pool_size or config.MCP_POOL_SIZE)
+        self.connections: List[MCPConnection] = [
+            MCPConnection(index, self.server_url, self.token) for index in range(self.pool_size)
+        ]
+        self._connect_lock: Optional[asyncio.Lock] = None
+        self._reconnect_task: Optional[asyncio.Task] = None
+
+        # Backpressure
+        self.max_in_flight = max(1, max_in_flight or config.MCP_MAX_IN_FLIGHT)
+        self.max_in_flight_per_agent = max(1, max_in_flight_per_agent or config.MCP_MAX_IN_FLIGHT_PER_AGENT)
+        self._total_slots = asyncio.Semaphore(self.max_in_flight)
+        self._agent_slots: Dict[str, asyncio.Semaphore] = {}
+        self.waiting: Dict[str, int] = {}
+        self.in_flight: Dict[str, int] = {}
+
+        # Request ID tracking (requests are only created on the event loop)
         self.request_id_counter = 0
-        self.request_id_lock = Lock()
 
         # Reconnection settings
         self.max_retries = 5
@@ -69,50 +222,65 @@ class MCPClient:
         self.retry_attempt = 0
 
         # Metrics
+        self.rtt_samples: deque = deque(maxlen=self.RTT_WINDOW)
         self.stats = {
             "invocations_total": 0,
             "invocations_success": 0,
             "invocations_failed": 0,
-            "reconnections": 0,
-            "bytes_sent": 0,
-            "bytes_received": 0,
-            "collision_detected": 0
+            "reconnections": 0
         }
 
+    @property
+    def is_connected(self) -> bool:
+        return any(connection.is_open for connection in self.connections)
+
     def _generate_request_id(self) -> str:
         """
-        Generate unique request ID with collision detection
+        Generate unique request ID
 
         Returns:
             Unique request ID
         """
-        with self.request_id_lock:
-            # Use monotonic counter with UUID to ensure uniqueness
-            self.request_id_counter += 1
-            unique_id = f"{self.request_id_counter}-{uuid.uuid4().hex[:8]}"
-            return unique_id
+        self.request_id_counter += 1
+        return str(self.request_id_counter)
 
     async def connect(self) -> None:
-        """Connect to MCP server with automatic retry"""
-        if self.is_connected:
-            return
+        """
+        Open every pool connection that is not open, with automatic retry
 
+        Raises:
+            MCPConnectionError: If no connection could be opened
+        """
+        if self._connect_lock is None:
+            self._connect_lock = asyncio.Lock()
+
+        async with self._connect_lock:
+            last_error = None
+            for connection in self.connections:
+                if not connection.is_open:
+                    try:
+                        await self._open(connection)
+                    except MCPConnectionError as e:
+                        last_error = e
+
+            if not self.is_connected:
+                raise last_error or MCPConnectionError("No MCP connection available")
+            if last_error:
+                logger.warning(f"MCP pool running with fewer connections than configured: {last_error}")
+
+    async def _open(self, connection: MCPConnection) -> None:
+        """Open one connection with exponential backoff"""
         for attempt in range(self.max_retries):
             try:
-                headers = {}
-                if self.token:
-                    headers["Authorization"] = f"Bearer {self.token}"
-
-                logger.info(f"Connecting to MCP server: {self.server_url} (attempt {attempt + 1}/{self.max_retries})")
-
-                self.connection = await websockets.connect(self.server_url, additional_headers=headers)
-                self.is_connected = True
+                logger.info(
+                    f"Connecting to MCP server: {self.server_url} "
+                    f"(connection {connection.index + 1}/{self.pool_size}, attempt {attempt + 1}/{self.max_retries})"
+                )
+                await connection.open()
+                if self.retry_attempt:
+                    self.stats["reconnections"] += 1
                 self.retry_attempt = 0
-
-                logger.info("Connected to MCP server")
-
-                # Start message listening loop
-                asyncio.create_task(self._listen())
+                logger.info(f"Connected to MCP server (connection {connection.index + 1}/{self.pool_size})")
                 return
 
             except Exception as e:
@@ -128,21 +296,38 @@ class MCPClient:
 
     async def disconnect(self) -> None:
         """Disconnect from MCP server and clean up pending requests"""
-        if self.connection:
-            try:
-                await self.connection.close()
-            except Exception as e:
-                logger.warning(f"Error closing connection: {e}")
-            finally:
-                self.is_connected = False
-                self.connection = None
+        if self._reconnect_task is not None:
+            self._reconnect_task.cancel()
+        for connection in self.connections:
+            await connection.close()
+
+    async def _acquire_connection(self) -> MCPConnection:
+        """
+        Open connection with the fewest outstanding requests
+
+        Closed connections are reopened in the background while the open ones
+        are used; callers only wait when none is open.
+        """
+        open_connections = [connection for connection in self.connections if connection.is_open]
+        if not open_connections:
+            await self.connect()
+            open_connections = [connection for connection in self.connections if connection.is_open]
+        elif len(open_connections) < self.pool_size and (self._reconnect_task is None or self._reconnect_task.done()):
+            self._reconnect_task = asyncio.create_task(self._reconnect())
+        return min(open_connections, key=lambda connection: connection.outstanding)
+
+    async def _reconnect(self) -> None:
+        """Reopen closed pool connections"""
+        try:
+            await self.connect()
+        except MCPConnectionError as e:
+            logger.warning(f"Could not reopen MCP connections: {e}")
 
-        # Clean up any pending requests
-        with self.pending_requests_lock:
-            for request_id, future in list(self.pending_requests.items()):
-                if not future.done():
-                    future.set_exception(MCPConnectionError("Connection closed"))
-            self.pending_requests.clear()
+    def _agent_semaphore(self, agent_id: str) -> asyncio.Semaphore:
+        semaphore = self._agent_slots.get(agent_id)
+        if semaphore is None:
+            semaphore = self._agent_slots[agent_id] = asyncio.Semaphore(self.max_in_flight_per_agent)
+        return semaphore
 
     async def invoke_tool(
         self,
@@ -154,6 +339,9 @@ class MCPClient:
         """
         Invoke a tool on an agent
 
+        Waits for a free slot when the agent or the client has too many
+        outstanding requests; the timeout applies once the request is sent.
+
         Args:
             agent_id: ID of the agent
             tool_name: Name of the tool to invoke
@@ -164,15 +352,37 @@ class MCPClient:
             Tool result
 
         Raises:
-            MCPConnectionError: If not connected
+            MCPConnectionError: If the server cannot be reached
             MCPInvocationError: If invocation fails
         """
-        if not self.is_connected:
-            await self.connect()
+        timeout = timeout or self.timeout
+
+        # Backpressure: per-agent slot first so a slow agent only holds its own slots
+        self.waiting[agent_id] = self.waiting.get(agent_id, 0) + 1
+        try:
+            await self._agent_semaphore(agent_id).acquire()
+            try:
+                await self._total_slots.acquire()
+            except BaseException:
+                self._agent_semaphore(agent_id).release()
+                raise
+        finally:
+            self.waiting[agent_id] -= 1
+
+        self.in_flight[agent_id] = self.in_flight.get(agent_id, 0) + 1
+        try:
+            return await self._send(agent_id, tool_name, arguments, timeout)
+        finally:
+            self.in_flight[agent_id] -= 1
+            self._total_slots.release()
+            self._agent_semaphore(agent_id).release()
+
+    async def _send(self, agent_id: str, tool_name: str, arguments: Dict[str, Any], timeout: float) -> Dict[str, Any]:
+        """Send one request on the least busy connection and wait for its result"""
+        connection = await self._acquire_connection()
 
         self.stats["invocations_total"] += 1
         request_id = self._generate_request_id()
-        timeout = timeout or self.timeout
 
         # Build JSON-RPC 2.0 request
         request = {
@@ -185,118 +395,72 @@ class MCPClient:
             "id": request_id
         }
 
-        # Create future for response (exception-safe)
-        response_future: asyncio.Future = asyncio.Future()
-
-        # Add to pending requests with collision detection
-        with self.pending_requests_lock:
-            if request_id in self.pending_requests:
-                logger.error(f"Request ID collision detected: {request_id}")
-                self.stats["collision_detected"] += 1
-                raise MCPInvocationError(f"Request ID collision - this should not happen")
-            self.pending_requests[request_id] = response_future
-
+        started = time.monotonic()
         try:
-            # Send request
-            message = json.dumps(request)
-            await self.connection.send(message)
-            self.stats["bytes_sent"] += len(message)
-
-            logger.debug(f"Invoked tool: agent={agent_id}, tool={tool_name}, request_id={request_id}")
-
-            # Wait for response with timeout
-            result = await asyncio.wait_for(response_future, timeout=timeout)
-
+            logger.debug(
+                f"Invoked tool: agent={agent_id}, tool={tool_name}, request_id={request_id}, "
+                f"connection={connection.index}"
+            )
+            result = await connection.request(request_id, json.dumps(request), timeout)
+
+            rtt = time.monotonic() - started
+            self.rtt_samples.append(rtt)
             self.stats["invocations_success"] += 1
+            MetricsRecorder.record_agent_call(agent_id, tool_name, rtt, success=True)
             return result
 
         except asyncio.TimeoutError:
             self.stats["invocations_failed"] += 1
-            # Mark future as cancelled to prevent dangling references
-            if not response_future.done():
-                response_future.cancel()
+            MetricsRecorder.record_agent_call(agent_id, tool_name, time.monotonic() - started, success=False, error_type='timeout')
             raise MCPInvocationError(f"Tool invocation timeout after {timeout}s: {tool_name}")
 
         except Exception as e:
             self.stats["invocations_failed"] += 1
-            # Mark future as cancelled on error
-            if not response_future.done():
-                response_future.cancel()
+            MetricsRecorder.record_agent_call(agent_id, tool_name, time.monotonic() - started, success=False, error_type='error')
             raise MCPInvocationError(f"Tool invocation failed: {tool_name}: {str(e)}")
 
-        finally:
-            # Clean up pending request (thread-safe)
-            with self.pending_requests_lock:
-                self.pending_requests.pop(request_id, None)
-
-    async def _listen(self) -> None:
-        """Listen for messages from MCP server"""
-        try:
-            async for message in self.connection:
-                self.stats["bytes_received"] += len(message)
-
-                try:
-                    data = json.loads(message)
-
-                    # Handle response (result or error)
-                    if "id" in data and ("result" in data or "error" in data):
-                        request_id = data["id"]
-
-                        with self.pending_requests_lock:
-                            if request_id in self.pending_requests:
-                                future = self.pending_requests[request_id]
-
-                                # Prevent setting result on already-done future (timeout case)
-                                if not future.done():
-                                    if "error" in data:
-                                        error = data["error"]
-                                        future.set_exception(
-                                            MCPInvocationError(f"MCP error {error.get('code')}: {error.get('message')}")
-                                        )
-                                    else:
-                                        future.set_result(data.get("result"))
-                                else:
-                                    logger.debug(f"Response for already-completed request: {request_id}")
-                            else:
-                                logger.warning(f"Received response for unknown request: {request_id}")
-
-                    # Handle notification
-                    elif "method" in data and "id" not in data:
-                        logger.debug(f"Received notification: {data.get('method')}")
+    def pool_stats(self) -> Dict[str, Any]:
+        """
+        Connection pool statistics
 
-                except json.JSONDecodeError as e:
-                    logger.error(f"Failed to parse message (malformed JSON): {e}")
-                    # Log the message for debugging but continue listening
-                    logger.debug(f"Malformed message (first 100 chars): {message[:100]}")
-                    # Continue processing - don't kill connection on bad JSON
-                    continue
+        Returns:
+            Dict with per-connection outstanding requests, per-agent waiting and
+            in-flight counts, RTT percentiles (seconds) and bytes sent/received
+        """
+        samples = sorted(self.rtt_samples)
 
-                except Exception as e:
-                    logger.error(f"Error processing message: {e}", exc_info=True)
-                    # Continue processing on individual message errors
-                    continue
+        def percentile(fraction: float) -> Optional[float]:
+            if not samples:
+                return None
+            return samples[min(len(samples) - 1, int(fraction * len(samples)))]
 
-        except asyncio.CancelledError:
-            logger.info("Message listening stopped")
-        except Exception as e:
-            logger.error(f"Connection lost: {e}", exc_info=True)
-            self.is_connected = False
+        return {
+            "connections": [
+                {"index": connection.index, "open": connection.is_open, "outstanding": connection.outstanding}
+                for connection in self.connections
+            ],
+            "queue_depth": sum(self.waiting.values()),
+            "waiting": {agent_id: count for agent_id, count in self.waiting.items() if count},
+            "in_flight": {agent_id: count for agent_id, count in self.in_flight.items() if count},
+            "rtt_seconds": {"p50": percentile(0.5), "p95": percentile(0.95), "p99": percentile(0.99)},
+            "bytes_sent": sum(connection.bytes_sent for connection in self.connections),
+            "bytes_received": sum(connection.bytes_received for connection in self.connections)
+        }
 
-            # Attempt to reconnect
-            if self.retry_attempt < self.max_retries:
-                self.stats["reconnections"] += 1
-                logger.info("Attempting to reconnect...")
-                try:
-                    await self.connect()
-                except Exception as e:
-                    logger.error(f"Reconnection failed: {e}")
+    def export_metrics(self) -> Dict[str, Any]:
+        """Publish pool statistics to the Prometheus gauges and return them"""
+        stats = self.pool_stats()
+        MetricsRecorder.set_mcp_pool_stats(stats)
+        return stats
 
     async def get_status(self) -> Dict[str, Any]:
         """Get client status"""
+        pool = self.export_metrics()
         return {
             "connected": self.is_connected,
             "server_url": self.server_url,
-            "pending_requests": len(self.pending_requests),
+            "pending_requests": sum(connection["outstanding"] for connection in pool["connections"]),
+            "pool": pool,
             "stats": self.stats.copy()
         }
 
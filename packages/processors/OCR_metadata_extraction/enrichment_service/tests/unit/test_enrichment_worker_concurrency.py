@@ -0,0 +1,165 @@
+"""
+Unit tests for concurrent document processing in EnrichmentWorker
+
+Tests:
+- process_batch bounds the number of documents enriched at once
+- Each message is answered as soon as its document is done
+- Timed-out documents are requeued
+- Messages are handed from the NSQ handler to the event loop
+- MCP pool gauges are refreshed periodically
+- main() cleans up the worker on shutdown
+"""
+
+import asyncio
+import json
+import pytest
+from unittest.mock import AsyncMock, Mock, patch
+
+from enrichment_service.workers.enrichment_worker import EnrichmentWorker
+
+
+def make_worker(max_concurrent=2, task_timeout=5):
+    """EnrichmentWorker without MongoDB, MCP or NSQ connections"""
+    worker = EnrichmentWorker.__new__(EnrichmentWorker)
+    worker.max_concurrent = max_concurrent
+    worker.batch_size = 50
+    worker.task_timeout = task_timeout
+    worker.touch_interval = 0
+    worker.semaphore = asyncio.Semaphore(max_concurrent)
+    worker.coordinator = Mock()
+    worker._batches = set()
+    worker._consumer_hub = None
+    return worker
+
+
+class TestProcessBatch:
+    """Test bounded concurrent processing"""
+
+    @pytest.mark.asyncio
+    async def test_concurrency_bounded_by_semaphore(self):
+        worker = make_worker(max_concurrent=2)
+        running = 0
+        peak = 0
+
+        async def process_task(task):
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.02)
+            running -= 1
+            return task['ok']
+
+        worker.process_task = process_task
+        stats = await worker.process_batch([{'ok': True}] * 5 + [{'ok': False}])
+
+        assert peak == 2
+        assert stats == {'total': 6, 'success': 5, 'failed': 1, 'errors': 0}
+
+    @pytest.mark.asyncio
+    async def test_results_reported_as_tasks_finish(self):
+        worker = make_worker(max_concurrent=4)
+        finished = []
+
+        async def process_task(task):
+            await asyncio.sleep(task['delay'])
+            return True
+
+        worker.process_task = process_task
+        await worker.process_batch(
+            [{'delay': 0.05}, {'delay': 0.0}],
+            on_result=lambda index, success: finished.append((index, success))
+        )
+
+        assert finished == [(1, True), (0, True)]
+
+    @pytest.mark.asyncio
+    async def test_timed_out_task_fails(self):
+        worker = make_worker(task_timeout=0.05)
+        worker._record_failure = Mock()
+
+        async def process_task(task):
+            await asyncio.sleep(5)
+
+        worker.process_task = process_task
+        results = []
+        stats = await worker.process_batch(
+            [{'task_id': 't1', 'enrichment_job_id': 'job-1'}],
+            on_result=lambda index, success: results.append(success)
+        )
+
+        assert results == [False]
+        assert stats['failed'] == 1
+        worker._record_failure.assert_called_once_with('job-1', 'timeout')
+
+
+class TestMessageHandoff:
+    """Test the NSQ handler and message responses"""
+
+    @pytest.mark.asyncio
+    async def test_message_enriched_and_finished(self):
+        worker = make_worker()
+        worker.loop = asyncio.get_running_loop()
+        worker.inbox = asyncio.Queue()
+        worker._consumer_hub = Mock()
+        worker._consumer_hub.loop.run_callback_threadsafe.side_effect = lambda fn, *args: fn(*args)
+
+        async def process_task(task):
+            return True
+
+        worker.process_task = process_task
+        message = Mock(body=json.dumps({'task_id': 't1'}).encode('utf-8'))
+        message.has_responded.return_value = False
+
+        assert worker._handle_message(message=message) is True
+        message.enable_async.assert_called_once()
+
+        dispatcher = asyncio.create_task(worker._dispatch_batches())
+        for _ in range(10):
+            await asyncio.sleep(0)
+        dispatcher.cancel()
+        await asyncio.gather(*worker._batches, return_exceptions=True)
+
+        message.finish.assert_called_once()
+        message.requeue.assert_not_called()
+
+    def test_invalid_message_finished_without_processing(self):
+        worker = make_worker()
+        message = Mock(body=b'not json')
+
+        assert worker._handle_message(message=message) is False
+        message.finish.assert_called_once()
+        message.enable_async.assert_not_called()
+
+
+class TestMetricsExport:
+    """Test the periodic MCP pool metrics export"""
+
+    @pytest.mark.asyncio
+    async def test_pool_metrics_exported_each_interval(self):
+        worker = make_worker()
+        worker.metrics_interval = 0.01
+        worker.mcp_client = Mock()
+        worker.mcp_client.export_metrics.side_effect = [RuntimeError('pool closed'), {}, {}]
+
+        exporter = asyncio.create_task(worker._export_metrics())
+        await asyncio.sleep(0.05)
+        exporter.cancel()
+
+        assert worker.mcp_client.export_metrics.call_count >= 2
+
+
+class TestMain:
+    """Test the worker entry point"""
+
+    @pytest.mark.asyncio
+    async def test_cleanup_after_consumer_stops(self):
+        from enrichment_service.workers import enrichment_worker
+
+        worker = Mock(start_consuming=AsyncMock(side_effect=RuntimeError('nsqd gone')), cleanup=AsyncMock())
+
+        with patch.object(enrichment_worker, 'EnrichmentWorker', return_value=worker):
+            with pytest.raises(RuntimeError):
+                await enrichment_worker.main()
+
+        worker.cleanup.assert_awaited_once()
+
@@ -0,0 +1,138 @@
+"""
+Unit tests for the MCPClient connection pool
+
+Tests:
+- Requests are spread over the pool by outstanding requests
+- Per-agent in-flight limits backpressure callers without blocking other agents
+- Pool statistics (queue depth, RTT percentiles, bytes)
+"""
+
+import asyncio
+import json
+import pytest
+
+websockets = pytest.importorskip('websockets')
+
+from enrichment_service.mcp_client.client import MCPClient, MCPInvocationError
+
+
+@pytest.fixture
+async def mcp_server():
+    """Local MCP server answering each request after arguments["delay"] seconds"""
+    connections = []
+
+    async def handler(websocket):
+        connections.append(websocket)
+
+        async def reply(request):
+            await asyncio.sleep(request["params"]["arguments"].get("delay", 0))
+            if request["params"]["name"] == "fail":
+                response = {"jsonrpc": "2.0", "id": request["id"], "error": {"code": -1, "message": "boom"}}
+            else:
+                response = {"jsonrpc": "2.0", "id": request["id"], "result": {"tool": request["params"]["name"]}}
+            await websocket.send(json.dumps(response))
+
+        async for message in websocket:
+            asyncio.create_task(reply(json.loads(message)))
+
+    async with websockets.serve(handler, "127.0.0.1", 0) as server:
+        port = server.sockets[0].getsockname()[1]
+        yield f"ws://127.0.0.1:{port}", connections
+
+
+class TestConnectionPool:
+    """Test request distribution over connections"""
+
+    @pytest.mark.asyncio
+    async def test_requests_spread_over_connections(self, mcp_server):
+        url, connections = mcp_server
+        client = MCPClient(server_url=url, pool_size=2, max_in_flight_per_agent=4)
+        try:
+            invocation = asyncio.gather(
+                client.invoke_tool("content-agent", "slow", {"delay": 0.2}),
+                client.invoke_tool("content-agent", "slow", {"delay": 0.2})
+            )
+            await asyncio.sleep(0.1)
+
+            assert len(connections) == 2
+            assert [connection["outstanding"] for connection in client.pool_stats()["connections"]] == [1, 1]
+            assert await invocation == [{"tool": "slow"}, {"tool": "slow"}]
+        finally:
+            await client.disconnect()
+
+    @pytest.mark.asyncio
+    async def test_error_response_raises(self, mcp_server):
+        url, _ = mcp_server
+        client = MCPClient(server_url=url, pool_size=1)
+        try:
+            with pytest.raises(MCPInvocationError):
+                await client.invoke_tool("content-agent", "fail", {})
+            assert client.stats["invocations_failed"] == 1
+        finally:
+            await client.disconnect()
+
+
+class TestBackpressure:
+    """Test per-agent in-flight limits"""
+
+    @pytest.mark.asyncio
+    async def test_slow_agent_does_not_stall_others(self, mcp_server):
+        url, _ = mcp_server
+        client = MCPClient(server_url=url, pool_size=1, max_in_flight_per_agent=1)
+        try:
+            slow = [
+                asyncio.create_task(client.invoke_tool("context-agent", "slow", {"delay": 0.3}))
+                for _ in range(2)
+            ]
+            await asyncio.sleep(0.05)
+
+            stats = client.pool_stats()
+            assert stats["in_flight"] == {"context-agent": 1}
+            assert stats["queue_depth"] == 1
+
+            # Another agent is served while the slow agent's second call waits
+            started = asyncio.get_running_loop().time()
+            await client.invoke_tool("metadata-agent", "fast", {})
+            assert asyncio.get_running_loop().time() - started < 0.2
+
+            await asyncio.gather(*slow)
+            assert client.pool_stats()["queue_depth"] == 0
+        finally:
+            await client.disconnect()
+
+    @pytest.mark.asyncio
+    async def test_pool_stats(self, mcp_server):
+        url, _ = mcp_server
+        client = MCPClient(server_url=url, pool_size=2)
+        try:
+            for _ in range(3):
+                await client.invoke_tool("metadata-agent", "fast", {})
+
+            stats = client.export_metrics()
+            assert stats["rtt_seconds"]["p50"] is not None
+            assert stats["bytes_sent"] > 0
+            assert stats["bytes_received"] > 0
+            assert client.stats["invocations_success"] == 3
+        finally:
+            await client.disconnect()
+
+
+class TestPoolMetrics:
+    """Test the Prometheus gauges fed from pool statistics"""
+
+    @staticmethod
+    def _stats(waiting, in_flight):
+        return {
+            "connections": [], "queue_depth": sum(waiting.values()), "waiting": waiting, "in_flight": in_flight,
+            "rtt_seconds": {"p50": None, "p95": None, "p99": None}, "bytes_sent": 0, "bytes_received": 0
+        }
+
+    def test_agents_dropping_out_are_reset(self):
+        from enrichment_service.utils.metrics import MetricsRecorder, mcp_pool_in_flight, mcp_pool_queue_depth
+
+        MetricsRecorder.set_mcp_pool_stats(self._stats({"metadata-agent": 3}, {"metadata-agent": 2, "entity-agent": 1}))
+        MetricsRecorder.set_mcp_pool_stats(self._stats({}, {"entity-agent": 4}))
+
+        assert mcp_pool_queue_depth.labels(agent_id="metadata-agent")._value.get() == 0
+        assert mcp_pool_in_flight.labels(agent_id="metadata-agent")._value.get() == 0
+        assert mcp_pool_in_flight.labels(agent_id="entity-agent")._value.get() == 4
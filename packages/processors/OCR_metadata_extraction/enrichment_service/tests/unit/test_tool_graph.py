@@ -0,0 +1,111 @@
+"""
+Unit tests for dependency-graph scheduling of enrichment tools
+
+Tests:
+- Graph validation (unknown dependencies, cycles)
+- Tools start as soon as their dependencies resolve
+- Failed and timed-out tools resolve to fallbacks
+- Pre-resolved dependencies for subgraphs
+"""
+
+import asyncio
+import pytest
+
+from enrichment_service.workers.tool_graph import ToolGraph, ToolGraphError, ToolNode
+
+
+def make_node(key, depends_on=(), timeout=None):
+    return ToolNode(
+        key=key,
+        agent_id="test-agent",
+        tool_name=f"tool_{key}",
+        build_params=lambda results: {dep: results[dep] for dep in depends_on},
+        depends_on=depends_on,
+        timeout=timeout
+    )
+
+
+def fallback(node):
+    return {"_source": "fallback"}
+
+
+class TestGraphValidation:
+    """Test graph construction checks"""
+
+    def test_unknown_dependency_rejected(self):
+        with pytest.raises(ToolGraphError):
+            ToolGraph([make_node("summary", depends_on=("entities",))])
+
+    def test_cycle_rejected(self):
+        with pytest.raises(ToolGraphError):
+            ToolGraph([make_node("a", depends_on=("b",)), make_node("b", depends_on=("a",))])
+
+    def test_subgraph_needs_resolved_dependencies(self):
+        graph = ToolGraph([make_node("entities"), make_node("summary", depends_on=("entities",))])
+
+        with pytest.raises(ToolGraphError):
+            asyncio.run(graph.subgraph(["summary"]).run(lambda node, params: None, fallback))
+
+
+class TestGraphExecution:
+    """Test scheduling of tools"""
+
+    @pytest.mark.asyncio
+    async def test_independent_tools_overlap(self):
+        """Latency is the critical path, not the sum of tool latencies"""
+        delays = {"entities": 0.1, "keywords": 0.1, "summary": 0.1}
+
+        async def invoke(node, params):
+            await asyncio.sleep(delays[node.key])
+            return {"key": node.key, "params": params}
+
+        graph = ToolGraph([
+            make_node("entities"),
+            make_node("keywords"),
+            make_node("summary", depends_on=("entities",))
+        ])
+        results, errors, timings = await graph.run(invoke, fallback)
+
+        assert errors == {}
+        assert results["summary"]["params"] == {"entities": results["entities"]}
+        # keywords runs alongside entities; summary waits only for entities
+        assert timings["keywords"][0] < timings["entities"][1]
+        assert timings["summary"][0] >= timings["entities"][1]
+        assert max(end for _, end in timings.values()) < 280
+
+    @pytest.mark.asyncio
+    async def test_failure_and_timeout_resolve_to_fallback(self):
+        async def invoke(node, params):
+            if node.key == "entities":
+                raise RuntimeError("agent down")
+            if node.key == "context":
+                await asyncio.sleep(5)
+            return {"params": params}
+
+        graph = ToolGraph([
+            make_node("entities"),
+            make_node("context", timeout=0.05),
+            make_node("summary", depends_on=("entities", "context"))
+        ])
+        results, errors, _ = await graph.run(invoke, fallback)
+
+        assert results["entities"] == {"_source": "fallback"}
+        assert results["context"] == {"_source": "fallback"}
+        assert set(errors) == {"entities", "context"}
+        assert results["summary"]["params"] == {
+            "entities": {"_source": "fallback"},
+            "context": {"_source": "fallback"}
+        }
+
+    @pytest.mark.asyncio
+    async def test_subgraph_uses_resolved_results(self):
+        async def invoke(node, params):
+            return {"params": params}
+
+        graph = ToolGraph([make_node("entities"), make_node("summary", depends_on=("entities",))])
+        results, _, timings = await graph.subgraph(["summary"]).run(
+            invoke, fallback, resolved={"entities": {"people": ["A"]}}
+        )
+
+        assert set(timings) == {"summary"}
+        assert results["summary"]["params"] == {"entities": {"people": ["A"]}}
@@ -159,6 +159,40 @@ mcp_connection_pool_size = Gauge(
     registry=None
 )
 
+mcp_pool_open_connections = Gauge(
+    'enrichment_mcp_pool_open_connections',
+    'Open connections in the MCP connection pool',
+    registry=None
+)
+
+mcp_pool_queue_depth = Gauge(
+    'enrichment_mcp_pool_queue_depth',
+    'MCP invocations waiting for a free in-flight slot',
+    ['agent_id'],
+    registry=None
+)
+
+mcp_pool_in_flight = Gauge(
+    'enrichment_mcp_pool_in_flight',
+    'Outstanding MCP invocations',
+    ['agent_id'],
+    registry=None
+)
+
+mcp_rtt_seconds = Gauge(
+    'enrichment_mcp_rtt_seconds',
+    'MCP round trip time percentiles over recent invocations',
+    ['quantile'],  # p50, p95, p99
+    registry=None
+)
+
+mcp_bytes = Gauge(
+    'enrichment_mcp_bytes',
+    'Bytes exchanged with the MCP server since the client started',
+    ['direction'],  # sent, received
+    registry=None
+)
+
 # ===================== Database Metrics =====================
 
 mongodb_operations_total = Counter(
@@ -200,6 +234,10 @@ nsq_message_processing_time = Histogram(
     registry=None
 )
 
+# Agents given a per-agent pool gauge value, so agents that drop out of the
+# pool statistics are reset to 0 instead of keeping their last value
+_mcp_pool_agents = {'waiting': set(), 'in_flight': set()}
+
 
 class MetricsRecorder:
     """Helper class to record metrics"""
@@ -300,6 +338,30 @@ class MetricsRecorder:
         """Update agent availability"""
         agent_availability.labels(agent_id=agent_id).set(1 if available else 0)
 
+    @staticmethod
+    def set_mcp_pool_stats(stats: Dict[str, Any]):
+        """
+        Update MCP connection pool metrics
+
+        Args:
+            stats: MCPClient.pool_stats() result
+        """
+        mcp_connection_pool_size.set(len(stats['connections']))
+        mcp_pool_open_connections.set(sum(1 for connection in stats['connections'] if connection['open']))
+        mcp_pool_queue_depth.labels(agent_id='all').set(stats['queue_depth'])
+        for key, gauge in (('waiting', mcp_pool_queue_depth), ('in_flight', mcp_pool_in_flight)):
+            counts = stats[key]
+            for agent_id in _mcp_pool_agents[key] - counts.keys():
+                gauge.labels(agent_id=agent_id).set(0)
+            for agent_id, count in counts.items():
+                gauge.labels(agent_id=agent_id).set(count)
+            _mcp_pool_agents[key] = set(counts)
+        for quantile, value in stats['rtt_seconds'].items():
+            if value is not None:
+                mcp_rtt_seconds.labels(quantile=quantile).set(value)
+        mcp_bytes.labels(direction='sent').set(stats['bytes_sent'])
+        mcp_bytes.labels(direction='received').set(stats['bytes_received'])
+
     @staticmethod
     def record_mongodb_operation(
         operation: str,
@@ -6,13 +6,16 @@ Phase 1 (Parallel):
   - entity-agent: Extract people, organizations, locations, events
   - structure-agent: Parse letter structure (salutation, body, closing)
 
-Phase 2 (Sequential):
+Phase 2 (Parallel):
   - content-agent: Generate summary, extract keywords, classify subjects
-  (Depends on entities from Phase 1)
+  (Summary and subjects depend on entities from Phase 1)
 
-Phase 3 (Sequential):
+Phase 3:
   - context-agent: Research historical context, assess significance
-  (Depends on all previous phases)
+  (Context depends on entities, significance on the context)
+
+Phases 1-3 run as one dependency graph (see tool_graph.py): every tool starts
+as soon as its inputs resolve, so phases overlap.
 
 Phase 4 (Validation):
   - Schema validation and completeness checking
@@ -32,7 +35,8 @@ from enrichment_service.utils.budget_manager import BudgetManager
 from enrichment_service.utils.cost_tracker import CostTracker
 from enrichment_service.errors.error_types import get_error_type, ErrorType
 from enrichment_service.errors.retry_strategy import get_retry_strategy
-from enrichment_service.config.timeouts import get_tool_timeout
+from enrichment_service.config.timeouts import get_tool_timeout, get_tool_deadline
+from enrichment_service.workers.tool_graph import ToolGraph, ToolNode
 
 logger = logging.getLogger(__name__)
 
@@ -47,6 +51,13 @@ class AgentOrchestrator:
     CONTENT_AGENT = "content-agent"
     CONTEXT_AGENT = "context-agent"
 
+    # Result keys of the tools in each phase (see _build_tool_graph)
+    PHASE_TOOLS = {
+        1: ("metadata", "entities", "structure"),
+        2: ("summary", "keywords", "subjects"),
+        3: ("historical_context", "significance")
+    }
+
     def __init__(self, mcp_client: Optional[MCPClient] = None, schema_path: Optional[str] = None, db=None):
         """
         Initialize orchestrator
@@ -78,6 +89,9 @@ class AgentOrchestrator:
         """
         Enrich single document through 3-phase pipeline
 
+        All tools run as one dependency graph: each starts as soon as the
+        results it needs are available, so the phases overlap.
+
         Args:
             document_id: Unique document ID
             ocr_data: Raw OCR extraction results
@@ -92,29 +106,24 @@ class AgentOrchestrator:
         logger.info(f"Starting enrichment for document {document_id}")
 
         try:
-            # Phase 1: Parallel extraction (free, fast)
-            phase1_start = datetime.utcnow()
-            phase1_results = await self._run_phase1(ocr_data)
-            phase1_duration = (datetime.utcnow() - phase1_start).total_seconds() * 1000
-
-            # Phase 2: Content analysis (Claude Sonnet)
-            phase2_start = datetime.utcnow()
-            phase2_results = await self._run_phase2(ocr_data, phase1_results)
-            phase2_duration = (datetime.utcnow() - phase2_start).total_seconds() * 1000
-
-            # Check budget before expensive Phase 3
+            # Check budget before scheduling the expensive context agent
             enable_context_agent = self.budget_manager.should_enable_context_agent()
             if not enable_context_agent:
                 logger.info(f"Budget limit reached, skipping context agent for document {document_id}")
 
-            # Phase 3: Historical context (Claude Opus) - optional based on budget
-            phase3_start = datetime.utcnow()
-            if enable_context_agent:
-                phase3_results = await self._run_phase3(ocr_data, phase1_results, phase2_results)
-            else:
+            phases = [1, 2, 3] if enable_context_agent and config.ENABLE_CLAUDE_OPUS else [1, 2]
+            results, errors, timings = await self._run_tool_graph(ocr_data, phases)
+
+            phase1_results = self._phase_results(1, results, errors)
+            phase2_results = self._phase_results(2, results, errors)
+            if not enable_context_agent:
                 # Skip context agent, use empty results
-                phase3_results = {'historical_context': '', 'significance': '', 'biographies': {}}
-            phase3_duration = (datetime.utcnow() - phase3_start).total_seconds() * 1000
+                phase3_results = {'historical_context': {}, 'significance': {}, 'biographies': {}}
+            elif not config.ENABLE_CLAUDE_OPUS:
+                logger.info("Phase 3 skipped: Claude Opus disabled")
+                phase3_results = {"phase": 3, "skipped": True, "historical_context": {}, "significance": {}}
+            else:
+                phase3_results = self._phase_results(3, results, errors)
 
             # Detect if OCR data contains structured extraction
             has_structured_ocr = 'structured_data' in ocr_data
@@ -152,9 +161,10 @@ class AgentOrchestrator:
                     "passes_threshold": completeness["passes_threshold"]
                 },
                 "enrichment_metadata": {
-                    "phase_1_duration_ms": phase1_duration,
-                    "phase_2_duration_ms": phase2_duration,
-                    "phase_3_duration_ms": phase3_duration,
+                    "phase_1_duration_ms": self._phase_duration(1, timings),
+                    "phase_2_duration_ms": self._phase_duration(2, timings),
+                    "phase_3_duration_ms": self._phase_duration(3, timings),
+                    "tool_durations_ms": {key: end - start for key, (start, end) in timings.items()},
                     "total_processing_time_ms": enrichment_duration,
                     "enrichment_id": self.enrichment_id,
                     "context_agent_enabled": enable_context_agent,
@@ -173,6 +183,108 @@ class AgentOrchestrator:
                 "enrichment_id": self.enrichment_id
             }
 
+    def _build_tool_graph(self, ocr_data: Dict[str, Any]) -> ToolGraph:
+        """
+        Declare every enrichment tool with the results it needs
+
+        Phase 1 (no inputs): document type, entities, letter structure
+        Phase 2: summary and subjects need entities; keywords need only the text
+        Phase 3: historical context needs entities; significance needs the context
+
+        Args:
+            ocr_data: Raw OCR extraction results
+
+        Returns:
+            ToolGraph with per-tool deadlines from config/timeouts.py
+        """
+        text = ocr_data.get("text", "")
+        full_text = ocr_data.get("full_text", text)
+        date = ocr_data.get("metadata", {}).get("date", "")
+
+        def entities(results: Dict[str, Any]) -> Dict[str, Any]:
+            return results.get("entities") or {}
+
+        def node(key, agent_id, tool_name, build_params, depends_on=()):
+            return ToolNode(
+                key=key,
+                agent_id=agent_id,
+                tool_name=tool_name,
+                build_params=build_params,
+                depends_on=depends_on,
+                timeout=get_tool_deadline(tool_name)
+            )
+
+        return ToolGraph([
+            node("metadata", self.METADATA_AGENT, "extract_document_type",
+                 lambda results: {"text": text}),
+            node("entities", self.ENTITY_AGENT, "extract_people",
+                 lambda results: {"text": full_text}),
+            node("structure", self.STRUCTURE_AGENT, "parse_letter_body",
+                 lambda results: {"text": full_text}),
+            node("summary", self.CONTENT_AGENT, "generate_summary",
+                 lambda results: {"text": full_text, "entities": entities(results)},
+                 depends_on=("entities",)),
+            node("keywords", self.CONTENT_AGENT, "extract_keywords",
+                 lambda results: {"text": full_text}),
+            node("subjects", self.CONTENT_AGENT, "classify_subjects",
+                 lambda results: {"text": full_text, "entities": entities(results)},
+                 depends_on=("entities",)),
+            node("historical_context", self.CONTEXT_AGENT, "research_historical_context",
+                 lambda results: {
+                     "text": text,
+                     "people": entities(results).get("people", []),
+                     "locations": entities(results).get("locations", []),
+                     "events": entities(results).get("events", []),
+                     "date": date
+                 },
+                 depends_on=("entities",)),
+            node("significance", self.CONTEXT_AGENT, "assess_significance",
+                 lambda results: {"text": text, "context": results.get("historical_context") or {}},
+                 depends_on=("historical_context",)),
+        ])
+
+    async def _run_tool_graph(
+        self,
+        ocr_data: Dict[str, Any],
+        phases: List[int],
+        resolved: Optional[Dict[str, Any]] = None
+    ) -> Tuple[Dict[str, Any], Dict[str, str], Dict[str, Tuple[float, float]]]:
+        """
+        Run the tools of some phases, each as soon as its inputs are available
+
+        Args:
+            ocr_data: Raw OCR extraction results
+            phases: Phases whose tools to run
+            resolved: Results of tools outside these phases that they depend on
+
+        Returns:
+            Tuple of (results, errors, timings) from ToolGraph.run
+        """
+        graph = self._build_tool_graph(ocr_data)
+        graph = graph.subgraph(key for phase in phases for key in self.PHASE_TOOLS[phase])
+        logger.debug(f"Running tool graph for phases {phases}: {', '.join(graph.nodes)}")
+        return await graph.run(
+            lambda node, params: self._invoke_agent_with_fallback(node.agent_id, node.tool_name, params),
+            lambda node: self._get_fallback_result(node.agent_id, node.tool_name),
+            resolved
+        )
+
+    def _phase_results(self, phase: int, results: Dict[str, Any], errors: Dict[str, str]) -> Dict[str, Any]:
+        """Collect the results (and errors) of one phase's tools"""
+        phase_results: Dict[str, Any] = {"phase": phase}
+        for key in self.PHASE_TOOLS[phase]:
+            phase_results[key] = results.get(key) or {}
+            if key in errors:
+                phase_results[f"{key}_error"] = errors[key]
+        return phase_results
+
+    def _phase_duration(self, phase: int, timings: Dict[str, Tuple[float, float]]) -> float:
+        """Time from the first start to the last end of a phase's tools, in ms"""
+        spans = [timings[key] for key in self.PHASE_TOOLS[phase] if key in timings]
+        if not spans:
+            return 0
+        return max(end for _, end in spans) - min(start for start, _ in spans)
+
     async def _run_phase1(self, ocr_data: Dict[str, Any]) -> Dict[str, Any]:
         """
         Phase 1: Parallel extraction using Ollama (free, fast)
@@ -183,49 +295,9 @@ class AgentOrchestrator:
         - structure-agent
         """
         logger.debug("Starting Phase 1 (parallel extraction)")
-
-        # Prepare parameters for each agent
-        tasks = [
-            self._invoke_agent_with_fallback(
-                self.METADATA_AGENT,
-                "extract_document_type",
-                {"text": ocr_data.get("text", "")}
-            ),
-            self._invoke_agent_with_fallback(
-                self.ENTITY_AGENT,
-                "extract_people",
-                {"text": ocr_data.get("full_text", ocr_data.get("text", ""))}
-            ),
-            self._invoke_agent_with_fallback(
-                self.STRUCTURE_AGENT,
-                "parse_letter_body",
-                {"text": ocr_data.get("full_text", ocr_data.get("text", ""))}
-            )
-        ]
-
-        # Run in parallel with asyncio.gather (return_exceptions=True to prevent pipeline halt)
-        results = await asyncio.gather(*tasks, return_exceptions=True)
-
-        # Extract results and check for exceptions
-        metadata_result = results[0] if not isinstance(results[0], Exception) else None
-        entity_result = results[1] if not isinstance(results[1], Exception) else None
-        structure_result = results[2] if not isinstance(results[2], Exception) else None
-
-        # Log any agent failures
-        for idx, result in enumerate(results):
-            if isinstance(result, Exception):
-                agent_names = [self.METADATA_AGENT, self.ENTITY_AGENT, self.STRUCTURE_AGENT]
-                logger.warning(f"Phase 1 agent {agent_names[idx]} failed: {result}")
-
+        results, errors, _ = await self._run_tool_graph(ocr_data, [1])
         # Pipeline continues even if individual agents fail (they have fallbacks)
-
-        # Merge Phase 1 results
-        return {
-            "metadata": metadata_result or {},
-            "entities": entity_result or {},
-            "structure": structure_result or {},
-            "phase": 1
-        }
+        return self._phase_results(1, results, errors)
 
     async def _run_phase2(
         self,
@@ -235,60 +307,14 @@ class AgentOrchestrator:
         """
         Phase 2: Content analysis using Claude (depends on Phase 1)
 
-        Runs content-agent which needs entity extraction results
+        Runs summary, keywords and subjects concurrently; summary and subjects
+        use the entities from Phase 1
         """
         logger.debug("Starting Phase 2 (content analysis)")
-
-        # Content agent needs entities to classify subjects properly
-        entities = phase1_results.get("entities", {})
-        phase2_results = {"phase": 2, "summary": {}, "keywords": {}, "subjects": {}}
-
-        try:
-            # Generate summary with fallback
-            summary = await self._invoke_agent_with_fallback(
-                self.CONTENT_AGENT,
-                "generate_summary",
-                {
-                    "text": ocr_data.get("full_text", ocr_data.get("text", "")),
-                    "entities": entities
-                }
-            )
-            phase2_results["summary"] = summary or {}
-        except Exception as e:
-            logger.error(f"Phase 2 summary generation failed: {e}", exc_info=True)
-            phase2_results["summary"] = self._get_fallback_result(self.CONTENT_AGENT, "generate_summary")
-            phase2_results["summary_error"] = str(e)
-
-        try:
-            # Extract keywords with fallback
-            keywords = await self._invoke_agent_with_fallback(
-                self.CONTENT_AGENT,
-                "extract_keywords",
-                {"text": ocr_data.get("full_text", ocr_data.get("text", ""))}
-            )
-            phase2_results["keywords"] = keywords or {}
-        except Exception as e:
-            logger.error(f"Phase 2 keyword extraction failed: {e}", exc_info=True)
-            phase2_results["keywords"] = self._get_fallback_result(self.CONTENT_AGENT, "extract_keywords")
-            phase2_results["keywords_error"] = str(e)
-
-        try:
-            # Classify subjects with fallback
-            subjects = await self._invoke_agent_with_fallback(
-                self.CONTENT_AGENT,
-                "classify_subjects",
-                {
-                    "text": ocr_data.get("full_text", ocr_data.get("text", "")),
-                    "entities": entities
-                }
-            )
-            phase2_results["subjects"] = subjects or {}
-        except Exception as e:
-            logger.error(f"Phase 2 subject classification failed: {e}", exc_info=True)
-            phase2_results["subjects"] = self._get_fallback_result(self.CONTENT_AGENT, "classify_subjects")
-            phase2_results["subjects_error"] = str(e)
-
-        return phase2_results
+        results, errors, _ = await self._run_tool_graph(
+            ocr_data, [2], resolved={"entities": phase1_results.get("entities", {})}
+        )
+        return self._phase_results(2, results, errors)
 
     async def _run_phase3(
         self,
@@ -297,65 +323,22 @@ class AgentOrchestrator:
         phase2_results: Dict[str, Any]
     ) -> Dict[str, Any]:
         """
-        Phase 3: Historical context using Claude Opus (depends on all phases)
+        Phase 3: Historical context using Claude Opus
 
-        Runs context-agent which uses highest quality model
+        Researches historical context from the Phase 1 entities, then assesses
+        significance from that context
         """
         logger.debug("Starting Phase 3 (historical context)")
 
         # Check if Claude Opus is enabled
         if not config.ENABLE_CLAUDE_OPUS:
             logger.info("Phase 3 skipped: Claude Opus disabled")
-            return {"phase": 3, "skipped": True, "historical_context": "", "significance": ""}
-
-        # Prepare context for historical analysis
-        entities = phase1_results.get("entities", {})
-        people = entities.get("people", [])
-        locations = entities.get("locations", [])
-        events = entities.get("events", [])
-
-        phase3_results = {
-            "phase": 3,
-            "historical_context": "",
-            "significance": ""
-        }
-
-        try:
-            # Research historical context with fallback
-            context = await self._invoke_agent_with_fallback(
-                self.CONTEXT_AGENT,
-                "research_historical_context",
-                {
-                    "text": ocr_data.get("text", ""),
-                    "people": people,
-                    "locations": locations,
-                    "events": events,
-                    "date": ocr_data.get("metadata", {}).get("date", "")
-                }
-            )
-            phase3_results["historical_context"] = context or {}
-        except Exception as e:
-            logger.error(f"Phase 3 historical context failed: {e}", exc_info=True)
-            phase3_results["historical_context"] = self._get_fallback_result(self.CONTEXT_AGENT, "research_historical_context")
-            phase3_results["context_error"] = str(e)
-
-        try:
-            # Assess significance with fallback
-            significance = await self._invoke_agent_with_fallback(
-                self.CONTEXT_AGENT,
-                "assess_significance",
-                {
-                    "text": ocr_data.get("text", ""),
-                    "context": phase3_results["historical_context"] or {}
-                }
-            )
-            phase3_results["significance"] = significance or {}
-        except Exception as e:
-            logger.error(f"Phase 3 significance assessment failed: {e}", exc_info=True)
-            phase3_results["significance"] = self._get_fallback_result(self.CONTEXT_AGENT, "assess_significance")
-            phase3_results["significance_error"] = str(e)
+            return {"phase": 3, "skipped": True, "historical_context": {}, "significance": {}}
 
-        return phase3_results
+        results, errors, _ = await self._run_tool_graph(
+            ocr_data, [3], resolved={"entities": phase1_results.get("entities", {})}
+        )
+        return self._phase_results(3, results, errors)
 
     async def _invoke_agent_with_fallback(
         self,
@@ -4,6 +4,10 @@ EnrichmentWorker - NSQ consumer that processes enrichment tasks
 Consumes enrichment tasks from NSQ topic "enrichment"
 Orchestrates 5 MCP agents through 3-phase pipeline
 Validates schema completeness and routes to review queue if needed
+
+The gnsq consumer runs on a gevent hub in a helper thread and only hands
+messages over; documents are enriched concurrently on one long-lived asyncio
+loop that also owns the shared MCP connection.
 """
 
 import asyncio
@@ -12,20 +16,13 @@ import logging
 import os
 import sys
 from datetime import datetime
-from typing import Dict, Any, Optional
-from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Optional, Callable, List, Tuple
 from urllib.parse import quote_plus
 from pymongo import MongoClient
 from pymongo.errors import ConnectionFailure
+import gevent
 import gnsq
-
-# Handle event loop conflicts by allowing nested event loops
-try:
-    import nest_asyncio
-    nest_asyncio.apply()
-except ImportError:
-    # nest_asyncio not available, use fallback approach
-    pass
+from gnsq.errors import NSQException
 
 # Import our enrichment components
 from enrichment_service.workers.agent_orchestrator import AgentOrchestrator
@@ -89,10 +86,26 @@ class EnrichmentWorker:
         self.enrichment_topic = self.config['ENRICHMENT_TOPIC']
         self.enrichment_channel = self.config['ENRICHMENT_CHANNEL']
 
-        # Thread pool for async processing in sync NSQ handler
-        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="enrichment_worker")
-
-        logger.info(f"EnrichmentWorker initialized - NSQ: {self.nsq_host}:{self.nsq_port}")
+        # Concurrency: documents enriched at once on the event loop, and NSQ messages held
+        self.max_concurrent = max(1, self.config.get('MAX_CONCURRENT_DOCUMENTS', 10))
+        self.max_in_flight = max(1, self.config.get('MAX_IN_FLIGHT', self.max_concurrent))
+        self.batch_size = max(1, self.config.get('BATCH_SIZE', 50))
+        self.task_timeout = self.config.get('TASK_TIMEOUT_SECONDS', 300)
+        self.touch_interval = self.config.get('TOUCH_INTERVAL_SECONDS', 30)
+        self.metrics_interval = self.config.get('METRICS_INTERVAL_SECONDS', 15)
+        self.semaphore = asyncio.Semaphore(self.max_concurrent)
+
+        # Set up by start_consuming()
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.inbox: Optional[asyncio.Queue] = None
+        self.consumer = None
+        self._consumer_hub = None
+        self._batches: set = set()
+
+        logger.info(
+            f"EnrichmentWorker initialized - NSQ: {self.nsq_host}:{self.nsq_port}, "
+            f"concurrent documents: {self.max_concurrent}, max in flight: {self.max_in_flight}"
+        )
 
     def _load_config(self) -> Dict[str, Any]:
         """Load configuration from environment variables"""
@@ -133,6 +146,11 @@ class EnrichmentWorker:
             'MCP_SERVER_URL': os.getenv('MCP_SERVER_URL', 'ws://localhost:3000'),
             'COMPLETENESS_THRESHOLD': float(os.getenv('COMPLETENESS_THRESHOLD', '0.95')),
             'BATCH_SIZE': int(os.getenv('BATCH_SIZE', '50')),
+            'MAX_CONCURRENT_DOCUMENTS': int(os.getenv('MAX_CONCURRENT_DOCUMENTS', '10')),
+            'MAX_IN_FLIGHT': int(os.getenv('ENRICHMENT_MAX_IN_FLIGHT', os.getenv('MAX_CONCURRENT_DOCUMENTS', '10'))),
+            'TASK_TIMEOUT_SECONDS': int(os.getenv('ENRICHMENT_TASK_TIMEOUT', '300')),
+            'TOUCH_INTERVAL_SECONDS': int(os.getenv('ENRICHMENT_TOUCH_INTERVAL', '30')),
+            'METRICS_INTERVAL_SECONDS': int(os.getenv('ENRICHMENT_METRICS_INTERVAL', '15')),
             'LOG_LEVEL': os.getenv('LOG_LEVEL', 'INFO')
         }
 
@@ -322,11 +340,25 @@ class EnrichmentWorker:
         """
         Start consuming messages from NSQ
 
-        Runs the blocking gnsq consumer in a thread pool to avoid blocking the event loop
+        The blocking gnsq consumer runs in a helper thread; its handler only
+        passes messages to this event loop, where they are enriched in batches
+        with at most max_concurrent documents at a time.
         """
         logger.info(f"Starting NSQ consumer: topic={self.enrichment_topic}, channel={self.enrichment_channel}")
         logger.info(f"Lookupd addresses: {self.lookupd_http_addresses}")
 
+        self.loop = asyncio.get_running_loop()
+        self.inbox = asyncio.Queue()
+
+        # One MCP connection for all documents, bound to this long-lived loop
+        try:
+            await self.mcp_client.connect()
+        except Exception as e:
+            logger.warning(f"MCP server not reachable yet, connecting on first tool call: {e}")
+
+        dispatcher = asyncio.create_task(self._dispatch_batches())
+        metrics_exporter = asyncio.create_task(self._export_metrics())
+
         try:
             # Create consumer using gnsq
             # Try connecting directly to nsqd first, then fall back to lookupd
@@ -336,7 +368,7 @@ class EnrichmentWorker:
                     self.enrichment_topic,
                     self.enrichment_channel,
                     nsqd_tcp_addresses=[f"{self.nsq_host}:{self.nsq_port}"],
-                    max_in_flight=100
+                    max_in_flight=self.max_in_flight
                 )
                 logger.info("✅ Connected to nsqd directly")
             except Exception as e:
@@ -345,27 +377,33 @@ class EnrichmentWorker:
                     self.enrichment_topic,
                     self.enrichment_channel,
                     self.lookupd_http_addresses,
-                    max_in_flight=100
+                    max_in_flight=self.max_in_flight
                 )
                 logger.info("✅ Connected to nsqlookupd")
 
             # Set message handler
             consumer.on_message.connect(self._handle_message)
+            self.consumer = consumer
 
             logger.info("NSQ Consumer created, starting to consume messages...")
 
-            # Run gnsq consumer in thread pool to avoid blocking the event loop
-            loop = asyncio.get_event_loop()
-            await loop.run_in_executor(None, consumer.start)
+            # Run gnsq consumer in a helper thread to avoid blocking the event loop
+            await self.loop.run_in_executor(None, consumer.start)
 
         except Exception as e:
             logger.error(f"NSQ consumer error: {e}", exc_info=True)
             raise
+        finally:
+            dispatcher.cancel()
+            metrics_exporter.cancel()
 
     def _handle_message(self, sender=None, message=None) -> bool:
         """
-        NSQ message handler - runs async task in thread to avoid blocking NSQ loop
-        
+        NSQ message handler - hands the task to the event loop and returns at once
+
+        Runs on the consumer thread's gevent hub. The message is answered
+        (finish/requeue/touch) back on that hub once the event loop is done with it.
+
         Called by blinker signal which sends (sender, message=msg)
 
         Args:
@@ -373,104 +411,124 @@ class EnrichmentWorker:
             message: NSQ message object
 
         Returns:
-            True if message was processed successfully
+            True if the message was handed over
         """
+        if message is None:
+            logger.error("No message provided to handler")
+            return False
+
         try:
-            if message is None:
-                logger.error("No message provided to handler")
-                return False
-                
             # Decode message
             task_data = json.loads(message.body.decode('utf-8'))
-
-            # Process in thread pool to avoid blocking NSQ event loop
-            # Create new event loop for this thread
-            result = self._process_task_sync(task_data)
-
-            if result:
-                message.finish()  # Acknowledge message
-                logger.debug(f"Message acknowledged: task_id={task_data.get('task_id', 'unknown')}")
-            else:
-                message.requeue()  # Requeue for retry
-                logger.warning(f"Message requeued: task_id={task_data.get('task_id', 'unknown')}")
-
-            return result
-
-        except json.JSONDecodeError as e:
+        except (json.JSONDecodeError, UnicodeDecodeError) as e:
             logger.error(f"Failed to parse NSQ message: {e}")
             message.finish()  # Don't requeue invalid messages
             return False
 
-        except Exception as e:
-            logger.error(f"Error handling NSQ message: {e}", exc_info=True)
-            message.requeue()  # Requeue on unexpected errors
-            return False
-
-    def _process_task_sync(self, task_data: Dict[str, Any]) -> bool:
-        """
-        Process task synchronously (wrapper for async process_task)
+        if self._consumer_hub is None:
+            self._consumer_hub = gevent.get_hub()
+        hub = self._consumer_hub
 
-        Runs async process_task in a fresh event loop in a separate thread
+        def respond(action: str) -> None:
+            hub.loop.run_callback_threadsafe(self._respond, message, action)
 
-        Args:
-            task_data: Task data dict
+        message.enable_async()
+        self.loop.call_soon_threadsafe(self.inbox.put_nowait, (task_data, respond))
+        return True
 
-        Returns:
-            True if processed successfully
-        """
-        def run_async_task_in_thread():
-            """Helper to run async task in its own event loop in a separate thread"""
+    @staticmethod
+    def _respond(message, action: str) -> None:
+        """Finish, requeue or touch a message (on the consumer's hub)"""
+        if message.has_responded():
+            return
+        try:
+            getattr(message, action)()
+        except NSQException as e:
+            logger.warning(f"Could not {action} NSQ message {message.id}: {e}")
+
+    async def _dispatch_batches(self) -> None:
+        """Group handed-over messages into batches and start each batch without waiting for it"""
+        while True:
+            batch: List[Tuple[Dict[str, Any], Callable[[str], None]]] = [await self.inbox.get()]
+            while len(batch) < self.batch_size and not self.inbox.empty():
+                batch.append(self.inbox.get_nowait())
+
+            task = asyncio.create_task(self._run_batch(batch))
+            self._batches.add(task)
+            task.add_done_callback(self._batches.discard)
+
+    async def _export_metrics(self) -> None:
+        """Refresh the MCP connection pool gauges periodically"""
+        if not self.metrics_interval:
+            return
+        while True:
+            await asyncio.sleep(self.metrics_interval)
             try:
-                # Clear any existing event loop for this thread
-                try:
-                    loop = asyncio.get_event_loop()
-                    if loop.is_running():
-                        # This shouldn't happen in a fresh thread, but handle it
-                        logger.warning("Event loop already running in thread")
-                        loop = None
-                except RuntimeError:
-                    loop = None
-
-                # Create a completely fresh event loop
-                if loop is None or loop.is_closed():
-                    asyncio.set_event_loop(None)
-                    loop = asyncio.new_event_loop()
-                    asyncio.set_event_loop(loop)
-
-                # Run the coroutine
-                result = loop.run_until_complete(self.process_task(task_data))
-                return result
-            finally:
-                # Always clean up
-                try:
-                    loop.close()
-                except:
-                    pass
-                asyncio.set_event_loop(None)
+                self.mcp_client.export_metrics()
+            except Exception as e:
+                logger.warning(f"Could not export MCP pool metrics: {e}")
 
-        try:
-            # Run in thread pool to ensure complete isolation from main event loop
-            future = self.executor.submit(run_async_task_in_thread)
-            result = future.result(timeout=300)  # 5 minute timeout
-            return result
-        except Exception as e:
-            logger.error(f"Error in sync task processing: {e}", exc_info=True)
-            return False
+    async def _run_batch(self, batch: List[Tuple[Dict[str, Any], Callable[[str], None]]]) -> None:
+        """Process a batch, answering each message as soon as its document is done"""
+        keepalives = [asyncio.create_task(self._keep_alive(respond)) for _, respond in batch]
+
+        def on_result(index: int, success: bool) -> None:
+            keepalives[index].cancel()
+            batch[index][1]('finish' if success else 'requeue')
+            if not success:
+                logger.warning(f"Message requeued: task_id={batch[index][0].get('task_id', 'unknown')}")
 
-    async def process_batch(self, tasks: list) -> Dict[str, int]:
+        try:
+            await self.process_batch([task_data for task_data, _ in batch], on_result=on_result)
+        finally:
+            for keepalive in keepalives:
+                keepalive.cancel()
+
+    async def _keep_alive(self, respond: Callable[[str], None]) -> None:
+        """Touch a message periodically while it waits or is processed"""
+        if not self.touch_interval:
+            return
+        while True:
+            await asyncio.sleep(self.touch_interval)
+            respond('touch')
+
+    async def process_batch(
+        self,
+        tasks: list,
+        on_result: Optional[Callable[[int, bool], None]] = None
+    ) -> Dict[str, int]:
         """
         Process batch of enrichment tasks concurrently
 
+        At most max_concurrent documents (across all batches) are enriched at once.
+
         Args:
             tasks: List of enrichment task dicts
+            on_result: Optional callback (task index, success) called as each task finishes
 
         Returns:
             Statistics dict with success/failure counts
         """
         logger.info(f"Processing batch of {len(tasks)} documents")
 
+        async def run(index: int, task: Dict[str, Any]):
+            try:
+                async with self.semaphore:
+                    result = await asyncio.wait_for(self.process_task(task), timeout=self.task_timeout)
+            except asyncio.TimeoutError:
+                logger.error(f"Task {task.get('task_id', 'unknown')} timed out after {self.task_timeout}s")
+                self._record_failure(task.get('enrichment_job_id', ''), 'timeout')
+                result = False
+            except Exception as e:
+                logger.error(f"Task {task.get('task_id', 'unknown')} failed: {e}", exc_info=True)
+                result = e
+
+            if on_result is not None:
+                on_result(index, result is True)
+            return result
+
         results = await asyncio.gather(
-            *[self.process_task(task) for task in tasks],
+            *[run(index, task) for index, task in enumerate(tasks)],
             return_exceptions=True
         )
 
@@ -484,6 +542,20 @@ class EnrichmentWorker:
         logger.info(f"Batch complete: {stats['success']}/{stats['total']} successful")
         return stats
 
+    async def cleanup(self) -> None:
+        """Stop consuming, cancel running batches and close connections"""
+        if self.consumer is not None and self._consumer_hub is not None:
+            self._consumer_hub.loop.run_callback_threadsafe(self.consumer.close)
+
+        for task in list(self._batches):
+            task.cancel()
+        if self._batches:
+            await asyncio.gather(*self._batches, return_exceptions=True)
+
+        await self.mcp_client.disconnect()
+        if self.db is not None:
+            self.mongo_client.close()
+
 
 # Entry point for containerized worker
 async def main():
@@ -491,7 +563,11 @@ async def main():
     logging.basicConfig(level=logging.INFO)
 
     worker = EnrichmentWorker()
-    await worker.start_consuming()
+    try:
+        await worker.start_consuming()
+    finally:
+        # Also runs when asyncio.run cancels main() on shutdown
+        await worker.cleanup()
 
 
 if __name__ == '__main__':
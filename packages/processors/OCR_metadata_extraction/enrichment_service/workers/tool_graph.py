@@ -0,0 +1,147 @@
+"""
+Tool Graph - Runs enrichment tools as a dependency graph
+
+Each tool declares the results it needs. A tool starts as soon as all of them
+have resolved, so per-document latency is the critical path of the graph
+rather than the sum of the tool latencies.
+"""
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ToolNode:
+    """One tool invocation in the graph"""
+
+    key: str  # Name the result is stored under
+    agent_id: str
+    tool_name: str
+    build_params: Callable[[Dict[str, Any]], Dict[str, Any]]  # Resolved results -> tool arguments
+    depends_on: Tuple[str, ...] = ()
+    timeout: Optional[float] = None  # Seconds for the whole invocation, retries included (None = no limit)
+
+
+class ToolGraphError(ValueError):
+    """Raised when the graph has unknown dependencies or a cycle"""
+
+
+class ToolGraph:
+    """Dependency graph of enrichment tools"""
+
+    def __init__(self, nodes: Iterable[ToolNode]):
+        """
+        Build and validate the graph
+
+        Args:
+            nodes: Tool nodes; keys must be unique
+
+        Raises:
+            ToolGraphError: If a key is duplicated, a dependency is unknown or the graph has a cycle
+        """
+        self.nodes: Dict[str, ToolNode] = {}
+        for node in nodes:
+            if node.key in self.nodes:
+                raise ToolGraphError(f"Duplicate tool key: {node.key}")
+            self.nodes[node.key] = node
+        self._check()
+
+    def _check(self) -> None:
+        """Reject unknown dependencies and cycles"""
+        for node in self.nodes.values():
+            unknown = [dep for dep in node.depends_on if dep not in self.nodes]
+            if unknown:
+                raise ToolGraphError(f"Tool {node.key} depends on unknown tools: {', '.join(unknown)}")
+
+        # Kahn's algorithm: every node must become ready eventually
+        remaining = {key: set(node.depends_on) for key, node in self.nodes.items()}
+        while remaining:
+            ready = [key for key, deps in remaining.items() if not deps]
+            if not ready:
+                raise ToolGraphError(f"Cycle between tools: {', '.join(sorted(remaining))}")
+            for key in ready:
+                del remaining[key]
+            for deps in remaining.values():
+                deps.difference_update(ready)
+
+    def subgraph(self, keys: Iterable[str]) -> "ToolGraph":
+        """
+        Graph of some of the nodes; dependencies outside it must be passed to run() as resolved
+
+        Args:
+            keys: Keys of the nodes to keep
+        """
+        keys = set(keys)
+        graph = ToolGraph.__new__(ToolGraph)
+        graph.nodes = {key: node for key, node in self.nodes.items() if key in keys}
+        return graph
+
+    async def run(
+        self,
+        invoke: Callable[[ToolNode, Dict[str, Any]], Awaitable[Dict[str, Any]]],
+        fallback: Callable[[ToolNode], Dict[str, Any]],
+        resolved: Optional[Dict[str, Any]] = None
+    ) -> Tuple[Dict[str, Any], Dict[str, str], Dict[str, Tuple[float, float]]]:
+        """
+        Run every node as soon as its dependencies have resolved
+
+        A node that raises or exceeds its timeout resolves to fallback(node),
+        so the nodes depending on it still run.
+
+        Args:
+            invoke: Coroutine function called with the node and its arguments
+            fallback: Result used for a failed node
+            resolved: Results available before the run (dependencies outside the graph)
+
+        Returns:
+            Tuple of (results by key, error message by key of failed nodes,
+            (start, end) offsets in ms from the start of the run by key)
+        """
+        results: Dict[str, Any] = dict(resolved or {})
+        errors: Dict[str, str] = {}
+        timings: Dict[str, Tuple[float, float]] = {}
+        started_at = time.monotonic()
+
+        missing = {dep for node in self.nodes.values() for dep in node.depends_on
+                   if dep not in self.nodes and dep not in results}
+        if missing:
+            raise ToolGraphError(f"Unresolved dependencies: {', '.join(sorted(missing))}")
+
+        done: Dict[str, asyncio.Event] = {key: asyncio.Event() for key in self.nodes}
+
+        async def run_node(node: ToolNode) -> None:
+            try:
+                for dep in node.depends_on:
+                    if dep in done:
+                        await done[dep].wait()
+
+                start = (time.monotonic() - started_at) * 1000
+                try:
+                    params = node.build_params(results)
+                    call = invoke(node, params)
+                    if node.timeout:
+                        result = await asyncio.wait_for(call, timeout=node.timeout)
+                    else:
+                        result = await call
+                except asyncio.TimeoutError:
+                    logger.warning(f"Tool {node.agent_id}/{node.tool_name} exceeded {node.timeout}s, using fallback")
+                    errors[node.key] = f"Timed out after {node.timeout}s"
+                    result = fallback(node)
+                except Exception as e:
+                    logger.error(f"Tool {node.agent_id}/{node.tool_name} failed: {e}", exc_info=True)
+                    errors[node.key] = str(e)
+                    result = fallback(node)
+
+                results[node.key] = result if result is not None else {}
+                timings[node.key] = (start, (time.monotonic() - started_at) * 1000)
+            finally:
+                # Dependents must never wait forever, even if this node was cancelled
+                done[node.key].set()
+
+        await asyncio.gather(*(run_node(node) for node in self.nodes.values()))
+        return results, errors, timings
@@ -1,4 +1,5 @@
 import React, { useState, useEffect } from 'react';
+import { iterateJobResultPages } from './jobResults';
 import { Download, Eye, Trash2, Clock, CheckCircle, XCircle, RefreshCw, ChevronLeft, ChevronRight, FileText, AlertCircle, TrendingUp, Languages, FolderOpen, Calendar, Upload, FolderPlus } from 'lucide-react';
 
 interface BulkJob {
@@ -330,8 +331,7 @@ const BulkJobHistory: React.FC = () => {
       return;
     }
 
-    const samples = (job.results.results_preview?.successful_samples || []) as any[];
-    if (samples.length === 0) {
+    if (!job.results.summary?.successful) {
       alert('No processed images available for this job');
       return;
     }
@@ -376,40 +376,50 @@ const BulkJobHistory: React.FC = () => {
       const projectData = await projectResponse.json();
       const projectId = projectData.project.id;
 
-      // Step 2: Add all processed images to the project
+      // Step 2: Add all processed images to the project, one page of results at a time
       const imagesAdded: string[] = [];
       let failedImages = 0;
+      let totalImages = 0;
 
-      for (const sample of samples) {
-        try {
-          const imageResponse = await fetch('/api/ocr/add-to-project', {
-            method: 'POST',
-            headers: {
-              'Authorization': `Bearer ${token}`,
-              'Content-Type': 'application/json',
-            },
-            body: JSON.stringify({
-              project_id: projectId,
-              filename: sample.file,
-              file_path: sample.file_path,
-              ocr_text: sample.text,
-              confidence: sample.confidence,
-              language: sample.language,
-              provider: sample.provider,
-            }),
-          });
-
-          if (imageResponse.ok) {
-            imagesAdded.push(sample.file);
-          } else {
+      const fetchWithToken = (url: string) => fetch(url, {
+        headers: {
+          'Authorization': `Bearer ${token}`,
+        },
+      });
+
+      for await (const samples of iterateJobResultPages(job.job_id, fetchWithToken)) {
+        for (const sample of samples) {
+          totalImages++;
+          try {
+            const imageResponse = await fetch('/api/ocr/add-to-project', {
+              method: 'POST',
+              headers: {
+                'Authorization': `Bearer ${token}`,
+                'Content-Type': 'application/json',
+              },
+              body: JSON.stringify({
+                project_id: projectId,
+                filename: sample.file,
+                file_path: sample.file_path,
+                ocr_text: sample.text,
+                confidence: sample.confidence,
+                language: sample.language,
+                provider: sample.provider,
+              }),
+            });
+
+            if (imageResponse.ok) {
+              imagesAdded.push(sample.file);
+            } else {
+              failedImages++;
+            }
+          } catch (err) {
             failedImages++;
           }
-        } catch (err) {
-          failedImages++;
         }
       }
 
-      alert(`✅ Project created successfully!\n\nProject: ${projectData.project.name}\nID: ${projectId}\n\nImages added: ${imagesAdded.length}/${samples.length}`);
+      alert(`✅ Project created successfully!\n\nProject: ${projectData.project.name}\nID: ${projectId}\n\nImages added: ${imagesAdded.length}/${totalImages}`);
     } catch (err) {
       const errorMessage = err instanceof Error ? err.message : 'Failed to create project';
       alert(errorMessage);
@@ -635,9 +645,9 @@ const BulkJobHistory: React.FC = () => {
                         )}
                         <button
                           onClick={() => handleCreateProjectFromJob(job)}
-                          disabled={isCreatingProject || !job.results?.results_preview?.successful_samples || job.results.results_preview.successful_samples.length === 0}
+                          disabled={isCreatingProject || !job.results?.summary?.successful}
                           className="p-2 text-orange-600 hover:bg-orange-50 disabled:text-gray-400 disabled:opacity-50 disabled:cursor-not-allowed rounded-lg transition-colors"
-                          title={!job.results?.results_preview?.successful_samples || job.results.results_preview.successful_samples.length === 0 ? "No processed images available" : "Create Project from Job"}
+                          title={!job.results?.summary?.successful ? "No processed images available" : "Create Project from Job"}
                         >
                           <FolderPlus className="w-5 h-5" />
                         </button>
@@ -918,7 +928,7 @@ const BulkJobHistory: React.FC = () => {
                     </div>
                   </div>
 
-                  {/* Sample Results */}
+                  {/* Sample Results (results_preview is a capped sample, not every file) */}
                   {selectedJob.results.results_preview && (
                     <div className="space-y-4">
                       {/* Successful Samples */}
@@ -928,7 +938,7 @@ const BulkJobHistory: React.FC = () => {
                             <div className="flex items-center gap-2">
                               <CheckCircle className="w-5 h-5 text-green-600" />
                               <h4 className="font-semibold text-gray-800">
-                                Successful Files ({selectedJob.results.results_preview.successful_samples.length})
+                                Sample of Successful Files (showing {Math.min(selectedJob.results.results_preview.successful_samples.length, 10)} of {selectedJob.results.summary.successful})
                               </h4>
                             </div>
                           </div>
@@ -956,9 +966,9 @@ const BulkJobHistory: React.FC = () => {
                                 )}
                               </div>
                             ))}
-                            {selectedJob.results.results_preview.successful_samples.length > 10 && (
+                            {selectedJob.results.summary.successful > 10 && (
                               <div className="p-3 text-center text-sm text-gray-600 bg-gray-50">
-                                ... and {selectedJob.results.results_preview.successful_samples.length - 10} more files
+                                ... and {selectedJob.results.summary.successful - Math.min(selectedJob.results.results_preview.successful_samples.length, 10)} more files (download the report for all results)
                               </div>
                             )}
                           </div>
@@ -972,7 +982,7 @@ const BulkJobHistory: React.FC = () => {
                             <div className="flex items-center gap-2">
                               <XCircle className="w-5 h-5 text-red-600" />
                               <h4 className="font-semibold text-gray-800">
-                                Failed Files ({selectedJob.results.results_preview.error_samples.length})
+                                Sample of Failed Files (showing {Math.min(selectedJob.results.results_preview.error_samples.length, 10)} of {selectedJob.results.summary.failed})
                               </h4>
                             </div>
                           </div>
@@ -988,9 +998,9 @@ const BulkJobHistory: React.FC = () => {
                                 </div>
                               </div>
                             ))}
-                            {selectedJob.results.results_preview.error_samples.length > 10 && (
+                            {selectedJob.results.summary.failed > 10 && (
                               <div className="p-3 text-center text-sm text-gray-600 bg-gray-50">
-                                ... and {selectedJob.results.results_preview.error_samples.length - 10} more errors
+                                ... and {selectedJob.results.summary.failed - Math.min(selectedJob.results.results_preview.error_samples.length, 10)} more errors (download the report for all errors)
                               </div>
                             )}
                           </div>
@@ -3,6 +3,7 @@ import { useNavigate } from 'react-router-dom';
 import { useAuthStore } from '@/stores/authStore';
 import { Download, BarChart3, FolderOpen, Zap, LogOut, History, Activity, Server } from 'lucide-react';
 import BulkJobHistory from './BulkJobHistory';
+import { iterateJobResultPages } from './jobResults';
 
 interface ProcessingResult {
   file: string;
@@ -591,7 +592,7 @@ const BulkOCRProcessor: React.FC = () => {
   const handleUploadToArchipelago = async (jobId: string) => {
     console.log(`[UPLOAD] Starting Archipelago upload for job: ${jobId}`);
     
-    if (!state.results || state.results.results_preview.successful_samples.length === 0) {
+    if (!state.results || state.results.summary.successful === 0) {
       console.warn(`[UPLOAD] No successful results found`);
       setState({ ...state, error: 'No successful results to upload' });
       return;
@@ -618,7 +619,7 @@ const BulkOCRProcessor: React.FC = () => {
 
       console.log(`[UPLOAD] Collection title: ${collectionTitle}`);
       console.log(`[UPLOAD] Job ID: ${jobId}`);
-      console.log(`[UPLOAD] Successful samples: ${state.results.results_preview.successful_samples.length}`);
+      console.log(`[UPLOAD] Successful files: ${state.results.summary.successful}`);
 
       console.log(`[UPLOAD] Sending POST request to /api/archipelago/push-bulk-ami`);
       const response = await authenticatedFetch('/api/archipelago/push-bulk-ami', {
@@ -745,7 +746,7 @@ const BulkOCRProcessor: React.FC = () => {
   };
 
   const handleCreateProject = async () => {
-    if (!state.results || state.results.results_preview.successful_samples.length === 0) {
+    if (!state.results || !currentJobId || state.results.summary.successful === 0) {
       setState({ ...state, error: 'No successful results to create project from' });
       return;
     }
@@ -773,8 +774,8 @@ const BulkOCRProcessor: React.FC = () => {
       const projectData = await projectResponse.json();
       const projectId = projectData.project.id;
 
-      // Upload all successful files to the project
-      const uploadPromises = state.results.results_preview.successful_samples.map(async (result) => {
+      // Upload all successful files to the project, one page of results at a time
+      const uploadResult = async (result: ProcessingResult) => {
         try {
           // Fetch the original file
           const fileResponse = await authenticatedFetch(
@@ -811,9 +812,11 @@ const BulkOCRProcessor: React.FC = () => {
           console.error(`Error uploading ${result.file}:`, error);
           return null;
         }
-      });
+      };
 
-      await Promise.all(uploadPromises);
+      for await (const results of iterateJobResultPages(currentJobId, authenticatedFetch)) {
+        await Promise.all(results.map(uploadResult));
+      }
 
       // Save bulk processing results to project folder
       try {
@@ -0,0 +1,32 @@
+// Per-file results of a bulk job, read page by page from /api/bulk/job/<job_id>/results.
+// results_preview in the job document only holds a capped sample with truncated text,
+// so anything that acts on every file of a job must go through these pages.
+
+export const JOB_RESULTS_PAGE_SIZE = 200;
+
+export type JobResultType = 'result' | 'error';
+
+export async function* iterateJobResultPages(
+  jobId: string,
+  fetcher: (url: string) => Promise<Response | null>,
+  type: JobResultType = 'result',
+): AsyncGenerator<any[]> {
+  let page = 1;
+  let pages = 1;
+
+  do {
+    const response = await fetcher(
+      `/api/bulk/job/${encodeURIComponent(jobId)}/results?type=${type}&page=${page}&limit=${JOB_RESULTS_PAGE_SIZE}`
+    );
+    if (!response || !response.ok) {
+      throw new Error('Failed to fetch job results');
+    }
+
+    const data = await response.json();
+    pages = data.pagination.pages;
+    if (data.results.length > 0) {
+      yield data.results;
+    }
+    page++;
+  } while (page <= pages);
+}
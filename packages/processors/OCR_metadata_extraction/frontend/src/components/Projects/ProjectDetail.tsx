@@ -251,7 +251,7 @@ export const ProjectDetail: React.FC = () => {
             {bulkResults.results_preview?.successful_samples?.length > 0 && (
               <div className="mb-6">
                 <h3 className="font-semibold text-gray-900 mb-3 text-green-700">
-                  ✓ Successful Results ({bulkResults.results_preview.successful_samples.length})
+                  ✓ Sample of Successful Results (showing {bulkResults.results_preview.successful_samples.length} of {bulkResults.summary?.successful ?? bulkResults.results_preview.successful_samples.length})
                 </h3>
                 <div className="overflow-x-auto">
                   <table className="w-full text-sm">
@@ -307,7 +307,7 @@ export const ProjectDetail: React.FC = () => {
             {bulkResults.results_preview?.failed_samples?.length > 0 && (
               <div>
                 <h3 className="font-semibold text-gray-900 mb-3 text-red-700">
-                  ✗ Failed Results ({bulkResults.results_preview.failed_samples.length})
+                  ✗ Sample of Failed Results (showing {bulkResults.results_preview.failed_samples.length} of {bulkResults.summary?.failed ?? bulkResults.results_preview.failed_samples.length})
                 </h3>
                 <div className="overflow-x-auto">
                   <table className="w-full text-sm">